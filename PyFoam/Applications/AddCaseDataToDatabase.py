@@ -52,6 +52,12 @@ Adds the content of a number of pickledData-files to a sqlite database
                        dest="skipMissing",
                        default=False,
                        help="Skip files that are missing or unreadable")
+        how.add_option("--layout",
+                       type="choice",
+                       choices=RunDatabase.layouts,
+                       dest="layout",
+                       default=None,
+                       help="Layout of a database that is created: 'wide' (one column per value) or 'long' (one row per value. Needed if there are more values than SQLite allows columns). Default is the setting 'layout' in the section 'RunDatabase' of the configuration. Possible values: "+", ".join(RunDatabase.layouts))
 
 
     def run(self):
@@ -62,7 +68,8 @@ Adds the content of a number of pickledData-files to a sqlite database
 
         db=RunDatabase(dest,
                        create=self.opts.create,
-                       verbose=self.opts.verbose)
+                       verbose=self.opts.verbose,
+                       layout=self.opts.layout)
 
         for s in sources:
             if self.opts.verbose:
@@ -77,4 +84,7 @@ Adds the content of a number of pickledData-files to a sqlite database
                 else:
                     self.error("There was a problem reading file",s,
                                ":",e)
-            db.add(data)
+            db.add(data,commit=False)
+
+        # all the files in one transaction
+        db.commit()
@@ -20,9 +20,48 @@ from PyFoam.Error import error,warning
 
 from PyFoam.ThirdParty.six import print_,iteritems,string_types
 
-from math import log10,ceil
 from os import path
 
+def processorInformation(task):
+    """Collect the information about one processor directory. Called
+    by the processes of the pool
+    :param task: tuple with the case, the region, the processor
+    directory, the time, whether binary boundary-files are treated as
+    ASCII, whether the sizes are needed and whether the boundary is
+    needed
+    :return: dictionary with the number of points, faces and cells
+    (None if not available) and the number of faces of all the
+    patches"""
+    case,region,processor,time,treatBinaryAsASCII,sizes,patches=task
+    sol=SolutionDirectory(case,
+                          archive=None,
+                          paraviewLink=False,
+                          region=region)
+    result={}
+    if sizes:
+        info=MeshInformation(case,
+                             processor=processor,
+                             region=region,
+                             time=time)
+        result["points"]=info.nrOfPoints()
+        result["faces"]=info.nrOfFaces()
+        try:
+            result["cells"]=info.nrOfCells()
+        except Exception:
+            result["cells"]=None
+    if patches:
+        try:
+            bound=ParsedBoundaryDict(sol.boundaryDict(processor=processor,
+                                                      region=region,
+                                                      time=time),
+                                     treatBinaryAsASCII=treatBinaryAsASCII)
+        except IOError:
+            bound=ParsedBoundaryDict(sol.boundaryDict(processor=processor,
+                                                      region=region),
+                                     treatBinaryAsASCII=treatBinaryAsASCII)
+        result["patches"]=dict((b,bound[b]["nFaces"]) for b in bound)
+    return result
+
 class CaseReport(PyFoamApplication):
     def __init__(self,
                  args=None,
@@ -149,6 +188,13 @@ respectivly
                           dest="parallel",
                           help="Get times from the processor-directories")
 
+        internal.add_option("--jobs",
+                            action="store",
+                            type="int",
+                            default=1,
+                            dest="jobs",
+                            help="Number of processes that read the data of the processor-directories. The results are the same as with one process. Default: %default")
+
         internal.add_option("--long-field-threshold",
                             action="store",
                             type="int",
@@ -205,6 +251,7 @@ respectivly
 
     def run(self):
         oldStdout=None
+        self.procData={}
 
         try:
             if self.opts.file:
@@ -227,6 +274,41 @@ respectivly
             if oldStdout:
                 sys.stdout=oldStdout
 
+    def processorData(self,sol,theRegion,sizes=False,patches=False):
+        """Get the information about all the processor directories.
+        The directories are read by a pool of processes if more than
+        one job is specified
+        :param sol: the SolutionDirectory
+        :param theRegion: the region
+        :param sizes: the number of points, faces and cells is needed
+        :param patches: the number of faces of the patches is needed
+        :return: list with the results of processorInformation in the
+        order of the processors"""
+        key=(sol.name,theRegion,sizes,patches)
+        if key in self.procData:
+            return self.procData[key]
+        tasks=[(sol.name,
+                theRegion,
+                p,
+                self.opts.time,
+                self.opts.boundaryTreatBinaryAsASCII,
+                sizes,
+                patches) for p in sol.processorDirs()]
+        if self.opts.jobs>1 and len(tasks)>1:
+            from multiprocessing import Pool
+            pool=Pool(min(self.opts.jobs,len(tasks)))
+            try:
+                data=pool.map(processorInformation,
+                              tasks,
+                              chunksize=max(1,len(tasks)//(4*self.opts.jobs)))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            data=[processorInformation(t) for t in tasks]
+        self.procData[key]=data
+        return data
+
     def doRegion(self,theRegion):
         ReST=RestructuredTextHelper(defaultHeading=self.opts.headingLevel)
 
@@ -277,6 +359,10 @@ respectivly
         if self.opts.parallel:
             defaultProc=0
 
+        # what is read from the processor directories. Read only once
+        procSizes=self.opts.decomposition or (self.opts.caseSize and self.opts.parallel)
+        procPatches=self.opts.decomposition or self.opts.processorMatrix
+
         if needsPolyBoundaries:
             proc=None
             boundary=BoundaryDict(sol.name,
@@ -355,22 +441,27 @@ respectivly
             nPoints=0
             nCells=0
             if self.opts.parallel:
-                procs=list(range(sol.nrProcs()))
                 print_("Accumulated from",sol.nrProcs(),"processors")
+                data=self.processorData(sol,theRegion,procSizes,procPatches)
             else:
-                procs=[None]
-
-            for p in procs:
                 info=MeshInformation(sol.name,
-                                     processor=p,
                                      region=theRegion,
                                      time=self.opts.time)
-                nFaces+=info.nrOfFaces()
-                nPoints+=info.nrOfPoints()
                 try:
-                    nCells+=info.nrOfCells()
+                    cells=info.nrOfCells()
                 except:
+                    cells=None
+                data=[{"faces":info.nrOfFaces(),
+                       "points":info.nrOfPoints(),
+                       "cells":cells}]
+
+            for d in data:
+                nFaces+=d["faces"]
+                nPoints+=d["points"]
+                if d["cells"] is None:
                     nCells="Not available"
+                elif nCells!="Not available":
+                    nCells+=d["cells"]
             tab=ReST.table()
             tab[0]=("Faces",nFaces)
             tab[1]=("Points",nPoints)
@@ -386,24 +477,10 @@ respectivly
                 print_("Case is decomposed for",sol.nrProcs(),"processors")
                 print_()
 
-                nCells=[]
-                nFaces=[]
-                nPoints=[]
-                for p in sol.processorDirs():
-                    info=MeshInformation(sol.name,
-                                         processor=p,
-                                         region=theRegion,
-                                         time=self.opts.time)
-                    nPoints.append(info.nrOfPoints())
-                    nFaces.append(info.nrOfFaces())
-                    nCells.append(info.nrOfCells())
-
-                digits=int(ceil(log10(max(sol.nrProcs(),
-                                          max(nCells),
-                                          max(nFaces),
-                                          max(nPoints)
-                                          ))))+2
-                nameLen=max(len("Points"),boundMaxLen)
+                data=self.processorData(sol,theRegion,procSizes,procPatches)
+                nCells=[d["cells"] if d["cells"] is not None else "Not available" for d in data]
+                nFaces=[d["faces"] for d in data]
+                nPoints=[d["points"] for d in data]
 
                 tab=ReST.table()
                 tab[0]=["CPU"]+list(range(sol.nrProcs()))
@@ -419,21 +496,8 @@ respectivly
                 for b in boundaryNames:
                     nr+=1
                     tab[(nr,0)]=b
-                    for i,p in enumerate(sol.processorDirs()):
-                        try:
-                            nFaces= ParsedBoundaryDict(sol.boundaryDict(processor=p,
-                                                                        region=theRegion,
-                                                                        time=self.opts.time),
-                                                       treatBinaryAsASCII=self.opts.boundaryTreatBinaryAsASCII
-                                                       )[b]["nFaces"]
-                        except IOError:
-                            nFaces= ParsedBoundaryDict(sol.boundaryDict(processor=p,
-                                                                        region=theRegion),
-                                                       treatBinaryAsASCII=self.opts.boundaryTreatBinaryAsASCII
-                                                       )[b]["nFaces"]
-                        except KeyError:
-                            nFaces=0
-
+                    for i,d in enumerate(data):
+                        nFaces=d["patches"].get(b,0)
                         tab[(nr,i+1)]=nFaces
 
                 print_(tab)
@@ -577,25 +641,16 @@ respectivly
             else:
                 matrix=[ [0,]*sol.nrProcs() for i in range(sol.nrProcs())]
 
-                for i,p in enumerate(sol.processorDirs()):
-                    try:
-                        bound=ParsedBoundaryDict(sol.boundaryDict(processor=p,
-                                                                  region=theRegion,
-                                                                  time=self.opts.time)
-                                                 ,treatBinaryAsASCII=self.opts.boundaryTreatBinaryAsASCII)
-                    except IOError:
-                        bound=ParsedBoundaryDict(sol.boundaryDict(processor=p,
-                                                                  treatBinaryAsASCII=self.opts.boundaryTreatBinaryAsASCII,
-                                                                  region=theRegion)
-                                                 ,treatBinaryAsASCII=self.opts.boundaryTreatBinaryAsASCII)
-
+                data=self.processorData(sol,theRegion,procSizes,procPatches)
+                for i,d in enumerate(data):
+                    bound=d["patches"]
                     for j in range(sol.nrProcs()):
                         name="procBoundary%dto%d" %(j,i)
                         name2="procBoundary%dto%d" %(i,j)
                         if name in bound:
-                            matrix[i][j]=bound[name]["nFaces"]
+                            matrix[i][j]=bound[name]
                         if name2 in bound:
-                            matrix[i][j]=bound[name2]["nFaces"]
+                            matrix[i][j]=bound[name2]
 
                 print_("Matrix of processor interactions (faces)")
                 print_()
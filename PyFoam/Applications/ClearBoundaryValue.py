@@ -5,19 +5,45 @@ Application class that implements pyFoamClearBoundaryValue.py
 
 from .PyFoamApplication import PyFoamApplication
 
-from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
+from PyFoam.RunDictionary.BoundaryFieldRewriter import BoundaryFieldRewriter,processorFieldFiles
+from PyFoam.Basics.Utilities import processFiles
 
 from PyFoam.ThirdParty.six import print_
 
 import sys
+from functools import partial
+
+def clearBoundaryValue(fName,opts,destPatches):
+    """Set the value on the patches of one field file
+    :param fName: name of the field file
+    :param opts: the options of the utility
+    :param destPatches: names of the patches to set
+    :return: the changed file as a string if only testing"""
+    fieldFile=BoundaryFieldRewriter(fName,backup=False)
+
+    value=""
+    if opts.patch:
+        value=fieldFile["boundaryField"][opts.patch][opts.srckey]
+    else:
+        value="uniform "+opts.value
+
+    for destPatch in destPatches:
+        fieldFile["boundaryField"][destPatch][opts.destkey]=value
+
+    if opts.test:
+        return str(fieldFile)
+    else:
+        fieldFile.writeFile()
 
 class ClearBoundaryValue(PyFoamApplication):
     def __init__(self,
                  args=None,
                  **kwargs):
         description="""\
-Takes a field-file and makes the whole internal field uniform. Either
-taking the value from a patch or using a user-specified value
+Takes a field-file and sets the value on a number of patches. Either
+taking the value from a patch or using a user-specified value. Only
+the boundaryField of the file is rewritten. The rest of the file
+(including the internal field) is copied unchanged
         """
 
         PyFoamApplication.__init__(self,
@@ -56,6 +82,17 @@ taking the value from a patch or using a user-specified value
                                default="value",
                                dest="srckey",
                                help="The key that should be read from the source patch: %default")
+        self.parser.add_option("--parallel",
+                               action="store_true",
+                               default=False,
+                               dest="parallel",
+                               help="Also change the corresponding files in the processor-directories of the case")
+        self.parser.add_option("--jobs",
+                               action="store",
+                               type="int",
+                               default=1,
+                               dest="jobs",
+                               help="Number of processes that change the files in parallel. Default: %default")
 
 
     def run(self):
@@ -66,24 +103,22 @@ taking the value from a patch or using a user-specified value
         if self.opts.patch!=None and self.opts.value!=None:
             self.error("Only a patch or a value can be specified")
 
+        names=[fName]
+        if self.opts.parallel:
+            names+=processorFieldFiles(fName)
+
         try:
-            fieldFile=ParsedParameterFile(fName,backup=False)
+            results=processFiles(partial(clearBoundaryValue,
+                                         opts=self.opts,
+                                         destPatches=destPatches),
+                                 names,
+                                 jobs=self.opts.jobs)
         except IOError:
             e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
             self.error("Problem with file",fName,":",e)
 
-        value=""
-        if self.opts.patch:
-            value=fieldFile["boundaryField"][self.opts.patch][self.opts.srckey]
-        else:
-            value="uniform "+self.opts.value
-
-        for destPatch in destPatches:
-            fieldFile["boundaryField"][destPatch][self.opts.destkey]=value
-
-        if self.opts.test:
-            print_(str(fieldFile))
-        else:
-            fieldFile.writeFile()
+        for r in results:
+            if r is not None:
+                print_(r)
 
 # Should work with Python3 and Python2
@@ -55,6 +55,13 @@ class CommonParserOptions(object):
                           dest="listLengthUnparsed",
                           help="Lists longer than this are not parsed")
 
+        parser.add_option("--numpy-list-length",
+                          action="store",
+                          type="int",
+                          default=None,
+                          dest="listLengthNumpy",
+                          help="Lists of numbers, vectors or tensors longer than this are read directly into numpy-arrays")
+
         parser.add_option("--do-macro-expansion",
                           action="store_true",
                           default=False,
@@ -7,6 +7,8 @@ from optparse import OptionGroup
 from PyFoam.ThirdParty.six.moves import cPickle as pickle
 from PyFoam.ThirdParty.six import print_
 
+from PyFoam.Basics.TimeLineStore import isTimeLineStore,readPlotData
+
 import sys
 
 class CommonPickledDataInput(object):
@@ -26,7 +28,8 @@ class CommonPickledDataInput(object):
 File from which the pickled data should be read. If this is set to
 'stdin' then the data is read from the standard-input to allow using
 the pipe into it. If unset and stdin is not a terminal, then it is
-automatically chosen""")
+automatically chosen. If this is a timelineStore-file then the data of
+the timelines and the plots is read""")
 
         pickled.add_option("--print-data",
                            action="store_true",
@@ -54,10 +57,16 @@ automatically chosen""")
 
             if self.opts.pickledFileRead=="stdin":
                 pick=pickle.Unpickler(sys.stdin)
+                data=pick.load()
+                del pick
+            elif isTimeLineStore(self.opts.pickledFileRead):
+                lineInfo,plotInfo=readPlotData(self.opts.pickledFileRead)
+                data={"timelines":lineInfo,
+                      "plots":plotInfo}
             else:
                 pick=pickle.Unpickler(open(self.opts.pickledFileRead,"rb"))
-            data=pick.load()
-            del pick
+                data=pick.load()
+                del pick
 
         if self.opts.printStdout:
             try:
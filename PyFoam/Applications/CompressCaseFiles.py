@@ -3,8 +3,13 @@ Application-class that implements pyFoamCompressCaseFiles.py
 """
 from optparse import OptionGroup
 from os import path,listdir
-import subprocess
+import os
 import sys
+import gzip
+import zlib
+import time
+import shutil
+import tempfile
 from glob import glob
 
 from .PyFoamApplication import PyFoamApplication
@@ -18,13 +23,166 @@ from PyFoam.Basics.Utilities import humanReadableSize
 if PY3:
     long=int
 
+# files are collected into tasks of at least this many bytes so that
+# small files don't need one message to the worker each
+taskBytes=64*1024*1024
+
+# size of the blocks that are copied
+blockSize=1024*1024
+
+# number of blocks that are compressed to estimate the compressed size
+# of a big file
+sampleBlocks=4
+
+def _temporaryFor(fName):
+    """Open a temporary file in the same directory as the file (so
+    that it can be renamed to it)"""
+    fd,tmpName=tempfile.mkstemp(dir=path.dirname(fName),
+                                prefix="."+path.basename(fName),
+                                suffix=".tmp")
+    return os.fdopen(fd,"wb"),tmpName
+
+def _replace(tmpName,original,target):
+    """Give the temporary file the name of the target and remove the
+    original"""
+    shutil.copystat(original,tmpName)
+    os.rename(tmpName,target)
+    os.remove(original)
+
+def _gzipMember(src,dst,fName,level,length=None):
+    """Compress data from an open file as one gzip-member
+    :param length: number of bytes to read. Everything if None"""
+    z=gzip.GzipFile(filename=path.basename(fName),
+                    mode="wb",
+                    compresslevel=level,
+                    fileobj=dst,
+                    mtime=os.stat(fName).st_mtime)
+    while length is None or length>0:
+        data=src.read(blockSize if length is None else min(blockSize,length))
+        if not data:
+            break
+        if length is not None:
+            length-=len(data)
+        z.write(data)
+    z.close()
+
+def _estimateCompressed(fName,level):
+    """Estimate the size of the compressed file by compressing a few
+    blocks of it"""
+    size=os.path.getsize(fName)
+    with open(fName,"rb") as f:
+        if size<=sampleBlocks*blockSize:
+            offsets=[0]
+            length=size
+        else:
+            offsets=[i*(size-blockSize)//(sampleBlocks-1) for i in range(sampleBlocks)]
+            length=blockSize
+        raw=0
+        compressed=0
+        for o in offsets:
+            f.seek(o)
+            data=f.read(length)
+            c=zlib.compressobj(level,zlib.DEFLATED,31)
+            raw+=len(data)
+            compressed+=len(c.compress(data))+len(c.flush())
+    if raw==0:
+        return compressed
+    return int(size*float(compressed)/raw)
+
+def _estimateDecompressed(fName):
+    """Estimate the size of the uncompressed file by decompressing the
+    beginning of it"""
+    size=os.path.getsize(fName)
+    raw=0
+    consumed=0
+    with open(fName,"rb") as f:
+        d=zlib.decompressobj(31)
+        while consumed<sampleBlocks*blockSize:
+            data=f.read(blockSize)
+            if not data:
+                break
+            consumed+=len(data)
+            while data:
+                raw+=len(d.decompress(data))
+                data=d.unused_data
+                if data:
+                    # next member
+                    d=zlib.decompressobj(31)
+    if consumed==0:
+        return 0
+    return int(raw*float(size)/consumed)
+
+def compressionTask(task):
+    """Execute one task of the compression. The tasks are tuples with
+    the kind of the task, a list of items and the compression level.
+    Kinds of tasks are:
+
+    - 'compress': compress the files in the list
+    - 'decompress': decompress the files in the list
+    - 'estimate'/'estimateDecompress': only estimate the size of the
+      files after compression or decompression
+    - 'member': the items are tuples (name,offset,length,partName).
+      The part of the file is compressed into the gzip-file partName
+
+    :return: list with a tuple (problem,oldSize,newSize) for every item.
+    The problem is None if everything went well"""
+    kind,items,level=task
+    results=[]
+    for item in items:
+        fName=item[0] if kind=="member" else item
+        tmpName=None
+        try:
+            if kind=="compress":
+                oldSize=path.getsize(fName)
+                with open(fName,"rb") as src:
+                    dst,tmpName=_temporaryFor(fName)
+                    with dst:
+                        _gzipMember(src,dst,fName,level)
+                newSize=path.getsize(tmpName)
+                _replace(tmpName,fName,fName+".gz")
+            elif kind=="decompress":
+                oldSize=path.getsize(fName)
+                with gzip.open(fName,"rb") as src:
+                    dst,tmpName=_temporaryFor(fName)
+                    with dst:
+                        shutil.copyfileobj(src,dst,blockSize)
+                newSize=path.getsize(tmpName)
+                _replace(tmpName,fName,fName[:-len(".gz")])
+            elif kind=="member":
+                fName,offset,length,tmpName=item
+                with open(fName,"rb") as src:
+                    src.seek(offset)
+                    with open(tmpName,"wb") as dst:
+                        _gzipMember(src,dst,fName,level,length=length)
+                oldSize=length
+                newSize=path.getsize(tmpName)
+            elif kind=="estimate":
+                oldSize=path.getsize(fName)
+                newSize=_estimateCompressed(fName,level)
+            elif kind=="estimateDecompress":
+                oldSize=path.getsize(fName)
+                newSize=_estimateDecompressed(fName)
+            else:
+                results.append(("Unknown task "+kind,0,0))
+                continue
+            results.append((None,oldSize,newSize))
+        except Exception:
+            e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
+            if tmpName is not None and path.exists(tmpName):
+                os.remove(tmpName)
+            results.append(("%s: %s: %s" % (fName,e.__class__.__name__,e),0,0))
+    return results
+
 class CompressCaseFiles(PyFoamApplication):
     def __init__(self,
                  args=None,
                  **kwargs):
         description="""\
 Gets a number of directories. If these are OpenFOAM-cases then it goes through them
-and checks for large uncompressed files and gnuzips them
+and checks for large uncompressed files and gnuzips them. The files are
+compressed by a number of processes. The compressed file is written
+under a temporary name and only replaces the original when it is
+complete
 """
         PyFoamApplication.__init__(self,
                                    args=args,
@@ -67,6 +225,44 @@ and checks for large uncompressed files and gnuzips them
                             default=False,
                             help="Compress files in the case directory that end with .logfile (Assuming that these are logfiles generated by PyFoam)")
 
+        compress.add_option("--decompress",
+                            action="store_true",
+                            dest="decompress",
+                            default=False,
+                            help="Decompress the files with the extension .gz in the same places instead of compressing")
+
+        how=OptionGroup(self.parser,
+                        "How",
+                        "How the files are compressed")
+        self.parser.add_option_group(how)
+
+        how.add_option("--jobs",
+                       action="store",
+                       type="int",
+                       dest="jobs",
+                       default=1,
+                       help="Number of processes that compress files at the same time. Default: %default")
+
+        how.add_option("--level",
+                       action="store",
+                       type="int",
+                       dest="level",
+                       default=6,
+                       help="Compression level (1 is fastest, 9 is best compression). Default: %default")
+
+        how.add_option("--split-size",
+                       action="store",
+                       type="int",
+                       dest="splitSize",
+                       default=0,
+                       help="Files bigger than this number of bytes are cut into parts of this size that are compressed in parallel. The result is a gzip-file with multiple members that gunzip and zlib read like a regular file. 0 switches this off. Default: %default")
+
+        how.add_option("--dry-run",
+                       action="store_true",
+                       dest="dryRun",
+                       default=False,
+                       help="Do not change any files. Estimate the size after the compression by compressing samples from each file")
+
         feedback=OptionGroup(self.parser,
                              "Feedback",
                              "What should be printed")
@@ -89,36 +285,33 @@ and checks for large uncompressed files and gnuzips them
 
 
     def compressFile(self,fName):
-        if self.verbose>1:
-            print_("  Compressing",fName)
-        zippedName=fName+".gz"
-        if path.exists(zippedName):
-            self.warning("Zipped file",zippedName,"already existing for",fName)
+        """Check whether the file should be compressed and add it to
+        the files that are compressed with the next call of
+        processFiles"""
+        if fName in self.queued:
+            # processor0 may be found through the times and the processor directories
+            return
+        if self.opts.decompress:
+            target=fName[:-len(".gz")]
+        else:
+            target=fName+".gz"
+        if path.exists(target):
+            if self.opts.decompress:
+                self.warning("Unzipped file",target,"already existing for",fName)
+            else:
+                self.warning("Zipped file",target,"already existing for",fName)
             return
         oldSize=path.getsize(fName)
-        if oldSize<self.bigSize:
+        if oldSize<self.bigSize and not self.opts.decompress:
             if self.verbose>2:
-                print_("   Skipping because it is too small")
+                print_("  Skipping",fName,"because it is too small")
             self.nrSkipped+=1
             return
+        if self.verbose>1:
+            print_("  Queueing",fName,"for","decompression" if self.opts.decompress else "compression")
 
-        # use gzip because that way the responsibility of removing the old file is with a 'tried and testd' program
-        ret=subprocess.call(["gzip",fName])
-        if ret!=0 or not path.exists(zippedName) or path.exists(fName):
-            self.warning("Problem compressing file",fName)
-            self.nrProblems+=1
-            return
-        newSize=path.getsize(zippedName)
-        if newSize>oldSize:
-            self.warning("Compression of",fName,"increased the filesize. Old:",
-                         humanReadableSize(oldSize),"New:",humanReadableSize(newSize))
-
-        if self.verbose>2:
-            print_("   Old size:",humanReadableSize(oldSize),"New size:",humanReadableSize(newSize))
-
-        self.nrFiles+=1
-        self.prevSize+=oldSize
-        self.nowSize+=newSize
+        self.pending.append((fName,oldSize))
+        self.queued.add(fName)
 
     def compressDirectory(self,dirName):
         if self.verbose>1:
@@ -128,11 +321,140 @@ and checks for large uncompressed files and gnuzips them
                 self.compressDirectory(path.join(dirName,f))
             else:
                 name,ext=path.splitext(f)
-                if ext.lower() not in self.extensions:
+                if self.opts.decompress:
+                    if ext.lower()==".gz":
+                        self.compressFile(path.join(dirName,f))
+                elif ext.lower() not in self.extensions:
                     self.compressFile(path.join(dirName,f))
                 else:
                     self.nrCompressed+=1
 
+    def makeTasks(self):
+        """Build the tasks for the pending files. Every task has about
+        the same number of bytes. The biggest tasks come first so that
+        no process is left with a big file at the end"""
+        level=self.opts.level
+        if self.opts.dryRun:
+            kind="estimateDecompress" if self.opts.decompress else "estimate"
+        else:
+            kind="decompress" if self.opts.decompress else "compress"
+
+        tasks=[]
+        # tuples with the name and the names of the parts
+        split=[]
+        batch=[]
+        batchSize=0
+        for fName,size in sorted(self.pending,key=lambda x:-x[1]):
+            if kind=="compress" and self.opts.splitSize>0 and size>self.opts.splitSize:
+                parts=[]
+                for offset in range(0,size,self.opts.splitSize):
+                    parts.append(path.join(path.dirname(fName),
+                                           ".%s.part%d.gz.tmp" % (path.basename(fName),len(parts))))
+                    length=min(self.opts.splitSize,size-offset)
+                    tasks.append((length,
+                                  ("member",[(fName,offset,length,parts[-1])],level)))
+                split.append((fName,parts))
+            elif size>=taskBytes:
+                tasks.append((size,(kind,[fName],level)))
+            else:
+                batch.append(fName)
+                batchSize+=size
+                if batchSize>=taskBytes:
+                    tasks.append((batchSize,(kind,batch,level)))
+                    batch=[]
+                    batchSize=0
+        if len(batch)>0:
+            tasks.append((batchSize,(kind,batch,level)))
+        tasks.sort(key=lambda x:-x[0])
+        return [t[1] for t in tasks],split
+
+    def assembleParts(self,fName,parts):
+        """Concatenate the members of a split file. Removes the parts
+        and replaces the original file
+        :return: the size of the compressed file"""
+        try:
+            with open(fName+".gz.tmp","wb") as dst:
+                for p in parts:
+                    with open(p,"rb") as src:
+                        shutil.copyfileobj(src,dst,blockSize)
+            newSize=path.getsize(fName+".gz.tmp")
+            shutil.copystat(fName,fName+".gz.tmp")
+            os.rename(fName+".gz.tmp",fName+".gz")
+            os.remove(fName)
+            return newSize
+        finally:
+            for p in parts+[fName+".gz.tmp"]:
+                if path.exists(p):
+                    os.remove(p)
+
+    def processFiles(self):
+        """Compress (or decompress) the files that were collected"""
+        if len(self.pending)==0:
+            return
+        sizes=dict(self.pending)
+        tasks,split=self.makeTasks()
+        self.pending=[]
+        self.queued=set()
+
+        if self.pool is not None and len(tasks)>1:
+            results=self.pool.imap(compressionTask,tasks)
+        else:
+            results=(compressionTask(t) for t in tasks)
+
+        partNames={}
+        for fName,parts in split:
+            for p in parts:
+                partNames[p]=fName
+        # sizes of the parts of split files that are already done
+        partSizes={}
+        failedSplit=set()
+
+        for task,result in zip(tasks,results):
+            kind,items,level=task
+            for item,(problem,oldSize,newSize) in zip(items,result):
+                if kind=="member":
+                    fName=item[0]
+                    if problem is not None:
+                        failedSplit.add(fName)
+                        self.warning("Problem compressing",problem)
+                        self.nrProblems+=1
+                    partSizes.setdefault(fName,[]).append(newSize)
+                    continue
+                self.fileDone(item,problem,oldSize,newSize)
+
+        for fName,parts in split:
+            if fName in failedSplit:
+                for p in parts:
+                    if path.exists(p):
+                        os.remove(p)
+                continue
+            try:
+                newSize=self.assembleParts(fName,parts)
+            except (OSError,IOError):
+                e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
+                self.fileDone(fName,str(e),0,0)
+            else:
+                self.fileDone(fName,None,sizes[fName],newSize)
+
+    def fileDone(self,fName,problem,oldSize,newSize):
+        """Update the statistics for a processed file"""
+        if problem is not None:
+            self.warning("Problem",
+                         "decompressing" if self.opts.decompress else "compressing",
+                         problem)
+            self.nrProblems+=1
+            return
+        if newSize>oldSize and not self.opts.decompress:
+            self.warning("Compression of",fName,"increased the filesize. Old:",
+                         humanReadableSize(oldSize),"New:",humanReadableSize(newSize))
+
+        if self.verbose>2:
+            print_("  ",fName,"Old size:",humanReadableSize(oldSize),"New size:",humanReadableSize(newSize))
+
+        self.nrFiles+=1
+        self.prevSize+=oldSize
+        self.nowSize+=newSize
+
     def compressCase(self,dirName,warn=False):
         if not path.exists(dirName):
             self.error("Directory",dirName,"does not exist")
@@ -165,15 +487,22 @@ and checks for large uncompressed files and gnuzips them
 
         # compress logfiles if requested
         if self.opts.logfile:
-            for f in glob(path.join(dirName,"*.logfile")):
+            for f in glob(path.join(dirName,"*.logfile.gz" if self.opts.decompress else "*.logfile")):
                 self.compressFile(path.join(dirName,f))
 
         # processor direcories
         for p in s.procDirs:
             self.compressDirectory(path.join(dirName,p))
+
+        self.processFiles()
+
         if self.nrFiles>oldNr and self.verbose>0:
-            print_("  -> ",self.nrFiles-oldNr,"files compressed.",
-                   humanReadableSize((self.prevSize-oldUnc)-(self.nowSize-oldCon)),"gained")
+            if self.opts.decompress:
+                print_("  -> ",self.nrFiles-oldNr,"files decompressed.",
+                       humanReadableSize((self.nowSize-oldCon)-(self.prevSize-oldUnc)),"more")
+            else:
+                print_("  -> ",self.nrFiles-oldNr,"files compressed.",
+                       humanReadableSize((self.prevSize-oldUnc)-(self.nowSize-oldCon)),"gained")
 
     def recursiveCompress(self,dirName):
         if self.verbose>1:
@@ -217,6 +546,18 @@ and checks for large uncompressed files and gnuzips them
         self.nrSkipped=0
         self.nrProblems=0
 
+        self.pending=[]
+        self.queued=set()
+        self.pool=None
+        if self.opts.jobs>1:
+            from multiprocessing import Pool
+            self.pool=Pool(self.opts.jobs)
+
+        if self.opts.level<1 or self.opts.level>9:
+            self.error("Compression level",self.opts.level,"not in the range 1 to 9")
+
+        startTime=time.time()
+
         try:
             for d in dirs:
                 p=path.abspath(d)
@@ -226,18 +567,38 @@ and checks for large uncompressed files and gnuzips them
                     self.compressCase(p,warn=True)
         except KeyboardInterrupt:
             print_("Rudely interrupted by Control-C")
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool=None
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+
+        duration=time.time()-startTime
 
         if self.opts.statistics:
             if self.verbose>0:
                 print_()
             print_(self.nrDir,"case directories processed")
             if self.nrFiles==0:
-                print_("No files to compress found")
+                print_("No files to","decompress" if self.opts.decompress else "compress","found")
             else:
                 print_(self.nrFiles,"files processed")
-                print_("Reduced total size from",humanReadableSize(self.prevSize),
-                       "to",humanReadableSize(self.nowSize),
-                       ". This is",(100.*self.nowSize)/self.prevSize,"percent of the original")
+                if self.opts.dryRun:
+                    print_("Dry run. Sizes after the",
+                           "decompression" if self.opts.decompress else "compression",
+                           "are estimated")
+                if self.opts.decompress:
+                    print_("Increased total size from",humanReadableSize(self.prevSize),
+                           "to",humanReadableSize(self.nowSize))
+                else:
+                    print_("Reduced total size from",humanReadableSize(self.prevSize),
+                           "to",humanReadableSize(self.nowSize),
+                           ". This is",(100.*self.nowSize)/self.prevSize,"percent of the original")
+                uncompressed=max(self.prevSize,self.nowSize)
+                print_("Processed",humanReadableSize(uncompressed),"of uncompressed data in",
+                       "%.1f s (%.1f MB/s)" % (duration,uncompressed/(1024.*1024.)/max(duration,1e-6)))
             if self.nrSkipped>0:
                 print_("Skipped",self.nrSkipped,"files because they were smaller than",self.bigSize)
             if self.nrCompressed>0:
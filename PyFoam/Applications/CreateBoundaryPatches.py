@@ -7,15 +7,111 @@ import re
 from os import path
 
 import sys
+from functools import partial
 
 from .PyFoamApplication import PyFoamApplication
 
-from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
+from PyFoam.RunDictionary.BoundaryFieldRewriter import BoundaryFieldRewriter,processorFieldFiles
+from PyFoam.Basics.Utilities import processFiles
 from PyFoam.RunDictionary.BoundaryDict import BoundaryDict
 from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
+from PyFoam.Error import PyFoamException
 
 from PyFoam.ThirdParty.six import print_
 
+def createBoundaryPatches(fName,opts):
+    """Add the patches to one field file
+    :param fName: name of the field file
+    :param opts: the options of the utility
+    :return: tuple with the messages for the user, the case and the
+    changed file as a string if only testing"""
+    messages=[]
+
+    try:
+        dictFile=BoundaryFieldRewriter(fName,backup=False)
+    except IOError:
+        e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
+        raise PyFoamException("Problem with file "+fName+": "+str(e))
+
+    fName=path.abspath(fName)
+    case=path.dirname(path.dirname(fName))
+    region=None
+    processor=None
+
+    if path.basename(case).find("processor")==0:
+        processor=path.basename(case)
+        case=path.dirname(case)
+
+    if not SolutionDirectory(case,archive=None,paraviewLink=False).isValid():
+        # checking for a multi-region case
+        case=path.dirname(case)
+        region=path.basename(path.dirname(fName))
+        if path.basename(case).find("processor")==0:
+            processor=path.basename(case)
+            case=path.dirname(case)
+        messages.append(" ".join([case,region]))
+        if region not in SolutionDirectory(case,archive=None,paraviewLink=False).getRegions():
+            raise PyFoamException(region+" is not a valid region in the case "+case)
+
+    if opts.filter==None:
+        flter=re.compile(".+")
+    else:
+        flter=re.compile(opts.filter)
+
+    boundaries=dictFile["boundaryField"]
+
+    try:
+        bFile=BoundaryDict(case,region=region,processor=processor)
+    except IOError:
+        e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
+        raise PyFoamException("Problem reading the boundary file: "+str(e))
+
+    if opts.clear:
+        for b in list(boundaries.keys()):
+            if b not in bFile.patches():
+                if opts.verbose:
+                    messages.append("Deleting patch "+b)
+                del boundaries[b]
+
+    if not opts.nocheck:
+        for p in bFile.patches():
+            if p in boundaries:
+                typ=boundaries[p]["type"]
+                pTyp=bFile[p]["type"]
+                if pTyp!="patch" and pTyp!="wall" and pTyp!=typ:
+                    if opts.fixtypes:
+                        if opts.verbose:
+                            messages.append("Fixing wall/patch patch "+p)
+                        del boundaries[p]
+                        continue
+                    else:
+                        raise PyFoamException("Inconsistent type for "+p+": Is "+typ+" but should be "+pTyp)
+                if typ in ["symmetryPlane","empty","wedge","cyclic","processor"] and pTyp!=typ:
+                    if opts.fixtypes:
+                        if opts.verbose:
+                            messages.append("Fixing special patch "+p)
+                        del boundaries[p]
+                        continue
+                    else:
+                        raise PyFoamException("Inconsistent type for "+p+": Is "+typ+" but should be some kind of patch type")
+
+    for p in bFile.patches():
+        if (not p in boundaries or opts.overwrite) and flter.match(p):
+            pTyp=bFile[p]["type"]
+            if pTyp!="patch" and pTyp!="wall":
+                tmp={"type":pTyp}
+            else:
+                tmp=eval(opts.default)
+            if opts.verbose:
+                messages.append("Writing "+str(tmp)+" to patch "+p)
+            boundaries[p]=tmp;
+
+    if opts.test:
+        return messages,case,str(dictFile)
+    else:
+        dictFile.writeFile()
+        return messages,case,None
+
 class CreateBoundaryPatches(PyFoamApplication):
     def __init__(self,
                  args=None,
@@ -23,7 +119,8 @@ class CreateBoundaryPatches(PyFoamApplication):
         description="""\
 Takes a field-file. Looks up the polyMesh/boundary-file of the case
 and adds the corresponding patches to the boundary field setting it to
-zeroGradient for all patches and walls
+zeroGradient for all patches and walls. Only the boundaryField of the
+file is rewritten. The rest of the file is copied unchanged
         """
 
         PyFoamApplication.__init__(self,
@@ -83,84 +180,42 @@ zeroGradient for all patches and walls
                                dest="fixtypes",
                                help="Fix inconsistencies")
 
-    def run(self):
-        fName=self.parser.getArgs()[0]
-
-        try:
-            dictFile=ParsedParameterFile(fName,backup=False)
-        except IOError:
-            e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
-            self.error("Problem with file",fName,":",e)
-
-        fName=path.abspath(fName)
-        case=path.dirname(path.dirname(fName))
-        region=None
+        self.parser.add_option("--parallel",
+                               action="store_true",
+                               default=False,
+                               dest="parallel",
+                               help="Also change the corresponding files in the processor-directories of the case (using their boundary-files)")
 
-        if not SolutionDirectory(case,archive=None,paraviewLink=False).isValid():
-            # checking for a multi-region case
-            case=path.dirname(case)
-            region=path.basename(path.dirname(fName))
-            print_(case,region)
-            if region not in SolutionDirectory(case,archive=None,paraviewLink=False).getRegions():
-                self.error(region,"is not a valid region in the case",case)
+        self.parser.add_option("--jobs",
+                               action="store",
+                               type="int",
+                               default=1,
+                               dest="jobs",
+                               help="Number of processes that change the files in parallel. Default: %default")
 
-        if self.opts.filter==None:
-            flter=re.compile(".+")
-        else:
-            flter=re.compile(self.opts.filter)
+    def run(self):
+        fName=self.parser.getArgs()[0]
 
-        boundaries=dictFile["boundaryField"]
+        names=[fName]
+        if self.opts.parallel:
+            names+=processorFieldFiles(fName)
 
         try:
-            bFile=BoundaryDict(case,region=region)
-        except IOError:
+            results=processFiles(partial(createBoundaryPatches,
+                                         opts=self.opts),
+                                 names,
+                                 jobs=self.opts.jobs)
+        except PyFoamException:
             e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
-            self.error("Problem reading the boundary file:",e)
-
-        if self.opts.clear:
-            for b in list(boundaries.keys()):
-                if b not in bFile.patches():
-                    if self.opts.verbose:
-                        print_("Deleting patch",b)
-                    del boundaries[b]
-
-        if not self.opts.nocheck:
-            for p in bFile.patches():
-                if p in boundaries:
-                    typ=boundaries[p]["type"]
-                    pTyp=bFile[p]["type"]
-                    if pTyp!="patch" and pTyp!="wall" and pTyp!=typ:
-                        if self.opts.fixtypes:
-                            if self.opts.verbose:
-                                print_("Fixing wall/patch patch",p)
-                            del boundaries[p]
-                            continue
-                        else:
-                            self.error("Inconsistent type for ",p,": Is",typ,"but should be",pTyp)
-                    if typ in ["symmetryPlane","empty","wedge","cyclic","processor"] and pTyp!=typ:
-                        if self.opts.fixtypes:
-                            if self.opts.verbose:
-                                print_("Fixing special patch",p)
-                            del boundaries[p]
-                            continue
-                        else:
-                            self.error("Inconsistent type for ",p,": Is",typ,"but should be some kind of patch type")
+            self.error(e.descr)
 
-        for p in bFile.patches():
-            if (not p in boundaries or self.opts.overwrite) and flter.match(p):
-                pTyp=bFile[p]["type"]
-                if pTyp!="patch" and pTyp!="wall":
-                    tmp={"type":pTyp}
-                else:
-                    tmp=eval(self.opts.default)
-                if self.opts.verbose:
-                    print_("Writing",tmp,"to patch",p)
-                boundaries[p]=tmp;
-
-        if self.opts.test:
-            print_(str(dictFile))
-        else:
-            dictFile.writeFile()
-            self.addToCaseLog(case)
+        for messages,case,txt in results:
+            for m in messages:
+                print_(m)
+            if txt is not None:
+                print_(txt)
+
+        if not self.opts.test:
+            self.addToCaseLog(results[0][1])
 
 # Should work with Python3 and Python2
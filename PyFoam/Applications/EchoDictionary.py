@@ -48,6 +48,7 @@ reformatting unformated dictionaries and debugging the parser
                                          listDict=self.opts.listDict,
                                          listDictWithHeader=self.opts.listDictWithHeader,
                                          listLengthUnparsed=self.opts.listLengthUnparsed,
+                                         listLengthNumpy=self.opts.listLengthNumpy,
                                          treatBinaryAsASCII=self.opts.treatBinaryAsASCII,
                                          doMacroExpansion=self.opts.doMacros)
         except IOError:
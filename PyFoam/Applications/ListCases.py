@@ -9,14 +9,19 @@ from PyFoam.ThirdParty.six.moves import cPickle as pickle
 from PyFoam.ThirdParty.six import string_types
 import time,datetime
 from stat import ST_MTIME
-import re
 import os
+import sys
+import sqlite3
+import threading
 import subprocess as sub
 
 from .PyFoamApplication import PyFoamApplication
 
 from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
 from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile,PyFoamParserError
+from PyFoam.Basics.CaseInfoCache import CaseInfoCache,fileSignature
+from PyFoam.Infrastructure.NetworkHelpers import threadPool
+from PyFoam.Infrastructure.Hardcoded import userDirectory,assertDirectory
 
 from PyFoam import configuration
 
@@ -167,6 +172,27 @@ etc). Currently doesn't honor the parallel data
                           dest="deadThreshold",
                           default=configuration().get("CommandOptionDefaults","deadThresholdListCases"),
                           help="Number of seconds without updates after which the case is assumed to be dead. Default: %default")
+        behave.add_option("--jobs",
+                          action="store",
+                          type="int",
+                          dest="jobs",
+                          default=configuration().getint("CommandOptionDefaults","jobsListCases"),
+                          help="Number of threads that inspect cases at the same time. Mainly helps on network file systems. Default: %default")
+        behave.add_option("--no-cache",
+                          action="store_false",
+                          dest="useCache",
+                          default=configuration().getboolean("CommandOptionDefaults","cacheListCases"),
+                          help="Do not use the cache with the information about cases that did not change since the last listing")
+        behave.add_option("--cache-file",
+                          action="store",
+                          dest="cacheFile",
+                          default=None,
+                          help="File with the cached information. Default: listCasesCache.sqlite in the user directory of PyFoam")
+        behave.add_option("--clear-cache",
+                          action="store_true",
+                          dest="clearCache",
+                          default=False,
+                          help="Remove all information from the cache before listing (use this if files were modified in a way that the cache did not notice)")
 
         select=OptionGroup(self.parser,
                            "Selection",
@@ -228,6 +254,243 @@ etc). Currently doesn't honor the parallel data
             self.hasState=True
             return open(fName).read().strip()
 
+    stateFiles=["StartedAt","CurrentTime","LastOutputSeen","TheState"]
+
+    pickleFiles=["pickledData","pickledUnfinishedData","pickledStartData"]
+
+    def caseSignature(self,cName,sol):
+        """Signature of the files that the information about a case is
+        read from. If it didn't change then the cached information is
+        used"""
+        names=[cName,
+               path.join(cName,"system","controlDict"),
+               path.join(cName,".hg","dirstate")]
+        names+=[path.join(cName,"PyFoamState."+f) for f in self.stateFiles]
+        if self.opts.parallel:
+            names+=[path.join(cName,f) for f in sol.processorDirs()]
+        for g in glob(path.join(cName,"*.analyzed")):
+            names+=[g]+[path.join(g,f) for f in self.pickleFiles]
+        options=(self.opts.parallel,self.opts.state,self.opts.hostname,
+                 self.opts.estimateEndTime,self.opts.startEndTime,
+                 self.opts.hgInfo,self.opts.solverNameForCustom,
+                 self.customData)
+        return repr(options)+"|"+fileSignature(names)
+
+    def inspectCase(self,cName):
+        """Collect the information about one case. Runs in a thread
+        :return: dictionary with the data. None if this is not a case"""
+        sol=SolutionDirectory(cName,archive=None,paraviewLink=False)
+        if not sol.isValid():
+            return None
+
+        if self.opts.progress:
+            print_("Processing",cName)
+
+        signature=None
+        data=None
+        if self.cache:
+            signature=self.caseSignature(cName,sol)
+            data=self.cache.get(cName,signature)
+        if data is None:
+            data=self.readCaseData(cName,sol)
+            if self.cache:
+                self.cache.put(cName,signature,data)
+
+        if self.opts.diskusage:
+            if self.cache:
+                data["diskusage"]=self.cache.diskUsage(cName)
+            else:
+                data["diskusage"]=diskUsage(cName)
+
+        return data
+
+    def readCaseData(self,cName,sol):
+        """Read the information about a case that does not depend on the
+        current time"""
+        data={}
+
+        data["mtime"]=stat(cName)[ST_MTIME]
+        times=sol.getTimes()
+        try:
+            data["first"]=times[0]
+        except IndexError:
+            data["first"]="None"
+        try:
+            data["last"]=times[-1]
+        except IndexError:
+            data["last"]="None"
+        data["nrSteps"]=len(times)
+        data["procs"]=sol.nrProcs()
+        data["pFirst"]=-1
+        data["pLast"]=-1
+        data["nrParallel"]=-1
+        if self.opts.parallel:
+            pTimes=sol.getParallelTimes()
+            data["nrParallel"]=len(pTimes)
+            if len(pTimes)>0:
+                data["pFirst"]=pTimes[0]
+                data["pLast"]=pTimes[-1]
+        data["name"]=cName
+        data["diskusage"]=-1
+        if self.opts.parallel:
+            for f in sol.processorDirs():
+                data["mtime"]=max(stat(path.join(cName,f))[ST_MTIME],data["mtime"])
+
+        if self.opts.state or self.opts.estimateEndTime:
+            try:
+                data["startedAt"]=time.mktime(time.strptime(self.readState(sol,"StartedAt")))
+            except ValueError:
+                data["startedAt"]="nix"
+
+        if self.opts.state:
+            try:
+                data["nowTime"]=float(self.readState(sol,"CurrentTime"))
+            except ValueError:
+                data["nowTime"]=None
+
+            try:
+                data["lastOutput"]=time.mktime(time.strptime(self.readState(sol,"LastOutputSeen")))
+            except ValueError:
+                data["lastOutput"]="nix"
+
+            data["state"]=self.readState(sol,"TheState")
+
+        if self.opts.startEndTime or self.opts.estimateEndTime:
+            try:
+                ctrlDict=ParsedParameterFile(sol.controlDict(),doMacroExpansion=True)
+            except PyFoamParserError:
+                # Didn't work with Macro expansion. Let's try without
+                try:
+                    ctrlDict=ParsedParameterFile(sol.controlDict())
+                except PyFoamParserError:
+                    ctrlDict=None
+            if ctrlDict:
+                data["startTime"]=ctrlDict["startTime"]
+                data["endTime"]=ctrlDict["endTime"]
+            else:
+                data["startTime"]=None
+                data["endTime"]=None
+
+        if self.opts.estimateEndTime:
+            # the estimate depends on the current time. It is computed in addLiveData
+            data["_running"]=self.readState(sol,"TheState")=="Running"
+            data["_currentTime"]=self.readState(sol,"CurrentTime")
+
+        if self.opts.hgInfo:
+            if path.isdir(path.join(cName,".hg")):
+                from stat import ST_ATIME
+                prevStat=stat(cName)
+                try:
+                    data["hgInfo"]=sub.Popen(["hg", "id",
+                                              "-R",cName,
+                                              "-b","-n","-i"], stdout=sub.PIPE).communicate()[0].strip()
+                except OSError:
+                    data["hgInfo"]="<hg not working>"
+                postStat=stat(cName)
+                if prevStat[ST_MTIME]!=postStat[ST_MTIME]:
+                    # hg seems to modify the modification time of the directory. So reset it
+                    os.utime(cName,(postStat[ST_ATIME],prevStat[ST_MTIME]))
+            else:
+                data["hgInfo"]="<no .hg directory>"
+
+        if len(self.customData)>0 or self.opts.hostname:
+            fn=None
+            pickleFile=None
+            if self.useSolverInData:
+                data["solver"]="none found"
+                # try to find the oldest pickled file
+                dirAndTime=[]
+                for f in self.pickleFiles:
+                    for g in glob(path.join(cName,"*.analyzed")):
+                        pName=path.join(g,f)
+                        base=path.basename(g)
+                        if base.find("PyFoamRunner.")==0:
+                            solverName=base[len("PyFoamRunner."):-len(".analyzed")]
+                        else:
+                            solverName=None
+                        if path.exists(pName):
+                            dirAndTime.append((path.getmtime(pName),solverName,pName))
+                dirAndTime.sort(key=lambda x:x[0])
+
+                if len(dirAndTime)>0:
+                    data["solver"]=dirAndTime[-1][1]
+                    pickleFile=dirAndTime[-1][2]
+
+                solverName=data["solver"]
+            else:
+                solverName=self.opts.solverNameForCustom
+
+            if pickleFile:
+                fn=pickleFile
+            else:
+                for f in self.pickleFiles:
+                    fp=path.join(cName,"PyFoamRunner."+solverName+".analyzed",f)
+                    if path.exists(fp):
+                        fn=fp
+                        break
+            pickleOK=False
+            if fn:
+                try:
+                    raw=pickle.Unpickler(open(fn,"rb")).load()
+                    pickleOK=True
+                    for n,spec in self.customData:
+                        dt=raw
+                        for k in spec:
+                            try:
+                                dt=dt[k]
+                            except KeyError:
+                                dt="No key '"+k+"'"
+                                break
+                            if isinstance(dt,string_types):
+                                break
+                        data[n]=dt
+                    if self.opts.hostname:
+                        try:
+                            data["hostname"]=raw["hostname"].split(".")[0]
+                        except KeyError:
+                            data["hostname"]="<unspecified>"
+                except ValueError:
+                    pass
+            if not pickleOK:
+                for n,spec in self.customData:
+                    data[n]="<no file>"
+                if self.opts.hostname:
+                    data["hostname"]="<no file>"
+
+        if self.opts.state or self.opts.estimateEndTime:
+            data["_hasState"]=any(path.exists(path.join(cName,"PyFoamState."+f)) for f in self.stateFiles)
+
+        return data
+
+    def addLiveData(self,data):
+        """Add the information that depends on the current time"""
+        if data.pop("_hasState",False):
+            self.hasState=True
+
+        if self.opts.state and data["state"]=="Running":
+            try:
+                gone=time.time()-data["lastOutput"]
+                if gone>self.opts.deadThreshold:
+                    data["state"]="Dead "+humanReadableDuration(gone)
+            except KeyError:
+                pass
+            except TypeError:
+                pass
+
+        running=data.pop("_running",False)
+        currentTime=data.pop("_currentTime","")
+        if self.opts.estimateEndTime:
+            data["endTimeEstimate"]=None
+            if running:
+                gone=time.time()-data["startedAt"]
+                try:
+                    current=float(currentTime)
+                    frac=(current-data["startTime"])/(data["endTime"]-data["startTime"])
+                except ValueError:
+                    frac=0
+                if frac>0:
+                    data["endTimeEstimate"]=data["startedAt"]+gone/frac
+
     def run(self):
         dirs=self.parser.getArgs()
 
@@ -236,7 +499,7 @@ etc). Currently doesn't honor the parallel data
 
         cData=[]
         totalDiskusage=0
-        useSolverInData=False
+        self.useSolverInData=False
 
         self.hasState=False
 
@@ -254,210 +517,90 @@ etc). Currently doesn't honor the parallel data
 
         if len(customData)>0 and not self.opts.solverNameForCustom:
             self.warning("Parameter '--solver-name-for-custom-data' should be set if '--custom-data' is used")
-            useSolverInData=True
+            self.useSolverInData=True
         elif  self.opts.hostname:
-            useSolverInData=True
+            self.useSolverInData=True
+        self.customData=customData
+        useSolverInData=self.useSolverInData
 
-        def lookForCases(d):
-            for n in tqdm(listdir(d),
-                          unit="entries",
-                          leave=False,
-                          desc=path.basename(path.abspath(d)),
-                          disable=not self.opts.progressBar):
-                if not self.fnmatch(n):
-                    continue
-                cName=path.join(d,n)
-                if path.isdir(cName):
-                    try:
-                        sol=SolutionDirectory(cName,archive=None,paraviewLink=False)
-                        if sol.isValid():
-                            if self.opts.progress:
-                                print_("Processing",cName)
-
-                            data={}
-
-                            data["mtime"]=stat(cName)[ST_MTIME]
-                            times=sol.getTimes()
-                            try:
-                                data["first"]=times[0]
-                            except IndexError:
-                                data["first"]="None"
-                            try:
-                                data["last"]=times[-1]
-                            except IndexError:
-                                data["last"]="None"
-                            data["nrSteps"]=len(times)
-                            data["procs"]=sol.nrProcs()
-                            data["pFirst"]=-1
-                            data["pLast"]=-1
-                            data["nrParallel"]=-1
-                            if self.opts.parallel:
-                                pTimes=sol.getParallelTimes()
-                                data["nrParallel"]=len(pTimes)
-                                if len(pTimes)>0:
-                                    data["pFirst"]=pTimes[0]
-                                    data["pLast"]=pTimes[-1]
-                            data["name"]=cName
-                            data["diskusage"]=-1
-                            if self.opts.diskusage:
-                                data["diskusage"]=diskUsage(cName)
-                                totalDiskusage+=data["diskusage"]
-                            if self.opts.parallel:
-                                for f in listdir(cName):
-                                    if re.compile("processor[0-9]+").match(f):
-                                        data["mtime"]=max(stat(path.join(cName,f))[ST_MTIME],data["mtime"])
-
-                            if self.opts.state or self.opts.estimateEndTime:
-                                try:
-                                    data["startedAt"]=time.mktime(time.strptime(self.readState(sol,"StartedAt")))
-                                except ValueError:
-                                    data["startedAt"]="nix"
-
-                            if self.opts.state:
-                                try:
-                                    data["nowTime"]=float(self.readState(sol,"CurrentTime"))
-                                except ValueError:
-                                    data["nowTime"]=None
-
-                                try:
-                                    data["lastOutput"]=time.mktime(time.strptime(self.readState(sol,"LastOutputSeen")))
-                                except ValueError:
-                                    data["lastOutput"]="nix"
-
-                                data["state"]=self.readState(sol,"TheState")
-                                if data["state"]=="Running":
-                                    try:
-                                        gone=time.time()-data["lastOutput"]
-                                        if gone>self.opts.deadThreshold:
-                                            data["state"]="Dead "+humanReadableDuration(gone)
-                                    except KeyError:
-                                        pass
-                                    except TypeError:
-                                        pass
-
-                            if self.opts.startEndTime or self.opts.estimateEndTime:
-                                try:
-                                    ctrlDict=ParsedParameterFile(sol.controlDict(),doMacroExpansion=True)
-                                except PyFoamParserError:
-                                    # Didn't work with Macro expansion. Let's try without
-                                    try:
-                                        ctrlDict=ParsedParameterFile(sol.controlDict())
-                                    except PyFoamParserError:
-                                        ctrlDict=None
-                                if ctrlDict:
-                                    data["startTime"]=ctrlDict["startTime"]
-                                    data["endTime"]=ctrlDict["endTime"]
-                                else:
-                                    data["startTime"]=None
-                                    data["endTime"]=None
-
-                            if self.opts.estimateEndTime:
-                                data["endTimeEstimate"]=None
-                                if self.readState(sol,"TheState")=="Running":
-                                    gone=time.time()-data["startedAt"]
-                                    try:
-                                        current=float(self.readState(sol,"CurrentTime"))
-                                        frac=(current-data["startTime"])/(data["endTime"]-data["startTime"])
-                                    except ValueError:
-                                        frac=0
-                                    if frac>0:
-                                        data["endTimeEstimate"]=data["startedAt"]+gone/frac
-
-                            if self.opts.hgInfo:
-                                if path.isdir(path.join(cName,".hg")):
-                                    from stat import ST_ATIME
-                                    prevStat=stat(cName)
-                                    try:
-                                        data["hgInfo"]=sub.Popen(["hg", "id",
-                                                                  "-R",cName,
-                                                                  "-b","-n","-i"], stdout=sub.PIPE).communicate()[0].strip()
-                                    except OSError:
-                                        data["hgInfo"]="<hg not working>"
-                                    postStat=stat(cName)
-                                    if prevStat[ST_MTIME]!=postStat[ST_MTIME]:
-                                        # hg seems to modify the modification time of the directory. So reset it
-                                        os.utime(cName,(postStat[ST_ATIME],prevStat[ST_MTIME]))
-                                else:
-                                    data["hgInfo"]="<no .hg directory>"
-
-                            if len(customData)>0 or self.opts.hostname:
-                                fn=None
-                                pickleFile=None
-                                if useSolverInData:
-                                    data["solver"]="none found"
-                                    # try to find the oldest pickled file
-                                    dirAndTime=[]
-                                    for f in ["pickledData","pickledUnfinishedData","pickledStartData"]:
-                                        for g in glob(path.join(cName,"*.analyzed")):
-                                            pName=path.join(g,f)
-                                            base=path.basename(g)
-                                            if base.find("PyFoamRunner.")==0:
-                                                solverName=base[len("PyFoamRunner."):-len(".analyzed")]
-                                            else:
-                                                solverName=None
-                                            if path.exists(pName):
-                                                dirAndTime.append((path.getmtime(pName),solverName,pName))
-                                    dirAndTime.sort(key=lambda x:x[0])
-
-                                    if len(dirAndTime)>0:
-                                        data["solver"]=dirAndTime[-1][1]
-                                        pickleFile=dirAndTime[-1][2]
-
-                                    solverName=data["solver"]
-                                else:
-                                    solverName=self.opts.solverNameForCustom
-
-                                if pickleFile:
-                                    fn=pickleFile
-                                else:
-                                    for f in ["pickledData","pickledUnfinishedData","pickledStartData"]:
-                                        fp=path.join(cName,"PyFoamRunner."+solverName+".analyzed",f)
-                                        if path.exists(fp):
-                                            fn=fp
-                                            break
-                                pickleOK=False
-                                if fn:
-                                    try:
-                                        raw=pickle.Unpickler(open(fn,"rb")).load()
-                                        pickleOK=True
-                                        for n,spec in customData:
-                                            dt=raw
-                                            for k in spec:
-                                                try:
-                                                    dt=dt[k]
-                                                except KeyError:
-                                                    dt="No key '"+k+"'"
-                                                    break
-                                                if isinstance(dt,string_types):
-                                                    break
-                                            data[n]=dt
-                                        if self.opts.hostname:
-                                            try:
-                                                data["hostname"]=raw["hostname"].split(".")[0]
-                                            except KeyError:
-                                                data["hostname"]="<unspecified>"
-                                    except ValueError:
-                                        pass
-                                if not pickleOK:
-                                    for n,spec in customData:
-                                        data[n]="<no file>"
-                                    if self.opts.hostname:
-                                        data["hostname"]="<no file>"
-                            cData.append(data)
-                        elif self.opts.recursive:
-                            # print("Recurse",cName)
-                            lookForCases(cName)
-                    except OSError:
-                        print_(cName,"is unreadable")
-
-        for d in tqdm(dirs,
-                      unit="dirs",
-                      disable=not self.opts.progressBar or len(dirs)<2):
+        self.cache=None
+        if self.opts.useCache:
+            try:
+                if self.opts.cacheFile:
+                    cacheFile=self.opts.cacheFile
+                else:
+                    assertDirectory(userDirectory())
+                    cacheFile=path.join(userDirectory(),"listCasesCache.sqlite")
+                self.cache=CaseInfoCache(cacheFile)
+                if self.opts.clearCache:
+                    self.cache.clear()
+            except sqlite3.Error:
+                self.warning("Can not use the cache",cacheFile,":",sys.exc_info()[1])
+                self.cache=None
+
+        level=[]
+        for d in dirs:
             if not path.isdir(d):
                 self.warning("There is no directory",d,"here")
                 continue
+            level.append(d)
+
+        # the directories are processed level by level. Directories that
+        # are not cases are searched in the next level if --recursive
+        while len(level)>0:
+            candidates=[]
+            for d in level:
+                try:
+                    for n in listdir(d):
+                        if not self.fnmatch(n):
+                            continue
+                        cName=path.join(d,n)
+                        if path.isdir(cName):
+                            candidates.append(cName)
+                except OSError:
+                    print_(d,"is unreadable")
+
+            progress=tqdm(total=len(candidates),
+                          unit="entries",
+                          leave=False,
+                          desc=", ".join(path.basename(path.abspath(d)) for d in level[:3]),
+                          disable=not self.opts.progressBar)
+            progressLock=threading.Lock()
+
+            def inspect(cName):
+                try:
+                    return self.inspectCase(cName)
+                except OSError:
+                    return "unreadable"
+                except Exception:
+                    return "failed: "+str(sys.exc_info()[1])
+                finally:
+                    with progressLock:
+                        progress.update(1)
+
+            level=[]
+            for cName,data in zip(candidates,
+                                  threadPool(inspect,candidates,self.opts.jobs)):
+                if isinstance(data,dict):
+                    cData.append(data)
+                elif data is None:
+                    if self.opts.recursive:
+                        level.append(cName)
+                elif data=="unreadable":
+                    print_(cName,"is unreadable")
+                else:
+                    self.warning("Problem with",cName,":",data)
+            progress.close()
+
+        if self.opts.diskusage:
+            for data in cData:
+                totalDiskusage+=data["diskusage"]
+
+        for data in cData:
+            self.addLiveData(data)
 
-            lookForCases(d)
+        if self.cache:
+            self.cache.close()
 
         if self.opts.progress:
             print_("Sorting data")
@@ -0,0 +1,65 @@
+"""
+Application-class that implements pyFoamMigrateRunDatabase.py
+"""
+from optparse import OptionGroup
+
+from .PyFoamApplication import PyFoamApplication
+from PyFoam.Basics.RunDatabase import RunDatabase
+
+from os import path
+
+class MigrateRunDatabase(PyFoamApplication):
+    def __init__(self,
+                 args=None,
+                 **kwargs):
+        description="""\
+Copies the data of a SQLite database that holds run information
+(written for instance by pyFoamAddCaseDataToDatabase.py) to a new
+database with a different layout. The 'long' layout stores every
+value as a row and is needed if there are more different values than
+SQLite allows columns. The original database is not changed
+"""
+        PyFoamApplication.__init__(self,
+                                   args=args,
+                                   description=description,
+                                   usage="%prog <old.db> <new.db>",
+                                   interspersed=True,
+                                   changeVersion=False,
+                                   nr=2,
+                                   exactNr=True,
+                                   **kwargs)
+
+    def addOptions(self):
+        how=OptionGroup(self.parser,
+                        "Behavior",
+                        "How the application should behave")
+        self.parser.add_option_group(how)
+
+        how.add_option("--layout",
+                       type="choice",
+                       choices=RunDatabase.layouts,
+                       dest="layout",
+                       default="long",
+                       help="Layout of the new database. Default: %default. Possible values: "+", ".join(RunDatabase.layouts))
+        how.add_option("--verbose",
+                       action="store_true",
+                       dest="verbose",
+                       default=False,
+                       help="Tell about the data copied")
+
+    def run(self):
+        source=self.parser.getArgs()[0]
+        dest=self.parser.getArgs()[1]
+        if path.exists(dest):
+            self.error("database-file",dest,"exists already.")
+
+        db=RunDatabase(source,
+                       verbose=self.opts.verbose)
+        new=db.copyTo(dest,layout=self.opts.layout)
+
+        self.setData({
+             "source" : db ,
+             "dest"   : new
+        })
+
+# Should work with Python3 and Python2
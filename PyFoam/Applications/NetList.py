@@ -5,6 +5,8 @@ from PyFoam import configuration as config
 from PyFoam.ThirdParty.six import print_,iteritems
 from PyFoam.Infrastructure.ZeroConf import getServerList
 from PyFoam.Infrastructure.ServerBase import getServerProxy
+from PyFoam.Infrastructure.NetworkHelpers import scanFoamServers,subnetHosts,threadPool
+from PyFoam.Infrastructure.FoamMetaServer import ServerInfo
 
 import socket,sys,time
 from PyFoam.ThirdParty.six import PY3
@@ -48,6 +50,11 @@ Lists all the processes known to a meta-server
                         dest="port",
                         default=self.defaultPort,
                         help="The port at which the query takes place (Default: "+str(self.defaultPort)+")")
+        spec.add_option("--scan-subnets",
+                        type="string",
+                        dest="scanSubnets",
+                        default=None,
+                        help="Don't use ZeroConf or the meta-server but scan these subnets (comma-separated list like 192.168.1.0/24,10.0.0.1) for servers. All hosts and ports are checked concurrently")
         spec.add_option("--zeroconf-wait",
                         type="float",
                         dest="timeout",
@@ -104,7 +111,9 @@ Lists all the processes known to a meta-server
         from PyFoam.Infrastructure.Authentication import ensureKeyPair
         ensureKeyPair()
 
-        if self.opts.zeroconf:
+        if self.opts.scanSubnets:
+            data=self.scanServers(self.opts.scanSubnets)
+        elif self.opts.zeroconf:
             data=getServerList(self.opts.timeout,
                                verbose=self.opts.debugZeroconf,
                                progress=self.opts.progressZeroconf)
@@ -214,6 +223,37 @@ Lists all the processes known to a meta-server
                 print_(info)
                 print_(line)
 
+    def scanServers(self,subnets):
+        """Scan subnets for servers
+        :param subnets: comma-separated list of subnets
+        :return: dictionary with the information about the servers"""
+        hosts=[]
+        for s in subnets.split(","):
+            hosts+=subnetHosts(s)
+        found=scanFoamServers(hosts,
+                              config().getint("Network","startServerPort"),
+                              config().getint("Network","nrServerPorts"))
+        addresses=[]
+        for h in hosts:
+            if found[h]:
+                addresses+=[(h,p) for p in found[h]]
+
+        def query(address):
+            ip,port=address
+            try:
+                info=ServerInfo(ip,getServerProxy(ip,port).pid(),port)
+                info.queryData()
+                return info
+            except socket.error:
+                self.warning("Connection refused by",ip,"on port",port)
+                return None
+
+        data={}
+        for (ip,port),info in zip(addresses,threadPool(query,addresses)):
+            if info is not None:
+                data["%s:%d" % (ip,port)]=info
+        return data
+
     def forwardCommand(self,info,cmd):
         """Forwards a command
         :param info: dictionary with the information
@@ -222,7 +262,7 @@ Lists all the processes known to a meta-server
         result=0
 
         try:
-            if self.opts.zeroconf:
+            if self.opts.zeroconf or self.opts.scanSubnets:
                 server=getServerProxy(info["ip"],info["port"])
                 result=eval("server."+cmd)
             else:
@@ -3,6 +3,9 @@
 from PyFoam.Applications.PyFoamApplication import PyFoamApplication
 from PyFoam.ThirdParty.six import print_,PY3
 from PyFoam.Infrastructure.ServerBase import getServerProxy
+from PyFoam.Infrastructure.NetworkHelpers import scanFoamServers
+from PyFoam import configuration as config
+from PyFoam.Infrastructure.PlotDataClient import PlotDataClient
 
 import readline,sys
 from optparse import OptionGroup
@@ -20,9 +23,10 @@ class NetShell(PyFoamApplication):
     def __init__(self):
         description="""\
 Connects to a running pyFoam-Server and executes commands via remote
-procedure calls
+procedure calls. If no port is specified the ports of the host are
+scanned for servers
         """
-        PyFoamApplication.__init__(self,description=description,usage="%prog <host> <port>",interspersed=True,nr=2)
+        PyFoamApplication.__init__(self,description=description,usage="%prog <host> [<port>]",interspersed=True,nr=1,exactNr=False)
     def addOptions(self):
         what=OptionGroup(self.parser,
                          "Command",
@@ -40,13 +44,27 @@ procedure calls
         ensureKeyPair()
 
         host=self.parser.getArgs()[0]
-        port=int(self.parser.getArgs()[1])
+        if len(self.parser.getArgs())>1:
+            port=int(self.parser.getArgs()[1])
+        else:
+            ports=scanFoamServers([host],
+                                  config().getint("Network","startServerPort"),
+                                  config().getint("Network","nrServerPorts"))[host]
+            if not ports:
+                print_("No server found on",host)
+                sys.exit(1)
+            elif len(ports)>1:
+                print_("Servers on",host,"found on the ports",
+                       " ".join(str(p) for p in ports),"- Specify one")
+                sys.exit(1)
+            port=ports[0]
 
         cmd=self.parser.options.command
 
         try:
             self.server=getServerProxy(host,port)
             methods=self.server.system.listMethods()
+            self.plotData=PlotDataClient(self.server)
             if not cmd:
                 print_("Connected to server",host,"on port",port)
                 print_(len(methods),"available methods found")
@@ -83,6 +101,7 @@ procedure calls
             if parts[0]=="help":
                 if len(parts)==1:
                     print_("For help on a method type 'help <method>'")
+                    print_("'plotdata' gets the new data of the timelines and prints a summary")
                     print_("Available methods are:")
                     for m in methods:
                         print_("\t",m)
@@ -98,11 +117,26 @@ procedure calls
                         print_("Method",name,"does not exist")
                 else:
                     print_("Too many arguments")
+            elif parts[0]=="plotdata":
+                self.printPlotData()
             else:
                 result=self.executeCommand(line)
                 if result!=None:
                     print_(result)
 
+    def printPlotData(self):
+        """Get the data of the timelines that was added since the last
+        call and print the size of the data"""
+        try:
+            lineInfo=self.plotData.update()
+        except (Fault,socket.error) as reason:
+            print_("Problem getting the plot data:",reason)
+            return
+        for nr in sorted(lineInfo,key=int):
+            line=lineInfo[nr]
+            print_("Line",nr,":",len(line["times"]),"times. Values:",
+                   " ".join(sorted(line["values"].keys())))
+
     def executeCommand(self,cmd):
         result=None
         try:
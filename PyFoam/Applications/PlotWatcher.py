@@ -66,6 +66,12 @@ the extension '.logfile' in the directory and uses that
                           dest="solverNotRunning",
                           default=False,
                           help="It makes no sense to wait for further output, because the solver is not running anymore. Watcher ends as soon as he encounters the end of the file. Only makes sense with --persist or --hardcopy")
+        input.add_option("--jobs",
+                          action="store",
+                          type="int",
+                          dest="jobs",
+                          default=1,
+                          help="Number of processes that analyze the log-file in chunks. Only used with --solver-not-running-anymore if there is only one log-file and no data files are written. The log-file is not output. Default: %default")
         input.add_option("--no-auto-add-restart-files",
                          action="store_false",
                          dest="autoAddRestart",
@@ -182,7 +188,8 @@ the extension '.logfile' in the directory and uses that
                            writePickled=self.opts.writePickled,
                            plottingImplementation=self.opts.implementation,
                            gnuplotTerminal=self.opts.gnuplotTerminal,
-                           solverNotRunning=self.opts.solverNotRunning)
+                           solverNotRunning=self.opts.solverNotRunning,
+                           jobs=self.opts.jobs)
 
         if self.cursesWindow:
             def fileChanged():
@@ -7,7 +7,7 @@ from .PyFoamApplication import PyFoamApplication
 
 from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
 from PyFoam.Basics.DataStructures import DictProxy
-from PyFoam.Basics.Utilities import rmtree,copytree,execute,remove
+from PyFoam.Basics.Utilities import rmtree,copytree,execute,remove,processFiles
 from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile,WriteParameterFile,FoamStringParser
 from PyFoam.Basics.TemplateFile import TemplateFile
 from PyFoam.Execution.BasicRunner import BasicRunner
@@ -27,6 +27,7 @@ from shutil import copymode,copy,move
 from collections import OrderedDict
 import time
 import re
+import sys
 
 from .CursesApplicationWrapper import addExpr
 
@@ -52,6 +53,37 @@ def buildFilenameExtension(paraList,valueStrings):
     else:
         return "_"+ext
 
+def prepareTask(task):
+    """Execute one task of the preparation. The tasks are tuples. The
+    first element says what should be done:
+
+    - ('template',template,target,values,options): render the template
+      with the values (options are passed to TemplateFile)
+    - ('copy',source,destination): replace the destination with a copy
+      of the source
+    - ('remove',name): remove the file
+
+    :return: None if everything went well. Otherwise a description of
+    the problem"""
+    try:
+        if task[0]=="template":
+            fName,tName,values,options=task[1:]
+            TemplateFile(name=fName,**options).writeToFile(tName,values)
+            copymode(fName,tName)
+        elif task[0]=="copy":
+            src,dst=task[1:]
+            if path.exists(dst):
+                rmtree(dst)
+            copytree(src,dst,force=True)
+        elif task[0]=="remove":
+            remove(task[1])
+        else:
+            return "Unknown task "+str(task)
+    except Exception:
+        e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
+        return "%s: %s: %s" % (task[1],e.__class__.__name__,e)
+    return None
+
 class PrepareCase(PyFoamApplication,
                   CommonTemplateBehaviour,
                   CommonTemplateFormat):
@@ -332,6 +364,13 @@ The used parameters are written to a file 'PyFoamPrepareCaseParameters' and are
                           default=True,
                           help="Do not create a .foam file that allows paraview to open the case")
 
+        stages.add_option("--jobs",
+                          action="store",
+                          type="int",
+                          dest="jobs",
+                          default=1,
+                          help="Number of processes that render the templates, copy the originals and remove the templates in parallel. The steps are still done one after the other. Default: %default")
+
         scripts=OptionGroup(self.parser,
                             "Scripts",
                             "Specification of scripts to be executed")
@@ -449,12 +488,39 @@ The used parameters are written to a file 'PyFoamPrepareCaseParameters' and are
 
         return result
 
+    def preparationJobs(self):
+        """Number of processes that are used for the tasks of the
+        preparation"""
+        return self.opts.jobs
+
+    def runTasks(self,tasks):
+        """Execute tasks that don't depend on each other (see prepareTask).
+        With more than one job they are executed in parallel. Problems
+        are reported in the order of the tasks"""
+        problems=[p for p in processFiles(prepareTask,
+                                          tasks,
+                                          self.preparationJobs()) if p is not None]
+        if len(problems)>0:
+            self.error("Problems during the preparation:\n"+"\n".join(problems))
+
     def copyOriginals(self,startDir,extension=None,recursive=True):
         """Go recursivly through directories and copy foo.org to foo"""
+        self.runTasks(self.collectOriginals(startDir,
+                                            extension=extension,
+                                            recursive=recursive))
+
+    def collectOriginals(self,startDir,extension=None,recursive=True):
+        """Go recursivly through directories and collect the tasks that
+        copy foo.org to foo
+        :return: list with the tasks"""
         self.info("Looking for originals in",startDir)
         if extension is None:
             extension=self.opts.originalExt
-        for f,t in self.listdir(startDir,extension):
+        tasks=[]
+        files=self.listdir(startDir,extension)
+        # these are replaced anyway
+        replaced=set(t for f,t in files if t!=None)
+        for f,t in files:
             if f[0]==".":
                 self.info("Skipping",f)
                 continue
@@ -463,20 +529,29 @@ The used parameters are written to a file 'PyFoamPrepareCaseParameters' and are
                 dst=path.join(startDir,t)
                 if path.exists(dst):
                     self.info("Replacing",dst,"with",src)
-                    rmtree(dst)
                 else:
                     self.info("Copying",src,"to",dst)
-                copytree(src,dst,force=True)
-            elif path.isdir(src) and recursive:
-                self.copyOriginals(src,
-                                   extension=extension,
-                                   recursive=recursive)
+                tasks.append(("copy",src,dst))
+            elif path.isdir(src) and recursive and f not in replaced:
+                tasks+=self.collectOriginals(src,
+                                             extension=extension,
+                                             recursive=recursive)
+        return tasks
 
     def cleanExtension(self,
                        startDir,
                        ext):
         """Go recursivly through directories and remove all files that have a specific extension"""
+        self.runTasks(self.collectExtension(startDir,ext))
+
+    def collectExtension(self,
+                         startDir,
+                         ext):
+        """Go recursivly through directories and collect the tasks that
+        remove all files that have a specific extension
+        :return: list with the tasks"""
         self.info("Looking for extension",ext,"in",startDir)
+        tasks=[]
         for f in listdir(startDir):
             if f[0]==".":
                 self.info("Skipping",f)
@@ -486,9 +561,10 @@ The used parameters are written to a file 'PyFoamPrepareCaseParameters' and are
             if path.splitext(src)[1]==ext or path.splitext(path.splitext(src)[0])[1]==ext:
                 if not path.isdir(src):
                     self.info("Removing",src)
-                    remove(src)
+                    tasks.append(("remove",src))
             if path.isdir(src):
-                self.cleanExtension(src,ext)
+                tasks+=self.collectExtension(src,ext)
+        return tasks
 
     def searchAndReplaceTemplates(self,
                                   startDir,
@@ -497,7 +573,21 @@ The used parameters are written to a file 'PyFoamPrepareCaseParameters' and are
                                   ignoreDirectories=[]):
         """Go through the directory recursively and replate foo.template with
         foo after inserting the values"""
+        self.runTasks(self.collectTemplates(startDir,
+                                            values,
+                                            templateExt,
+                                            ignoreDirectories=ignoreDirectories))
+
+    def collectTemplates(self,
+                         startDir,
+                         values,
+                         templateExt,
+                         ignoreDirectories=[]):
+        """Go through the directory recursively and collect the tasks that
+        replace foo.template with foo after inserting the values
+        :return: list with the tasks"""
         self.info("Looking for templates with extension",templateExt,"in ",startDir)
+        tasks=[]
         for f,t in self.listdir(startDir,templateExt):
             if f[0]==".":
                 self.info("Skipping",f)
@@ -511,7 +601,7 @@ The used parameters are written to a file 'PyFoamPrepareCaseParameters' and are
                 if matches:
                     self.info("Skipping directory",f,"because it matches",matches)
                     continue
-                self.searchAndReplaceTemplates(
+                tasks+=self.collectTemplates(
                     path.join(startDir,f),
                     values,
                     templateExt)
@@ -519,14 +609,13 @@ The used parameters are written to a file 'PyFoamPrepareCaseParameters' and are
                 tName=path.join(startDir,t)
                 fName=path.join(startDir,f)
                 self.info("Found template for",tName)
-                t=TemplateFile(name=fName,
-                               tolerantRender=self.opts.tolerantRender,
-                               allowExec=self.opts.allowExec,
-                               expressionDelimiter=self.opts.expressionDelimiter,
-                               assignmentDebug=self.pickAssignmentDebug(fName),
-                               assignmentLineStart=self.opts.assignmentLineStart)
-                t.writeToFile(tName,values)
-                copymode(fName,tName)
+                tasks.append(("template",fName,tName,values,
+                              {"tolerantRender":self.opts.tolerantRender,
+                               "allowExec":self.opts.allowExec,
+                               "expressionDelimiter":self.opts.expressionDelimiter,
+                               "assignmentDebug":self.pickAssignmentDebug(fName),
+                               "assignmentLineStart":self.opts.assignmentLineStart}))
+        return tasks
 
     def overloadDir(self,here,there):
         """Copy files recursively. Overwrite local copies if they exist"""
@@ -1214,11 +1303,18 @@ The used parameters are written to a file 'PyFoamPrepareCaseParameters' and are
 
         if self.opts.doTemplateClean:
             self.info("Clearing templates")
+            tasks=[]
+            found=set()
             for d in self.opts.cleanDirectories:
                 for e in [self.opts.templateExt,
                           self.opts.postTemplateExt,
                           self.opts.finalTemplateExt]:
-                    self.cleanExtension(path.join(sol.name,d),e)
+                    for task in self.collectExtension(path.join(sol.name,d),e):
+                        # files may match more than one extension
+                        if task not in found:
+                            found.add(task)
+                            tasks.append(task)
+            self.runTasks(tasks)
             self.info("")
 
         sol.reread(force=True)
@@ -12,14 +12,15 @@ else:
     from xmlrpclib import Fault,ProtocolError
 
 from PyFoam.Infrastructure.ServerBase import getServerProxy
+from PyFoam.Infrastructure.PlotDataClient import PlotDataClient
 
 import socket
 
 from optparse import OptionGroup
-from PyFoam.ThirdParty.six.moves import cPickle as pickle
 from time import sleep
 
 from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+from PyFoam.Basics.TimeLineStore import readPlotData,writePickle
 from PyFoam.Basics.PlotTimelinesFactory import createPlotTimelines
 from PyFoam.Basics.GeneralPlotTimelines import PlotLinesRegistry
 from PyFoam.Basics.CustomPlotInfo import CustomPlotInfo
@@ -34,7 +35,8 @@ class RedoPlot(PyFoamApplication):
         description="""\
 Either connects to a running pyFoam-Server and gets all the
 information for plotting or reads the relevant data from a pickle file
-and either displays the plot or writes the plots to file
+(or the timelineStore-file that is written during the run) and either
+displays the plot or writes the plots to file
         """
         if args:
             self.quiet=True
@@ -63,7 +65,7 @@ and either displays the plot or writes the plots to file
                         dest="pickle",
                         action="store_true",
                         default=False,
-                        help="Get the data from a pickle-file")
+                        help="Get the data from a pickle-file. This can also be a timelineStore-file")
 
         self.parser.add_option_group(mode)
 
@@ -104,6 +106,11 @@ and either displays the plot or writes the plots to file
                           action="store_true",
                           default=False,
                           help="Write the raw line data (not the way it is plotted)")
+        output.add_option("--convert-to-pickle",
+                          dest="convertToPickle",
+                          action="store",
+                          default=None,
+                          help="Write the data to this file in the format of the pickledPlots-file (for instance to convert a timelineStore-file) instead of plotting")
         self.parser.add_option_group(output)
 
         plot=OptionGroup(self.parser,
@@ -180,20 +187,23 @@ and either displays the plot or writes the plots to file
                 self.error("XMLRPC-problem",reason)
 
             plotInfo=self.executeCommand("getPlots()")
-            lineInfo=self.executeCommand("getPlotData()")
+            lineInfo=PlotDataClient(self.server).update()
         else:
             if len(self.parser.getArgs())!=1:
                 warning("Only the first parameter is used")
 
             fName=self.parser.getArgs()[0]
-            unpick=pickle.Unpickler(open(fName,"rb"))
-
-            lineInfo=unpick.load()
-            plotInfo=unpick.load()
+            lineInfo,plotInfo=readPlotData(fName)
 
         if not self.quiet:
             print_("Found",len(plotInfo),"plots and",len(lineInfo),"data sets")
 
+        if self.opts.convertToPickle:
+            if not self.quiet:
+                print_("Writing data to",self.opts.convertToPickle)
+            writePickle(self.opts.convertToPickle,lineInfo,plotInfo)
+            return
+
         registry=TimeLinesRegistry()
         for nr,line in iteritems(lineInfo):
             if not self.quiet:
@@ -94,6 +94,8 @@ One case for every variation and start with the 4th variant
 
         PrepareCase.addOptions(self)
 
+        self.parser.get_option("--jobs").help="Number of processors that are used to run variations at the same time. Variations that run in parallel (--procnr) use as many of these processors. The solver output is not written to the terminal. Only with --every-variant-one-case-execution. For the other modes this is the number of processes used for the preparation of the case. Default: %default"
+
         variation=OptionGroup(self.parser,
                               "Parameter variation",
                               "Parameters specific to the parameter variation")
@@ -318,6 +320,7 @@ One case for every variation and start with the 4th variant
                            verbose=self.opts.verbose)
 
         origCase=SolutionDirectory(origPath,archive=None)
+        workCase=None
         if self.opts.oneClonedCase:
             self.printPhase("Cloning work case")
             workCase=origCase.cloneCase(path.join(self.opts.cloneToDirectory,
@@ -325,86 +328,226 @@ One case for every variation and start with the 4th variant
 
         self.printPhase("Starting actual variations")
 
-        for i in range(start,end+1):
-            self.printPhase("Variation",i,"of [",start,",",end,"]")
+        def storeData(i,data):
+            self["run%05d" % i]=data
+            if db:
+                db.add(data)
 
-            usedVals=variations[i].copy()
-            usedVals.update(fixed)
+        if self.opts.jobs>1 and self.opts.everyVariantOneCase:
+            self.runVariationsParallel(range(start,end+1),variations,fixed,
+                                       origCase,storeData)
+        else:
+            for i in range(start,end+1):
+                self.printPhase("Variation",i,"of [",start,",",end,"]")
 
-            self.prepareHooks()
+                usedVals=variations[i].copy()
+                usedVals.update(fixed)
 
-            clone=False
-            if self.opts.inplaceExecution:
-                workCase=origCase
-            elif self.opts.oneClonedCase:
-                pass
-            else:
-                self.printPhase("Cloning work case")
-                workCase=origCase.cloneCase(path.join(self.opts.cloneToDirectory,
-                                                  self.opts.clonedCasePrefix+"_"+
-                                                      ("%05d" % i)+"_"+path.basename(origPath))+self.opts.clonedCasePostfix)
+                self.runVariation(i,usedVals,origCase,workCase,storeData)
 
-            self.processPlotLineOptions(autoPath=workCase.name)
+        self.printPhase("Ending variation")
 
-            self.printPhase("Setting up the case")
+    def runVariation(self,i,usedVals,origCase,workCase,storeData):
+        """Set up the case for one variation and run the solver on it
+        :param i: number of the variation
+        :param usedVals: the parameters of the variation
+        :param origCase: the template case
+        :param workCase: the case that is used if the variations are not
+        done in separate cases
+        :param storeData: function that gets the number of the variation
+        and the data of the run"""
 
-            self.prepare(workCase,overrideParameters=usedVals)
+        origPath=self.parser.getArgs()[0]
 
-            if self.opts.noExecuteSolver:
-                self.printPhase("Not executing the solver")
-                continue
+        self.prepareHooks()
 
-            if self.opts.oneClonedCase or self.opts.inplaceExecution:
-                self.setLogname(self.opts.clonedCasePrefix+("_%05d_"%i)+usedVals["solver"],
-                                useApplication=False,
-                                force=True)
-            else:
-                self.setLogname(self.opts.clonedCasePrefix+"_"+usedVals["solver"],
-                                useApplication=False,
-                                force=True)
+        if self.opts.inplaceExecution:
+            workCase=origCase
+        elif self.opts.oneClonedCase:
+            pass
+        else:
+            self.printPhase("Cloning work case")
+            workCase=origCase.cloneCase(path.join(self.opts.cloneToDirectory,
+                                              self.opts.clonedCasePrefix+"_"+
+                                                  ("%05d" % i)+"_"+path.basename(origPath))+self.opts.clonedCasePostfix)
 
-            lam=self.getParallel(workCase)
+        self.processPlotLineOptions(autoPath=workCase.name)
 
-            allLines().clear()
-            allPlots().clear()
-            resetCustomCounter()
+        self.printPhase("Setting up the case")
 
-            run=AnalyzedRunner(BoundingLogAnalyzer(progress=self.opts.progress,
-                                                   doFiles=self.opts.writeFiles,
-                                                   singleFile=self.opts.singleDataFilesOnly,
-                                                   doTimelines=True),
-                               silent=self.opts.progress or self.opts.silent,
-                               argv=[usedVals["solver"],"-case",workCase.name],
-                               server=self.opts.server,
-                               lam=lam,
-                               logname=self.opts.logname,
-                               compressLog=self.opts.compress,
-                               logTail=self.opts.logTail,
-                               noLog=self.opts.noLog,
-                               remark=self.opts.remark,
-                               parameters=usedVals,
-                               echoCommandLine=self.opts.echoCommandPrefix,
-                               jobId=self.opts.jobId)
+        self.prepare(workCase,overrideParameters=usedVals)
 
-            run.createPlots(customRegexp=self.lines_,
-                            writeFiles=self.opts.writeFiles)
+        if self.opts.noExecuteSolver:
+            self.printPhase("Not executing the solver")
+            return
 
-            self.runPreHooks()
+        if self.opts.oneClonedCase or self.opts.inplaceExecution:
+            self.setLogname(self.opts.clonedCasePrefix+("_%05d_"%i)+usedVals["solver"],
+                            useApplication=False,
+                            force=True)
+        else:
+            self.setLogname(self.opts.clonedCasePrefix+"_"+usedVals["solver"],
+                            useApplication=False,
+                            force=True)
 
-            self.printPhase("Running")
+        lam=self.getParallel(workCase)
 
-            run.start()
+        allLines().clear()
+        allPlots().clear()
+        resetCustomCounter()
 
-            self.printPhase("Getting data")
+        run=AnalyzedRunner(BoundingLogAnalyzer(progress=self.opts.progress,
+                                               doFiles=self.opts.writeFiles,
+                                               singleFile=self.opts.singleDataFilesOnly,
+                                               doTimelines=True),
+                           silent=self.opts.progress or self.opts.silent or (self.opts.jobs>1 and self.opts.everyVariantOneCase),
+                           argv=[usedVals["solver"],"-case",workCase.name],
+                           server=self.opts.server,
+                           lam=lam,
+                           logname=self.opts.logname,
+                           compressLog=self.opts.compress,
+                           logTail=self.opts.logTail,
+                           noLog=self.opts.noLog,
+                           remark=self.opts.remark,
+                           parameters=usedVals,
+                           echoCommandLine=self.opts.echoCommandPrefix,
+                           jobId=self.opts.jobId)
 
-            self["run%05d" % i]=run.data
-            if db:
-                db.add(run.data)
+        run.createPlots(customRegexp=self.lines_,
+                        writeFiles=self.opts.writeFiles)
 
-            self.runPostHooks()
+        self.runPreHooks()
 
-            self.reportUsage(run)
-            self.reportRunnerData(run)
+        self.printPhase("Running")
 
-        self.printPhase("Ending variation")
+        run.start()
+
+        self.printPhase("Getting data")
+
+        storeData(i,run.data)
+
+        self.runPostHooks()
+
+        self.reportUsage(run)
+        self.reportRunnerData(run)
+
+    def preparationJobs(self):
+        """With separate cases the variations are run in parallel and
+        every variation is prepared by one process"""
+        if self.opts.everyVariantOneCase:
+            return 1
+        else:
+            return self.opts.jobs
+
+    def variationProcessors(self,usedVals):
+        """Number of processors that a variation will use. Used to
+        decide how many variations can run at the same time"""
+        if self.opts.procnr:
+            return self.opts.procnr
+        if self.opts.autosenseParallel and "numberOfProcessors" in usedVals:
+            try:
+                return max(1,int(usedVals["numberOfProcessors"]))
+            except ValueError:
+                pass
+        return 1
+
+    def runVariationsParallel(self,numbers,variations,fixed,origCase,storeData):
+        """Run variations at the same time. Every variation is done in a
+        separate process (with its own timelines and plots). Variations
+        are started as long as the number of used processors is not
+        bigger than the number of jobs. The data of the runs is sent
+        back to this process and stored here (so that only one process
+        writes to the database) in the order of the variations
+        :param numbers: the numbers of the variations
+        :param variations: list with all the variations
+        :param fixed: parameters that are the same for all the variations
+        :param origCase: the template case
+        :param storeData: function that stores the data of a run"""
+        import multiprocessing
+        from PyFoam.ThirdParty.six.moves import queue
+        try:
+            ctx=multiprocessing.get_context("fork")
+        except AttributeError:
+            # Python 2 always forks on POSIX
+            ctx=multiprocessing
+        except ValueError:
+            self.error("--jobs needs an operating system that can fork processes")
+
+        results=ctx.Queue()
+
+        def worker(i,usedVals):
+            try:
+                self.runVariation(i,usedVals,origCase,None,
+                                  lambda nr,data:results.put(("data",nr,data)))
+                results.put(("done",i,None))
+            except BaseException:
+                import traceback
+                results.put(("error",i,traceback.format_exc()))
+
+        waiting=[]
+        for i in numbers:
+            usedVals=variations[i].copy()
+            usedVals.update(fixed)
+            waiting.append((i,usedVals,self.variationProcessors(usedVals)))
+
+        running={}
+        free=self.opts.jobs
+        failed=[]
+
+        # data is only stored when all the variations before it are finished
+        unstored=list(numbers)
+        received=dict((i,[]) for i in numbers)
+        finished=set()
+
+        def storeFinished():
+            while len(unstored)>0 and unstored[0] in finished:
+                i=unstored.pop(0)
+                for data in received.pop(i):
+                    storeData(i,data)
+
+        while len(waiting)>0 or len(running)>0:
+            # start all the variations that fit. Smaller ones may be
+            # started before bigger ones that have to wait
+            for entry in list(waiting):
+                i,usedVals,procs=entry
+                if procs<=free or len(running)==0:
+                    self.printPhase("Starting variation",i,"on",procs,"processors")
+                    proc=ctx.Process(target=worker,args=(i,usedVals))
+                    proc.start()
+                    running[i]=(proc,procs)
+                    free-=procs
+                    waiting.remove(entry)
+                if free<=0:
+                    break
+
+            try:
+                kind,i,data=results.get(timeout=1)
+            except queue.Empty:
+                for i,(proc,procs) in list(running.items()):
+                    if not proc.is_alive() and proc.exitcode!=0:
+                        # killed without reporting
+                        failed.append(i)
+                        finished.add(i)
+                        del running[i]
+                        free+=procs
+                storeFinished()
+                continue
+
+            if kind=="data":
+                received[i].append(data)
+                continue
+
+            proc,procs=running.pop(i)
+            proc.join()
+            free+=procs
+            if kind=="error":
+                failed.append(i)
+                self.warning("Variation",i,"failed:\n",data)
+            else:
+                self.printPhase("Variation",i,"finished")
+            finished.add(i)
+            storeFinished()
+
+        if len(failed)>0:
+            self.error("Variations",", ".join(str(i) for i in sorted(failed)),"failed")
 # Should work with Python3 and Python2
@@ -96,6 +96,11 @@ This utility does some basic manipulations with STL-files
                                dest="stlFile",
                                default=None,
                                help="Write to this filename")
+            outOpts.add_option("--binary",
+                               action="store_true",
+                               dest="binary",
+                               default=False,
+                               help="Write a binary STL. The names of the patches are lost because all facets end up in one solid")
             cmd.parser.add_option_group(outOpts)
 
         for cmd in [namesCmd,infoCmd,removeCmd,mergeCmd]:
@@ -196,17 +201,17 @@ This utility does some basic manipulations with STL-files
             for s in sources:
                 result+=s
 
-            result.writeTo(outputTo)
+            result.writeTo(outputTo,binary=self.opts.binary)
         elif self.cmdname=="remove":
             s=sources[0]
             s.erasePatches(self.opts.patchNames)
-            s.writeTo(outputTo)
+            s.writeTo(outputTo,binary=self.opts.binary)
         elif self.cmdname=="merge":
             if self.opts.newName==None:
                 self.error("Specify --new-patch-name")
             s=sources[0]
             s.mergePatches(self.opts.patchNames,self.opts.newName)
-            s.writeTo(outputTo)
+            s.writeTo(outputTo,binary=self.opts.binary)
         else:
             self.error("Unimplemented subcommand",self.cmdname)
 
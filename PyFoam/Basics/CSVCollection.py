@@ -30,7 +30,7 @@ class CSVCollection(object):
         :param key: the key
         :param value: and it's value"""
 
-        if not key in self.headers:
+        if not key in self.headerDict:
             self.headers.append(key)
             self.renew=True
             self.headerDict[key]=key
@@ -0,0 +1,155 @@
+#  ICE Revision: $Id$
+"""
+Persistent cache for information about cases that is expensive to
+collect (for instance on network file systems)
+"""
+
+import sqlite3
+import threading
+import time
+import os
+from os import path
+
+from PyFoam.ThirdParty.six.moves import cPickle as pickle
+
+try:
+    from os import scandir
+except ImportError:
+    # Python 2
+    scandir=None
+
+# directories that changed less than this many seconds before they were
+# scanned may still be written to. Their size is not reused
+settledTime=60.
+
+def fileSignature(names):
+    """A string that changes if one of the files or directories is
+    created, removed or modified
+    :param names: list with the file names
+    :return: the signature"""
+    sig=[]
+    for n in names:
+        try:
+            st=os.stat(n)
+        except OSError:
+            continue
+        sig.append("%s:%s:%d" % (n,getattr(st,"st_mtime_ns",st.st_mtime),st.st_size))
+    return "|".join(sig)
+
+class CaseInfoCache(object):
+    """SQLite-database with the information about cases and the sizes
+    of directories. Can be used from several threads"""
+
+    def __init__(self,name):
+        """:param name: name of the database file. Created if it does
+        not exist"""
+        self.name=name
+        self.lock=threading.Lock()
+        self.db=sqlite3.connect(name,check_same_thread=False,timeout=60)
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS cases "+
+                            "(name TEXT PRIMARY KEY, signature TEXT, data BLOB)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS directories "+
+                            "(name TEXT PRIMARY KEY, mtime TEXT, scanned REAL, "+
+                            "size INTEGER, subdirs TEXT)")
+
+    def get(self,name,signature):
+        """Get the data for a case
+        :param name: the case
+        :param signature: the signature of the case (see fileSignature)
+        :return: the data. None if there is no data for this signature"""
+        with self.lock:
+            row=self.db.execute("SELECT signature,data FROM cases WHERE name=?",
+                                (path.abspath(name),)).fetchone()
+        if row is None or row[0]!=signature:
+            return None
+        try:
+            return pickle.loads(bytes(row[1]))
+        except Exception:
+            return None
+
+    def put(self,name,signature,data):
+        """Store the data for a case
+        :param name: the case
+        :param signature: the signature of the case
+        :param data: dictionary with the data"""
+        blob=sqlite3.Binary(pickle.dumps(data,protocol=2))
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO cases VALUES (?,?,?)",
+                            (path.abspath(name),signature,blob))
+
+    def __scan(self,dName):
+        """Size of the plain files in a directory and the names of the
+        sub-directories"""
+        size=0
+        subdirs=[]
+        if scandir is not None:
+            for e in scandir(dName):
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        subdirs.append(e.name)
+                    else:
+                        size+=e.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+        else:
+            for n in os.listdir(dName):
+                full=path.join(dName,n)
+                try:
+                    if path.isdir(full) and not path.islink(full):
+                        subdirs.append(n)
+                    else:
+                        size+=os.lstat(full).st_size
+                except OSError:
+                    pass
+        return size,subdirs
+
+    def diskUsage(self,dName):
+        """Calculate the disk space used by a directory in bytes. For
+        directories that did not change since the last call the stored
+        sizes are used. Files that are rewritten in place without
+        changing the directory are not noticed for these
+        :param dName: the directory"""
+        total=0
+        todo=[path.abspath(dName)]
+        while todo:
+            d=todo.pop()
+            try:
+                st=os.lstat(d)
+            except OSError:
+                continue
+            total+=st.st_size
+            mtime=str(getattr(st,"st_mtime_ns",st.st_mtime))
+            with self.lock:
+                row=self.db.execute("SELECT mtime,scanned,size,subdirs FROM directories WHERE name=?",
+                                    (d,)).fetchone()
+            if row is not None and row[0]==mtime and row[1]-st.st_mtime>settledTime:
+                size=row[2]
+                subdirs=[s for s in row[3].split("/") if s!=""]
+            else:
+                scanned=time.time()
+                try:
+                    size,subdirs=self.__scan(d)
+                except OSError:
+                    continue
+                with self.lock:
+                    self.db.execute("INSERT OR REPLACE INTO directories VALUES (?,?,?,?,?)",
+                                    (d,mtime,scanned,size,"/".join(subdirs)))
+            total+=size
+            todo+=[path.join(d,s) for s in subdirs]
+        return total
+
+    def clear(self):
+        """Remove all the data"""
+        with self.lock:
+            with self.db:
+                self.db.execute("DELETE FROM cases")
+                self.db.execute("DELETE FROM directories")
+
+    def close(self):
+        """Write the data to the disk and close the database"""
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+# Should work with Python3 and Python2
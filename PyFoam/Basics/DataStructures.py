@@ -53,7 +53,7 @@ class Field(FoamDataType):
         self.name=name
         self.length=length
 
-        if type(val) in[list,UnparsedList,BinaryList]:
+        if type(val) in[list,UnparsedList,BinaryList,NumpyList]:
             self.uniform=False
         elif self.name==None:
             self.uniform=True
@@ -116,7 +116,7 @@ class Field(FoamDataType):
     def __len__(self):
         if self.length:
             return self.length
-        elif isinstance(self.val,(list,)):
+        elif isinstance(self.val,(list,NumpyList)):
             return len(self.val)
         else:
             raise TypeError("Operation len() unsupported for data of type",type(self.val))
@@ -655,11 +655,204 @@ class UnparsedList(object):
                                 regexp,
                                 dtypes)
 
+# Number of components of the types that can be in binary lists
+binaryElementTypes={"label"           : 1,
+                    "scalar"          : 1,
+                    "vector"          : 3,
+                    "symmTensor"      : 6,
+                    "tensor"          : 9,
+                    "sphericalTensor" : 1}
+
+def binaryElementType(name):
+    """Find the type of the elements of a binary list from a name like
+    List<vector>, labelList or volSymmTensorField
+    :return: the type (key of binaryElementTypes) or None if no type
+    is recognized"""
+    if name is None:
+        return None
+    lower=name.lower()
+    for t in ["symmTensor","sphericalTensor","tensor","vector","scalar","label"]:
+        if lower.find(t.lower())>=0:
+            return t
+    return None
+
+def binaryArchTypes(arch=None):
+    """Get the numpy data types from the arch-entry of the header
+    :param arch: a string like LSB;label=32;scalar=64. If unset the
+    OpenFOAM-defaults are used
+    :return: tuple with the types for labels and scalars"""
+    import numpy as np
+
+    order="<"
+    labelBits=32
+    scalarBits=64
+    if arch:
+        for part in arch.strip('"').split(";"):
+            part=part.strip()
+            if part=="MSB":
+                order=">"
+            elif part=="LSB":
+                order="<"
+            elif part.find("label=")==0:
+                labelBits=int(part[len("label="):])
+            elif part.find("scalar=")==0:
+                scalarBits=int(part[len("scalar="):])
+
+    return (np.dtype(order+"i%d" % (labelBits//8)),
+            np.dtype(order+"f%d" % (scalarBits//8)))
+
 class BinaryList(UnparsedList):
     """A class that represents a list that is saved as binary data"""
 
-    def __init__(self,lngth,data):
+    def __init__(self,lngth,data,arch=None,elementType=None):
+        """:param lngth: number of elements in the list
+        :param data: the binary data. A string with one character per byte
+        :param arch: the arch-entry from the header
+        :param elementType: type of the elements (label, scalar, vector, ...)
+        If unset then it is guessed from the size of the data"""
         UnparsedList.__init__(self,lngth,data)
+        self.arch=arch
+        self.elementType=elementType
+
+    def binaryData(self):
+        """:return: the data as a bytes-object"""
+        if isinstance(self.data,bytes):
+            return self.data
+        else:
+            return self.data.encode("latin-1")
+
+    def dtype(self):
+        """:return: the numpy-type of the elements and the number of
+        components"""
+        labelType,scalarType=binaryArchTypes(self.arch)
+
+        elementType=self.elementType
+        if elementType is None and self.length>0:
+            size=len(self.data)//self.length
+            if size==labelType.itemsize and size!=scalarType.itemsize:
+                elementType="label"
+            else:
+                for t in ["scalar","vector","symmTensor","tensor"]:
+                    if size==scalarType.itemsize*binaryElementTypes[t]:
+                        elementType=t
+                        break
+        if elementType is None:
+            raise TypeError("Can not determine the type of the elements of the binary list")
+
+        if elementType=="label":
+            return labelType,1
+        else:
+            return scalarType,binaryElementTypes[elementType]
+
+    def toNumpy(self,regexp=None,dtypes=None):
+        """Decode the binary data. The resulting array shares the memory
+        with the data and is therefor read-only
+        :param regexp: Ignored. Just for compatibility with UnparsedList
+        :param dtypes: if set a structured array with these types is returned
+        :return: array of the shape (n,) for scalars or (n,nrComponents)"""
+        import numpy as np
+
+        dtype,nrComp=self.dtype()
+        values=np.frombuffer(self.binaryData(),dtype=dtype)
+        if len(values)!=self.length*nrComp:
+            raise TypeError("Binary data has",len(values),"values. Expected",self.length*nrComp)
+        if nrComp>1:
+            values=values.reshape((self.length,nrComp))
+        if dtypes is None:
+            return values
+        else:
+            return NumpyList(values).toNumpy(dtypes=dtypes)
+
+    def fromNumpy(self,values):
+        """Replace the data with the values from an array. The values are
+        converted to the types specified by the arch
+        :param values: array with the shape (n,) or (n,nrComponents)"""
+        import numpy as np
+
+        values=np.asarray(values)
+        labelType,scalarType=binaryArchTypes(self.arch)
+        if len(values.shape)==1:
+            nrComp=1
+        else:
+            nrComp=values.shape[1]
+        if self.elementType is None or binaryElementTypes[self.elementType]!=nrComp:
+            self.elementType=None
+            if values.dtype.kind in "iu" and nrComp==1:
+                self.elementType="label"
+            else:
+                for t in ["scalar","vector","symmTensor","tensor"]:
+                    if binaryElementTypes[t]==nrComp:
+                        self.elementType=t
+                        break
+            if self.elementType is None:
+                raise TypeError("Can not write values with",nrComp,"components as a binary list")
+
+        if self.elementType=="label":
+            data=values.astype(labelType).tobytes()
+        else:
+            data=values.astype(scalarType).tobytes()
+
+        if PY3:
+            data=data.decode("latin-1")
+        self.data=data
+        self.length=len(values)
+
+class NumpyList(object):
+    """A class that encapsulates a list of numbers or vectors/tensors
+    that was read directly into a numpy-array for performance reasons.
+    The array has the shape (n,) for scalars and (n,3), (n,6) or (n,9)
+    for vectors, symmetric tensors and tensors"""
+
+    def __init__(self,data):
+        self.data=data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self,key):
+        return self.data[key]
+
+    def __setitem__(self,key,value):
+        self.data[key]=value
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def nrComponents(self):
+        """:return: number of components of one element of the list"""
+        if len(self.data.shape)==1:
+            return 1
+        else:
+            return self.data.shape[1]
+
+    def __cmp__(self,other):
+        if self==other:
+            return 0
+        return cmp(self.data.tolist(),other.data.tolist())
+
+    def __eq__(self,other):
+        import numpy as np
+        if type(other)!=NumpyList:
+            return False
+        return np.array_equal(self.data,other.data)
+
+    def __ne__(self,other):
+        return not self.__eq__(other)
+
+    def __lt__(self,other):
+        return self.__cmp__(other)<0
+
+    def toNumpy(self,regexp=None,dtypes=None):
+        """@param regexp: Ignored. Just for compatibility with UnparsedList
+        @param dtypes: if set a structured array with these types is returned"""
+        if dtypes is None:
+            return self.data
+        import numpy as np
+        if self.nrComponents()==1:
+            columns=[self.data]
+        else:
+            columns=[self.data[:,i] for i in range(self.nrComponents())]
+        return np.rec.fromarrays(columns,dtype=dtypes)
 
 def makePrimitiveString(val):
     """Make strings of types that might get written to a directory"""
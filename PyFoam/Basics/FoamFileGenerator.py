@@ -2,11 +2,14 @@
 """Transform a Python data-structure into a OpenFOAM-File-Representation"""
 
 from PyFoam.Error import error,PyFoamException
-from PyFoam.Basics.DataStructures import Vector,Field,Dimension,TupleProxy,DictProxy,Tensor,SymmTensor,Unparsed,UnparsedList,Codestream,DictRedirection,BinaryList,BoolProxy
+from PyFoam.Basics.DataStructures import Vector,Field,Dimension,TupleProxy,DictProxy,Tensor,SymmTensor,Unparsed,UnparsedList,Codestream,DictRedirection,BinaryList,BoolProxy,NumpyList
 
 from PyFoam.ThirdParty.six import string_types,integer_types
 from collections import OrderedDict
 
+# number of rows of a numpy-list that are formatted at once
+numpyWriteChunk=10000
+
 class FoamFileGenerator(object):
     """Class that generates a OpenFOAM-compatible representation of a
     data-structure"""
@@ -63,7 +66,7 @@ class FoamFileGenerator(object):
             result+=self.strDict(self.data,firstLevel=firstLevel)
         elif type(self.data) in [tuple,TupleProxy]:
             result+=self.strTuple(self.data)
-        elif type(self.data) in [list,UnparsedList,BinaryList]:
+        elif type(self.data) in [list,UnparsedList,BinaryList,NumpyList]:
             result+=self.strList(self.data)
         elif self.data is None:
             raise FoamFileGeneratorError("<None> found")
@@ -139,7 +142,7 @@ class FoamFileGenerator(object):
                 s+="\n"+(" "*indent)+"{\n"
                 s+=self.strDict(v,indent+2)
                 s+=(" "*indent)+"}"+end
-            elif type(v) in [list,UnparsedList]:
+            elif type(v) in [list,UnparsedList,NumpyList]:
                 s+="\n"
                 s+=self.strList(v,indent+2)
                 if s[-1]=="\n":
@@ -179,6 +182,8 @@ class FoamFileGenerator(object):
             s+=lst.data
             s+=")"
             return s
+        elif type(lst)==NumpyList:
+            return self.strNumpyList(lst,indent)
 
         theLen=len(lst)
 
@@ -209,7 +214,7 @@ class FoamFileGenerator(object):
                     s+="\n"+(" "*(indent+2))+"{\n"
                     s+=self.strDict(v,indent+4)
                     s+="\n"+(" "*(indent+2))+"}\n"
-                elif type(v) in [list,UnparsedList]:
+                elif type(v) in [list,UnparsedList,NumpyList]:
                     s+="\n"
                     s+=self.strList(v,indent+2)
                 elif type(v)==tuple:
@@ -221,6 +226,34 @@ class FoamFileGenerator(object):
 
         return s
 
+    def strNumpyList(self,lst,indent=0):
+        """Write the list in chunks of rows that are formatted in one
+        operation each. Floats are written with 17 digits so that they
+        are read back unchanged"""
+        from io import StringIO
+
+        nrComp=lst.nrComponents()
+        if lst.data.dtype.kind in "iu":
+            fmt="%d"
+        else:
+            fmt="%.17g"
+        if nrComp==1:
+            line=(" "*(indent+2))+fmt+"\n"
+        else:
+            line=(" "*(indent+2))+"("+" ".join([fmt]*nrComp)+")\n"
+        data=lst.data.reshape((len(lst),nrComp))
+
+        buf=StringIO()
+        for start in range(0,len(data),numpyWriteChunk):
+            chunk=data[start:start+numpyWriteChunk]
+            buf.write((line*len(chunk)) % tuple(chunk.ravel().tolist()))
+
+        s=(" "*indent)+str(len(lst))+"\n"
+        s+=(" "*indent)+"(\n"
+        s+=buf.getvalue()
+        s+=(" "*indent)+")\n"
+        return s
+
     def strTuple(self,lst,indent=0):
         s=""
 
@@ -7,6 +7,8 @@ from PyFoam.Error import notImplemented
 
 from PyFoam.ThirdParty.six import iteritems
 
+from PyFoam import configuration as config
+
 import re
 
 class PlotLinesRegistry(object):
@@ -44,6 +46,109 @@ def allPlots():
     return _allPlots
 
 
+def columnArray(column):
+    """Get the values of a timeline as a numpy-array (without copying
+    them if possible)"""
+    import numpy
+    try:
+        return numpy.asarray(column.view(),dtype=float)
+    except AttributeError:
+        return numpy.asarray(column,dtype=float)
+
+class TimelineDecimator(object):
+    """Reduces a timeline to a limited number of points for plotting.
+    The points are grouped into buckets of consecutive points and of
+    every bucket only the minimum and the maximum are kept (in the
+    order in which they occur) so that peaks remain visible. Complete
+    buckets are remembered so that only the points that were added
+    since the last call have to be looked at. If there are too many
+    buckets neighbouring buckets are merged"""
+
+    def __init__(self,maxPoints):
+        """:param maxPoints: the maximum number of points (roughly the
+        number of pixels in x-direction times 2)"""
+        self.maxPoints=max(4,maxPoints)
+        self.reset()
+
+    def reset(self):
+        """Forget everything"""
+        import numpy
+        self.size=1
+        self.done=0
+        self.indices=numpy.zeros(0,dtype=int)
+        self.splits=None
+
+    def __addBuckets(self,values,end):
+        """Process the complete buckets up to end"""
+        import numpy
+        nr=(end-self.done)//self.size
+        if nr<=0:
+            return
+        block=values[self.done:self.done+nr*self.size].reshape(nr,self.size)
+        base=self.done+numpy.arange(nr)*self.size
+        mins=block.argmin(axis=1)+base
+        maxs=block.argmax(axis=1)+base
+        new=numpy.column_stack((numpy.minimum(mins,maxs),
+                                numpy.maximum(mins,maxs))).ravel()
+        self.indices=numpy.concatenate((self.indices,new))
+        self.done+=nr*self.size
+
+    def __mergeBuckets(self,values):
+        """Double the size of the buckets"""
+        import numpy
+        nr=len(self.indices)//2
+        if nr % 2==1:
+            # the last bucket has no partner. Its points are processed again
+            self.indices=self.indices[:-2]
+            self.done-=self.size
+            nr-=1
+        pairs=self.indices.reshape(nr//2,4)
+        vals=values[pairs]
+        rows=numpy.arange(nr//2)
+        mins=pairs[rows,vals.argmin(axis=1)]
+        maxs=pairs[rows,vals.argmax(axis=1)]
+        self.indices=numpy.column_stack((numpy.minimum(mins,maxs),
+                                         numpy.maximum(mins,maxs))).ravel()
+        self.size*=2
+
+    def __call__(self,times,values,splits=None):
+        """Get the decimated data
+        :param times: the times of the timeline (numpy-array)
+        :param values: the values of the timeline (numpy-array). Only
+        the last value may have changed since the last call
+        :param splits: counter that changes if the data was modified
+        in another way (see TimeLineCollection.splits)
+        :return: tuple with the arrays of the times and the values"""
+        import numpy
+        n=min(len(times),len(values))
+        if n<=self.maxPoints:
+            return times[:n],values[:n]
+
+        if splits!=self.splits or n<self.done:
+            self.reset()
+            self.splits=splits
+
+        # the last value may still change
+        stable=n-1
+        self.__addBuckets(values,stable)
+        while len(self.indices)>self.maxPoints:
+            self.__mergeBuckets(values)
+            self.__addBuckets(values,stable)
+
+        # the incomplete bucket at the end
+        tail=[]
+        if stable>self.done:
+            rest=values[self.done:stable]
+            tail=sorted(set([self.done+int(rest.argmin()),self.done+int(rest.argmax())]))
+        # the first and the last point are always plotted
+        indices=numpy.concatenate(([0],
+                                   self.indices,
+                                   numpy.array(tail+[stable],dtype=int)))
+        # buckets with one point
+        indices=indices[numpy.concatenate(([True],indices[1:]!=indices[:-1]))]
+
+        return times[indices],values[indices]
+
 class GeneralPlotTimelines(object):
     """This class defines the interface for specific implementations of plotting
 
@@ -69,6 +174,11 @@ class GeneralPlotTimelines(object):
 
         self.showWindow=showWindow
 
+        # the plotted data is reduced to this number of points
+        self.maxPoints=config().getint("Plotting","maxPlotPoints")
+        self.decimators={}
+        self.plotValues={}
+
         if registry==None:
             registry=allPlots()
         self.nr=registry.add(self)
@@ -118,6 +228,33 @@ class GeneralPlotTimelines(object):
         """Check whether there is any plotable data"""
         return self.hasTimes() and len(self.getNames())>0
 
+    def getValues(self,name):
+        """The values of a timeline that are to be plotted. To be used
+        by buildData. If the timeline has too many points these are the
+        decimated values that fit the times passed to buildData
+        :param name: the name under which the data is stored in the timeline"""
+        try:
+            return self.plotValues[name]
+        except KeyError:
+            return self.data.getValues(name)
+
+    def decimate(self,name,lines,times):
+        """Reduce the number of points that are plotted
+        :param name: the name under which the data is stored in the timeline
+        :param lines: the TimeLineCollection that holds the data
+        :param times: the times of the data
+        :return: the times to be plotted. The values are stored for getValues"""
+        self.plotValues.pop(name,None)
+        if self.maxPoints<=0 or len(times)<=self.maxPoints:
+            return times
+        if name not in self.decimators:
+            self.decimators[name]=TimelineDecimator(self.maxPoints)
+        times,values=self.decimators[name](columnArray(times),
+                                           columnArray(self.data.getValues(name)),
+                                           splits=lines.splits)
+        self.plotValues[name]=values
+        return times
+
     def redo(self):
         """Replot the timelines"""
         if not self.hasData():
@@ -132,10 +269,11 @@ class GeneralPlotTimelines(object):
             if title.find("_slave")>=0:
                 title=title[: title.find("_slave")]
                 slaveNr=int(n[n.find("_slave")+len("_slave"):])
-                lastValid=self.data.slaves[slaveNr].lastValid[title]
+                lines=self.data.slaves[slaveNr]
             else:
-                lastValid=self.data.lastValid[title]
-            times=self.data.getTimes(title)
+                lines=self.data
+            lastValid=lines.lastValid[title]
+            times=self.decimate(n,lines,self.data.getTimes(title))
             self.buildData(times,n,title,lastValid)
 
         if len(names)>0 and len(times)>0:
@@ -124,7 +124,7 @@ class GnuplotTimelines(GeneralPlotTimelines,Gnuplot):
         :param title: the title under which this will be displayed"""
 
         tm=times
-        dt=self.data.getValues(name)
+        dt=self.getValues(name)
         if len(tm)>0 and not lastValid:
             tm=tm[:-1]
             dt=dt[:-1]
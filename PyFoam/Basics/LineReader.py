@@ -5,9 +5,15 @@ from PyFoam.Infrastructure.Logging import foamLogger
 from PyFoam.ThirdParty.six import print_
 
 import sys
+import os
+import io
+import select
 
 from PyFoam.ThirdParty.six import PY3
 
+# size of the blocks that readLines reads
+blockSize=65536
+
 class LineReader(object):
     """Read a line from a file
 
@@ -22,6 +28,7 @@ class LineReader(object):
         self.goOn=True
         self.wasInterupted=False
         self.keyboardInterupted=False
+        self.rest=None
         self.reset()
 
     def bytesRead(self):
@@ -74,4 +81,88 @@ class LineReader(object):
 
         return status
 
+    def __readBlock(self,fh,size):
+        """Read the data that is available. Only blocks if nothing is
+        available"""
+        if hasattr(fh,"read1"):
+            return fh.read1(size)
+        elif isinstance(fh,io.RawIOBase) or PY3:
+            return fh.read(size)
+        try:
+            # Python 2 file-object of a pipe
+            return os.read(fh.fileno(),size)
+        except (AttributeError,io.UnsupportedOperation):
+            return fh.read(size)
+
+    def __wouldBlock(self,fh):
+        """Check whether reading from the file has to wait for data. If
+        this can't be determined it is assumed that data is available"""
+        try:
+            readable,_,_=select.select([fh],[],[],0)
+        except (TypeError,ValueError,OSError,select.error,io.UnsupportedOperation):
+            return False
+        return len(readable)==0
+
+    def readLines(self,fh,size=blockSize,idle=None):
+        """reads all the complete lines that are available (at least
+        one). For pipes this is much faster than reading the lines one
+        by one. Should not be mixed with read
+
+        fh - filehandle to read from
+        size - maximum number of bytes to read at once
+        idle - function without arguments that is called before the
+        reading waits for new data (for instance to flush output)
+
+        Return value: list with the lines (stripped like the lines from
+        read). Empty if the end of the file was reached. The last line
+        is also stored in self.line"""
+
+        if not self.goOn:
+            return []
+
+        try:
+            while True:
+                if idle is not None and self.__wouldBlock(fh):
+                    idle()
+                data=self.__readBlock(fh,size)
+                if self.rest is None:
+                    self.rest=data[:0]
+                if len(data)==0:
+                    # end of file. Pass the last incomplete line
+                    data=self.rest
+                    self.rest=None
+                    if len(data)==0:
+                        self.line=""
+                        return []
+                    break
+                self.bytes+=len(data)
+                data=self.rest+data
+                if type(data) is bytes:
+                    pos=data.rfind(b"\n")
+                else:
+                    pos=data.rfind("\n")
+                if pos>=0:
+                    self.rest=data[pos+1:]
+                    data=data[:pos]
+                    break
+                self.rest=data
+        except KeyboardInterrupt:
+            foamLogger().warning("Keyboard Interrupt")
+            print_(" Interrupted by the Keyboard")
+            self.wasInterupted=True
+            self.keyboardInterupted=True
+            self.goOn=False
+            self.line=""
+            return []
+
+        if type(data) is bytes and PY3:
+            data=data.decode("utf-8","replace")
+        if self.stripAll:
+            lines=[l.strip() for l in data.split("\n")]
+        else:
+            lines=[l.rstrip() for l in data.split("\n")]
+
+        self.line=lines[-1]
+        return lines
+
 # Should work with Python3 and Python2
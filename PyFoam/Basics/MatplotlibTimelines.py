@@ -91,7 +91,7 @@ class MatplotlibTimelines(GeneralPlotTimelines):
         a=self.axis1
         if self.testAlternate(name):
             a=self.axis2
-        data=self.data.getValues(name)
+        data=self.getValues(name)
         tm=times
         if len(tm)>0 and not lastValid:
             tm=tm[:-1]
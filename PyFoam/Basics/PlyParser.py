@@ -13,17 +13,34 @@ import PyFoam.ThirdParty.ply.lex as lex
 import PyFoam.ThirdParty.ply.yacc as yacc
 
 import os
+import copy
+import threading
 
 from PyFoam.FoamInformation import getUserTempDir
 
+# Lexers and parsers that were already built. Indexed by the parser
+# class and the start symbol
+_builtParsers={}
+_builtParsersLock=threading.Lock()
+
+def clearParserCache():
+    """Remove all the cached lexers and parsers. The next parser
+    instance will build them again"""
+    with _builtParsersLock:
+        _builtParsers.clear()
+
 class PlyParser(object):
     """
     Base class for a lexer/parser that has the rules defined as methods
+
+    Building the lexer and the parser tables is expensive. Therefor they
+    are only built for the first instance of a class (and start symbol)
+    and later instances get a copy of them with the rules bound to the
+    new instance
     """
     tokens = ()
     precedence = ()
 
-
     def __init__(self, **kw):
         """Constructs the parser and the lexer"""
         self.debug = kw.get('debug', 2)
@@ -36,17 +53,56 @@ class PlyParser(object):
         self.tabmodule = modname + "_" + "parsetab"
         #print self.debugfile, self.tabmodule
 
-        # Build the lexer and parser
-        lex.lex(module=self, debug=self.debug)
-        yacc.yacc(module=self,
-                  debug=self.debug,
-                  debugfile=self.debugfile,
-                  tabmodule=self.tabmodule,
-                  outputdir=getUserTempDir(),
-                  check_recursion=self.debug)
+        if self.debug:
+            # always rebuild to get the debug output
+            lexer,parser=self.__build()
+        else:
+            key=(self.__class__,getattr(self,"start",None))
+            with _builtParsersLock:
+                if key not in _builtParsers:
+                    _builtParsers[key]=self.__build()
+                lexer,parser=_builtParsers[key]
+            lexer,parser=self.__bindTo(lexer,parser)
+
+        self.lexer=lexer
+        self.parser=parser
         self.lex=lex
         self.yacc=yacc
 
+    def __build(self):
+        """Build the lexer and parser for this instance
+        :return: tuple with the lexer and the parser"""
+        lexer=lex.lex(module=self, debug=self.debug)
+        parser=yacc.yacc(module=self,
+                         debug=self.debug,
+                         debugfile=self.debugfile,
+                         tabmodule=self.tabmodule,
+                         outputdir=getUserTempDir(),
+                         check_recursion=self.debug)
+        return lexer,parser
+
+    def __bindTo(self,lexer,parser):
+        """Copies of a cached lexer and parser whose rules call the
+        methods of this instance. The tables are shared with the originals
+        :return: tuple with the lexer and the parser"""
+        lexer=lexer.clone(self)
+        lexer.lexstatestack=[]
+        lexer.begin('INITIAL')
+
+        productions=[]
+        for p in parser.productions:
+            p=copy.copy(p)
+            if p.func:
+                p.callable=getattr(self,p.func)
+            productions.append(p)
+
+        parser=copy.copy(parser)
+        parser.productions=productions
+        if parser.errorfunc:
+            parser.errorfunc=getattr(self,parser.errorfunc.__name__)
+
+        return lexer,parser
+
     def parse(self,content):
         """Do the actual parsing
         :param content: String that is to be parsed
@@ -57,4 +113,7 @@ class PlyParser(object):
         else:
             debug=0
 
-        return yacc.parse(content,debug=debug)
+        self.lexer.lineno=1
+        self.lexer.begin('INITIAL')
+
+        return self.parser.parse(content,lexer=self.lexer,debug=debug)
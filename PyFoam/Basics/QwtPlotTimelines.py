@@ -90,7 +90,7 @@ class QwtPlotTimelines(GeneralPlotTimelines):
         axis=self.axis1
         if self.testAlternate(name):
             a=self.axis2
-        data=self.data.getValues(name)
+        data=self.getValues(name)
         tm=times
         if len(tm)>0 and not lastValid:
             tm=tm[:-1]
@@ -1,6 +1,13 @@
 #  ICE Revision: $Id: $
 """
 Collects data about runs in a small SQLite database
+
+Two layouts of the database are supported: in the 'wide' layout every
+value is a column (of the table of the run data or of a table for the
+sub-dictionaries). In the 'long' layout every value is a row in one
+table with the values and the names of the values are in another
+table. This is needed if there are more different values than SQLite
+allows columns in a table
 """
 
 # don't look at it too closely. It's my first sqlite-code
@@ -10,6 +17,7 @@ from os import path
 import datetime
 import re
 import sys
+import csv
 
 from PyFoam.Error import error
 from .CSVCollection import CSVCollection
@@ -24,49 +32,179 @@ class RunDatabase(object):
 
     separator="//"
 
+    layouts=["wide","long"]
+
     def __init__(self,
                  name,
                  create=False,
-                 verbose=False):
+                 verbose=False,
+                 layout=None):
         """:param name: name of the file
-        :param create: should the database be created if it does not exist"""
+        :param create: should the database be created if it does not exist
+        :param layout: the layout of a newly created database ('wide'
+        or 'long'). If unset the setting from the configuration is
+        used. Existing databases keep their layout"""
 
         self.verbose=verbose
         if not path.exists(name):
             if create==False:
                 error("Database",name,"does not exist")
             else:
-                self.initDatabase(name)
+                self.initDatabase(name,layout=layout)
 
         self.db=sqlite3.connect(name)
         self.db.row_factory=sqlite3.Row
 
-    def initDatabase(self,name):
-        """Create a new database file"""
+        # cached information about the tables and the columns
+        self.__columns={}
+        self.__tables=None
+        self.__keys=None
+
+        if "runValues" in self.__getTables():
+            self.layout="long"
+        else:
+            self.layout="wide"
+
+    def initDatabase(self,name,layout=None):
+        """Create a new database file
+        :param layout: 'wide' or 'long'"""
+        if layout is None:
+            from PyFoam import configuration as config
+            layout=config().get("RunDatabase","layout")
+        if layout not in RunDatabase.layouts:
+            error("Layout",layout,"not in",RunDatabase.layouts)
+
         db=sqlite3.connect(name)
         with db:
             db.row_factory=sqlite3.Row
             cursor=db.cursor()
-            cursor.execute("CREATE TABLE theRuns(runId INTEGER PRIMARY KEY, "+
-                           self.__normalize("insertionTime")+" TIMESTAMP)")
+            if layout=="wide":
+                cursor.execute("CREATE TABLE theRuns(runId INTEGER PRIMARY KEY, "+
+                               self.__normalize("insertionTime")+" TIMESTAMP)")
+            else:
+                cursor.execute("CREATE TABLE runs(runId INTEGER PRIMARY KEY)")
+                cursor.execute("CREATE TABLE dataKeys(keyId INTEGER PRIMARY KEY, "+
+                               "tableName TEXT NOT NULL, name TEXT NOT NULL, "+
+                               "isReal INTEGER, UNIQUE(tableName,name))")
+                # the value goes to the column of the type of the key
+                # so that SQLite converts it like in the wide layout
+                cursor.execute("CREATE TABLE runValues(runId INTEGER NOT NULL, "+
+                               "keyId INTEGER NOT NULL, realValue REAL, textValue TEXT, "+
+                               "PRIMARY KEY(runId,keyId))")
+                cursor.execute("CREATE INDEX runValuesKeys ON runValues(keyId,runId)")
             cursor.close()
+        db.close()
 
-    def add(self,data):
-        """Add a dictionary with data to the database"""
-        self.__adaptDatabase(data)
+    def add(self,data,commit=True):
+        """Add a dictionary with data to the database
+        :param commit: commit the data to the file. If False
+        then commit() has to be called (this is faster for many runs)"""
 
         runData=dict([("insertionTime",datetime.datetime.now())]+ \
                 [(k,v) for k,v in iteritems(data) if type(v)!=dict])
-        runID=self.__addContent("theRuns",runData)
+
+        tables={"theRuns":self.__convertValues(runData)}
 
         subtables=dict([(k,v) for k,v in iteritems(data) if type(v)==dict])
         for tn,content in iteritems(subtables):
-            self.__addContent(tn+"Data",
-                              dict(list(self.__flattenDict(content).items())+
-                                   [("runId",runID)]))
+            tables[tn+"Data"]=self.__convertValues(self.__flattenDict(content))
+
+        runID=self.__insertRun(None,tables)
 
+        if commit:
+            self.commit()
+
+        return runID
+
+    def commit(self):
+        """Write the added data to the file"""
         self.db.commit()
 
+    def __convertValues(self,data):
+        """Numbers are stored as floats. Everything else as a string"""
+        result={}
+        for k,v in iteritems(data):
+            if isinstance(v,integer_types+(float,)):
+                result[k]=float(v)
+            else:
+                result[k]=uniCode(str(v))
+        return result
+
+    def __insertRun(self,runId,tables,isReal=None):
+        """Add the data of one run
+        :param runId: the id of the run. If None a new one is used
+        :param tables: dictionary with the names of the tables as keys
+        and dictionaries with the values as values. 'theRuns' is the
+        table with the basic run data
+        :param isReal: function that gets the name of the table and the
+        value name and returns whether a new column for this is REAL
+        (otherwise TEXT). If unset the type of the value is used
+        :return: the id of the run"""
+
+        def realColumn(t,k,v):
+            if isReal is None:
+                return isinstance(v,float)
+            else:
+                return isReal(t,k)
+
+        if self.layout=="wide":
+            self.__adaptDatabase(tables,realColumn)
+            runData=dict(tables["theRuns"])
+            if runId is not None:
+                runData["runId"]=runId
+            runId=self.__addContent("theRuns",runData)
+            for tn,content in iteritems(tables):
+                if tn=="theRuns":
+                    continue
+                self.__addContent(tn,dict(list(content.items())+
+                                          [("runId",runId)]))
+        else:
+            cursor=self.db.cursor()
+            if runId is None:
+                cursor.execute("INSERT INTO runs DEFAULT VALUES")
+                runId=cursor.lastrowid
+            else:
+                cursor.execute("INSERT INTO runs (runId) VALUES (?)",(runId,))
+            values=[]
+            for tn,content in iteritems(tables):
+                for k,v in iteritems(content):
+                    keyId,real=self.__getKey(tn,k,realColumn(tn,k,v))
+                    if real:
+                        values.append((runId,keyId,v,None))
+                    else:
+                        values.append((runId,keyId,None,v))
+            if self.verbose:
+                print_("Adding",len(values),"values for run",runId)
+            cursor.executemany("INSERT INTO runValues (runId,keyId,realValue,textValue) "+
+                               "VALUES (?,?,?,?)",values)
+            cursor.close()
+
+        return runId
+
+    def __getKeys(self):
+        """The keys of the long layout. A dictionary with the table and
+        the value name as the key and the id of the key and whether it
+        is a REAL as the value"""
+        if self.__keys is None:
+            self.__keys={}
+            for r in self.db.execute("SELECT keyId,tableName,name,isReal FROM dataKeys"):
+                self.__keys[(r["tableName"],r["name"])]=(r["keyId"],bool(r["isReal"]))
+        return self.__keys
+
+    def __getKey(self,table,name,isReal):
+        """Id of a key (created if it does not exist) and whether it
+        is a REAL"""
+        keys=self.__getKeys()
+        try:
+            return keys[(table,name)]
+        except KeyError:
+            if self.verbose:
+                print_("Adding key",name,"to",table)
+            c=self.db.execute("INSERT INTO dataKeys (tableName,name,isReal) VALUES (?,?,?)",
+                              (table,name,1 if isReal else 0))
+            keys[(table,name)]=(c.lastrowid,isReal)
+            return keys[(table,name)]
+
     specialChars={
         '[':'bro',
         ']':'brc',
@@ -79,12 +217,18 @@ class RunDatabase(object):
 
     specialString="_specialChar"
 
+    __normalized={}
+
     def __normalize(self,s):
         """Normalize a column-name so that the case-insensitve column-names of SQlite
         are no problem"""
 
         if s in ["runId","dataId"]:
             return s
+        try:
+            return RunDatabase.__normalized[s]
+        except KeyError:
+            pass
         result=""
         for c in s:
             if c.isupper() or c=="_":
@@ -93,6 +237,7 @@ class RunDatabase(object):
                 result+=RunDatabase.specialString+RunDatabase.specialChars[c]
             else:
                 result+=c
+        RunDatabase.__normalized[s]=result
         return result
 
     def __denormalize(self,s):
@@ -127,22 +272,8 @@ class RunDatabase(object):
 
     def __addContent(self,table,data):
         cursor=self.db.cursor()
-        runData={}
-        for k,v in iteritems(data):
-            if k=="runId":
-                runData[k]=v
-            elif isinstance(v,integer_types+(float,)):
-                runData[k]=float(v)
-            else:
-                runData[k]=uniCode(str(v))
-        cols=self.__getColumns(table)[1:]
-        addData=[]
-        for c in cols:
-            try:
-                addData.append(runData[c])
-            except KeyError:
-                addData.append(None)
-        addData=tuple(addData)
+        cols=[c for c in self.__getColumns(table) if c in data]
+        addData=tuple(data[c] for c in cols)
         cSQL = "insert into "+table+" ("+ \
                ",".join(['"'+self.__normalize(c)+'"' for c in cols])+ \
                ") values ("+",".join(["?"]*len(addData))+")"
@@ -161,24 +292,25 @@ class RunDatabase(object):
 
         return lastrow
 
-    def __adaptDatabase(self,data):
-        """Make sure that all the required columns and tables are there"""
-
-        c=self.db.execute('SELECT name FROM sqlite_master WHERE type = "table"')
-        tables=[ x["name"] for x in c.fetchall() ]
+    def __getTables(self):
+        if self.__tables is None:
+            c=self.db.execute('SELECT name FROM sqlite_master WHERE type = "table" ORDER BY rowid')
+            self.__tables=[ x["name"] for x in c.fetchall() ]
+        return self.__tables
 
-        indata=dict([(k,v) for k,v in iteritems(data) if type(v)!=dict])
-        subtables=dict([(k,v) for k,v in iteritems(data) if type(v)==dict])
-
-        self.__addColumnsToTable("theRuns",indata)
+    def __adaptDatabase(self,tables,realColumn):
+        """Make sure that all the required columns and tables are there
+        :param tables: dictionary with the tables and their values
+        :param realColumn: function that says whether a new column is REAL"""
 
-        for tn,content in iteritems(subtables):
-            if tn+"Data" not in tables:
+        for tn,content in iteritems(tables):
+            if tn not in self.__getTables():
                 if self.verbose:
                     print_("Adding table",tn)
-                self.db.execute("CREATE TABLE "+tn+"Data (dataId INTEGER PRIMARY KEY, runId INTEGER)")
-            self.__addColumnsToTable(tn+"Data",
-                                     self.__flattenDict(content))
+                self.db.execute("CREATE TABLE "+tn+" (dataId INTEGER PRIMARY KEY, runId INTEGER)")
+                self.db.execute("CREATE INDEX "+tn+"RunId ON "+tn+" (runId)")
+                self.__tables.append(tn)
+            self.__addColumnsToTable(tn,content,realColumn)
 
     def __flattenDict(self,oData,prefix=""):
         data=[(prefix+k,v) for k,v in iteritems(oData) if type(v)!=dict]
@@ -190,30 +322,172 @@ class RunDatabase(object):
         return dict(data)
 
     def __getColumns(self,tablename):
-        c=self.db.execute('SELECT * from '+tablename)
-        result=[]
-        for desc in c.description:
-            if desc[0] in ['dataId','runId']:
-                result.append(desc[0])
-            else:
-                result.append(self.__denormalize(desc[0]))
+        """The (denormalized) names of the columns of a table. Cached"""
+        if tablename not in self.__columns:
+            result=[]
+            for desc in self.db.execute('PRAGMA table_info("%s")' % tablename):
+                if desc[1] in ['dataId','runId']:
+                    result.append(desc[1])
+                else:
+                    result.append(self.__denormalize(desc[1]))
+            self.__columns[tablename]=result
 
-        return result
+        return self.__columns[tablename]
 
-    def __addColumnsToTable(self,table,data):
+    def __addColumnsToTable(self,table,data,realColumn):
         columns=self.__getColumns(table)
+        present=set(columns)
 
         for k,v in iteritems(data):
-            if k not in columns:
+            if k not in present:
                 if self.verbose:
                     print_("Adding:",k,"to",table,"(normalized:",
                            self.__normalize(k),")")
-                if isinstance(v,integer_types+(float,)):
+                if realColumn(table,k,v):
                     self.db.execute('ALTER TABLE "%s" ADD COLUMN "%s" REAL' %
                                     (table,self.__normalize(k)))
                 else:
                     self.db.execute('ALTER TABLE "%s" ADD COLUMN "%s" TEXT' %
                                     (table,self.__normalize(k)))
+                columns.append(k)
+
+    def __tableKeys(self):
+        """The names of the values in the tables
+        :return: list of tuples. First element is the name of the
+        table. The second is a list with tuples of the name of a value
+        and whether it is a REAL. Tables and values are in the order in
+        which they were created"""
+        result=[]
+        if self.layout=="wide":
+            for t in self.__getTables():
+                names=[]
+                for desc in self.db.execute('PRAGMA table_info("%s")' % t):
+                    if desc[1] in ['dataId','runId']:
+                        continue
+                    names.append((self.__denormalize(desc[1]),
+                                  desc[2].upper()=="REAL"))
+                result.append((t,names))
+        else:
+            tables={}
+            for r in self.db.execute("SELECT tableName,name,isReal FROM dataKeys ORDER BY keyId"):
+                if r["tableName"] not in tables:
+                    tables[r["tableName"]]=[]
+                    result.append((r["tableName"],tables[r["tableName"]]))
+                tables[r["tableName"]].append((r["name"],bool(r["isReal"])))
+        return result
+
+    def __firstRuns(self):
+        """Dictionary with the first run that has data for every table"""
+        result={}
+        if self.layout=="wide":
+            for t in self.__getTables():
+                r=self.db.execute("SELECT MIN(runId) FROM "+t+
+                                  " WHERE runId IN (SELECT runId FROM theRuns)").fetchone()
+                if r[0] is not None:
+                    result[t]=r[0]
+        else:
+            for r in self.db.execute("SELECT k.tableName,MIN(v.runId) FROM runValues v "+
+                                     "JOIN dataKeys k ON v.keyId=k.keyId "+
+                                     "GROUP BY k.tableName"):
+                result[r[0]]=r[1]
+        return result
+
+    def iterRuns(self):
+        """Iterate over the runs in the order in which they were added.
+        The data of the runs is read with one ordered query per table
+        (wide layout) or one query for all the values (long layout)
+        :return: tuples with the id of the run and a dictionary with
+        the tables. The values of the tables are dictionaries with the
+        values of the run"""
+
+        if self.layout=="wide":
+            cursors=[]
+            for t in self.__getTables():
+                if t=="theRuns":
+                    continue
+                c=self.db.cursor()
+                c.execute("SELECT * FROM "+t+" ORDER BY runId")
+                names=[d[0] for d in c.description]
+                # positions and denormalized names of the data columns
+                used=[(i,self.__denormalize(n)) for i,n in enumerate(names)
+                      if n not in ["dataId","runId"]]
+                cursors.append([t,used,names.index("runId"),c,c.fetchone()])
+
+            runCursor=self.db.cursor()
+            runCursor.execute("SELECT * FROM theRuns ORDER BY runId")
+            runNames=[self.__denormalize(d[0]) for d in runCursor.description]
+            for row in runCursor:
+                runId=row[0]
+                tables={"theRuns":dict(zip(runNames[1:],tuple(row)[1:]))}
+                for c in cursors:
+                    t,used,runIndex,cursor,current=c
+                    found=0
+                    while current is not None and current[runIndex]<=runId:
+                        if current[runIndex]==runId:
+                            found+=1
+                            tables[t]=dict((n,current[i]) for i,n in used)
+                        current=cursor.fetchone()
+                    c[4]=current
+                    if found>1:
+                        error(found,"data items found for id ",runId,
+                              "in table",t,".Need exactly 1")
+                yield runId,tables
+        else:
+            keys=dict((v[0],(k[0],k[1],v[1])) for k,v in iteritems(self.__getKeys()))
+            valueCursor=self.db.cursor()
+            valueCursor.execute("SELECT runId,keyId,realValue,textValue FROM runValues "+
+                                "ORDER BY runId,keyId")
+            current=valueCursor.fetchone()
+            runCursor=self.db.cursor()
+            runCursor.execute("SELECT runId FROM runs ORDER BY runId")
+            for row in runCursor:
+                runId=row[0]
+                tables={}
+                while current is not None and current[0]<=runId:
+                    if current[0]==runId:
+                        t,n,isReal=keys[current[1]]
+                        if t not in tables:
+                            tables[t]={}
+                        tables[t][n]=current[2] if isReal else current[3]
+                    current=valueCursor.fetchone()
+                yield runId,tables
+
+    def copyTo(self,name,layout="long"):
+        """Copy the data to a new database (for instance to change the
+        layout). The ids of the runs are kept
+        :param name: name of the new database file. Must not exist
+        :param layout: layout of the new database
+        :return: the new database"""
+        if path.exists(name):
+            error("Database",name,"already exists")
+        other=RunDatabase(name,create=True,verbose=self.verbose,layout=layout)
+
+        types={}
+        for t,names in self.__tableKeys():
+            for n,real in names:
+                types[(t,n)]=real
+        isReal=lambda t,n:types[(t,n)]
+
+        # create the columns in the original order
+        for t,names in self.__tableKeys():
+            if other.layout=="long":
+                for n,real in names:
+                    other.__getKey(t,n,real)
+            else:
+                other.__adaptDatabase({t:dict((n,None) for n,real in names)},
+                                      lambda t,n,v:isReal(t,n))
+
+        nr=0
+        for runId,tables in self.iterRuns():
+            for t in tables:
+                tables[t]=dict((n,v) for n,v in iteritems(tables[t]) if v is not None)
+            other.__insertRun(runId,tables,isReal=isReal)
+            nr+=1
+        other.commit()
+        if self.verbose:
+            print_("Copied",nr,"runs")
+
+        return other
 
     def dumpToCSV(self,
                   fname,
@@ -221,74 +495,92 @@ class RunDatabase(object):
                   disableRunData=None,
                   pandasFormat=True,
                   excel=False):
-        """Dump the contents of the database to a csv-file
+        """Dump the contents of the database to a csv-file. The columns
+        are determined first and then the runs are written one after
+        the other
         :param name: the CSV-file
         :param selection: list of regular expressions. Only data
         entries fitting those will be added to the CSV-file (except
         for the basic run). If unset all data will be written"""
-        file=CSVCollection(fname)
 
-        runCursor=self.db.cursor()
-        runCursor.execute("SELECT * from theRuns")
+        disableExprs=[re.compile(e) for e in disableRunData] if disableRunData else []
+        selectionExprs=[re.compile(e) for e in selection] if selection else []
+
+        tableKeys=dict(self.__tableKeys())
+        firstRuns=self.__firstRuns()
+        order=[t for t,names in self.__tableKeys()]
 
-        c=self.db.execute('SELECT name FROM sqlite_master WHERE type = "table"')
-        tables=[ x["name"] for x in c.fetchall() ]
+        # each column is a tuple of the name in the file, the table and the value name
+        columns=[]
 
         allData=set()
         writtenData=set()
 
         disabledStandard=set()
 
-        for d in runCursor:
-            id=d['runId']
-            if self.verbose:
-                print_("Dumping run",id)
-            for k in list(d.keys()):
+        if disableRunData:
+            for n in ["runId"]+[self.__normalize(k) for k,r in tableKeys.get("theRuns",[])]:
+                for exp in disableExprs:
+                    if not exp.search(self.__denormalize(n)) is None:
+                        disabledStandard.add(n)
+                        break
+                else:
+                    columns.append((n,None,n))
+
+        # tables in the order in which they first have data
+        for t in sorted(firstRuns,key=lambda t:(firstRuns[t],order.index(t))):
+            if t=="theRuns":
+                namePrefix="runInfo"
+            else:
+                namePrefix=t[:-4]
+            for k,r in tableKeys[t]:
+                if self.__normalize(k) in disabledStandard:
+                    continue
+                name=namePrefix+self.separator+k
+                allData.add(name)
                 writeEntry=True
-                if disableRunData:
-                    for e in disableRunData:
-                        exp=re.compile(e)
-                        if not exp.search(self.__denormalize(k)) is None:
-                            writeEntry=False
+                if selection:
+                    writeEntry=False
+                    for exp in selectionExprs:
+                        if exp.search(name):
+                            writeEntry=True
                             break
-                    if writeEntry:
-                        file[k]=d[k]
+                if writeEntry:
+                    writtenData.add(name)
+                    columns.append((name,t,k))
+
+        collection=CSVCollection()
+        outFile=None
+        writer=None
+
+        for id,tables in self.iterRuns():
+            if self.verbose:
+                print_("Dumping run",id)
+            row=[]
+            for name,t,k in columns:
+                if t is None:
+                    if k=="runId":
+                        v=id
                     else:
-                        disabledStandard.add(k)
-            for t in tables:
-                if t=="theRuns":
-                    namePrefix="runInfo"
+                        v=tables["theRuns"].get(self.__denormalize(k),None)
+                elif t in tables:
+                    v=tables[t].get(k,None)
                 else:
-                    namePrefix=t[:-4]
-                dataCursor=self.db.cursor()
-                dataCursor.execute("SELECT * FROM "+t+" WHERE runId=?",
-                                   (str(id),))
-                data=dataCursor.fetchall()
-                if len(data)>1:
-                    error(len(data),"data items found for id ",id,
-                          "in table",t,".Need exactly 1")
-                elif len(data)<1:
+                    # no data for this run
+                    row.append(None)
                     continue
-                for k in list(data[0].keys()):
-                    if k in ["dataId","runId"]:
-                        continue
-                    if k in disabledStandard:
-                        continue
-                    name=namePrefix+self.separator+self.__denormalize(k)
-                    allData.add(name)
-                    writeEntry=True
-                    if selection:
-                        writeEntry=False
-                        for e in selection:
-                            exp=re.compile(e)
-                            if exp.search(name):
-                                writeEntry=True
-                                break
-                    if writeEntry:
-                        writtenData.add(name)
-                        file[name]=data[0][k]
-
-            file.write()
+                collection[name]=v
+                row.append(v)
+            if fname:
+                if outFile is None:
+                    outFile=open(fname,"w")
+                    writer=csv.writer(outFile)
+                    writer.writerow([c[0] for c in columns])
+                writer.writerow(row)
+            collection.write()
+
+        if outFile is not None:
+            outFile.close()
 
         if self.verbose:
             sep="\n    "
@@ -300,14 +592,14 @@ class RunDatabase(object):
             if len(disabledStandard)>0:
                 print_("Disabled standard entries:",sep,sep.join(sorted(disabledStandard)),sep="")
 
-        f=file(pandasFormat)
+        f=collection(pandasFormat)
         if excel:
-            file(True).to_excel(fname)
+            collection(True).to_excel(fname)
 
         if not f is None:
             return f
         else:
             # retry by forcing to numpy
-            return file(False)
+            return collection(False)
 
 # Should work with Python3 and Python2
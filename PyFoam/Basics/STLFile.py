@@ -1,10 +1,74 @@
 #  ICE Revision: $Id$
-"""Read a STL file and do simple manipulations"""
+"""Read a STL file and do simple manipulations
+
+The facets of every solid are stored in numpy-arrays (one array with
+the normals and one with the three vertices of every facet). ASCII
+files are read block by block: the numbers of the facets are parsed by
+numpy and only the 'solid' and 'endsolid'-lines are looked at by
+Python. Binary files are read into a record-array and the normals and
+vertices are views of that. Both formats can be written"""
 
 from os import path
+import os
+import struct
+import warnings
+
+import numpy as np
+
 from PyFoam.Error import error
 
-from PyFoam.ThirdParty.six import next as iterNext
+# size of the blocks in which ASCII-files are read
+blockSize=16*1024*1024
+
+# number of facets that are formatted at once when writing ASCII
+writeChunk=100000
+
+binaryFacet=np.dtype([("normal","<f4",(3,)),
+                      ("vertices","<f4",(3,3)),
+                      ("attribute","<u2")])
+
+# the words in the body of a solid. The ones that contain other words
+# have to be removed first
+facetKeywords=[b"endfacet",b"endloop",b"facet",b"normal",b"outer",b"loop",b"vertex"]
+
+# translation table that replaces the letters of these words with spaces
+keywordLetters=bytearray(range(256))
+for c in bytearray(b"".join(facetKeywords)):
+    keywordLetters[c]=ord(" ")
+keywordLetters=bytes(keywordLetters)
+
+facetTokens=["facet normal","outer loop","vertex","vertex","vertex","endloop","endfacet"]
+
+class STLSolid(object):
+    """One solid of a STL-file"""
+
+    def __init__(self,name,normals=None,vertices=None,lines=None):
+        """
+        :param name: name of the solid
+        :param normals: array with the normals of the facets (shape (n,3))
+        :param vertices: array with the vertices of the facets (shape (n,3,3))
+        :param lines: first and last line of the solid in the file it
+        was read from. None if unknown
+        """
+        self.name=name
+        if normals is None:
+            normals=np.zeros((0,3))
+        if vertices is None:
+            vertices=np.zeros((0,3,3))
+        self.normals=normals
+        self.vertices=vertices
+        self.lines=lines
+
+    def nrFacets(self):
+        return len(self.normals)
+
+    def boundingBox(self):
+        """:return: tuple with the lists of the minimum and the maximum
+        coordinates of the vertices"""
+        if self.nrFacets()==0:
+            return [1e100]*3,[-1e100]*3
+        points=self.vertices.reshape(-1,3)
+        return [float(v) for v in points.min(axis=0)],[float(v) for v in points.max(axis=0)]
 
 class STLFile(object):
     """Store a complete STL-file and do simple manipulations with it"""
@@ -26,13 +90,19 @@ class STLFile(object):
         else:
             self._filename=fName
 
+        self._solids=[]
+        self._binary=False
+
         if self._fp==None:
             if fName!=None:
-                self._contents=[l.strip() for l in open(fName).readlines()]
-            else:
-                self._contents=[]
+                with open(fName,"rb") as fh:
+                    self._read(fh,os.fstat(fh.fileno()).st_size)
         else:
-            self._contents=[l.strip() for l in self._fp.readlines()]
+            fh=self._fp
+            if hasattr(fh,"buffer"):
+                # text-mode handle (for instance sys.stdin)
+                fh=fh.buffer
+            self._read(fh)
 
         self.resetInfo()
 
@@ -47,163 +117,359 @@ class STLFile(object):
         else:
             return path.basename(self._filename)
 
+    def isBinary(self):
+        """Was this read from a binary file"""
+        return self._binary
+
+    def solids(self):
+        """The list of STLSolid-objects in the file"""
+        return self._solids
+
     def expectedToken(self,l,token,i):
         if l.strip().find(token)!=0:
             error("'%s' expected in line %d of %s" % (token,i+1,self.filename()))
 
+    def _read(self,fh,size=None):
+        """Read binary or ASCII data
+        :param fh: file opened in binary mode
+        :param size: size of the file. If unset the whole data is read
+        to find out"""
+        if size is None:
+            data=fh.read()
+            if not isinstance(data,bytes):
+                data=data.encode("latin-1")
+            if self._isBinary(data[:84],len(data)):
+                self._readBinary(data=data)
+            else:
+                self._readASCII([data])
+        else:
+            head=fh.read(84)
+            if self._isBinary(head,size):
+                self._readBinary(head=head,fh=fh)
+            else:
+                self._readASCII(self._blocks(fh,head))
+
+    def _isBinary(self,head,size):
+        """A file is binary if its size fits the number of facets in the
+        header (ASCII-files that happen to fit are extremely unlikely)"""
+        if len(head)<84:
+            return False
+        nr,=struct.unpack("<I",head[80:84])
+        return size==84+nr*binaryFacet.itemsize
+
+    def _blocks(self,fh,first):
+        yield first
+        while True:
+            block=fh.read(blockSize)
+            if len(block)==0:
+                return
+            yield block
+
+    def _readBinary(self,head=None,fh=None,data=None):
+        if data is not None:
+            head=data[:84]
+        nr,=struct.unpack("<I",head[80:84])
+        if data is not None:
+            facets=np.frombuffer(data,dtype=binaryFacet,count=nr,offset=84)
+        else:
+            facets=np.fromfile(fh,dtype=binaryFacet,count=nr)
+            if len(facets)!=nr:
+                error("File",self.filename(),"seems to be incomplete")
+        name=self.noName
+        title=head[:80].decode("latin-1").replace("\0"," ").split()
+        if len(title)>1 and title[0]=="solid":
+            name=title[1]
+        self._solids=[STLSolid(name,
+                               normals=facets["normal"],
+                               vertices=facets["vertices"])]
+        self._binary=True
+
+    def _readASCII(self,blocks):
+        """Parse ASCII data. Only complete facets are handed to the
+        parser, the rest is kept for the next block
+        :param blocks: iterator with the data"""
+        rest=b""
+        lineNr=0
+        state={"solid":None,"bodies":[]}
+        for block in blocks:
+            text=rest+block
+            cut=text.rfind(b"endfacet")
+            if cut>=0:
+                cut=text.find(b"\n",cut)
+            if cut<0:
+                rest=text
+                continue
+            cut+=1
+            self._parseText(text[:cut],lineNr,state)
+            lineNr+=text.count(b"\n",0,cut)
+            rest=text[cut:]
+        self._parseText(rest,lineNr,state)
+        if state["solid"] is not None:
+            error("File",self.filename(),"seems to be incomplete")
+
+    def _solidLines(self,text):
+        """Find the 'solid' and 'endsolid'-lines
+        :return: iterator with the keyword, the start and the end of
+        the line and the words after the keyword"""
+        pos=text.find(b"solid")
+        while pos>=0:
+            lineStart=text.rfind(b"\n",0,pos)+1
+            lineEnd=text.find(b"\n",pos)
+            if lineEnd<0:
+                lineEnd=len(text)
+            prefix=text[lineStart:pos].strip()
+            after=text[pos+5:pos+6]
+            if prefix in [b"",b"end"] and (after==b"" or after.isspace()):
+                yield ("solid" if prefix==b"" else "endsolid",
+                       lineStart,
+                       lineEnd,
+                       text[pos+5:lineEnd].decode("latin-1").split())
+            pos=text.find(b"solid",lineEnd)
+
+    def _parseText(self,text,lineNr,state):
+        """Parse a part of an ASCII-file
+        :param text: the text. Ends with a complete line
+        :param lineNr: number of lines before the text
+        :param state: dictionary with the solid that is currently read
+        and the facets read so far"""
+        pos=0
+        # line numbers are counted incrementally
+        counted=0
+        for keyword,lineStart,lineEnd,parts in self._solidLines(text):
+            bodyLine=lineNr+text.count(b"\n",counted,pos)
+            self._addFacets(text[pos:lineStart],bodyLine,state)
+            lineNr+=text.count(b"\n",counted,lineStart)
+            counted=lineStart
+            line=text[lineStart:lineEnd].decode("latin-1")
+            if keyword=="solid":
+                if state["solid"] is not None:
+                    self.expectedToken(line,"facet normal",lineNr)
+                if len(parts)>0:
+                    name=parts[0]
+                else:
+                    name=self.noName
+                state["solid"]=STLSolid(name,lines=[lineNr+1,None])
+                state["bodies"]=[]
+            else:
+                solid=state["solid"]
+                if solid is None:
+                    self.expectedToken(line,"solid",lineNr)
+                if len(parts)>0 and parts[0]!=solid.name:
+                    error("Patch name",parts[0],"Expected",solid.name)
+                solid.lines[1]=lineNr+1
+                if len(state["bodies"])>0:
+                    data=np.concatenate(state["bodies"])
+                    solid.normals=data[:,0:3]
+                    solid.vertices=data[:,3:12].reshape(-1,3,3)
+                self._solids.append(solid)
+                state["solid"]=None
+                state["bodies"]=[]
+            pos=lineEnd
+        self._addFacets(text[pos:],lineNr+text.count(b"\n",counted,pos),state)
+
+    def _numbers(self,clean):
+        """Parse the numbers in a text"""
+        try:
+            with warnings.catch_warnings():
+                # older numpy only warns about data that is not a number
+                warnings.simplefilter("error",DeprecationWarning)
+                return np.fromstring(clean,sep=" ")
+        except (ValueError,DeprecationWarning):
+            return None
+
+    def _addFacets(self,body,lineNr,state):
+        """Convert the text between the 'solid'-lines to numbers"""
+        if state["solid"] is None:
+            for i,l in enumerate(body.decode("latin-1").split("\n")):
+                if l.strip()!="":
+                    self.expectedToken(l,"solid",lineNr+i)
+            return
+        nr=body.count(b"endfacet")
+        if nr==0:
+            if body.strip()!=b"":
+                self._checkFacets(body,lineNr)
+            return
+        for k,n in [(b"vertex",3*nr),(b"facet",2*nr),(b"normal",nr),
+                    (b"outer",nr),(b"loop",2*nr),(b"endloop",nr)]:
+            if body.count(k)!=n:
+                self._checkFacets(body,lineNr)
+                error("Problem reading the facets after line",lineNr,"of",self.filename())
+        # fast: all the letters of the keywords become spaces. The
+        # exponents of the numbers are protected by making them
+        # upper-case
+        values=self._numbers(body.replace(b"e-",b"E-").replace(b"e+",b"E+").translate(keywordLetters))
+        if values is None or len(values)!=12*nr:
+            # slow: only whole keywords are removed
+            clean=body
+            for k in facetKeywords:
+                clean=clean.replace(k,b" ")
+            values=self._numbers(clean)
+        if values is None or len(values)!=12*nr:
+            self._checkFacets(body,lineNr)
+            error("Problem reading the facets after line",lineNr,"of",self.filename())
+        state["bodies"].append(values.reshape(nr,12))
+
+    def _checkFacets(self,body,lineNr):
+        """Go through the lines to find the one with the problem (and
+        report its number)"""
+        nr=0
+        for i,l in enumerate(body.decode("latin-1").split("\n")):
+            if l.strip()=="":
+                continue
+            token=facetTokens[nr % len(facetTokens)]
+            self.expectedToken(l,token,lineNr+i)
+            if token in ["facet normal","vertex"]:
+                values=l.split()[len(token.split()):]
+                try:
+                    [float(v) for v in values]
+                except ValueError:
+                    values=[]
+                if len(values)!=3:
+                    error("Three numbers expected in line %d of %s" % (lineNr+i+1,self.filename()))
+            nr+=1
+        if nr % len(facetTokens)!=0:
+            error("File",self.filename(),"seems to be incomplete")
+
+    def _modified(self):
+        """The line numbers of the original file are no longer valid"""
+        self.resetInfo()
+        for s in self._solids:
+            s.lines=None
+
     def erasePatches(self,patchNames):
         """Erase the patches in the list"""
-        processed=[]
-
-        keep=True
-        currentName=None
-
-        for l in self._contents:
-            nextState=keep
-            parts=l.split()
-            if len(parts)>0:
-                if parts[0]=="endsolid":
-                    nextState=True
-                    if currentName!=parts[1]:
-                        error("Patch name",parts[1],"Expected",currentName)
-                    currentName=None
-                elif parts[0]=="solid":
-                    currentName=parts[1]
-                    if currentName in patchNames:
-                        keep=False
-                        nextState=False
-            if keep:
-                processed.append(l)
-            keep=nextState
-
-        self._contents=processed
+        self._solids=[s for s in self._solids if s.name not in patchNames]
+        self._modified()
 
     def mergePatches(self,patchNames,targetPatchName):
         """Merge the patches in the list and put them into a new patch"""
 
-        processed=[]
-        saved=[]
-
-        keep=True
-        currentName=None
-
-        for l in self._contents:
-            nextState=keep
-            parts=l.split()
-            if len(parts)>0:
-                if parts[0]=="endsolid":
-                    nextState=True
-                    if currentName!=parts[1]:
-                        error("Patch name",parts[1],"Expected",currentName)
-                    currentName=None
-                elif parts[0]=="solid":
-                    currentName=parts[1]
-                    if currentName in patchNames:
-                        keep=False
-                        nextState=False
-            if keep:
-                processed.append(l)
-            elif len(parts)>0:
-                if parts[0] not in ["solid","endsolid"]:
-                    saved.append(l)
-            keep=nextState
-
-        self._contents=processed
-
-        self._contents.append("solid "+targetPatchName)
-        self._contents+=saved
-        self._contents.append("endsolid "+targetPatchName)
+        merged=[s for s in self._solids if s.name in patchNames]
+        self._solids=[s for s in self._solids if s.name not in patchNames]
+        if len(merged)>0:
+            self._solids.append(STLSolid(targetPatchName,
+                                         normals=np.concatenate([s.normals for s in merged]),
+                                         vertices=np.concatenate([s.vertices for s in merged])))
+        else:
+            self._solids.append(STLSolid(targetPatchName))
+        self._modified()
 
     def patchInfo(self):
-        """Get info about the patches. A list of dictionaries with the relevant information"""
+        """Get info about the patches. A list of dictionaries with the
+        relevant information. The range of lines is the one in the
+        original file. If the file was binary or was modified it is the
+        range in the file written by writeTo"""
         if self._patchInfo:
             return self._patchInfo
 
         self._patchInfo=[]
 
-        newPatch=True
-
-        e=enumerate(self._contents)
-
-        goOn=True
-        while goOn:
-            try:
-                i,l=iterNext(e)
-                if newPatch:
-                    self.expectedToken(l,"solid",i)
-                    info={}
-                    if len(l.split())<2:
-                        info["name"]=self.noName
-                    else:
-                        info["name"]=l.split()[1]
-                    info["start"]=i+1
-                    info["facets"]=0
-                    info["min"]=[1e100]*3
-                    info["max"]=[-1e100]*3
-                    newPatch=False
-                elif l.strip().find("endsolid")==0:
-                    info["end"]=i+1
-                    self._patchInfo.append(info)
-                    newPatch=True
-                else:
-                    self.expectedToken(l,"facet normal",i)
-                    i,l=iterNext(e)
-                    self.expectedToken(l,"outer loop",i)
-                    for v in range(3):
-                        i,l=iterNext(e)
-                        self.expectedToken(l,"vertex",i)
-                        info["min"]=[min(m) for m in zip(info["min"],
-                                                         [float(v) for v in l.strip().split()[1:4]])]
-                        info["max"]=[max(m) for m in zip(info["max"],
-                                                         [float(v) for v in l.strip().split()[1:4]])]
-                    i,l=iterNext(e)
-                    self.expectedToken(l,"endloop",i)
-                    i,l=iterNext(e)
-                    self.expectedToken(l,"endfacet",i)
-                    info["facets"]+=1
-            except StopIteration:
-                goOn=False
-
-
-        if not newPatch:
-            error("File",self.filename(),"seems to be incomplete")
+        line=1
+        for s in self._solids:
+            info={"name":s.name,
+                  "facets":s.nrFacets()}
+            info["min"],info["max"]=s.boundingBox()
+            if s.lines is not None:
+                info["start"],info["end"]=s.lines
+            else:
+                info["start"]=line
+                info["end"]=line+1+len(facetTokens)*s.nrFacets()
+            line=info["end"]+1
+            self._patchInfo.append(info)
 
         return self._patchInfo
 
-    def writeTo(self,fName):
-        """Write to a file"""
+    def _solidLine(self,keyword,solid):
+        if solid.name==self.noName:
+            return keyword
+        else:
+            return keyword+" "+solid.name
+
+    def _asciiChunks(self):
+        """The ASCII representation in chunks. The numbers are written
+        with as many digits as are needed to read them back unchanged
+        (9 for single precision data from binary files, 17 for double
+        precision)"""
+        for s in self._solids:
+            if max(s.normals.dtype.itemsize,s.vertices.dtype.itemsize)<=4:
+                number="%.9g"
+            else:
+                number="%.17g"
+            facet="\n".join(["facet normal "+" ".join([number]*3),
+                             "outer loop"]+
+                            ["vertex "+" ".join([number]*3)]*3+
+                            ["endloop","endfacet",""])
+            yield self._solidLine("solid",s)+"\n"
+            for start in range(0,s.nrFacets(),writeChunk):
+                end=min(start+writeChunk,s.nrFacets())
+                data=np.hstack((s.normals[start:end],
+                                s.vertices[start:end].reshape(-1,9)))
+                yield (facet*(end-start)) % tuple(data.ravel().tolist())
+            yield self._solidLine("endsolid",s)+"\n"
+
+    def writeTo(self,fName,binary=False):
+        """Write to a file
+        :param fName: name of the file or a file handle
+        :param binary: write a binary STL. This format has no names for
+        the solids: all the solids end up in one"""
         if hasattr(fName, 'write'):
             f=fName
+            close=False
+            if binary and hasattr(f,"buffer"):
+                f.flush()
+                f=f.buffer
         else:
-            f=open(fName,"w")
+            f=open(fName,"wb" if binary else "w")
+            close=True
 
-        f.write("\n".join(self._contents))
+        try:
+            if binary:
+                self._writeBinary(f)
+            else:
+                for chunk in self._asciiChunks():
+                    f.write(chunk)
+        finally:
+            if close:
+                f.close()
+            else:
+                f.flush()
+
+    def _writeBinary(self,f):
+        nr=sum(s.nrFacets() for s in self._solids)
+        title="binary STL written by PyFoam: "+" ".join(s.name for s in self._solids)
+        head=title.encode("latin-1","replace")[:80].ljust(80,b" ")
+        f.write(head+struct.pack("<I",nr))
+        for s in self._solids:
+            for start in range(0,s.nrFacets(),writeChunk):
+                end=min(start+writeChunk,s.nrFacets())
+                facets=np.zeros(end-start,dtype=binaryFacet)
+                facets["normal"]=s.normals[start:end]
+                facets["vertices"]=s.vertices[start:end]
+                f.write(facets.tobytes())
 
     def __iter__(self):
-        for l in self._contents:
-            yield l
+        for chunk in self._asciiChunks():
+            for l in chunk.split("\n")[:-1]:
+                yield l
 
     def __iadd__(self,other):
         self.resetInfo()
 
         fName=path.splitext(other.filename())[0]
-        moreThanOne=len(other.patchInfo())>1
-
-        nr=1
+        moreThanOne=len(other.solids())>1
 
-        for l in other:
-            if l.strip().find("solid")==0 or l.strip().find("endsolid")==0:
-                parts=l.split()
-                if len(parts)==1:
-                    l=parts[0]+" "+fName
-                    if moreThanOne:
-                        l+="_%04d" % nr
-                else:
-                    l=parts[0]+" %s:%s" %(fName," ".join(parts[1:]))
-                if parts[0]=="solid":
-                    nr+=1
+        for nr,s in enumerate(other.solids()):
+            if s.name==self.noName:
+                name=fName
+                if moreThanOne:
+                    name+="_%04d" % (nr+1)
+            else:
+                name="%s:%s" % (fName,s.name)
+            self._solids.append(STLSolid(name,
+                                         normals=s.normals,
+                                         vertices=s.vertices))
 
-            self._contents.append(l)
+        self._modified()
 
         return self
 
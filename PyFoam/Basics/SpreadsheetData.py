@@ -24,6 +24,29 @@ class WrongDataSize(FatalErrorPyFoamException):
     def __init__(self,txt="Size of the arrays differs"):
         FatalErrorPyFoamException.__init__(self,txt)
 
+def _sequentialSum(values):
+    """Sum of the values added one after the other (like a loop does).
+    numpy.sum adds pairwise which gives slightly different results"""
+    if len(values)==0:
+        return 0
+    return numpy.cumsum(values)[-1]
+
+def _runningExtreme(values,start,better):
+    """The result of val=max(v,val) (or min) for all values in a
+    loop. Reproduces how this treats nan (a nan is only 'forgotten' by
+    the next value)
+    :param start: the initial value
+    :param better: numpy.maximum or numpy.minimum"""
+    if len(values)==0:
+        return start
+    nans=numpy.nonzero(numpy.isnan(values))[0]
+    if len(nans)==0:
+        return better(better.reduce(values),start)
+    last=nans[-1]
+    if last==len(values)-1:
+        return values[last]
+    return better.reduce(values[last+1:])
+
 class SpreadsheetData(object):
     """
     Collects data that could go into a spreadsheet. The focus of this class is on
@@ -161,20 +184,27 @@ class SpreadsheetData(object):
             if data is not None and names is None:
                 error("No names given for the data")
 
-            types=[]
-            for d in data[0]:
-                try:
-                    float(d)
-                    types.append('f8')
-                except ValueError:
-                    types.append('S')
-
-            for i,t in enumerate(types):
-                if t=="S":
-                    l=max(len(str(d[i])) for d in data)+1
-                    types[i]="S%d" % l
-            self.data=numpy.array([tuple(v) for v in data],
-                                  dtype=list(zip(names,types)))
+            if isinstance(data,numpy.ndarray) and data.ndim==2 and \
+               data.dtype.kind=="f" and data.shape[1]==len(names):
+                # columns of floats. No need to convert row by row
+                self.data=numpy.empty(len(data),dtype=list(zip(names,['f8']*len(names))))
+                for i,n in enumerate(names):
+                    self.data[n]=data[:,i]
+            else:
+                types=[]
+                for d in data[0]:
+                    try:
+                        float(d)
+                        types.append('f8')
+                    except ValueError:
+                        types.append('S')
+
+                for i,t in enumerate(types):
+                    if t=="S":
+                        l=max(len(str(d[i])) for d in data)+1
+                        types[i]="S%d" % l
+                self.data=numpy.array([tuple(v) for v in data],
+                                      dtype=list(zip(names,types)))
         if timeName:
             try:
                 index=list(self.data.dtype.names).index(timeName)
@@ -367,7 +397,10 @@ class SpreadsheetData(object):
         is ordered in ascending order. If unspecified a dictionary with the values from all columns is returned
         :param time: name of the time column. If none is given then the first column is assumed
         :param invalidExtend: if t is out of the valid range then use the smallest or the biggest value. If False use nan
-        :param noInterpolation: if t doesn't exactly fit a data-point return 'nan'"""
+        :param noInterpolation: if t doesn't exactly fit a data-point return 'nan'
+
+        If t is a list or an array then the values for all these times are
+        returned as an array (see evaluate)"""
 
         if time==None:
             time=self.time
@@ -383,6 +416,13 @@ class SpreadsheetData(object):
                                    noInterpolation=noInterpolation)
             return result
 
+        if numpy.ndim(t)>0:
+            return self.evaluate(t,
+                                 name,
+                                 time=time,
+                                 invalidExtend=invalidExtend,
+                                 noInterpolation=noInterpolation)
+
         x=self.data[time]
         y=self.data[name]
 
@@ -427,6 +467,93 @@ class SpreadsheetData(object):
             else:
                 return y[iLow] + (y[iHigh]-y[iLow])*(t-x[iLow])/(x[iHigh]-x[iLow])
 
+    def evaluate(self,
+                 times,
+                 name,
+                 time=None,
+                 invalidExtend=False,
+                 noInterpolation=False):
+        """Evaluate the data for an array of times. Gives the same values
+        as calling __call__ for every time (the search for the interval is
+        done for all times at once)
+        :param times: the times at which the data should be evaluated
+        :param name: name of the data column
+        :param time: name of the time column. If none is given then the first column is assumed
+        :param invalidExtend: see __call__
+        :param noInterpolation: see __call__
+        :return: array with the values. For columns with strings an array of objects"""
+
+        if time==None:
+            time=self.time
+
+        x=self.data[time]
+        y=self.data[name]
+        t=numpy.asarray(times,dtype=numpy.float64)
+
+        isString=y.dtype!=numpy.float64
+        n=len(x)
+
+        if isString:
+            result=numpy.empty(len(t),dtype=object)
+            result[:]=""
+        else:
+            result=numpy.empty(len(t))
+            result[:]=float('nan')
+
+        below=t<x[0]
+        above=t>x[-1]
+        if invalidExtend:
+            result[below]=y[0]
+            result[above]=y[-1]
+        inside=~(below|above)
+
+        # the same bisection as in __call__ but for all times at once
+        low=numpy.zeros(len(t),dtype=int)
+        high=numpy.empty(len(t),dtype=int)
+        high[:]=n-1
+        found=numpy.empty(len(t),dtype=int)
+        found[:]=-1
+        searching=inside.copy()
+        if noInterpolation:
+            searching&=~((t==x[0])|(t==x[-1]))
+        searching&=(high-low)>1
+        while searching.any():
+            new=low+(high-low)//2
+            xNew=x[new]
+            hit=searching&(xNew==t)
+            found[hit]=new[hit]
+            searching&=~hit
+            lower=searching&(t<xNew)
+            high[lower]=new[lower]
+            upper=searching&~lower
+            low[upper]=new[upper]
+            searching&=(high-low)>1
+
+        if noInterpolation:
+            atStart=inside&(t==x[0])
+            atEnd=inside&(t==x[-1])&~atStart
+            result[atStart]=y[0]
+            result[atEnd]=y[-1]
+            hit=inside&~(atStart|atEnd)&(found>=0)
+            result[hit]=y[found[hit]]
+            return result
+
+        hit=inside&(found>=0)
+        result[hit]=y[found[hit]]
+        interpolate=inside&(found<0)
+        iLow=low[interpolate]
+        iHigh=high[interpolate]
+        tI=t[interpolate]
+        with numpy.errstate(divide="ignore",invalid="ignore"):
+            if isString:
+                result[interpolate]=numpy.where((tI-x[iLow])/(x[iHigh]-x[iLow])<0.5,
+                                                y[iLow],
+                                                y[iHigh])
+            else:
+                result[interpolate]=y[iLow] + (y[iHigh]-y[iLow])*(tI-x[iLow])/(x[iHigh]-x[iLow])
+
+        return result
+
     def addTimes(self,times,time=None,interpolate=False,invalidExtend=False):
         """Extend the data so that all new times are represented (add rows
         if they are not there)
@@ -440,52 +567,38 @@ class SpreadsheetData(object):
         if time==None:
             time=self.time
 
-        if len(times)==len(self.data[time]):
-            same=True
-            for i in range(len(times)):
-                if times[i]!=self.data[time][i]:
-                    same=False
-                    break
-            if same:
-                # No difference between the times
-                return
-
-        newData=[]
-        otherI=0
-        originalI=0
-        while otherI<len(times):
-            goOn=originalI<len(self.data[time])
-            while goOn and times[otherI]>self.data[time][originalI]:
-                newData.append(self.data[originalI])
-                originalI+=1
-                goOn=originalI<len(self.data[time])
-
-            append=True
-            if originalI<len(self.data[time]):
-                if times[otherI]==self.data[time][originalI]:
-                    newData.append(self.data[originalI])
-                    originalI+=1
-                    otherI+=1
-                    append=False
-
-            if append:
-                t=times[otherI]
-                newRow=[]
-                for n in self.names():
-                    if n==time:
-                        newRow.append(t)
-                    elif interpolate:
-                        newRow.append(self(t,n,time=time,invalidExtend=invalidExtend))
-                    else:
-                        newRow.append(float('nan'))
-                newData.append(newRow)
-                otherI+=1
+        x=self.data[time]
+        times=numpy.asarray(times,dtype=numpy.float64)
 
-        while originalI<len(self.data[time]):
-            newData.append(self.data[originalI])
-            originalI+=1
+        if numpy.array_equal(times,x):
+            # No difference between the times
+            return
 
-        self.data=numpy.array([tuple(v) for v in newData],dtype=self.data.dtype)
+        # a time needs a new row if there are not enough rows with
+        # that time already (times are matched one to one)
+        existing=numpy.searchsorted(x,times,side="right")-numpy.searchsorted(x,times,side="left")
+        occurence=numpy.arange(len(times))-numpy.searchsorted(times,times,side="left")
+        newTimes=times[occurence>=existing]
+
+        newRows=self.__nanRows(newTimes,time)
+        if interpolate:
+            for n in self.names():
+                if n!=time:
+                    newRows[n]=self.evaluate(newTimes,n,time=time,invalidExtend=invalidExtend)
+
+        data=numpy.concatenate((self.data,newRows))
+        # the stable sort keeps the original rows before new rows with the same time
+        self.data=data[numpy.argsort(data[time],kind="mergesort")]
+
+    def __nanRows(self,times,time):
+        """Rows for the times with all other values set to 'nan'"""
+        rows=numpy.empty(len(times),dtype=self.data.dtype)
+        for n in self.names():
+            if n==time:
+                rows[n]=times
+            else:
+                rows[n]=float('nan')
+        return rows
 
     def resample(self,
                  other,
@@ -509,55 +622,29 @@ class SpreadsheetData(object):
         if extendData and (
             self.data[time][0] > other.data[time][0] or \
             self.data[time][-1] < other.data[time][-1]):
-            pre=[]
-            i=0
-            while other.data[time][i] < self.data[time][0]:
-                data=[]
-                for n in self.names():
-                    if n==time:
-                        data.append(other.data[time][i])
-                    else:
-                        data.append(float('nan'))
-                pre.append(data)
-                i+=1
-                if i>=len(other.data[time]):
-                    break
-            if len(pre)>0:
-                self.data=numpy.concatenate((numpy.array([tuple(v) for v in pre],
-                                                         dtype=self.data.dtype),
+            otherT=other.data[time]
+            # the times at the start and the end of the other data that are outside our range
+            notBefore=numpy.nonzero(~(otherT < self.data[time][0]))[0]
+            nrPre=notBefore[0] if len(notBefore)>0 else len(otherT)
+            if nrPre>0:
+                self.data=numpy.concatenate((self.__nanRows(otherT[:nrPre],time),
                                              self.data))
 
-            post=[]
-            i=-1
-            while other.data[time][i] > self.data[time][-1]:
-                data=[]
-                for n in self.names():
-                    if n==time:
-                        data.append(other.data[time][i])
-                    else:
-                        data.append(float('nan'))
-                post.append(data)
-                i-=1
-                if abs(i)>=len(other.data[time])+1:
-                    break
-
-            post.reverse()
-            if len(post)>0:
-                self.data=numpy.concatenate((self.data,numpy.array([tuple(p) for p in post],
-                                                                   dtype=self.data.dtype)))
-
-        result=[]
-
-        for t in self.data[time]:
-            nm=name
-            if otherName:
-                nm=otherName
-            result.append(other(t,nm,
-                                time=time,
-                                invalidExtend=invalidExtend,
-                                noInterpolation=noInterpolation))
+            notAfter=numpy.nonzero(~(otherT > self.data[time][-1]))[0]
+            nrPost=len(otherT)-1-notAfter[-1] if len(notAfter)>0 else len(otherT)
+            if nrPost>0:
+                self.data=numpy.concatenate((self.data,
+                                             self.__nanRows(otherT[len(otherT)-nrPost:],time)))
 
-        return result
+        nm=name
+        if otherName:
+            nm=otherName
+
+        return list(other.evaluate(self.data[time],
+                                   nm,
+                                   time=time,
+                                   invalidExtend=invalidExtend,
+                                   noInterpolation=noInterpolation))
 
     def compare(self,
                 other,
@@ -584,20 +671,17 @@ class SpreadsheetData(object):
 
         x=self.data[time]
         y=self.data[name]
-        y2=self.resample(other,name,otherName=otherName,time=time,invalidExtend=True)
+        y2=numpy.asarray(self.resample(other,name,otherName=otherName,time=time,invalidExtend=True))
 
         minT,maxT=minTime,maxTime
         if common:
             minTmp,maxTmp=max(x[0],other.data[time][0]),min(x[-1],other.data[time][-1])
-            for i in range(len(x)):
-                if minTmp<=x[i]:
-                    minT=x[i]
-                    break
-            for i in range(len(x)):
-                val=x[-(i+1)]
-                if maxTmp>=val:
-                    maxT=val
-                    break
+            candidates=numpy.nonzero(minTmp<=x)[0]
+            if len(candidates)>0:
+                minT=x[candidates[0]]
+            candidates=numpy.nonzero(maxTmp>=x)[0]
+            if len(candidates)>0:
+                maxT=x[candidates[-1]]
         else:
             minT,maxT=x[0],x[-1]
 
@@ -624,28 +708,24 @@ class SpreadsheetData(object):
 
         maxDiff=0
         maxPos=x[0]
-        sumDiff=0
-        sumWeighted=0
-        cnt=0
-
-        for i,t in enumerate(x):
-            if t<minT or t>maxT:
-                continue
-            cnt+=1
-
-            val1=y[i]
-            val2=y2[i]
-            diff=abs(val1-val2)
-            if diff>maxDiff:
-                maxDiff=diff
-                maxPos=x[i]
-            sumDiff+=diff
-            weight=0
-            if t>minT:
-                weight+=(t-x[i-1])/2
-            if t<maxT:
-                weight+=(x[i+1]-t)/2
-            sumWeighted+=weight*diff
+
+        used=numpy.nonzero(~((x<minT)|(x>maxT)))[0]
+        cnt=len(used)
+
+        t=x[used]
+        diff=numpy.abs(y[used]-y2[used])
+        if cnt>0:
+            # the first position of the biggest difference (nan is never bigger)
+            iMax=numpy.argmax(numpy.where(numpy.isnan(diff),-numpy.inf,diff))
+            if diff[iMax]>maxDiff:
+                maxDiff=diff[iMax]
+                maxPos=t[iMax]
+        sumDiff=_sequentialSum(diff)
+
+        before=x[numpy.maximum(used-1,0)]
+        after=x[numpy.minimum(used+1,len(x)-1)]
+        weight=numpy.where(t>minT,(t-before)/2,0)+numpy.where(t<maxT,(after-t)/2,0)
+        sumWeighted=_sequentialSum(weight*diff)
 
         return { "max" : maxDiff,
                  "maxPos" : maxPos,
@@ -673,11 +753,6 @@ class SpreadsheetData(object):
         x=self.data[time]
         y=self.data[name]
 
-        minVal=1e40
-        maxVal=-1e40
-        sum=0
-        sumWeighted=0
-
         minT,maxT=x[0],x[-1]
 
         if minTime:
@@ -688,22 +763,19 @@ class SpreadsheetData(object):
             if maxTime<maxT:
                 maxT=maxTime
 
-        cnt=0
-
-        for i,t in enumerate(x):
-            if t<minT or t>maxT:
-                continue
-            cnt+=1
-            val=y[i]
-            maxVal=max(val,maxVal)
-            minVal=min(val,minVal)
-            sum+=val
-            weight=0
-            if i>0:
-                weight+=(t-x[i-1])/2
-            if i<(len(x)-1):
-                weight+=(x[i+1]-t)/2
-            sumWeighted+=weight*val
+        used=numpy.nonzero(~((x<minT)|(x>maxT)))[0]
+        cnt=len(used)
+
+        t=x[used]
+        val=y[used]
+        maxVal=_runningExtreme(val,-1e40,numpy.maximum)
+        minVal=_runningExtreme(val,1e40,numpy.minimum)
+        sum=_sequentialSum(val)
+
+        before=x[numpy.maximum(used-1,0)]
+        after=x[numpy.minimum(used+1,len(x)-1)]
+        weight=numpy.where(used>0,(t-before)/2,0)+numpy.where(used<(len(x)-1),(after-t)/2,0)
+        sumWeighted=_sequentialSum(weight*val)
 
         return { "max" : maxVal,
                  "min" : minVal,
@@ -3,6 +3,10 @@
 import re
 from math import *
 import sys
+import hashlib
+from os import path
+from collections import OrderedDict
+from threading import Lock
 
 from PyFoam.Error import error,warning
 from PyFoam.ThirdParty.pyratemp import Template as PyratempTemplate
@@ -10,6 +14,7 @@ from PyFoam.ThirdParty.pyratemp import EvalPseudoSandbox,TemplateRenderError
 from PyFoam.ThirdParty.pyratemp import Renderer as PyratempRenderer
 
 from PyFoam.ThirdParty.six import iteritems,exec_,print_,PY3
+from PyFoam.ThirdParty.six.moves import cPickle as pickle
 
 class RendererWithFilename(PyratempRenderer):
      """Usual renderer but report a filename"""
@@ -261,15 +266,22 @@ class TemplateFileOldFormat(object):
 
 class EvalPseudoSandboxWithMath(EvalPseudoSandbox):
     """Add mathematical functions to the valid functons"""
+
+    # the functions that are added. Only collected once
+    _mathFunctions=None
+
     def __init__(self,allowExec=False):
         EvalPseudoSandbox.__init__(self)
-        import math
-        for o in dir(math):
-            if o[0]!="_":
-                self.register(o,getattr(math,o))
-
-        from PyFoam.ThirdParty.six.moves import builtins as __builtin__
-        self.register("set",__builtin__.set)
+        if EvalPseudoSandboxWithMath._mathFunctions is None:
+            import math
+            from PyFoam.ThirdParty.six.moves import builtins as __builtin__
+            functions={}
+            for o in dir(math):
+                if o[0]!="_":
+                    functions[o]=getattr(math,o)
+            functions["set"]=__builtin__.set
+            EvalPseudoSandboxWithMath._mathFunctions=functions
+        self.eval_allowed_globals.update(self._mathFunctions)
 
         if allowExec:
             del self.eval_allowed_globals["__import__"]
@@ -341,6 +353,108 @@ class EvalPseudoSandboxWithMathWithImport(EvalPseudoSandboxWithMath):
     def __init__(self):
         EvalPseudoSandboxWithMath.__init__(self,allowExec=True)
 
+class CompiledTemplate(object):
+    """The parts of a TemplateFile that only depend on the text of the
+    template and the options of the preprocessor: the preprocessed
+    template, the parse-tree of pyratemp and the compiled expressions"""
+
+    def __init__(self,template,parsetree=None):
+        """:param template: the preprocessed template
+        :param parsetree: the parse-tree. If unset the template has not
+        been parsed yet"""
+        self.template=template
+        self.parsetree=parsetree
+        self.compileCache={}
+
+# compiled templates indexed by templateCacheKey
+_templateCache=OrderedDict()
+_templateCacheLock=Lock()
+
+def templateCacheKey(template,**options):
+    """Key for the template cache
+    :param template: the text of the template
+    :param options: the options that change the preprocessing and the parsing"""
+    if not isinstance(template,bytes):
+        template=template.encode("utf-8")
+    options=repr(sorted((k,repr(v)) for k,v in options.items()))
+    return hashlib.sha1(options.encode("utf-8")+b"\0"+template).hexdigest()
+
+def _persistentCacheFile(key):
+    from PyFoam import configuration as config
+    cacheDir=config().get("Template","persistentCacheDirectory")
+    if cacheDir=="":
+        from PyFoam.FoamInformation import getUserTempDir
+        cacheDir=path.join(getUserTempDir(),"templateCache")
+    return path.join(path.expanduser(cacheDir),key)
+
+def _usePersistentCache():
+    from PyFoam import configuration as config
+    return config().getboolean("Template","persistentCache")
+
+def getCompiledTemplate(key):
+    """Look for a compiled template in the cache. If the persistent
+    cache is switched on in the configuration and the template is not
+    in memory it is looked for in the user temp directory
+    :param key: the key from templateCacheKey
+    :return: the CompiledTemplate or None"""
+    with _templateCacheLock:
+        if key in _templateCache:
+            return _templateCache[key]
+
+    if _usePersistentCache():
+        try:
+            with open(_persistentCacheFile(key),"rb") as fh:
+                template,parsetree=pickle.load(fh)
+        except Exception:
+            # not there or written by another version of Python
+            return None
+        compiled=CompiledTemplate(template,parsetree)
+        _storeCompiledTemplate(key,compiled)
+        return compiled
+
+    return None
+
+def _storeCompiledTemplate(key,compiled):
+    from PyFoam import configuration as config
+    with _templateCacheLock:
+        _templateCache[key]=compiled
+        while len(_templateCache)>config().getint("Template","cacheSize"):
+            _templateCache.popitem(last=False)
+
+def addCompiledTemplate(key,compiled):
+    """Add a parsed template to the cache (and to the persistent cache if
+    that is switched on)
+    :param key: the key from templateCacheKey
+    :param compiled: a CompiledTemplate"""
+    _storeCompiledTemplate(key,compiled)
+
+    if _usePersistentCache():
+        import os
+        fName=_persistentCacheFile(key)
+        try:
+            if not path.isdir(path.dirname(fName)):
+                os.makedirs(path.dirname(fName))
+            # other processes may read the file at the same time
+            tmpName="%s.%d.tmp" % (fName,os.getpid())
+            with open(tmpName,"wb") as fh:
+                pickle.dump((compiled.template,compiled.parsetree),fh,2)
+            os.rename(tmpName,fName)
+        except (OSError,IOError):
+            e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
+            warning("Could not write",fName,"to the template cache:",e)
+
+def clearTemplateCache(persistent=False):
+    """Remove all the compiled templates. The next TemplateFile will
+    preprocess and parse its template again
+    :param persistent: also remove the directory with the stored templates"""
+    with _templateCacheLock:
+        _templateCache.clear()
+    if persistent:
+        from shutil import rmtree
+        cacheDir=path.dirname(_persistentCacheFile("dummy"))
+        if path.isdir(cacheDir):
+            rmtree(cacheDir,ignore_errors=True)
+
 class TemplateFile(TemplateFileOldFormat):
     """Works on template files. Does calculations between $$.
     Lines that start with $$ contain definitions"""
@@ -364,8 +478,12 @@ class TemplateFile(TemplateFileOldFormat):
         :param assignmentLineStart: Start of a line that holds an assignment operation
         :param assignmentDebug: Add a commented line to debug assignments. Prefix used is this parameter
         :param allowExec: allow execution  (and import). This is potentially unsafe
-        :param special: list with strings that leave expression untreated"""
+        :param special: list with strings that leave expression untreated
 
+        Templates with the same text and options are only preprocessed
+        and parsed once (see getCompiledTemplate)"""
+
+        self.encoding=encoding
         self.expressionDelimiter=expressionDelimiter
         self.assignmentLineStart=assignmentLineStart
         self.assignmentDebug=assignmentDebug
@@ -399,20 +517,49 @@ class TemplateFile(TemplateFileOldFormat):
         else:
             sandbox=EvalPseudoSandboxWithMath
 
-        self.ptemplate=PyratempTemplate(string=self.template,
-                                        eval_class=sandbox,
-                                        renderer_class=renderer_class,
-                                        encoding=encoding,
-                                        escape=None
-        )
+        compiled=self.compiled
+
+        def sandboxWithCache():
+            # the expressions of the template are only compiled once
+            evaluator=sandbox()
+            evaluator._compile_cache=compiled.compileCache
+            return evaluator
+
+        if compiled.parsetree is None:
+            self.ptemplate=PyratempTemplate(string=self.template,
+                                            eval_class=sandboxWithCache,
+                                            renderer_class=renderer_class,
+                                            encoding=encoding,
+                                            escape=None
+            )
+            compiled.parsetree=self.ptemplate.parsetree
+            addCompiledTemplate(self.cacheKey,compiled)
+        else:
+            self.ptemplate=PyratempTemplate(parsetree=compiled.parsetree,
+                                            eval_class=sandboxWithCache,
+                                            renderer_class=renderer_class,
+                                            encoding=encoding,
+                                            escape=None
+            )
 
     def buildTemplate(self,template):
-        self.template=PyratempPreprocessor(assignmentLineStart=self.assignmentLineStart,
-                                           expressionDelimiter=self.expressionDelimiter,
-                                           assignmentDebug=self.assignmentDebug,
-                                           specials=self.specials,
-                                           allowExec=self.allowExec
-                                       )(template)
+        self.cacheKey=templateCacheKey(template,
+                                       assignmentLineStart=self.assignmentLineStart,
+                                       expressionDelimiter=self.expressionDelimiter,
+                                       assignmentDebug=self.assignmentDebug,
+                                       specials=self.specials,
+                                       allowExec=self.allowExec,
+                                       encoding=self.encoding)
+        self.compiled=getCompiledTemplate(self.cacheKey)
+        if self.compiled is None:
+            self.compiled=CompiledTemplate(
+                PyratempPreprocessor(assignmentLineStart=self.assignmentLineStart,
+                                     expressionDelimiter=self.expressionDelimiter,
+                                     assignmentDebug=self.assignmentDebug,
+                                     specials=self.specials,
+                                     allowExec=self.allowExec
+                                 )(template))
+        self.template=self.compiled.template
 
     def getString(self,vals):
         """In the template, replaces all the strings between $$
@@ -3,11 +3,12 @@
 
 from PyFoam.Error import error
 from math import ceil
-from copy import deepcopy
 from threading import Lock
+from array import array
 import sys
 
 from PyFoam.ThirdParty.six import print_,iteritems
+from PyFoam.ThirdParty.six.moves import intern
 
 transmissionLock=Lock()
 
@@ -22,6 +23,91 @@ def signedMax(a,b):
     else:
         return max(a,b)
 
+class TimeLineColumn(object):
+    """A growing column of floats. The values are stored in an
+    array('d') with some room to grow so that appending is amortized.
+    When the array has to grow a new one is allocated. Views that were
+    handed out by view() keep the old array and stay valid"""
+
+    def __init__(self,values=None):
+        """:param values: initial values"""
+        if values is None:
+            self.data=array("d")
+        else:
+            self.data=array("d",values)
+        self.n=len(self.data)
+
+    def __len__(self):
+        return self.n
+
+    def append(self,val):
+        """Add a value at the end"""
+        if self.n==len(self.data):
+            # replace the array instead of resizing it (that would fail
+            # if there are views of it)
+            data=self.data[:self.n]
+            data.extend(array("d",[0.])*max(16,self.n))
+            self.data=data
+        self.data[self.n]=val
+        self.n+=1
+
+    def last(self):
+        """The last value"""
+        if self.n==0:
+            raise IndexError("TimeLineColumn is empty")
+        return self.data[self.n-1]
+
+    def setLast(self,val):
+        """Replace the last value"""
+        if self.n==0:
+            raise IndexError("TimeLineColumn is empty")
+        self.data[self.n-1]=val
+
+    def __index(self,i):
+        if i<0:
+            i+=self.n
+        if i<0 or i>=self.n:
+            raise IndexError("TimeLineColumn index out of range")
+        return i
+
+    def __getitem__(self,i):
+        if isinstance(i,slice):
+            return self.data[slice(*i.indices(self.n))]
+        return self.data[self.__index(i)]
+
+    def __setitem__(self,i,val):
+        self.data[self.__index(i)]=val
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self.data[i]
+
+    def __eq__(self,other):
+        try:
+            return len(self)==len(other) and all(a==b for a,b in zip(self,other))
+        except TypeError:
+            return False
+
+    def __ne__(self,other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return "TimeLineColumn(%s)" % self.tolist()
+
+    def tolist(self):
+        """:return: the values as a list"""
+        return self.data[:self.n].tolist()
+
+    def view(self):
+        """:return: a view of the current values that does not copy
+        them. Values appended later are not in the view. Under Python 2
+        this is a copy"""
+        try:
+            return memoryview(self.data)[:self.n]
+        except TypeError:
+            # Python 2: arrays don't support the new buffer protocol
+            return self.data[:self.n]
+
 class TimeLinesRegistry(object):
     """Collects references to TimeLineCollection objects"""
 
@@ -55,24 +141,95 @@ class TimeLinesRegistry(object):
     def prepareForTransfer(self):
         """Makes sure that the data about the timelines is to be transfered via XMLRPC"""
 
+        # only the views are taken while the lock is held. The
+        # conversion to lists happens afterwards
         transmissionLock.acquire()
 
-        lst={}
+        snapshots={}
         for i,p in iteritems(self.lines):
             slaves=[]
             for s in p.slaves:
                 slaves.append(s.lineNr)
 
-            lst[str(i)]={ "nr"    : i,
-                     "times" : deepcopy(p.times),
-                     "values": deepcopy(p.values),
-                     "lastValid" : deepcopy(p.lastValid),
-                     "slaves": slaves }
+            times,values=p.snapshot()
+            snapshots[i]=(times,values,dict(p.lastValid),slaves)
 
         transmissionLock.release()
 
+        lst={}
+        for i,(times,values,lastValid,slaves) in iteritems(snapshots):
+            lst[str(i)]={ "nr"    : i,
+                          "times" : list(times),
+                          "values": dict((k,list(v)) for k,v in iteritems(values)),
+                          "lastValid" : lastValid,
+                          "slaves": slaves }
+
         return lst
 
+    def prepareIncrementalTransfer(self,cursor=None):
+        """Like prepareForTransfer but only the data that changed since an
+        earlier call is transfered. The last time-step that was
+        transfered is transfered again because it may have been
+        incomplete. If a timeline was split since then it is transfered
+        completely
+        :param cursor: the cursor returned by the last call. If unset all
+        the data is transfered
+        :return: tuple with the data and the cursor for the next call. The
+        data can be added to the data of the earlier calls with
+        mergeTransfer. The cursor has for every timeline the number of
+        splits, the number of times and the length of every series. Like
+        the data it can be transfered via XMLRPC"""
+
+        if cursor is None:
+            cursor={}
+
+        transmissionLock.acquire()
+
+        snapshots={}
+        for i,p in iteritems(self.lines):
+            slaves=[]
+            for s in p.slaves:
+                slaves.append(s.lineNr)
+
+            times,values=p.snapshot()
+            snapshots[i]=(p.splits,times,values,dict(p.lastValid),slaves)
+
+        transmissionLock.release()
+
+        lst={}
+        newCursor={}
+        for i,(splits,times,values,lastValid,slaves) in iteritems(snapshots):
+            nr=str(i)
+            start=0
+            written={}
+            if nr in cursor:
+                oldSplits,oldLen,written=cursor[nr]
+                if oldSplits==splits and oldLen<=len(times):
+                    start=max(0,oldLen-1)
+                else:
+                    written={}
+
+            # every series starts where it ended the last time
+            starts={}
+            newValues={}
+            for k,v in iteritems(values):
+                if start>0 and k in written:
+                    starts[k]=max(0,min(written[k]-1,len(v)))
+                else:
+                    starts[k]=0
+                newValues[k]=list(v[starts[k]:])
+
+            lst[nr]={ "nr"    : i,
+                      "start" : start,
+                      "times" : list(times[start:]),
+                      "starts": starts,
+                      "values": newValues,
+                      "lastValid" : lastValid,
+                      "slaves": slaves }
+            newCursor[nr]=[splits,len(times),dict((k,len(v)) for k,v in iteritems(values))]
+
+        return lst,newCursor
+
     def resolveSlaves(self):
         """Looks through all the registered lines and replaces integers with
         the actual registered line"""
@@ -94,6 +251,66 @@ _allLines=TimeLinesRegistry()
 def allLines():
     return _allLines
 
+def mergeTransfer(lineInfo,increment):
+    """Add the data from prepareIncrementalTransfer to the data of the
+    earlier calls
+    :param lineInfo: dictionary in the format of prepareForTransfer. Is
+    modified
+    :param increment: the data from prepareIncrementalTransfer
+    :return: lineInfo"""
+    for nr,inc in iteritems(increment):
+        start=inc["start"]
+        if start==0 or nr not in lineInfo:
+            lineInfo[nr]={ "nr"    : inc["nr"],
+                           "times" : list(inc["times"]),
+                           "values": dict((k,list(v)) for k,v in iteritems(inc["values"])),
+                           "lastValid" : inc["lastValid"],
+                           "slaves": inc["slaves"] }
+            continue
+        old=lineInfo[nr]
+        old["times"][start:]=inc["times"]
+        for k,v in iteritems(inc["values"]):
+            vals=old["values"].setdefault(k,[])
+            vals[inc["starts"][k]:]=v
+        old["lastValid"]=inc["lastValid"]
+        old["slaves"]=inc["slaves"]
+    return lineInfo
+
+# list with the recorded calls to the collections (if recording)
+_journal=None
+
+def startJournal():
+    """Start recording all the changes to the TimeLineCollections of this
+    process. The changes can then be applied to the collections with the
+    same numbers in another process"""
+    global _journal
+    _journal=[]
+
+def stopJournal():
+    """Stop recording the changes
+    :return: list with the recorded changes"""
+    global _journal
+    journal=_journal
+    _journal=None
+    return journal
+
+def replayJournal(journal,registry=None):
+    """Apply recorded changes to the collections. If the collections had the
+    same state as the collections the changes were recorded on then this
+    gives the same result as the original calls
+    :param journal: list with changes recorded between startJournal and stopJournal
+    :param registry: the registry to look up the collections. If unset the global registry"""
+    if registry==None:
+        registry=allLines()
+    for entry in journal:
+        line=registry.get(entry[0])
+        if entry[1]=="time":
+            line.setTime(entry[2])
+        elif entry[1]=="value":
+            line.setValue(entry[2],entry[3])
+        elif entry[1]=="accumulator":
+            line.setAccumulator(entry[2],entry[3])
+
 class TimeLineCollection(object):
 
     possibleAccumulations=["first", "last", "min", "max", "average", "sum","count"]
@@ -120,7 +337,7 @@ class TimeLineCollection(object):
 
         self.cTime=None
         self.addTimeOnDemand=False
-        self.times=[]
+        self.times=TimeLineColumn()
         self.values={}
         self.lastValid={}
         self.setDefault(deflt)
@@ -136,6 +353,9 @@ class TimeLineCollection(object):
 
         self.slaves=[]
 
+        # number of times the old data was changed (for instance by splitting)
+        self.splits=0
+
         self.setSplitting(splitThres=splitThres,
                           splitFun=splitFun,
                           advancedSplit=advancedSplit,
@@ -143,8 +363,10 @@ class TimeLineCollection(object):
 
         self.lineNr=None
         if preloadData:
-            self.times=preloadData["times"]
-            self.values=preloadData["values"]
+            self.times=TimeLineColumn(preloadData["times"])
+            self.values={}
+            for k,v in iteritems(preloadData["values"]):
+                self.values[k]=TimeLineColumn(v)
             self.slaves=preloadData["slaves"]
             self.lineNr=int(preloadData["nr"])
             if "lastValid" in preloadData:
@@ -156,6 +378,18 @@ class TimeLineCollection(object):
             registry=allLines()
         self.lineNr=registry.add(self,self.lineNr)
 
+    def clearData(self):
+        """Remove all the data but keep the settings"""
+        self.cTime=None
+        self.addTimeOnDemand=False
+        self.times=TimeLineColumn()
+        self.values={}
+        self.lastValid={}
+        self.occured={}
+        self.splits+=1
+        if self.advancedSplit:
+            self.splitLevels=[]
+
     def resetValid(self,val=False):
         """Helper function that resets the information whether the last entry is valid"""
         self.lastValid={}
@@ -185,6 +419,8 @@ class TimeLineCollection(object):
         :param accu: Name of the accumulator"""
         if not (accu in TimeLineCollection.possibleAccumulations):
             error("Value",accu,"not in list of possible values:",TimeLineCollection.possibleAccumulations,"When setting for",name)
+        if _journal is not None:
+            _journal.append((self.lineNr,"accumulator",intern(name),accu))
         self.accumulations[name]=accu
 
     def setSplitting(self,splitThres=None,splitFun=None,advancedSplit=False,noEmptyTime=True):
@@ -225,6 +461,11 @@ class TimeLineCollection(object):
         :param time: the new current time
         :param noLock: do not acquire the lock that ensures consistent data transmission"""
 
+        if _journal is not None and not noLock:
+            # calls from the master are not recorded. They are repeated when
+            # the call to the master is replayed
+            _journal.append((self.lineNr,"time",time))
+
         if not noLock:
             transmissionLock.acquire()
 
@@ -245,19 +486,23 @@ class TimeLineCollection(object):
                 self.times.append(self.cTime)
                 for v in list(self.values.values()):
                     if len(v)>0 and self.extendCopy:
-                        val=v[-1]
+                        val=v.last()
                     else:
                         val=self.defaultValue
                     v.append(val)
             else:
                 if len(self.times)>0:
-                    self.times[-1]=self.cTime
+                    self.times.setLast(self.cTime)
 
             self.resetValid()
 
             if self.thres and append:
               try:
                 if len(self.times)>=self.thres:
+                    # the splitting works on lists
+                    self.times=self.times.tolist()
+                    for k in self.values:
+                        self.values[k]=self.values[k].tolist()
                     if self.advancedSplit:
                         # Clumsy algorithm where the maximum and the minimum of a
                         # data-window are preserved in that order
@@ -322,6 +567,10 @@ class TimeLineCollection(object):
                         self.times=self.split(self.times,min)
                         for k in list(self.values.keys()):
                             self.values[k]=self.split(self.values[k],self.fun)
+                    self.times=TimeLineColumn(self.times)
+                    self.splits+=1
+                    for k in self.values:
+                        self.values[k]=TimeLineColumn(self.values[k])
               except Exception:
                    e = sys.exc_info()[1] # Needed because python 2.5 does not support 'as e'
                    err, detail, tb = sys.exc_info()
@@ -341,7 +590,7 @@ class TimeLineCollection(object):
         :param array: the field to split
         :param func: The function to use for joining two points"""
 
-        newLen=len(array)/2
+        newLen=len(array)//2
         newArray=[0.]*newLen
 
         for i in range(newLen):
@@ -380,9 +629,20 @@ class TimeLineCollection(object):
                     nr=int(name[-2:])
                     nm=name[:name.find("_slave")]
                     return self.slaves[nr].getValues(nm)
-            self.values[name]=self.nr()*[self.defaultValue]
+            self.values[name]=TimeLineColumn(self.nr()*[self.defaultValue])
         return self.values[name]
 
+    def snapshot(self):
+        """Get the current data without copying it. Later time-steps don't
+        change the snapshot. Only the last entry may still change while its
+        time-step is accumulated
+        :return: tuple with a view of the times and a dictionary with views
+        of the values"""
+        values={}
+        for k,v in iteritems(self.values):
+            values[k]=v.view()
+        return self.times.view(),values
+
     def setValue(self,name,value):
         """Sets the value of the last element in a timeline
         :param name: name of the timeline
@@ -390,12 +650,16 @@ class TimeLineCollection(object):
 
         val=float(value)
 
+        if _journal is not None:
+            # the same names are transmitted only once
+            _journal.append((self.lineNr,"value",intern(name),val))
+
         transmissionLock.acquire()
         if self.addTimeOnDemand:
             self.times.append(self.cTime)
             for v in list(self.values.values()):
                 if len(v)>0 and self.extendCopy:
-                    val=v[-1]
+                    val=v.last()
                 else:
                     val=self.defaultValue
                 v.append(val)
@@ -411,7 +675,7 @@ class TimeLineCollection(object):
                     newValue=val
                 self.occured[name]=1
             else:
-                oldValue=data[-1]
+                oldValue=data.last()
                 n=self.occured[name]
                 self.occured[name]+=1
                 if name in self.accumulations:
@@ -433,7 +697,7 @@ class TimeLineCollection(object):
                 else:
                     error("Unimplemented accumulator",accu,"for",name)
 
-            data[-1]=newValue
+            data.setLast(newValue)
 
         self.lastValid[name]=True
 
@@ -451,11 +715,12 @@ class TimeLineCollection(object):
             import numpypy
             import numpy
 
-        names=["time"]+list(self.values.keys())
+        times,values=self.snapshot()
+        names=["time"]+list(values.keys())
         data=[]
-        data.append(self.times)
-        for k in list(self.values.keys()):
-            data.append(self.values[k])
+        data.append(numpy.asarray(times))
+        for k in list(values.keys()):
+            data.append(numpy.asarray(values[k]))
 
         return SpreadsheetData(names=names,data=numpy.asarray(data).transpose())
 
@@ -467,7 +732,7 @@ class TimeLineCollection(object):
         for n,d in iteritems(self.values):
             if len(d)>0:
                 if self.lastValid[n] or len(d)<2:
-                    result[n]=d[-1]
+                    result[n]=d.last()
                 else:
                     result[n]=d[-2]
 
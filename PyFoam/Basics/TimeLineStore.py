@@ -0,0 +1,120 @@
+#  ICE Revision: $Id$
+"""File in which the data of the timelines is stored during a run
+
+Writing the complete data every time would get slower the longer the
+run takes. Therefor only the data that changed since the last write is
+appended to the file as a pickled record. The file starts with a
+header. The other records are either the changes of the timelines (in
+the format of TimeLinesRegistry.prepareIncrementalTransfer) or the
+information about the plots. Reading the file replays these records.
+If the last record is incomplete (because the file is read while it is
+written) it is ignored"""
+
+from shutil import move
+
+from PyFoam.ThirdParty.six.moves import cPickle as pickle
+
+from PyFoam.Basics.TimeLineCollection import mergeTransfer
+from PyFoam.Error import error
+
+storeMagic="PyFoamTimeLineStore"
+storeVersion=1
+
+def isTimeLineStore(fName):
+    """Check whether a file is a timeline store (and not a pickle of the
+    complete data)
+    :param fName: name of the file"""
+    with open(fName,"rb") as fh:
+        try:
+            return _isHeader(pickle.Unpickler(fh).load())
+        except Exception:
+            return False
+
+def _isHeader(data):
+    return type(data)==tuple and len(data)==2 and data[0]==storeMagic
+
+class TimeLineStoreWriter(object):
+    """Appends the changes of the timelines and the plots to a file"""
+
+    def __init__(self,fName):
+        """:param fName: name of the file. An existing file is overwritten"""
+        self.fName=fName
+        self.cursor=None
+        self.plotInfo=None
+
+        with open(self.fName,"wb") as fh:
+            pickle.Pickler(fh,2).dump((storeMagic,storeVersion))
+
+    def update(self,lines,plots=None):
+        """Append the changes since the last call to the file
+        :param lines: a TimeLinesRegistry
+        :param plots: a PlotLinesRegistry. If the plots didn't change they
+        are not written"""
+        increment,self.cursor=lines.prepareIncrementalTransfer(self.cursor)
+        plotInfo=None
+        if plots is not None:
+            plotInfo=plots.prepareForTransfer()
+            if plotInfo==self.plotInfo:
+                plotInfo=None
+
+        with open(self.fName,"ab") as fh:
+            pick=pickle.Pickler(fh,2)
+            if plotInfo is not None:
+                pick.dump(("plots",plotInfo))
+                self.plotInfo=plotInfo
+            pick.dump(("lines",increment))
+
+def _readRecords(unpick):
+    """Read the records after the header
+    :param unpick: Unpickler that already read the header
+    :return: tuple with the data of the lines and of the plots"""
+    lineInfo={}
+    plotInfo={}
+    while True:
+        try:
+            kind,data=unpick.load()
+        except EOFError:
+            break
+        except (pickle.UnpicklingError,ValueError,TypeError,AttributeError,IndexError):
+            # the last record is still being written
+            break
+        if kind=="lines":
+            mergeTransfer(lineInfo,data)
+        elif kind=="plots":
+            plotInfo=data
+    return lineInfo,plotInfo
+
+def readPlotData(fName):
+    """Read the data for the plots from a timeline store or from a file
+    with the pickled data (the old format)
+    :param fName: name of the file
+    :return: tuple with the data of the lines and of the plots (in the
+    format of prepareForTransfer)"""
+    with open(fName,"rb") as fh:
+        unpick=pickle.Unpickler(fh)
+        first=unpick.load()
+        if _isHeader(first):
+            if first[1]>storeVersion:
+                error(fName,"was written with version",first[1],
+                      "of the format. Only versions up to",storeVersion,"can be read")
+            return _readRecords(unpick)
+        else:
+            return first,unpick.load()
+
+def convertToPickle(fName,pickleName):
+    """Write the data of a timeline store in the old format (the
+    pickled data of the lines and then of the plots)
+    :param fName: the timeline store
+    :param pickleName: name of the pickle-file"""
+    lineInfo,plotInfo=readPlotData(fName)
+    writePickle(pickleName,lineInfo,plotInfo)
+
+def writePickle(pickleName,lineInfo,plotInfo):
+    """Write the data of the lines and the plots in the old format"""
+    with open(pickleName+".tmp","wb") as fh:
+        pick=pickle.Pickler(fh)
+        pick.dump(lineInfo)
+        pick.dump(plotInfo)
+    move(pickleName+".tmp",pickleName)
+
+# Should work with Python3 and Python2
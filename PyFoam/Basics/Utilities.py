@@ -371,4 +371,25 @@ def find(pattern,path,directoriesToo=True):
     """Calls the method of the same name from the Utilites class"""
     return Utilities().find(pattern,path,directoriesToo=directoriesToo)
 
+def processFiles(func,names,jobs=1):
+    """Apply a function to a number of files. If more than one job is
+    specified then the files are processed in parallel by separate
+    processes
+    :param func: function that gets the name of the file as the only
+    argument. If jobs>1 it must be picklable (a function defined on the
+    module level or a functools.partial of it)
+    :param names: list with the file names
+    :param jobs: the number of processes to use
+    :return: list with the results of the function"""
+    if jobs>1 and len(names)>1:
+        from multiprocessing import Pool
+        pool=Pool(min(jobs,len(names)))
+        try:
+            return pool.map(func,names)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        return [func(n) for n in names]
+
 # Should work with Python3 and Python2
@@ -1,7 +1,7 @@
 #  ICE Revision: $Id$
 """Common stuff for classes that use analyzers"""
 
-from os import path,mkdir
+from os import path,mkdir,remove
 from shutil import move,rmtree
 
 from PyFoam.Basics.PlotTimelinesFactory import createPlotTimelines,createPlotTimelinesDirect
@@ -18,6 +18,7 @@ from PyFoam.ThirdParty.six import print_
 
 from PyFoam.Basics.GeneralPlotTimelines import allPlots
 from PyFoam.Basics.TimeLineCollection import allLines
+from PyFoam.Basics.TimeLineStore import TimeLineStoreWriter,writePickle
 
 from threading import Lock
 
@@ -53,6 +54,7 @@ class AnalyzedCommon(object):
         self.doPickling=doPickling
         if self.doPickling:
             self.pickleLock=Lock()
+            self.timeLineStore=None
 
         self.reset()
 
@@ -66,7 +68,7 @@ class AnalyzedCommon(object):
         self.end=None
         self.raiseit=False
         self.writeFiles=False
-        self.splitThres=2048
+        self.splitThres=None
         self.plottingImplementation="dummy"
         self.gnuplotTerminal=None
 
@@ -212,7 +214,7 @@ class AnalyzedCommon(object):
     def createPlots(self,
                     persist=None,
                     raiseit=False,
-                    splitThres=2048,
+                    splitThres=None,
                     plotLinear=True,
                     plotCont=True,
                     plotBound=True,
@@ -371,7 +373,7 @@ class AnalyzedCommon(object):
                              end=None,
                              raiseit=False,
                              writeFiles=False,
-                             splitThres=2048,
+                             splitThres=None,
                              gnuplotTerminal=None,
                              plottingImplementation="dummy"):
         plots={}
@@ -461,10 +463,13 @@ class AnalyzedCommon(object):
 
         return plots
 
-    def picklePlots(self,wait=False):
+    def picklePlots(self,wait=False,final=False):
         """Writes the necessary information for the plots permanently to disc,
-        so that it doesn't have to be generated again
-        :param wait: wait for the lock to be allowed to pickle"""
+        so that it doesn't have to be generated again. During the run only
+        the changes are appended to the file timelineStore. At the end the
+        complete data is pickled to pickledPlots
+        :param wait: wait for the lock to be allowed to pickle
+        :param final: the run is finished. Write pickledPlots"""
 
         #        print "Putting some pickles in the jar"
 
@@ -475,11 +480,20 @@ class AnalyzedCommon(object):
             if not gotIt:
                 return
 
-            pickleFile=path.join(self.logDir,"pickledPlots")
-            pick=pickle.Pickler(open(pickleFile+".tmp","wb"))
-            pick.dump(lines.prepareForTransfer())
-            pick.dump(plots.prepareForTransfer())
-            move(pickleFile+".tmp",pickleFile)
+            if self.timeLineStore is None:
+                # the pickledPlots of an earlier run in the same directory
+                # would be read instead of the new data
+                oldPlots=path.join(self.logDir,"pickledPlots")
+                if path.exists(oldPlots):
+                    remove(oldPlots)
+                self.timeLineStore=TimeLineStoreWriter(path.join(self.logDir,
+                                                                 "timelineStore"))
+            self.timeLineStore.update(lines,plots)
+
+            if final:
+                writePickle(path.join(self.logDir,"pickledPlots"),
+                            lines.prepareForTransfer(),
+                            plots.prepareForTransfer())
 
             if hasattr(self,"data"):
                 pickleFile=path.join(self.logDir,"pickledUnfinishedData")
@@ -298,118 +298,138 @@ class BasicRunner(object):
         addLinesToWarning=0
         collectWarnings=True
 
+        # the texts are collected in lists and joined when they are needed
+        self.errorLines=None
+        self.warningLines=None
+
+        flushInterval=config().getfloat("Execution","logFlushInterval",default=1.)
+        lastFlush=time()
+        handlingTime=0.
+
+        def flushLog():
+            # the solver is quiet. Make the log complete for the readers
+            if not self.noLog:
+                fh.flush()
+
         while self.run.check():
             try:
-                self.run.read()
-                if not self.run.check():
+                lines=self.run.readLines(idle=flushLog)
+                if len(lines)==0:
                     break
+                startHandling=time()
+
+                for line in lines:
+                    if self.errorLines is not None:
+                        self.errorLines.append(line)
+
+                    if addLinesToWarning>0:
+                        self.warningLines.append(line)
+                        addLinesToWarning-=1
+                        totalWarningLines+=1
+                        if totalWarningLines>500:
+                            collectWarnings=False
+                            addLinesToWarning=0
+                            self.warningLines.append("No more warnings added because limit of 500 lines exceeded")
+                    self.data["lines"]+=1
+
+                    tmp=check.getTime(line)
+                    if check.controlDictRead(line):
+                        if self.writeRequested:
+                            duration=config().getfloat("Execution","controlDictRestoreWait",default=30.)
+                            warning("Preparing to reset controlDict to old glory in",duration,"seconds")
+                            Timer(duration,
+                                  restoreControlDict,
+                                  args=[self.controlDict,self]).start()
+                            self.writeRequested=False
+
+                    if tmp!=None:
+                        self.data["time"]=tmp
+                        self.nowTime=tmp
+                        self.writeTheState("Running",always=False)
+                        self.writeNowTime()
+                        self.lastTimeStepSeen=time()
+                        if self.createTime==None:
+                            # necessary because interFoam reports no creation time
+                            self.createTime=tmp
+                        try:
+                            self.data["stepNr"]+=1
+                        except KeyError:
+                            self.data["stepNr"]=1  # =1L
+
+                        self.data["lasttimesteptime"]=asctime()
+                        self.joinTexts()
+
+                    tmp=check.getCreateTime(line)
+                    self.endSeen=check.endSeen
+                    if tmp!=None:
+                        self.createTime=tmp
 
-                line=self.run.getLine()
-
-                if "errorText" in self.data:
-                    self.data["errorText"]+=line+"\n"
-
-                if addLinesToWarning>0:
-                    self.data["warningText"]+=line+"\n"
-                    addLinesToWarning-=1
-                    totalWarningLines+=1
-                    if totalWarningLines>500:
-                        collectWarnings=False
-                        addLinesToWarning=0
-                        self.data["warningText"]+="No more warnings added because limit of 500 lines exceeded"
-                self.data["lines"]+=1
-                self.lastLogLineSeen=time()
+                    if not self.silent:
+                        try:
+                            print_(line)
+                        except IOError:
+                            e = sys.exc_info()[1] # compatible with 2.x and 3.x
+                            if e.errno!=32:
+                                raise e
+                            else:
+                                # Pipe was broken
+                                self.run.interrupt()
+
+                    if check.isSpecial(line):
+                        if line.find("FOAM FATAL ERROR")>=0 or line.find("FOAM FATAL IO ERROR")>=0:
+                            self.fatalError=True
+                            if "time" in self.data:
+                                where="at time "+str(self.data["time"])+"\n"
+                            else:
+                                where="before time started\n"
+                            self.errorLines=["PyFoam found a Fatal Error "+where,
+                                             line]
+
+                        if line.find("Foam::sigFpe::sigFpeHandler")>=0:
+                            self.fatalFPE=True
+                        if line.find("Foam::error::printStack")>=0:
+                            self.fatalStackdump=True
+
+                        if line.find("FOAM Warning")>=0:
+                            self.warnings+=1
+                            try:
+                                self.data["warnings"]+=1
+                            except KeyError:
+                                self.data["warnings"]=1
+                            if collectWarnings:
+                                addLinesToWarning=20
+                                if self.warningLines is None:
+                                    self.warningLines=[]
+                                else:
+                                    self.warningLines.append("-"*40)
+                                if "time" in self.data:
+                                    where="at time "+str(self.data["time"])+"\n"
+                                else:
+                                    where="before time started\n"
+                                self.warningLines+=["Warning found by PyFoam on line "+
+                                                    str(self.data["lines"])+" "+where,
+                                                    line]
+
+                    if self.fatalError and line!="":
+                        foamLogger().error(line)
+
+                    if self.server!=None:
+                        self.server._insertLine(line)
+
+                    self.lineHandle(line)
+
+                    if not self.noLog:
+                        fh.write(line+"\n")
+                    elif self.logTail:
+                        self.appendTailLine(line)
+
+                now=time()
+                handlingTime+=now-startHandling
+                self.lastLogLineSeen=now
                 self.writeLastSeen()
-
-                tmp=check.getTime(line)
-                if check.controlDictRead(line):
-                    if self.writeRequested:
-                        duration=config().getfloat("Execution","controlDictRestoreWait",default=30.)
-                        warning("Preparing to reset controlDict to old glory in",duration,"seconds")
-                        Timer(duration,
-                              restoreControlDict,
-                              args=[self.controlDict,self]).start()
-                        self.writeRequested=False
-
-                if tmp!=None:
-                    self.data["time"]=tmp
-                    self.nowTime=tmp
-                    self.writeTheState("Running",always=False)
-                    self.writeNowTime()
-                    self.lastTimeStepSeen=time()
-                    if self.createTime==None:
-                        # necessary because interFoam reports no creation time
-                        self.createTime=tmp
-                    try:
-                        self.data["stepNr"]+=1
-                    except KeyError:
-                        self.data["stepNr"]=1  # =1L
-
-                    self.data["lasttimesteptime"]=asctime()
-
-                tmp=check.getCreateTime(line)
-                self.endSeen=check.endSeen
-                if tmp!=None:
-                    self.createTime=tmp
-
-                if not self.silent:
-                    try:
-                        print_(line)
-                    except IOError:
-                        e = sys.exc_info()[1] # compatible with 2.x and 3.x
-                        if e.errno!=32:
-                            raise e
-                        else:
-                            # Pipe was broken
-                            self.run.interrupt()
-
-                if line.find("FOAM FATAL ERROR")>=0 or line.find("FOAM FATAL IO ERROR")>=0:
-                    self.fatalError=True
-                    self.data["errorText"]="PyFoam found a Fatal Error "
-                    if "time" in self.data:
-                        self.data["errorText"]+="at time "+str(self.data["time"])+"\n"
-                    else:
-                        self.data["errorText"]+="before time started\n"
-                    self.data["errorText"]+="\n"+line+"\n"
-
-                if line.find("Foam::sigFpe::sigFpeHandler")>=0:
-                    self.fatalFPE=True
-                if line.find("Foam::error::printStack")>=0:
-                    self.fatalStackdump=True
-
-                if self.fatalError and line!="":
-                    foamLogger().error(line)
-
-                if line.find("FOAM Warning")>=0:
-                    self.warnings+=1
-                    try:
-                        self.data["warnings"]+=1
-                    except KeyError:
-                        self.data["warnings"]=1
-                    if collectWarnings:
-                        addLinesToWarning=20
-                        if not "warningText" in self.data:
-                            self.data["warningText"]=""
-                        else:
-                            self.data["warningText"]+=("-"*40)+"\n"
-                        self.data["warningText"]+="Warning found by PyFoam on line "
-                        self.data["warningText"]+=str(self.data["lines"])+" "
-                        if "time" in self.data:
-                            self.data["warningText"]+="at time "+str(self.data["time"])+"\n"
-                        else:
-                            self.data["warningText"]+="before time started\n"
-                        self.data["warningText"]+="\n"+line+"\n"
-
-                if self.server!=None:
-                    self.server._insertLine(line)
-
-                self.lineHandle(line)
-
-                if not self.noLog:
-                    fh.write(line+"\n")
+                if not self.noLog and now-lastFlush>=flushInterval:
                     fh.flush()
-                elif self.logTail:
-                    self.appendTailLine(line)
+                    lastFlush=now
 
             except KeyboardInterrupt:
                 e = sys.exc_info()[1] # compatible with 2.x and 3.x
@@ -419,6 +439,8 @@ class BasicRunner(object):
                 self.data["keyboardInterrupt"]=True
                 interrupted=True
 
+        self.joinTexts()
+
         if not "keyboardInterrupt" in self.data:
             self.data["keyboardInterrupt"]=self.run.keyboardInterupted
 
@@ -429,6 +451,10 @@ class BasicRunner(object):
         self.data["cpuUserTime"]=self.run.cpuUserTime()
         self.data["cpuSystemTime"]=self.run.cpuSystemTime()
         self.data["wallTime"]=self.run.wallTime()
+        if self.data["wallTime"]>0:
+            self.data["linesPerSecond"]=self.data["lines"]/self.data["wallTime"]
+        if handlingTime>0:
+            self.data["linesHandledPerSecond"]=self.data["lines"]/handlingTime
         self.data["usedMemory"]=self.run.usedMemory()
         self.data["endtime"]=asctime()
 
@@ -462,6 +488,14 @@ class BasicRunner(object):
 
         return self.data
 
+    def joinTexts(self):
+        """Update the error and the warning text in the data from the
+        collected lines"""
+        if self.errorLines is not None:
+            self.data["errorText"]="\n".join(self.errorLines)+"\n"
+        if self.warningLines is not None:
+            self.data["warningText"]="\n".join(self.warningLines)+"\n"
+
     def writeToStateFile(self,fName,message):
         """Write a message to a state file"""
         if self.writeState:
@@ -568,6 +602,7 @@ class BasicRunnerCheck(object):
         #        self.timeExpr=re.compile("^Time = (%f%)$".replace("%f%",self.floatRegExp))
         self.timeExpr=config().getRegexp("SolverOutput","timeregexp")
         self.createExpr=re.compile("^Create mesh for time = (%f%)$".replace("%f%",self.floatRegExp))
+        self.specialExpr=re.compile("FOAM FATAL|FOAM Warning|Foam::sigFpe::sigFpeHandler|Foam::error::printStack")
         self.endSeen=False
 
     def getTime(self,line):
@@ -593,6 +628,11 @@ class BasicRunnerCheck(object):
         else:
             return None
 
+    def isSpecial(self,line):
+        """Could this line be an error or a warning? One search is
+        cheaper than searching for all the possible messages"""
+        return self.specialExpr.search(line) is not None
+
     def controlDictRead(self,line):
         """Was the controlDict reread?"""
         phrases=["Reading object controlDict from file",
@@ -22,13 +22,16 @@ class BasicWatcher(object):
                  silent=False,
                  tailLength=1000,
                  sleep=0.1,
-                 follow=True):
+                 follow=True,
+                 jobs=1):
         """:param filename: name of the logfile to watch
         :param silent: if True no output is sent to stdout
         :param tailLength: number of bytes at the end of the fail that should be output.
         :param follow: if the end of the file is reached wait for further input
         Because data is output on a per-line-basis
-        :param sleep: interval to sleep if no line is returned"""
+        :param sleep: interval to sleep if no line is returned
+        :param jobs: if the file is not followed analyze it in chunks with
+        that many processes"""
 
         if type(filenames) is list:
             meshTimes=[]
@@ -57,6 +60,7 @@ class BasicWatcher(object):
         self.tail=tailLength
         self.sleep=sleep
         self.follow=follow
+        self.jobs=jobs
         self.isTailing=False
 
         if not path.exists(self.filename):
@@ -88,6 +92,12 @@ class BasicWatcher(object):
     def start(self):
         """Reads the file and does the processing"""
 
+        if self.jobs>1 and not self.follow and len(self.nextFiles)==0:
+            from PyFoam.LogAnalysis.ChunkedLogAnalysis import canAnalyzeChunked
+            if canAnalyzeChunked(self.analyzer):
+                self.startChunked()
+                return
+
         fh,currSize=self.changeFile(self.filename)
         switchTime=None if len(self.changeTimes)==0 else self.changeTimes[0]
         self.changeTimes=self.changeTimes[1:]
@@ -137,6 +147,30 @@ class BasicWatcher(object):
 
         fh.close()
 
+    def startChunked(self):
+        """Analyzes the complete file in chunks with multiple processes.
+        The file is not output"""
+        from PyFoam.LogAnalysis.ChunkedLogAnalysis import analyzeChunked
+
+        for f in self._changeFileHooks:
+            f()
+
+        self.startHandle()
+
+        try:
+            analyzeChunked(self.analyzer,
+                           self.filename,
+                           self.jobs,
+                           lineHandle=self.lineHandle)
+        except KeyboardInterrupt:
+            print_("Watcher: Keyboard interrupt")
+
+        self.isTailing=True
+        self.timeHandle()
+        self.tailingHandle()
+
+        self.stopHandle()
+
     def startHandle(self):
         """to be called before the program is started"""
         pass
@@ -224,8 +224,11 @@ class FoamThread(Thread):
             # to give a chance to read the remaining output
             if self.hasSomethingToSay:
                 sleep(2.)
-            while self.reader.read(self.output):
-                print_("Unused output:",self.reader.line)
+            lines=self.reader.readLines(self.output)
+            while len(lines)>0:
+                for l in lines:
+                    print_("Unused output:",l)
+                lines=self.reader.readLines(self.output)
         except OSError:
             e = sys.exc_info()[1] # compatible with 2.x and 3.x
             print_("Exeption caught:",e)
@@ -261,6 +264,18 @@ class FoamThread(Thread):
         self.line=self.reader.line
         self.lineLock.release()
 
+    def readLines(self,idle=None):
+        """read all the lines of the output that are available. Reading them
+        in blocks is faster than reading them one by one
+        :param idle: function that is called before waiting for more output
+        :return: list with the lines. Empty if there is no more output"""
+        lines=self.reader.readLines(self.output,idle=idle)
+        self.setState(len(lines)>0)
+        self.lineLock.acquire()
+        self.line=self.reader.line
+        self.lineLock.release()
+        return lines
+
     def getLine(self):
         """gets the last line from the output"""
         self.lineLock.acquire()
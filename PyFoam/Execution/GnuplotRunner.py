@@ -18,7 +18,7 @@ class GnuplotCommon(StepAnalyzedCommon):
                  fname,
                  smallestFreq=0.,
                  persist=None,
-                 splitThres=2048,
+                 splitThres=None,
                  plotLinear=True,
                  plotCont=True,
                  plotBound=True,
@@ -239,15 +239,19 @@ class GnuplotWatcher(GnuplotCommon,BasicWatcher):
                  writePickled=True,
                  gnuplotTerminal=None,
                  plottingImplementation=None,
-                 solverNotRunning=False):
+                 solverNotRunning=False,
+                 jobs=1):
         """:param smallestFreq: smallest Frequency of output
-        :param persist: Gnuplot window persistst after run"""
+        :param persist: Gnuplot window persistst after run
+        :param jobs: number of processes that analyze the file if the
+        solver is not running anymore"""
         BasicWatcher.__init__(self,
                               logfile,
                               silent=(silent or progress),
                               tailLength=tailLength,
                               sleep=sleep,
-                              follow=not solverNotRunning)
+                              follow=not solverNotRunning,
+                              jobs=jobs)
         GnuplotCommon.__init__(self,
                                logfile,
                                smallestFreq=smallestFreq,
@@ -63,4 +63,4 @@ class StepAnalyzedCommon(AnalyzedCommon):
 
     def stopHandle(self):
         if self.doPickling:
-            self.picklePlots(wait=True)
+            self.picklePlots(wait=True,final=True)
@@ -19,6 +19,7 @@ _defaults={
         "nrServerPorts"    : "100",
         "portWait"         : "1.",
         "socketTimeout"    : "1.",
+        "scanJobs"         : "256",
         "zeroconfTimeout"  : "5.",
         "socketRetries"    : "10",
         "startServerThread": "True",
@@ -78,6 +79,7 @@ _defaults={
     },
     "Execution":{
         "controlDictRestoreWait":"60.",
+        "logFlushInterval":"1.",
         "DebuggerCall":"gdb -ex run --args {exe} {args}",
         "DebuggerCall_Darwin":"lldb -o run -k bt -- {exe} {args}"
     },
@@ -96,6 +98,8 @@ _defaults={
     "CommandOptionDefaults":{
         "sortListCases":"mtime",
         "deadThresholdListCases":3601,
+        "jobsListCases":8,
+        "cacheListCases":True,
     },
     "Plotting":{
         "preferredImplementation":"gnuplot",
@@ -113,6 +117,7 @@ _defaults={
         "plotcourant" : False,
         "plotexecution" : False,
         "plotdeltat" : False,
+        "maxPlotPoints" : 4000,
     },
     "Curses": {
         "headerTextColor": "red",
@@ -128,6 +133,7 @@ _defaults={
     "SolverOutput": {
         "timeRegExp": "^(Time =|Iteration:) (.+)$",
         "stripSpaces":False,
+        "prefilterLines":True,
     },
     "Clearing": {
         "additionalPatterns":"[]",
@@ -191,10 +197,17 @@ Full command: |-commandLine-|""",
         "tolerantRender"                : False,
         "expressionDelimiter"           : "|-",
         "assignmentLineStart"           : "$$",
+        "cacheSize"                     : 1000,
+        "persistentCache"               : False,
+        "persistentCacheDirectory"      : "",
     },
     "SolverBase" : {
         # entries of form solvername: list of base-solvers
     },
+    "RunDatabase" : {
+        # layout of newly created databases: wide or long
+        "layout"                        : "wide",
+    },
     "Blink1" : {
         "baseurl" : "http://localhost:8934/blink1",
         "allowedTimeout" : 1,
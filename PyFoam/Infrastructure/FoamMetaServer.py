@@ -9,13 +9,12 @@ if PY3:
     from xmlrpc.client import ServerProxy
 else:
     from xmlrpclib import Fault,ServerProxy
-    from PyFoam.ThirdParty.IPy import IP
 
 import socket
 from threading import Lock,Thread,Timer
 
 from PyFoam.Infrastructure.Logging import foamLogger
-from PyFoam.Infrastructure.NetworkHelpers import checkFoamServers
+from PyFoam.Infrastructure.NetworkHelpers import scanFoamServers,subnetHosts,hostNames
 from PyFoam import configuration as config
 from PyFoam.ThirdParty.six import print_,binary_type
 
@@ -361,39 +360,44 @@ class MetaCollector(Thread):
         if self.additional!=None:
             addreses=self.additional.split(',')+addreses
 
+        hosts=[]
+        seen=set()
         for a in addreses:
             foamLogger("server").info("Collecting in subnet "+a)
-            for host in IP(a):
-                try:
-                    name,alias,rest =socket.gethostbyaddr(str(host))
-                except socket.herror as reason:
-                    # no name for the host
-                    name="unknown"
-
-                foamLogger("server").debug("Collector Checking:"+str(host)+" "+name)
-
-                result=None
-                try:
-                    result=checkFoamServers(str(host),port,length)
-                except:
-                    foamLogger("server").error("Unknown exception "+str(sys.exc_info()[0])+" while checking for new servers"+str((str(host),port,length)))
-                    foamLogger("server").error("Reason:"+str(sys.exc_info()[1]))
-                    foamLogger("server").error("Trace:"+str(extract_tb(sys.exc_info()[2])))
-
-                if result!=None:
-                    foamLogger("server").debug("Collector Found "+str(result)+" for "+name)
-                    for p in result:
-                        try:
-                            server=getServerProxy(str(host),p)
-                            ip=server.ip()
-                            pid=server.pid()
-                            self.parent._registerServer(ip,pid,p)
-                        except:
-                            foamLogger("server").error("Unknown exception "+str(sys.exc_info()[0])+" while registering "+name)
-                            foamLogger("server").error("Reason:"+str(sys.exc_info()[1]))
-                            foamLogger("server").error("Trace:"+str(extract_tb(sys.exc_info()[2])))
-                else:
-                    foamLogger("server").debug("Collector Found "+str(result)+" for "+name)
+            for h in subnetHosts(a):
+                if h not in seen:
+                    seen.add(h)
+                    hosts.append(h)
+
+        # all hosts are checked at the same time
+        names=hostNames(hosts)
+        try:
+            results=scanFoamServers(hosts,port,length)
+        except:
+            foamLogger("server").error("Unknown exception "+str(sys.exc_info()[0])+" while checking for new servers"+str((port,length)))
+            foamLogger("server").error("Reason:"+str(sys.exc_info()[1]))
+            foamLogger("server").error("Trace:"+str(extract_tb(sys.exc_info()[2])))
+            results={}
+
+        for host in hosts:
+            name=names[host]
+            result=results.get(host,None)
+            foamLogger("server").debug("Collector Checking:"+host+" "+name)
+
+            if result!=None:
+                foamLogger("server").debug("Collector Found "+str(result)+" for "+name)
+                for p in result:
+                    try:
+                        server=getServerProxy(host,p)
+                        ip=server.ip()
+                        pid=server.pid()
+                        self.parent._registerServer(ip,pid,p)
+                    except:
+                        foamLogger("server").error("Unknown exception "+str(sys.exc_info()[0])+" while registering "+name)
+                        foamLogger("server").error("Reason:"+str(sys.exc_info()[1]))
+                        foamLogger("server").error("Trace:"+str(extract_tb(sys.exc_info()[2])))
+            else:
+                foamLogger("server").debug("Collector Found "+str(result)+" for "+name)
 
         self.parent.startupLock.release()
 
@@ -48,12 +48,27 @@ def findFreePort(useSSL=None):
     if useSSL is None:
         useSSL=config().getboolean("Network","SSLServerDefault")
 
+    startPort,nrPorts=serverPortRange(useSSL)
+    return useSSL,freeServerPort(startPort,length=nrPorts)
+
+def serverPortRange(useSSL):
+    """The ports on which servers are started (and looked for)
+    :param useSSL: the range for SSL-servers
+    :return: tuple with the first port and the number of ports"""
     if useSSL:
         startPort=config().getint("Network","startServerPortSSL")
     else:
         startPort=config().getint("Network","startServerPort")
-    return useSSL,freeServerPort(startPort,
-                                 length=config().getint("Network","nrServerPorts"))
+    return startPort,config().getint("Network","nrServerPorts")
+
+def nextServerPort(port,useSSL):
+    """The port to try after a port. After the last port of the range
+    the first port is used so that the server can be found
+    :param port: the port that was tried
+    :param useSSL: the port is from the range for SSL-servers
+    :return: the next port"""
+    startPort,nrPorts=serverPortRange(useSSL)
+    return startPort+(port+1-startPort)%nrPorts
 
 # Wrapper that checks if the method was authenticated
 from functools import wraps
@@ -409,6 +424,19 @@ class FoamAnswerer(object):
         """Get all the data for the plots"""
         return allLines().prepareForTransfer()
 
+    @needsAuthentication
+    def getPlotDataSince(self,cursor):
+        """Get the data for the plots that was added since an earlier call
+        :param cursor: the cursor returned by the earlier call. An empty
+        dictionary to get all the data
+        :return: dictionary with the entries data (the changes of the
+        timelines. To be added to the earlier data with
+        PyFoam.Basics.TimeLineCollection.mergeTransfer) and cursor
+        (for the next call)"""
+        data,cursor=allLines().prepareIncrementalTransfer(cursor)
+        return {"data"   : data,
+                "cursor" : cursor}
+
     @needsAuthentication
     def controlDictUnmodified(self):
         """Checks whether there is a pending change to the controlDict"""
@@ -453,14 +481,17 @@ class FoamServer(Thread):
         maxTries=config().getint("Network","socketRetries")
 
         ok=False
+        self._port=None
 
         self._zConf=ZeroConfFoamServer()
 
         while not ok and tries<maxTries:
             ok=True
-            tries+=1
 
-            self.__ssl,self._port=findFreePort()
+            if self._port is None:
+                tries+=1
+                self.__ssl,self._port=findFreePort()
+                triedPorts=1
 
             self._running=False
 
@@ -488,7 +519,14 @@ class FoamServer(Thread):
                 ok=False
                 warning("Could not start on port",self._port,"althoug it was promised. Try:",tries,"of",maxTries)
                 foamLogger().warning("Could not get port %d - SocketError: %s. Try %d of %d" % (self._port,str(reason),tries,maxTries))
-                sleep(2+20*random())
+                # probably another server that was started at the same
+                # time got the port. Binding to a used port fails
+                # immediately so the next ports can be tried directly
+                self._port=nextServerPort(self._port,self.__ssl)
+                triedPorts+=1
+                if triedPorts>serverPortRange(self.__ssl)[1]:
+                    self._port=None
+                    sleep(2+20*random())
 
         if not ok:
             foamLogger().warning("Exceeded maximum number of tries for getting a port: %d" % maxTries)
@@ -4,9 +4,11 @@
 import socket
 import errno
 import time
+import threading
 
 from PyFoam import configuration as config
-from PyFoam.ThirdParty.six import print_,PY3
+from PyFoam.ThirdParty.six import print_,PY3,reraise
+from PyFoam.ThirdParty.six.moves import queue
 
 if PY3:
     import xmlrpc.client as xmlrpclib
@@ -45,54 +47,183 @@ def freeServerPort(start,length=1):
 
     return port
 
-def checkFoamServers(host,start,length=1):
+def threadPool(func,items,jobs=None):
+    """Call a function for all the items with a number of threads. Meant
+    for functions that mostly wait for the network
+    :param func: the function. Gets one item
+    :param items: list with the items
+    :param jobs: maximum number of threads. If unset the configuration
+    Network/scanJobs is used
+    :return: list with the results in the order of the items. If the
+    function raised an exception for an item the exception of the
+    first of these items is raised after all the items were done"""
+    if jobs is None:
+        jobs=config().getint("Network","scanJobs")
+
+    items=list(items)
+    results=[None]*len(items)
+    errors=[None]*len(items)
+    work=queue.Queue()
+    for i in range(len(items)):
+        work.put(i)
+
+    def worker():
+        while True:
+            try:
+                i=work.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[i]=func(items[i])
+            except Exception:
+                errors[i]=sys.exc_info()
+
+    threads=[threading.Thread(target=worker) for j in range(max(1,min(jobs,len(items))))]
+    for t in threads:
+        t.daemon=True
+        t.start()
+    for t in threads:
+        t.join()
+
+    for e in errors:
+        if e is not None:
+            reraise(*e)
+
+    return results
+
+def subnetHosts(subnet):
+    """All the addresses of a subnet
+    :param subnet: the subnet in the notation 192.168.1.0/24 (a single
+    address is also possible)
+    :return: list with the addresses as strings"""
+    if PY3:
+        import ipaddress
+        return [str(h) for h in ipaddress.ip_network(subnet.strip(),strict=False)]
+    else:
+        from PyFoam.ThirdParty.IPy import IP
+        return [str(h) for h in IP(subnet.strip())]
+
+def hostNames(hosts,jobs=None):
+    """Reverse lookup of the names of the hosts (in parallel)
+    :param hosts: list of addresses
+    :return: dictionary with the names of the hosts. 'unknown' if the
+    host has no name"""
+    def lookup(host):
+        try:
+            return socket.gethostbyaddr(host)[0]
+        except (socket.herror,socket.gaierror):
+            return "unknown"
+
+    return dict(zip(hosts,threadPool(lookup,hosts,jobs)))
+
+class TimeoutTransport(xmlrpclib.Transport):
+    """Transport with a timeout for the connection (instead of the
+    global timeout of the sockets)"""
+
+    def __init__(self,timeout,*args,**kwargs):
+        xmlrpclib.Transport.__init__(self,*args,**kwargs)
+        self.timeout=timeout
+
+    def make_connection(self,host):
+        conn=xmlrpclib.Transport.make_connection(self,host)
+        conn.timeout=self.timeout
+        return conn
+
+def probePort(host,port,timeout):
+    """Check whether something listens on a port
+    :param host: address of the host
+    :param port: the port
+    :param timeout: timeout for the connection in seconds
+    :return: True if the connection was accepted, False if it was
+    refused and None if the host is unreachable"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect((host,port))
+    except socket.timeout:
+        return None
+    except socket.error:
+        reason = sys.exc_info()[1] # compatible with 2.x and 3.x
+        code=reason.errno
+        if code in [errno.EHOSTUNREACH,errno.ENETUNREACH,errno.ETIMEDOUT] or code is None or code<0:
+            # Host unreachable: no more scanning
+            return None
+        elif code==errno.ECONNREFUSED:
+            # port does not exist
+            return False
+        else:
+            print_(errno.errorcode.get(code,code))
+            raise reason
+    finally:
+        sock.close()
+    return True
+
+def isFoamServer(host,port,timeout):
+    """Ask the server on a port whether it is a FoamServer"""
+    try:
+        server=xmlrpclib.ServerProxy("http://%s:%d" % (host,port),
+                                     transport=TimeoutTransport(timeout))
+        return server.isFoamServer()==True
+    except (xmlrpclib.ProtocolError,xmlrpclib.Fault,socket.error):
+        return False
+    except xml.parsers.expat.ExpatError:
+        return False
+
+def scanFoamServers(hosts,start,length=1,timeout=None,jobs=None):
     """
-    Finds the port on a remote host on which Foam-Servers are running
-    :param host: the IP of the host that should be checked
+    Finds the ports on a number of hosts on which Foam-Servers are
+    running. All the ports are probed concurrently. When a host turns
+    out to be unreachable its other ports are not probed
+    :param hosts: list with the IPs of the hosts that should be checked
     :param start: the port to start with
     :param length: the number of ports to scan
-    :return: a list with the found ports, None if the machine is unreachable
+    :param timeout: timeout for a connection. If unset the
+    configuration Network/socketTimeout is used
+    :param jobs: number of connections that are tried at the same time
+    :return: dictionary with a list of the found ports for every
+    host. None for hosts that are unreachable
     """
+    if timeout is None:
+        timeout=config().getfloat("Network","socketTimeout")
+
+    unreachable=set()
+
+    def check(hostPort):
+        host,port=hostPort
+        if host in unreachable:
+            return False
+        state=probePort(host,port,timeout)
+        if state is None:
+            unreachable.add(host)
+            return False
+        elif state:
+            return isFoamServer(host,port,timeout)
+        else:
+            return False
 
-    ports=[]
-
-##    try:
-##        name,alias,rest =socket.gethostbyaddr(host)
-##    except socket.herror,reason:
-##        # no name for the host
-##        return None
+    pairs=[(h,p) for h in hosts for p in range(start,start+length)]
+    found=threadPool(check,pairs,jobs)
 
-    for p in range(start,start+length):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        socket.setdefaulttimeout(config().getfloat("Network","socketTimeout"))
-        ok=False
-        try:
-            sock.connect((host,p))
-            sock.close()
-        except socket.error:
-            reason = sys.exc_info()[1] # compatible with 2.x and 3.x
-            code=reason.errno
-            if code in [errno.EHOSTUNREACH,errno.ENETUNREACH,errno.ETIMEDOUT] or code=="timed out" or code<0:
-                # Host unreachable: no more scanning
-                return None
-            elif code==errno.ECONNREFUSED:
-                # port does not exist
-                continue
-            else:
-                print_(errno.errorcode[code])
-                raise reason
+    result={}
+    for h in hosts:
+        result[h]=[]
+    for (h,p),ok in zip(pairs,found):
+        if ok:
+            result[h].append(p)
+    for h in unreachable:
+        result[h]=None
 
-        try:
-            server=xmlrpclib.ServerProxy("http://%s:%d" % (host,p))
-            ok=server.isFoamServer()
-        except xmlrpclib.ProtocolError:
-            pass
-        except xml.parsers.expat.ExpatError:
-            pass
+    return result
 
-        if ok:
-            ports.append(p)
+def checkFoamServers(host,start,length=1):
+    """
+    Finds the port on a remote host on which Foam-Servers are running
+    :param host: the IP of the host that should be checked
+    :param start: the port to start with
+    :param length: the number of ports to scan
+    :return: a list with the found ports, None if the machine is unreachable
+    """
 
-    return ports
+    return scanFoamServers([host],start,length)[host]
 
 # Should work with Python3 and Python2
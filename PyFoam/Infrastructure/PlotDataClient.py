@@ -0,0 +1,53 @@
+#  ICE Revision: $Id$
+"""Keeps a copy of the plot data of a FoamServer up to date"""
+
+from PyFoam.ThirdParty.six import PY3
+
+if PY3:
+    from xmlrpc.client import Fault
+else:
+    from xmlrpclib import Fault
+
+from PyFoam.Basics.TimeLineCollection import mergeTransfer
+
+class PlotDataClient(object):
+    """Gets the data of the timelines from a FoamServer. After the
+    first call only the data that was added since the last call is
+    transfered. Servers that don't support this send all the data
+    every time"""
+
+    def __init__(self,server):
+        """:param server: proxy of the FoamServer"""
+        self.server=server
+        self.cursor={}
+        self.lineInfo={}
+        self.incremental=True
+
+    def update(self):
+        """Get the new data from the server
+        :return: all the data (in the format of prepareForTransfer
+        of TimeLinesRegistry)"""
+        if self.incremental:
+            try:
+                answer=self.server.getPlotDataSince(self.cursor)
+            except Fault:
+                # old server without the method
+                self.incremental=False
+            else:
+                if type(answer)!=dict:
+                    # the server refuses the request
+                    return self.lineInfo
+                mergeTransfer(self.lineInfo,answer["data"])
+                self.cursor=answer["cursor"]
+                return self.lineInfo
+
+        lineInfo=self.server.getPlotData()
+        if type(lineInfo)==dict:
+            self.lineInfo=lineInfo
+        return self.lineInfo
+
+    def plots(self):
+        """Get the information about the plots from the server"""
+        return self.server.getPlots()
+
+# Should work with Python3 and Python2
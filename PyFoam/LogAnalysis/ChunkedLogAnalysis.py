@@ -0,0 +1,295 @@
+#  ICE Revision: $Id$
+"""Analyze a complete log-file in chunks that are processed in parallel
+
+The file is read in large blocks and split at the lines where a new
+time-step starts. The chunks are analyzed in forked processes that
+start with a copy of the analyzer. The changes every process makes to
+the timelines are recorded and applied to the timelines of the
+original analyzer in the order of the chunks. This gives the same
+timelines as analyzing the file line by line"""
+
+import sys
+import gzip
+import traceback
+import multiprocessing
+from collections import deque
+from threading import Lock
+
+from PyFoam.Basics import TimeLineCollection
+from PyFoam.Basics.ProgressOutput import ProgressOutput
+from PyFoam import configuration as config
+from PyFoam.Error import error
+
+from PyFoam.ThirdParty.six import PY3
+
+chunkSize=8*1024*1024
+minChunkSize=64*1024
+
+def openLog(fName):
+    """Open a log-file for binary reading. Compressed files are opened
+    with gzip
+    :param fName: name of the file"""
+    fh=open(fName,"rb")
+    magic=fh.read(2)
+    fh.seek(0)
+    if magic==b"\x1f\x8b":
+        fh.close()
+        fh=gzip.open(fName,"rb")
+    return fh
+
+def decodeLines(data,stripAll=True):
+    """Split a block of data into lines the way LineReader does
+    :param data: the raw bytes of complete lines
+    :param stripAll: remove spaces at the start of the lines as well"""
+    if len(data)==0:
+        return []
+    if PY3:
+        data=data.decode("utf-8","replace")
+    lines=data.split("\n")
+    if lines[-1]=="":
+        lines.pop()
+    if stripAll:
+        return [l.strip() for l in lines]
+    else:
+        return [l.rstrip() for l in lines]
+
+def _lineStart(data,pos):
+    """Start of the line that position pos is part of"""
+    return data.rfind(b"\n",0,pos)+1
+
+def _findTimeLine(data,isTimeLine,start,end):
+    """Search backwards for the last line that starts a time-step
+    :param start: the line has to start after this position
+    :param end: the line has to start before this position
+    :return: the position of the line start or None"""
+    if end<=0:
+        return None
+    pos=_lineStart(data,end)
+    if pos==end:
+        # end is at a line-start: begin with the line before
+        pos=_lineStart(data,end-1)
+    while pos>start:
+        lineEnd=data.find(b"\n",pos)
+        if lineEnd<0:
+            lineEnd=len(data)
+        if isTimeLine(data[pos:lineEnd]):
+            return pos
+        pos=_lineStart(data,pos-1)
+    return None
+
+def _firstTimeLine(data,isTimeLine,start,end):
+    """Search forward for the first line that starts a time-step
+    :param start: position of the first line to check
+    :param end: the line has to start before this position
+    :return: the position of the line start or None"""
+    pos=start
+    while pos<end:
+        lineEnd=data.find(b"\n",pos)
+        if lineEnd<0:
+            lineEnd=len(data)
+        if isTimeLine(data[pos:lineEnd]):
+            return pos
+        pos=lineEnd+1
+    return None
+
+def timeStepChunks(fh,isTimeLine,size=chunkSize):
+    """Read the file in large blocks and split it into chunks that start
+    with a new time-step
+    :param fh: binary file handle
+    :param isTimeLine: function that gets the raw bytes of a line and
+    decides whether it starts a new time-step
+    :param size: approximate size of the chunks
+    :return: generator. The first element is the header (all the lines
+    before the first time-step). The others are tuples with the data of
+    the time-step before the chunk (needed to get the analyzers into the
+    right state) and the chunk itself"""
+
+    data=b""
+    warmup=b""
+    inHeader=True
+    # lines starting before this position were already checked
+    scanned=0
+
+    while True:
+        block=fh.read(size)
+        eof=len(block)==0
+        data+=block
+        if eof:
+            end=len(data)
+        else:
+            # only check complete lines
+            end=data.rfind(b"\n")+1
+
+        if inHeader:
+            pos=_firstTimeLine(data,isTimeLine,scanned,end)
+            if pos is None:
+                if not eof:
+                    scanned=end
+                    continue
+                pos=len(data)
+            yield data[:pos]
+            data=data[pos:]
+            end-=pos
+            scanned=0
+            inHeader=False
+
+        if eof:
+            if len(data)>0:
+                yield warmup,data
+            return
+
+        split=_findTimeLine(data,isTimeLine,scanned,end)
+        if split is None:
+            # time-step is longer than the block. Read more
+            scanned=max(end-1,0)
+            continue
+
+        chunk=data[:split]
+        yield warmup,chunk
+        warmup=chunk[_findTimeLine(chunk,isTimeLine,-1,split):]
+        data=data[split:]
+        scanned=0
+
+def canAnalyzeChunked(analyzer):
+    """Checks whether the results of the analyzer only depend on the
+    timelines. Analyzers that write files, count iterations over the
+    whole run or have triggers can only work line by line
+    :param analyzer: a FoamLogAnalyzer"""
+    if not analyzer.hasAnalyzer("Time"):
+        return False
+    if len(analyzer.timeTriggers)>0:
+        return False
+    for nm in analyzer.listAnalyzers():
+        a=analyzer.getAnalyzer(nm)
+        if getattr(a,"files",None) is not None:
+            return False
+        if getattr(a,"plotIterations",False):
+            return False
+    return True
+
+# the analyzer and the function that handles the lines. Set before the
+# processes are forked
+_analyzer=None
+_lineHandle=None
+
+def _analyzeChunk(warmup,chunk,stripAll):
+    """Analyze one chunk in a forked process
+    :return: the recorded changes of the timelines and the time at the end
+    of the chunk. If the analysis failed None and the error message"""
+    # the parent may have been changing the timelines (and holding the
+    # lock) during the fork. Only the recorded changes are needed anyway
+    TimeLineCollection.transmissionLock=Lock()
+    for line in TimeLineCollection.allLines().lines.values():
+        line.clearData()
+    # the listeners and the progress only make sense in the original process
+    _analyzer.timeListeners=[]
+    _analyzer.progressOut=ProgressOutput()
+
+    try:
+        for l in decodeLines(warmup,stripAll):
+            _lineHandle(l)
+        TimeLineCollection.startJournal()
+        for l in decodeLines(chunk,stripAll):
+            _lineHandle(l)
+        return TimeLineCollection.stopJournal(),_analyzer.time
+    except Exception:
+        # not all exceptions can be transferred to the parent. Send the
+        # description instead
+        return None,traceback.format_exc()
+
+def _forkPool(jobs):
+    """Pool where every chunk is analyzed in a process freshly forked
+    from this process. None if the platform can't fork"""
+    try:
+        ctx=multiprocessing.get_context("fork")
+    except AttributeError:
+        # Python 2 always forks on POSIX
+        if sys.platform=="win32":
+            return None
+        ctx=multiprocessing
+    except ValueError:
+        return None
+    return ctx.Pool(jobs,maxtasksperchild=1)
+
+def analyzeChunked(analyzer,fName,jobs,lineHandle=None,size=None):
+    """Analyze a complete log-file with a number of processes
+    :param analyzer: the FoamLogAnalyzer. Should be checked with canAnalyzeChunked
+    :param fName: the log-file. May be compressed
+    :param jobs: number of processes
+    :param lineHandle: function that is called with every line. If unset
+    the analyzeLine-method of the analyzer
+    :param size: approximate size of the chunks. If unset it is determined
+    from the size of the file"""
+    global _analyzer,_lineHandle
+
+    if lineHandle is None:
+        lineHandle=analyzer.analyzeLine
+
+    stripAll=config().getboolean("SolverOutput","stripSpaces")
+    timeExpr=analyzer.getAnalyzer("Time").exp
+
+    def isTimeLine(raw):
+        if PY3:
+            raw=raw.decode("utf-8","replace")
+        return timeExpr.match(raw.strip()) is not None
+
+    fh=openLog(fName)
+    if size is None:
+        import os
+        fSize=os.path.getsize(fName)
+        if isinstance(fh,gzip.GzipFile):
+            # typical compression ratio for logs
+            fSize*=5
+        size=max(minChunkSize,min(chunkSize,fSize//(4*max(jobs,1))))
+
+    chunks=timeStepChunks(fh,isTimeLine,size)
+
+    # the header is analyzed here so that the processes know everything
+    # that happened before the time-steps (automatic plots for instance)
+    for l in decodeLines(next(chunks),stripAll):
+        lineHandle(l)
+
+    _analyzer=analyzer
+    _lineHandle=lineHandle
+
+    pool=None
+    if jobs>1:
+        pool=_forkPool(jobs)
+
+    lastTime=None
+    try:
+        if pool is None:
+            for warmup,chunk in chunks:
+                for l in decodeLines(chunk,stripAll):
+                    lineHandle(l)
+        else:
+            pending=deque()
+
+            def finishFirst():
+                journal,time=pending.popleft().get()
+                if journal is None:
+                    error("Problem analyzing",fName,"in parallel:\n",time)
+                TimeLineCollection.replayJournal(journal)
+                return time
+
+            for warmup,chunk in chunks:
+                pending.append(pool.apply_async(_analyzeChunk,
+                                                (warmup,chunk,stripAll)))
+                if len(pending)>=2*jobs:
+                    lastTime=finishFirst()
+            while len(pending)>0:
+                lastTime=finishFirst()
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        _analyzer=None
+        _lineHandle=None
+        fh.close()
+
+    if lastTime is not None:
+        # let the listeners know about the final state
+        analyzer.setTime(lastTime)
+
+# Should work with Python3 and Python2
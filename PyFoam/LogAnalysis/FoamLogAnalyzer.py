@@ -2,6 +2,7 @@
 """Analyze OpenFOAM logs"""
 
 from .TimeLineAnalyzer import TimeLineAnalyzer
+from .LineDispatcher import LineDispatcher
 from PyFoam.Basics.LineReader import LineReader
 from PyFoam.Error import error
 
@@ -31,6 +32,9 @@ class FoamLogAnalyzer(object):
         self.timeListeners=[]
         self.timeTriggers=[]
 
+        self.prefilterLines=config().getboolean("SolverOutput","prefilterLines")
+        self.dispatcher=None
+
         self.customExpr=re.compile("Custom([0-9]+)_(.+)")
 
         if progress:
@@ -136,11 +140,18 @@ class FoamLogAnalyzer(object):
 
         obj.setParent(self)
         self.analyzers[name]=obj
+        self.dispatcher=None
 
     def analyzeLine(self,line):
-        """Calls all the anlyzers for a line"""
-        for nm in self.analyzers:
-            self.analyzers[nm].doAnalysis(line)
+        """Calls all the anlyzers for a line. If prefilterLines is set
+        only the analyzers that may match the line are called"""
+        if self.prefilterLines:
+            if self.dispatcher is None:
+                self.dispatcher=LineDispatcher(list(self.analyzers.values()))
+            self.dispatcher.dispatch(line)
+        else:
+            for nm in self.analyzers:
+                self.analyzers[nm].doAnalysis(line)
 
     def analyze(self,fh):
         """Analyzes a file (one line at a time)
@@ -129,6 +129,15 @@ class GeneralLineAnalyzer(LogLineAnalyzer):
         else:
             return [],[]
 
+    def lineFilters(self):
+        """Only lines that match the regular expression are analyzed"""
+        if self.overrides(GeneralLineAnalyzer,"doAnalysis","stringToMatch"):
+            return None
+        elif not hasattr(getattr(self,"exp",None),"pattern"):
+            return None
+        else:
+            return [self.exp]
+
     def stringToMatch(self,line):
         """Returns string to match. To be overriden for multi-line expressions"""
         return line.strip()
@@ -0,0 +1,197 @@
+#  ICE Revision: $Id$
+"""Only pass lines to the analyzers that can possibly match them"""
+
+import re
+
+try:
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
+
+from PyFoam.ThirdParty.six import unichr
+
+def requiredLiterals(exp):
+    """Find substrings of which at least one has to be in every string
+    that the regular expression matches
+    :param exp: a compiled regular expression
+    :return: list of strings or None if no such list can be determined"""
+    if exp.flags & re.IGNORECASE:
+        return None
+    try:
+        parsed=sre_parse.parse(exp.pattern,exp.flags)
+    except Exception:
+        return None
+    return _sequenceLiterals(parsed)
+
+def _better(old,new):
+    """Select the more selective of two lists of literals"""
+    if new is None:
+        return old
+    if old is None:
+        return new
+    if min(len(l) for l in new)>min(len(l) for l in old):
+        return new
+    else:
+        return old
+
+def _sequenceLiterals(items):
+    """Literals for a sequence of items from sre_parse"""
+    best=None
+    run=""
+    for op,av in items:
+        if op==sre_parse.LITERAL:
+            run+=unichr(av)
+            continue
+        elif op==sre_parse.AT:
+            # anchors don't consume characters
+            continue
+        if run:
+            best=_better(best,[run])
+            run=""
+        if op==sre_parse.SUBPATTERN:
+            if len(av)==4 and av[1] & re.IGNORECASE:
+                continue
+            best=_better(best,_sequenceLiterals(av[-1]))
+        elif op==sre_parse.BRANCH:
+            alternatives=[]
+            for b in av[1]:
+                lit=_sequenceLiterals(b)
+                if lit is None:
+                    alternatives=None
+                    break
+                alternatives+=lit
+            best=_better(best,alternatives)
+        elif op in (sre_parse.MAX_REPEAT,sre_parse.MIN_REPEAT):
+            if av[0]>=1:
+                best=_better(best,_sequenceLiterals(av[2]))
+    if run:
+        best=_better(best,[run])
+    return best
+
+def _hasGroupReferences(items):
+    """Check whether a parsed regular expression references groups (these
+    can't be combined with other expressions)"""
+    for op,av in items:
+        if op in (sre_parse.GROUPREF,sre_parse.GROUPREF_EXISTS):
+            return True
+        if op==sre_parse.SUBPATTERN:
+            if _hasGroupReferences(av[-1]):
+                return True
+        elif op==sre_parse.BRANCH:
+            for b in av[1]:
+                if _hasGroupReferences(b):
+                    return True
+        elif op in (sre_parse.MAX_REPEAT,sre_parse.MIN_REPEAT):
+            if _hasGroupReferences(av[2]):
+                return True
+        elif op in (sre_parse.ASSERT,sre_parse.ASSERT_NOT):
+            if _hasGroupReferences(av[1]):
+                return True
+    return False
+
+def combinable(exp):
+    """Can this regular expression be part of a combined alternation"""
+    if exp.flags & ~re.UNICODE:
+        # the flags would be lost in the combined expression
+        return False
+    try:
+        parsed=sre_parse.parse(exp.pattern,exp.flags)
+    except Exception:
+        return False
+    return not _hasGroupReferences(parsed)
+
+class LineDispatcher(object):
+    """Passes each line only to the analyzers whose regular expressions
+    may match it
+
+    Every analyzer reports through lineFilters the regular expressions it
+    matches. If literal substrings can be found of which every matching
+    line contains at least one then the analyzer is only called if the
+    line contains it. All these literals are searched for with one
+    regular expression. The expressions of the other analyzers are
+    combined into one alternation which is tried once per line. Analyzers
+    that don't report their expressions (for instance because they have
+    to see every line) are always called. The order in which the
+    analyzers are called is preserved"""
+
+    def __init__(self,analyzers):
+        """:param analyzers: list with the LogLineAnalyzers in the order
+        in which they should be called"""
+        self.analyzers=list(analyzers)
+
+        # indizes of the analyzers that are always called
+        self.always=set()
+        # indizes of the analyzers that are called if combined matches
+        self.combinedUsers=set()
+        # literals and the indizes of the analyzers that need them
+        literalUsers={}
+
+        combined=[]
+
+        for i,a in enumerate(self.analyzers):
+            filters=a.lineFilters()
+            if filters is None or len(filters)==0:
+                self.always.add(i)
+                continue
+            literals=[]
+            for f in filters:
+                lit=requiredLiterals(f)
+                if lit is None:
+                    literals=None
+                    break
+                literals+=lit
+            if literals is not None:
+                for l in literals:
+                    literalUsers.setdefault(l,set()).add(i)
+            elif all(combinable(f) for f in filters):
+                self.combinedUsers.add(i)
+                combined+=[f.pattern for f in filters]
+            else:
+                self.always.add(i)
+
+        self.combined=None
+        if len(combined)>0:
+            try:
+                self.combined=re.compile("|".join("(?:%s)" % c for c in combined))
+            except re.error:
+                # for instance duplicate group names. Call them always
+                self.always|=self.combinedUsers
+                self.combinedUsers=set()
+
+        # The expression finds at every position the longest literal that
+        # starts there. Shorter literals that are part of it are
+        # therefor found through the longer literal
+        self.literalUsers={}
+        for l in literalUsers:
+            self.literalUsers[l]=set()
+            for o in literalUsers:
+                if l.find(o)>=0:
+                    self.literalUsers[l]|=literalUsers[o]
+        self.literals=None
+        if len(literalUsers)>0:
+            lits=sorted(literalUsers,key=len,reverse=True)
+            self.literals=re.compile("(?=(%s))" % "|".join(re.escape(l) for l in lits))
+
+        self.alwaysList=sorted(self.always)
+
+    def dispatch(self,line):
+        """Pass the line to the analyzers that may match it"""
+        called=None
+        if self.literals is not None:
+            for l in self.literals.findall(line):
+                if called is None:
+                    called=set(self.always)
+                called|=self.literalUsers[l]
+        if self.combined is not None:
+            if self.combined.match(line) or self.combined.match(line.strip()):
+                if called is None:
+                    called=set(self.always)
+                called|=self.combinedUsers
+        if called is None:
+            for i in self.alwaysList:
+                self.analyzers[i].doAnalysis(line)
+        else:
+            for i in sorted(called):
+                self.analyzers[i].doAnalysis(line)
+
+# Should work with Python3 and Python2
@@ -5,6 +5,8 @@ import sys
 
 from os import path,mkdir
 
+from .ChunkedLogAnalysis import analyzeChunked,canAnalyzeChunked
+
 class LogAnalyzerApplication(object):
     """
     Wrapper for the Analyzer Classes
@@ -18,10 +20,12 @@ class LogAnalyzerApplication(object):
         """ :param analyze: The analyzer"""
         self.analyzer=analyze
 
-    def run(self,pfad=None):
+    def run(self,pfad=None,jobs=1):
         """ runs the analyzer
         :param pfad: path to the logfile, if no path is given it is
-        taken from the command line"""
+        taken from the command line
+        :param jobs: number of processes that analyze the file in chunks
+        (only used if the analyzer writes no files)"""
         if pfad==None:
             fn=sys.argv[1]
         else:
@@ -35,6 +39,10 @@ class LogAnalyzerApplication(object):
 
         self.analyzer.setDirectory(oDir)
         
+        if jobs>1 and canAnalyzeChunked(self.analyzer):
+            analyzeChunked(self.analyzer,fn,jobs)
+            return
+
         fh=open(fn,'r')
         self.analyzer.analyze(fh)
         
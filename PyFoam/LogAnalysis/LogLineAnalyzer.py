@@ -29,6 +29,29 @@ class LogLineAnalyzer(object):
         This method carries the main functionality in the sub-classes"""
         pass
 
+    def lineFilters(self):
+        """The regular expressions that this analyzer matches lines
+        against. If none of them matches a line then doAnalysis does
+        nothing for that line and does not have to be called. This
+        allows the parent to skip analyzers for most lines
+
+        :return: a list of compiled regular expressions or None if the
+        analyzer has to see every line"""
+        return None
+
+    def overrides(self,base,*names):
+        """Check whether a subclass of base replaces methods of base
+        :param base: the class that defines the methods
+        :param names: the names of the methods
+        :return: True if one of the methods is not the one from base"""
+        for c in type(self).__mro__:
+            if c is base:
+                return False
+            for n in names:
+                if n in c.__dict__:
+                    return True
+        return False
+
     def timeChanged(self):
         """The value of the time has changed in the Log-file
 
@@ -27,6 +27,12 @@ class PhaseChangerLineAnalyzer(GeneralLineAnalyzer):
         self.exp=re.compile(exp)
         self.registerRegexp(self.exp)
 
+    def lineFilters(self):
+        if self.overrides(PhaseChangerLineAnalyzer,"doAnalysis"):
+            return None
+        else:
+            return [self.exp]
+
     def doAnalysis(self,line):
         """Look for the pattern. If it matches set the phase name"""
 
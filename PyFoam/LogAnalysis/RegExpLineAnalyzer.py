@@ -98,6 +98,13 @@ class RegExpLineAnalyzer(GeneralLineAnalyzer):
         self.data={}
         self.dataTransformations=dataTransformations
 
+    def lineFilters(self):
+        """Multi-line expressions have to see every line"""
+        if self.multiLine or self.overrides(RegExpLineAnalyzer,"doAnalysis","stringToMatch"):
+            return None
+        else:
+            return [self.exp]
+
     def stringToMatch(self,line):
         """Returns string to match. To be overriden for multi-line expressions"""
         if self.multiLine:
@@ -38,6 +38,12 @@ class TimeLineAnalyzer(LogLineAnalyzer):
         except ValueError:
             pass
 
+    def lineFilters(self):
+        if self.overrides(TimeLineAnalyzer,"doAnalysis"):
+            return None
+        else:
+            return [self.exp,self.fallback,self.createExpr]
+
     def doAnalysis(self,line):
         m=self.exp.match(line.strip())
         if m!=None:
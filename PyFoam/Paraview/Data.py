@@ -101,6 +101,11 @@ from PyFoam.Paraview.Data import setPlotData
 setPlotData(self.GetOutput(),"compressibleInterFoam","linear")
     """
     actualFile=path.join("PyFoamRunner."+solverName+".analyzed","pickledPlots")
+    storeFile=path.join(path.dirname(actualFile),"timelineStore")
+    if not path.exists(actualFile) or \
+       (path.exists(storeFile) and path.getmtime(storeFile)>path.getmtime(actualFile)):
+        # the run is not finished yet
+        actualFile=storeFile
     data=RedoPlot(args=[actualFile,
                         "--pickle-file",
                         "--numpy"]).plotNumpy[plotName]
@@ -0,0 +1,221 @@
+#  ICE Revision: $Id$
+"""Change the boundary conditions of a field file without rewriting the rest
+
+Only the boundaryField-entry is parsed. The rest of the file (especially
+a large internal field) is copied byte by byte when the file is written"""
+
+import re
+import os
+import gzip
+import shutil
+from os import path
+from glob import glob
+from tempfile import mktemp
+
+from PyFoam.RunDictionary.FileBasis import FileBasisBackup
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile,FoamFileParser
+from PyFoam.RunDictionary.LazyFieldFile import readHeaderInfo,findEntry,locateInternalField,copyFromFile
+from PyFoam.Basics.FoamFileGenerator import FoamFileGenerator
+from PyFoam.Basics.DataStructures import BinaryList,binaryElementType
+from PyFoam.Basics.Utilities import processFiles
+
+from PyFoam.ThirdParty.six import PY3
+
+# Things inside the boundaryField that have to be skipped when looking
+# for the closing brace
+blockRE=re.compile(br'[{}]|"(?:[^"\\\n]|\\.)*"|//[^\n]*|/\*.*?\*/|List<(\w+)>\s+(\d+)\s*\(',
+                   re.DOTALL)
+
+class BoundaryFieldRewriter(FileBasisBackup):
+    """Field file of which only the boundaryField is read. The content
+    is a dictionary with the single entry boundaryField that can be
+    modified like the content of a ParsedParameterFile. When the file is
+    written everything outside the boundaryField is copied unchanged
+    from the original. If the boundaryField can not be located the
+    whole file is parsed and written like a ParsedParameterFile"""
+
+    def __init__(self,
+                 name,
+                 backup=False):
+        """:param name: The name of the field file
+        :param backup: create a backup-copy of the file"""
+        FileBasisBackup.__init__(self,name,backup=backup)
+        self.header=None
+        self.start=None
+        self.end=None
+        self.readFile()
+
+    def readFile(self):
+        """Find the boundaryField and parse it. If it can not be found
+        that way the whole file is parsed"""
+        self.parsed=None
+        self.openFile(mode="rb")
+        try:
+            headerText,self.binary,arch=readHeaderInfo(self.fh)
+            block=None
+            if headerText is not None:
+                located=locateInternalField(self.fh,self.realName(),self.zipped)
+                if located is None:
+                    searchStart=0
+                else:
+                    searchStart=located[0].end+1
+                self.start=findEntry(self.fh,b"boundaryField",searchStart)
+                if self.start>=0:
+                    self.fh.seek(self.start)
+                    block=self.__boundaryBlock(self.fh.read(),arch)
+        finally:
+            self.closeFile()
+
+        if block is None:
+            self.__parseAll()
+            return
+
+        self.end=self.start+len(block)
+
+        if self.binary:
+            self.encoding="latin-1"
+        self.content=self.parse(self.decode(headerText+b"\n\n"+block))
+
+    def __parseAll(self):
+        """Parse the whole file. Used if the boundaryField could not be
+        located"""
+        self.parsed=ParsedParameterFile(self.name,backup=False)
+        self.header=self.parsed.header
+        self.content=self.parsed.content
+
+    def __boundaryBlock(self,data,arch):
+        """Find the end of the boundaryField
+        :param data: the file starting with the boundaryField
+        :param arch: the arch-entry of the header
+        :return: the part of data with the boundaryField. None if no
+        end was found"""
+        pos=0
+        depth=0
+        while True:
+            m=blockRE.search(data,pos)
+            if m is None:
+                return None
+            pos=m.end()
+            tok=m.group(0)
+            if tok==b"{":
+                depth+=1
+            elif tok==b"}":
+                depth-=1
+                if depth==0:
+                    return data[:pos]
+            elif m.group(1) and self.binary:
+                # skip the binary data because it may contain braces
+                dtype,nrComp=BinaryList(int(m.group(2)),
+                                        "",
+                                        arch=arch,
+                                        elementType=binaryElementType(m.group(1).decode())).dtype()
+                pos+=int(m.group(2))*nrComp*dtype.itemsize
+
+    def decode(self,data):
+        """Convert bytes from the file to a string"""
+        if self.encoding:
+            txt=data.decode(self.encoding)
+        else:
+            try:
+                txt=data.decode("utf-8")
+            except UnicodeDecodeError:
+                self.encoding="latin-1"
+                txt=data.decode(self.encoding)
+        if not PY3:
+            txt=txt.encode("latin-1")
+        return txt
+
+    def parse(self,content):
+        """Parse the header and the boundaryField
+        :return: a dictionary with the boundaryField"""
+        parser=FoamFileParser(content,fName=self.name)
+        self.header=parser.getHeader()
+        return parser.getData()
+
+    def boundaryText(self):
+        """:return: the boundaryField as a string"""
+        return FoamFileGenerator(self.content).makeString(firstLevel=True).strip()
+
+    def encode(self,txt):
+        """Encode the string so that it can be written to the binary file"""
+        if PY3 or type(txt)!=str:
+            return txt.encode(self.encoding if self.encoding else "utf-8")
+        else:
+            return txt
+
+    def __str__(self):
+        if self.parsed is not None:
+            return str(self.parsed)
+        self.openFile(keepContent=True,mode="rb")
+        try:
+            before=self.fh.read(self.start)
+            self.fh.seek(self.end)
+            after=self.fh.read()
+        finally:
+            self.closeFile()
+        return self.decode(before)+self.boundaryText()+self.decode(after)
+
+    def writeFile(self,content=None):
+        """Write the file. Everything but the boundaryField is copied
+        blockwise from the current file
+        :param content: content that should replace the old content"""
+        if content!=None:
+            self.content=content
+        if self.content==None:
+            return
+        if self.parsed is not None:
+            self.parsed.writeFile(self.content)
+            return
+
+        block=self.encode(self.boundaryText())
+
+        fn=mktemp(dir=path.dirname(self.name))
+        if self.zipped:
+            out=gzip.open(fn,"wb")
+        else:
+            out=open(fn,"wb")
+        try:
+            self.openFile(keepContent=True,mode="rb")
+            copyFromFile(self.fh,out,0,self.start)
+            out.write(block)
+            copyFromFile(self.fh,out,self.end)
+            self.closeFile()
+        finally:
+            out.close()
+
+        shutil.copymode(self.realName(),fn)
+        os.rename(fn,self.realName())
+        self.end=self.start+len(block)
+
+    def __contains__(self,key):
+        return key in self.content
+
+    def __getitem__(self,key):
+        return self.content[key]
+
+    def __setitem__(self,key,value):
+        self.content[key]=value
+
+def processorFieldFiles(fName):
+    """Find the files that correspond to a field file in the
+    processor-directories of the case
+    :param fName: name of the field file in the undecomposed case
+    :return: list with the names of the files"""
+    from PyFoam.RunDictionary.FileBasis import FileBasis
+
+    case=FileBasis(fName).getCaseDir()
+    if case is None:
+        return []
+    fName=path.abspath(fName)
+    if path.splitext(fName)[1]==".gz":
+        fName=fName[:-3]
+    rel=path.relpath(fName,path.abspath(case))
+
+    result=[]
+    for p in sorted(glob(path.join(case,"processor*"))):
+        name=path.join(p,rel)
+        if path.exists(name) or path.exists(name+".gz"):
+            result.append(name)
+    return result
+
+# Should work with Python3 and Python2
@@ -0,0 +1,187 @@
+#  ICE Revision: $Id$
+"""Cached listings of directories
+
+Listing directories with many entries (cases with thousands of
+time-directories or hundreds of processor-directories) is expensive and
+SolutionDirectory needs this information in many places. The listings
+are therefor cached and shared by all the objects in a process. A
+cached listing is used as long as the modification time of the
+directory does not change (the modification time of a directory
+changes if entries are added, removed or renamed)"""
+
+import os
+import re
+import time
+from bisect import bisect_left
+from os import path
+from threading import Lock
+from collections import OrderedDict
+
+try:
+    from os import scandir
+except ImportError:
+    # Python 2
+    scandir=None
+
+# number of directories for which the listing is kept
+maxCachedDirectories=10000
+
+# if a directory was scanned less than this many seconds after its
+# modification time then changes in the same tick of the file system
+# clock may have been missed. Such listings are not trusted
+racyInterval=2.
+
+processorDirExpr=re.compile("processor([0-9]+)$")
+
+class DirectoryListing(object):
+    """The entries of a directory. The information that is derived
+    from the entries is only computed once"""
+
+    def __init__(self,name,mtime,entries):
+        """:param name: the full path of the directory
+        :param mtime: the modification time at the time of the scan
+        :param entries: dictionary with the names of the entries as keys
+        and a boolean whether the entry is a directory as the value"""
+        self.name=name
+        self.mtime=mtime
+        self.scanned=time.time()
+        self.entries=entries
+
+        self.__times=None
+        self.__processorDirs=None
+
+    def __contains__(self,name):
+        return name in self.entries
+
+    def isDir(self,name):
+        """Is this entry a directory"""
+        return self.entries.get(name,False)
+
+    def directories(self):
+        """Sorted list with the names of the sub-directories"""
+        return sorted(n for n,d in self.entries.items() if d)
+
+    def __timeData(self):
+        if self.__times is None:
+            times=[]
+            for n in self.entries:
+                try:
+                    times.append((float(n),n))
+                except ValueError:
+                    pass
+            times.sort(key=lambda x:x[0])
+            self.__times=([t[1] for t in times],[t[0] for t in times])
+        return self.__times
+
+    def times(self):
+        """The names of all the entries that are numbers sorted by their
+        value"""
+        return self.__timeData()[0]
+
+    def timeValues(self):
+        """The values of the entries in times()"""
+        return self.__timeData()[1]
+
+    def timeDirectories(self):
+        """The names of the directories that are numbers sorted by their
+        value"""
+        return [t for t in self.times() if self.entries[t]]
+
+    def processorDirs(self):
+        """The processor-directories sorted by their number"""
+        if self.__processorDirs is None:
+            procs=[]
+            for n,d in self.entries.items():
+                m=processorDirExpr.match(n)
+                if m and d:
+                    procs.append((int(m.group(1)),n))
+            procs.sort()
+            self.__processorDirs=[p[1] for p in procs]
+        return self.__processorDirs
+
+_listings=OrderedDict()
+_listingsLock=Lock()
+
+def _scan(dName):
+    entries={}
+    if scandir is not None:
+        it=scandir(dName)
+        try:
+            for e in it:
+                try:
+                    entries[e.name]=e.is_dir()
+                except OSError:
+                    entries[e.name]=False
+        finally:
+            if hasattr(it,"close"):
+                it.close()
+    else:
+        for n in os.listdir(dName):
+            entries[n]=path.isdir(path.join(dName,n))
+    return entries
+
+def listing(dName):
+    """Get the listing of a directory. The directory is only scanned if
+    it changed since the last time
+    :param dName: name of the directory
+    :return: a DirectoryListing. None if the directory does not exist"""
+    dName=path.abspath(dName)
+    try:
+        st=os.stat(dName)
+    except OSError:
+        invalidate(dName)
+        return None
+    mtime=getattr(st,"st_mtime_ns",st.st_mtime)
+
+    with _listingsLock:
+        old=_listings.get(dName,None)
+    if old is not None and old.mtime==mtime and old.scanned-st.st_mtime>racyInterval:
+        return old
+
+    try:
+        new=DirectoryListing(dName,mtime,_scan(dName))
+    except OSError:
+        # not a directory or removed since the stat
+        invalidate(dName)
+        return None
+
+    with _listingsLock:
+        _listings.pop(dName,None)
+        _listings[dName]=new
+        while len(_listings)>maxCachedDirectories:
+            _listings.popitem(last=False)
+    return new
+
+def invalidate(dName=None):
+    """Forget the listing of a directory
+    :param dName: the directory. If unset all the listings are removed"""
+    with _listingsLock:
+        if dName is None:
+            _listings.clear()
+        else:
+            _listings.pop(path.abspath(dName),None)
+
+def closestTime(values,t,minTime=False):
+    """Find the index of a time in a sorted list
+    :param values: the sorted values
+    :param t: the time to look for
+    :param minTime: return the index of the closest time. Otherwise only
+    times that differ by less than 1e-6 are found
+    :return: the index. None if nothing was found"""
+    if len(values)==0:
+        return 0 if minTime else None
+    i=bisect_left(values,t)
+    result=None
+    for j in (i-1,i):
+        if j<0 or j>=len(values):
+            continue
+        if result is None or abs(values[j]-t)<abs(values[result]-t):
+            result=j
+    # the first of equal values
+    while result>0 and values[result-1]==values[result]:
+        result-=1
+    if not minTime and abs(values[result]-t)>=1e-6:
+        return None
+    return result
+
+# Should work with Python3 and Python2
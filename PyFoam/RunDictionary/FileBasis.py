@@ -16,6 +16,11 @@ from PyFoam.Error import warning,error
 
 from PyFoam.ThirdParty.six import PY3
 
+# the FoamFile-header is searched for the format in this many bytes
+headerBytes=16384
+
+binaryFormatExpr=re.compile(br"FoamFile\s*\{[^}]*\bformat\s+binary\s*;")
+
 class FileBasis(Utilities):
     """ Base class for the other OpenFOAM--file-classes"""
 
@@ -57,6 +62,8 @@ class FileBasis(Utilities):
 
             self.fh=None
         self.content=None
+        # encoding of the file. If unset the default is used
+        self.encoding=None
 
     def realName(self):
         """The full filename with appended .gz (if zipped)"""
@@ -82,6 +89,9 @@ class FileBasis(Utilities):
         if self.name:
             if self.zipped:
                 self.fh=gzip.open(self.name+".gz",mode)
+            elif PY3 and self.encoding and mode.find("b")<0:
+                # no translation of newlines because they might be binary data
+                self.fh=open(self.name,mode,encoding=self.encoding,newline="")
             else:
                 self.fh=open(self.name,mode)
         else:
@@ -94,14 +104,37 @@ class FileBasis(Utilities):
         self.fh=None
 
     def readFile(self):
-        """ read the whole File into memory"""
-        self.openFile()
-        txt=self.fh.read()
-        if PY3 and self.zipped:
-            txt=str(txt,"utf-8")
+        """ read the whole File into memory. Files in binary format are
+        read in a way that every byte is one character"""
+        if PY3 and self.name:
+            self.openFile(mode="rb")
+            txt=self.decode(self.fh.read())
+        else:
+            self.openFile()
+            txt=self.fh.read()
         self.content=self.parse(txt)
         self.closeFile()
 
+    def decode(self,data):
+        """Decode the bytes of a file (for Python3). If the header says
+        that the format is binary every byte becomes one character and
+        the newlines are not translated (a byte 13 in the binary data
+        would be changed otherwise). Other files are decoded as UTF-8
+        (latin-1 if that is not possible) with universal newlines
+        :param data: the bytes that were read"""
+        if binaryFormatExpr.search(data[:headerBytes]):
+            self.encoding="latin-1"
+            return data.decode(self.encoding)
+        if self.encoding:
+            txt=data.decode(self.encoding)
+        else:
+            try:
+                txt=data.decode("utf-8")
+            except UnicodeDecodeError:
+                self.encoding="latin-1"
+                txt=data.decode(self.encoding)
+        return txt.replace("\r\n","\n").replace("\r","\n")
+
     def writeFile(self,content=None):
         """ write the whole File from memory
         :param content: content that should replace the old content"""
@@ -119,7 +152,7 @@ class FileBasis(Utilities):
     def encode(self,txt):
         """Encode a string to byte if necessary (for Python3)"""
         if PY3 and self.zipped:
-            return bytes(txt,"utf-8")
+            return bytes(txt,self.encoding if self.encoding else "utf-8")
         else:
             return txt
 
@@ -0,0 +1,441 @@
+#  ICE Revision: $Id$
+"""Field files whose internal field is only read when needed
+
+For large field files only the header and the boundary conditions are
+parsed. The internal field is located in the file and only read when its
+values are requested"""
+
+import re
+import os
+import gzip
+import shutil
+from os import path
+from tempfile import mktemp
+
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile,readNumpyList,FoamFileParser
+from PyFoam.Basics.DataStructures import Field,NumpyList,BinaryList,Unparsed,binaryElementType,binaryElementTypes
+from PyFoam.Error import error
+
+from PyFoam.ThirdParty.six import PY3
+
+# Size of the blocks in which the file is searched and copied
+blockSize=4*1024*1024
+
+# Word that replaces the internal field while parsing
+lazyPlaceholder="PyFoamLazyInternalField"
+
+headerRE=re.compile(br'FoamFile\s*\{([^}]*)\}')
+formatRE=re.compile(br'\sformat\s+(\w+)\s*;')
+archRE=re.compile(br'\sarch\s+"([^"]*)"\s*;')
+nonuniformRE=re.compile(br'\s+nonuniform\s+(List<\w+>)\s+(\d+)\s*\(')
+
+def findInFile(fh,pattern,start=0):
+    """Search a pattern in a file without reading it completely
+    :param fh: file opened in binary mode (may be a gzip-file)
+    :param pattern: the bytes to look for
+    :param start: position from which to search
+    :return: the position of the pattern or -1 if it is not found"""
+    fh.seek(start)
+    # position of the first byte in block
+    pos=start
+    block=b""
+    while True:
+        data=fh.read(blockSize)
+        if not data:
+            return -1
+        block+=data
+        found=block.find(pattern)
+        if found>=0:
+            return pos+found
+        # keep the end of the block in case the pattern spans two blocks
+        keep=min(len(pattern)-1,len(block))
+        pos+=len(block)-keep
+        block=block[len(block)-keep:]
+
+def findClosingParenthesis(fh,start):
+    """Find the parenthesis that closes a list. Parenthesis inside the
+    list (for instance of vectors) are matched by their depth
+    :param fh: file opened in binary mode (may be a gzip-file)
+    :param start: position after the opening parenthesis of the list
+    :return: the position of the closing parenthesis or -1 if it is not found"""
+    import numpy
+
+    fh.seek(start)
+    pos=start
+    depth=1
+    while True:
+        block=fh.read(blockSize)
+        if not block:
+            return -1
+        data=numpy.frombuffer(block,dtype=numpy.uint8)
+        change=(data==ord("(")).astype(numpy.int64)-(data==ord(")"))
+        levels=depth+numpy.cumsum(change)
+        closed=numpy.flatnonzero(levels==0)
+        if len(closed)>0:
+            return pos+int(closed[0])
+        depth=int(levels[-1])
+        pos+=len(block)
+
+def copyFromFile(fh,out,start,end=None):
+    """Copy a part of a file blockwise to another file
+    :param fh: file opened in binary mode to read from
+    :param out: file opened in binary mode to write to
+    :param start: position to start copying
+    :param end: position before which the copying stops. If unset the
+    rest of the file is copied"""
+    fh.seek(start)
+    if end is None:
+        while True:
+            block=fh.read(blockSize)
+            if not block:
+                return
+            out.write(block)
+    todo=end-start
+    while todo>0:
+        block=fh.read(min(blockSize,todo))
+        if not block:
+            error("Unexpected end of file while copying")
+        out.write(block)
+        todo-=len(block)
+
+def readHeaderInfo(fh):
+    """Get the information about the format from the header of a file
+    :param fh: file opened in binary mode
+    :return: tuple with the text of the header (None if no header was
+    found), a flag whether the file is binary and the arch-entry"""
+    fh.seek(0)
+    m=headerRE.search(fh.read(blockSize))
+    if not m:
+        return None,False,None
+    header=b" "+m.group(1)
+    binary=False
+    arch=None
+    f=formatRE.search(header)
+    if f and f.group(1)==b"binary":
+        binary=True
+    a=archRE.search(header)
+    if a:
+        arch=a.group(1).decode("latin-1")
+    return m.group(0),binary,arch
+
+def findEntry(fh,name,start=0):
+    """Find an entry that starts at the beginning of a line
+    :param fh: file opened in binary mode
+    :param name: the name of the entry (bytes)
+    :param start: position from which to search
+    :return: the position of the entry or -1 if it is not found"""
+    pos=start
+    while True:
+        pos=findInFile(fh,name,pos)
+        if pos<0:
+            return -1
+        fh.seek(pos+len(name))
+        if fh.read(1) in [b" ",b"\t",b"\n",b"\r",b"{"]:
+            if pos==0:
+                return pos
+            fh.seek(pos-1)
+            if fh.read(1) in [b"\n",b"\r"]:
+                return pos
+        pos+=1
+
+def locateInternalField(fh,fName,zipped):
+    """Find the position of the data of a nonuniform internal field
+    :param fh: file opened in binary mode
+    :param fName: name of the file
+    :param zipped: is the file compressed
+    :return: a tuple with a LazyField and the position after the word
+    internalField or None if the internal field can not be read lazily"""
+    header,binary,arch=readHeaderInfo(fh)
+    if header is None:
+        return None
+
+    pos=findEntry(fh,b"internalField")
+    if pos<0:
+        return None
+
+    valueStart=pos+len("internalField")
+    fh.seek(valueStart)
+    m=nonuniformRE.match(fh.read(1024))
+    if not m:
+        return None
+    name=m.group(1).decode("latin-1")
+    length=int(m.group(2))
+    dataStart=valueStart+m.end()
+
+    field=LazyField(fName,
+                    zipped,
+                    name,
+                    length,
+                    dataStart,
+                    None,
+                    binary=binary,
+                    arch=arch)
+    if binary:
+        if field.elementType is None:
+            return None
+        dtype,nrComp=BinaryList(length,
+                                "",
+                                arch=arch,
+                                elementType=field.elementType).dtype()
+        end=dataStart+length*nrComp*dtype.itemsize
+        fh.seek(end)
+        if fh.read(1)!=b")":
+            return None
+    elif field.nrComponents()==1:
+        end=findInFile(fh,b")",dataStart)
+    else:
+        end=findClosingParenthesis(fh,dataStart)
+    if end<0:
+        return None
+    field.end=end
+
+    return field,valueStart
+
+class LazyField(object):
+    """The nonuniform internal field of a LazyFieldFile. The values are
+    read from the file when they are needed for the first time. Binary
+    data from an uncompressed file is memory-mapped (copy-on-write)"""
+
+    def __init__(self,
+                 fName,
+                 zipped,
+                 name,
+                 length,
+                 start,
+                 end,
+                 binary=False,
+                 arch=None):
+        """:param fName: the file with the data
+        :param zipped: is the file compressed
+        :param name: type of the list (for instance List<vector>)
+        :param length: number of elements
+        :param start: position of the first character after the (
+        :param end: position of the closing )
+        :param binary: is the data binary
+        :param arch: the arch-entry of the header"""
+        self.fName=fName
+        self.zipped=zipped
+        self.name=name
+        self.length=length
+        self.start=start
+        self.end=end
+        self.binary=binary
+        self.arch=arch
+        self.elementType=binaryElementType(name)
+        self.data=None
+
+    def openSource(self):
+        """Open the file with the data in binary mode"""
+        if self.zipped:
+            return gzip.open(self.fName,"rb")
+        else:
+            return open(self.fName,"rb")
+
+    def isUniform(self):
+        return False
+
+    def isBinary(self):
+        return self.binary
+
+    def isLoaded(self):
+        """:return: True if the values were already read"""
+        return self.data is not None
+
+    def nrComponents(self):
+        if self.elementType is None:
+            return None
+        else:
+            return binaryElementTypes[self.elementType]
+
+    def __len__(self):
+        return self.length
+
+    def head(self):
+        """:return: the text in front of the data"""
+        return "nonuniform "+self.name+" "+str(self.length)+"("
+
+    def load(self):
+        """Read the values from the file"""
+        import numpy as np
+
+        if self.binary:
+            dtype,nrComp=BinaryList(self.length,
+                                    "",
+                                    arch=self.arch,
+                                    elementType=self.elementType).dtype()
+            shape=(self.length,) if nrComp==1 else (self.length,nrComp)
+            if self.zipped:
+                with self.openSource() as fh:
+                    fh.seek(self.start)
+                    data=bytearray(fh.read(self.end-self.start))
+                self.data=np.frombuffer(data,dtype=dtype).reshape(shape)
+            else:
+                self.data=np.memmap(self.fName,
+                                    dtype=dtype,
+                                    mode="c",
+                                    offset=self.start,
+                                    shape=shape)
+        else:
+            with self.openSource() as fh:
+                fh.seek(self.start)
+                txt=fh.read(self.end+1-self.start).decode("latin-1")
+            result=readNumpyList(txt,0,self.length)
+            if result is None:
+                parsed=FoamFileParser(str(self.length)+"("+txt,
+                                      listDict=True,
+                                      noVectorOrTensor=True).getData()
+                self.data=np.array(parsed)
+            else:
+                self.data=result[0]
+
+    def value(self):
+        """:return: the values as a numpy-array"""
+        if self.data is None:
+            self.load()
+        return self.data
+
+    def toNumpy(self,regexp=None,dtypes=None):
+        """:param regexp: Ignored. Just for compatibility with UnparsedList
+        :param dtypes: if set a structured array with these types is returned"""
+        return NumpyList(self.value()).toNumpy(dtypes=dtypes)
+
+    def setValue(self,data):
+        """Replace the values
+        :param data: array with the new values"""
+        import numpy as np
+        self.data=np.asarray(data)
+        self.length=len(self.data)
+
+    def detach(self):
+        """Make sure that the values are in memory and not mapped from the
+        file (necessary before the file is overwritten)"""
+        import numpy as np
+        if isinstance(self.data,np.memmap):
+            self.data=np.array(self.data)
+
+    def __getitem__(self,key):
+        return self.value()[key]
+
+    def __setitem__(self,key,value):
+        self.value()[key]=value
+
+    def toField(self):
+        """:return: a regular Field with the values"""
+        if self.binary:
+            val=BinaryList(self.length,"",arch=self.arch,elementType=self.elementType)
+            val.fromNumpy(self.value())
+        else:
+            val=NumpyList(self.value())
+        return Field(val,name=self.name)
+
+    def __str__(self):
+        return str(self.toField())
+
+class LazyFieldFile(ParsedParameterFile):
+    """A field file where the internal field is only read when its values
+    are accessed. If the values are never accessed then writing the file
+    copies the data of the internal field unchanged from the original"""
+
+    def __init__(self,
+                 name,
+                 backup=False,
+                 **kwargs):
+        """:param name: name of the field file
+        :param backup: create a backup-copy of the file
+        All other parameters are passed to ParsedParameterFile"""
+        ParsedParameterFile.__init__(self,
+                                     name,
+                                     backup=backup,
+                                     dontRead=True,
+                                     **kwargs)
+        self.readFile()
+
+    def readFile(self):
+        """Parse the file without the data of the internal field"""
+        self.openFile(mode="rb")
+        located=locateInternalField(self.fh,self.realName(),self.zipped)
+        if located is None:
+            self.closeFile()
+            ParsedParameterFile.readFile(self)
+            return
+
+        field,valueStart=located
+        self.fh.seek(0)
+        txt=self.fh.read(valueStart)+b" "+lazyPlaceholder.encode()
+        self.fh.seek(field.end+1)
+        txt+=self.fh.read()
+        self.closeFile()
+
+        if PY3:
+            txt=self.decode(txt)
+
+        self.content=self.parse(txt)
+        if self.content.get("internalField",None)!=lazyPlaceholder:
+            error("Internal field of",self.name,"was not parsed as expected")
+        self.content["internalField"]=field
+
+    def __split(self):
+        """Generate the text of the file with the internal field removed
+        :return: the text before and after the internal field"""
+        field=self.content["internalField"]
+        self.content["internalField"]=Unparsed(lazyPlaceholder)
+        try:
+            txt=ParsedParameterFile.__str__(self)
+        finally:
+            self.content["internalField"]=field
+        before,after=txt.split(lazyPlaceholder,1)
+        return before,after
+
+    def __str__(self):
+        field=self.content.get("internalField",None)
+        if not isinstance(field,LazyField):
+            return ParsedParameterFile.__str__(self)
+        before,after=self.__split()
+        if field.isLoaded():
+            return before+str(field)+after
+        with field.openSource() as fh:
+            fh.seek(field.start)
+            data=fh.read(field.end-field.start).decode("latin-1")
+        return before+field.head()+data+")"+after
+
+    def writeFile(self,content=None):
+        """Write the file. If the values of the internal field were not
+        accessed then they are copied blockwise from the original file"""
+        if content!=None:
+            self.content=content
+        field=self.content.get("internalField",None)
+        if not isinstance(field,LazyField) or field.isLoaded() or not self.name:
+            if isinstance(field,LazyField):
+                field.detach()
+            ParsedParameterFile.writeFile(self)
+            return
+
+        if PY3 and self.header and self.header.get("format",None)=="binary":
+            self.encoding="latin-1"
+        encoding=self.encoding if self.encoding else "utf-8"
+
+        before,after=self.__split()
+        before=(before+field.head()).encode(encoding)
+        after=(")"+after).encode(encoding)
+
+        fn=mktemp(dir=path.dirname(self.name))
+        if self.zipped:
+            out=gzip.open(fn,"wb")
+        else:
+            out=open(fn,"wb")
+        with field.openSource() as fh:
+            out.write(before)
+            copyFromFile(fh,out,field.start,field.end)
+            out.write(after)
+        out.close()
+
+        if path.exists(self.realName()):
+            shutil.copymode(self.realName(),fn)
+        os.rename(fn,self.realName())
+
+        if path.abspath(self.realName())==path.abspath(field.fName):
+            # the data is now at a different position in the file
+            field.end=len(before)+field.end-field.start
+            field.start=len(before)
+
+# Should work with Python3 and Python2
@@ -9,6 +9,8 @@ from PyFoam.RunDictionary.ParsedParameterFile import ParsedFileHeader
 from os import path
 import re
 
+noteExpr=re.compile('(nPoints|nCells|nFaces|nInternalFaces): *([0-9]+)')
+
 class MeshInformation:
     """Reads Information about the mesh on demand"""
     
@@ -24,23 +26,48 @@ class MeshInformation:
         self.time=time
         self.processor=processor
         
+    def __ownerHeader(self):
+        """The sizes from the note in the header of the owner-file.
+        OpenFOAM writes the number of points, cells and faces there. Only
+        the header is read"""
+        try:
+            return self.ownerHeader
+        except AttributeError:
+            self.ownerHeader={}
+            try:
+                try:
+                    owner=ParsedFileHeader(path.join(self.sol.polyMeshDir(time=self.time,processor=self.processor),"owner"))
+                except IOError:
+                    owner=ParsedFileHeader(path.join(self.sol.polyMeshDir(processor=self.processor),"owner"))
+                for k,v in noteExpr.findall(owner["note"]):
+                    self.ownerHeader[k]=int(v)
+            except Exception:
+                pass
+            return self.ownerHeader
+
     def nrOfFaces(self):
         try:
             return self.faces
         except AttributeError:
+            if "nFaces" in self.__ownerHeader():
+                self.faces=self.__ownerHeader()["nFaces"]
+                return self.faces
             try:
                 faces=ListFile(self.sol.polyMeshDir(time=self.time,processor=self.processor),"faces")
                 self.faces=faces.getSize()
             except IOError:
                 faces=ListFile(self.sol.polyMeshDir(processor=self.processor),"faces")
                 self.faces=faces.getSize()
-                
+
             return self.faces
 
     def nrOfPoints(self):
         try:
             return self.points
         except AttributeError:
+            if "nPoints" in self.__ownerHeader():
+                self.points=self.__ownerHeader()["nPoints"]
+                return self.points
             try:
                 points=ListFile(self.sol.polyMeshDir(time=self.time,processor=self.processor),"points")
                 self.points=points.getSize()
@@ -54,14 +81,7 @@ class MeshInformation:
         try:
             return self.cells
         except:
-            try:
-                try:
-                    owner=ParsedFileHeader(path.join(self.sol.polyMeshDir(time=self.time,processor=self.processor),"owner"))
-                except IOError:
-                    owner=ParsedFileHeader(path.join(self.sol.polyMeshDir(processor=self.processor),"owner"))
-
-                mat=re.compile('.+nCells: *([0-9]+) .+').match(owner["note"])
-                self.cells=int(mat.group(1))
+            if "nCells" in self.__ownerHeader():
+                self.cells=self.__ownerHeader()["nCells"]
                 return self.cells
-            except:
-                raise PyFoamException("Not Implemented")
+            raise PyFoamException("Not Implemented")
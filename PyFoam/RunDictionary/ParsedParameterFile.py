@@ -5,15 +5,17 @@ from PyFoam.RunDictionary.FileBasis import FileBasisBackup
 from PyFoam.Basics.PlyParser import PlyParser
 from PyFoam.Basics.FoamFileGenerator import FoamFileGenerator
 
-from PyFoam.Basics.DataStructures import Vector,Field,Dimension,DictProxy,TupleProxy,Tensor,SymmTensor,Unparsed,UnparsedList,Codestream,DictRedirection,BinaryBlob,BinaryList,BoolProxy
+from PyFoam.Basics.DataStructures import Vector,Field,Dimension,DictProxy,TupleProxy,Tensor,SymmTensor,Unparsed,UnparsedList,Codestream,DictRedirection,BinaryBlob,BinaryList,BoolProxy,NumpyList,binaryElementType
 
 from PyFoam.Error import error,warning,FatalErrorPyFoamException
 
 from os import path
 from copy import deepcopy
 import sys
+import re
+import warnings
 
-from PyFoam.ThirdParty.six import print_,integer_types,iteritems,string_types
+from PyFoam.ThirdParty.six import print_,integer_types,iteritems,string_types,PY3
 
 class ParsedParameterFile(FileBasisBackup):
     """ Parameterfile whose complete representation is read into
@@ -27,6 +29,7 @@ class ParsedParameterFile(FileBasisBackup):
                  listDict=False,
                  listDictWithHeader=False,
                  listLengthUnparsed=None,
+                 listLengthNumpy=None,
                  preserveComments=True,
                  noHeader=False,
                  binaryMode=False,
@@ -44,6 +47,8 @@ class ParsedParameterFile(FileBasisBackup):
         :param listDict: the file only contains a list
         :param listDictWithHeader: the file only contains a list and a header
         :param listLengthUnparsed: Lists longer than that length are not parsed
+        :param listLengthNumpy: Lists of numbers, vectors or tensors longer
+        than that length are read directly into numpy-arrays
         :param binaryMode: Parse long lists in binary mode (to be overridden by
         the settings in the header).
         :param treatBinaryAsASCII: even if the header says that this is a
@@ -70,6 +75,7 @@ class ParsedParameterFile(FileBasisBackup):
         self.listDict=listDict
         self.listDictWithHeader=listDictWithHeader
         self.listLengthUnparsed=listLengthUnparsed
+        self.listLengthNumpy=listLengthNumpy
         self.doMacros=doMacroExpansion
         self.preserveComments=preserveComments
         self.noVectorOrTensor=noVectorOrTensor
@@ -94,6 +100,7 @@ class ParsedParameterFile(FileBasisBackup):
                                   listDict=self.listDict,
                                   listDictWithHeader=self.listDictWithHeader,
                                   listLengthUnparsed=self.listLengthUnparsed,
+                                  listLengthNumpy=self.listLengthNumpy,
                                   noHeader=self.noHeader,
                                   noBody=self.noBody,
                                   preserveComments=self.preserveComments,
@@ -113,6 +120,7 @@ class ParsedParameterFile(FileBasisBackup):
                                       listDict=self.listDict,
                                       listDictWithHeader=self.listDictWithHeader,
                                       listLengthUnparsed=self.listLengthUnparsed,
+                                      listLengthNumpy=self.listLengthNumpy,
                                       noHeader=self.noHeader,
                                       noBody=self.noBody,
                                       preserveComments=self.preserveComments,
@@ -130,6 +138,13 @@ class ParsedParameterFile(FileBasisBackup):
 
         return self.content
 
+    def writeFile(self,content=None):
+        """Write the file. Binary files are written so that every
+        character of the binary data is one byte"""
+        if PY3 and self.header and self.header.get("format",None)=="binary":
+            self.encoding="latin-1"
+        FileBasisBackup.writeFile(self,content)
+
     def __contains__(self,key):
         return key in self.content
 
@@ -206,6 +221,72 @@ class Enumerate(object):
 
 inputModes=Enumerate(["merge","error","warn","protect","overwrite","default"])
 
+# Lists that only contain numbers or only contain tuples of numbers
+_numberListRE=re.compile(r'[-+.0-9eE\s]*(?=\))')
+_firstTupleRE=re.compile(r'\s*\(([-+.0-9eE\s]*)\)')
+# lists of tuples with the same number of components. Built when needed
+_tupleListREs={}
+
+def _tupleListRE(nrComponents):
+    """Regular expression that matches a list of tuples that all have
+    the same number of components"""
+    try:
+        return _tupleListREs[nrComponents]
+    except KeyError:
+        number=r'[-+.0-9eE]+'
+        tupleRE=r'\s*\(\s*'+number+(r'\s+'+number)*(nrComponents-1)+r'\s*\)'
+        _tupleListREs[nrComponents]=re.compile(r'(?:'+tupleRE+r')*\s*(?=\))')
+        return _tupleListREs[nrComponents]
+
+def readNumpyList(data,start,length):
+    """Read a list of numbers or of vectors/tensors directly into a
+    numpy-array without going through the parser
+    :param data: the string with the list
+    :param start: position after the opening bracket of the list
+    :param length: the expected number of elements
+    :return: tuple with the array and the position of the closing bracket.
+    None if the list can not be read that way"""
+    import numpy as np
+
+    nrTuples=None
+    m=_numberListRE.match(data,start)
+    if m is None:
+        first=_firstTupleRE.match(data,start)
+        if first is None or len(first.group(1).split()) not in [3,6,9]:
+            return None
+        m=_tupleListRE(len(first.group(1).split())).match(data,start)
+        if m is None:
+            return None
+        text=data[start:m.end()]
+        nrTuples=text.count("(")
+        if nrTuples!=length:
+            return None
+        text=text.replace("("," ").replace(")"," ")
+    else:
+        text=data[start:m.end()]
+
+    if text.find(".")<0 and text.find("e")<0 and text.find("E")<0:
+        dtype=np.int64
+    else:
+        dtype=np.float64
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            values=np.fromstring(text,dtype=dtype,sep=" ")
+        except (ValueError,DeprecationWarning):
+            return None
+
+    if nrTuples is None:
+        if len(values)!=length:
+            return None
+    else:
+        if length==0 or len(values)%length!=0 or len(values)//length not in [3,6,9]:
+            return None
+        values=values.reshape((length,len(values)//length))
+
+    return values,m.end()
+
 class NotAPrelist:
     """Class to return if the length of the prelist does not fit the prefix"""
     def __init__(self,a,b):
@@ -230,6 +311,7 @@ class FoamFileParser(PlyParser):
                  listDict=False,
                  listDictWithHeader=False,
                  listLengthUnparsed=None,
+                 listLengthNumpy=None,
                  binaryMode=False,
                  treatBinaryAsASCII=False,
                  duplicateCheck=False,
@@ -240,6 +322,8 @@ class FoamFileParser(PlyParser):
         :param fName: Name of the actual file (if any)
         :param debug: output debug information during parsing
         :param noHeader: switch that turns off the parsing of the header
+        :param listLengthNumpy: Lists of numbers, vectors or tensors longer
+        than that are read into numpy-arrays
         :param duplicateCheck: Check for duplicates in dictionaries
         :param duplicateFail: Fail if a duplicate is discovered"""
 
@@ -250,6 +334,7 @@ class FoamFileParser(PlyParser):
         self.header=None
         self.debug=debug
         self.listLengthUnparsed=listLengthUnparsed
+        self.listLengthNumpy=listLengthNumpy
         self.doMacros=doMacroExpansion
         self.preserveComments=preserveComments
         self.preserveNewLines=preserveNewlines
@@ -258,6 +343,8 @@ class FoamFileParser(PlyParser):
         self.noVectorOrTensor=noVectorOrTensor
         self.inHeader=True
         self.inBinary=False
+        self.binaryArch=None
+        self.headerClass=None
         self.checkPrelistLength=True
 
         # Make sure that the first comment is discarded
@@ -433,6 +520,7 @@ class FoamFileParser(PlyParser):
         'CODESTART',
         'CODEEND',
         'BINARYBLOB',
+        'NUMPYLIST',
         'RESTOFLINE',
     )
 
@@ -460,6 +548,7 @@ class FoamFileParser(PlyParser):
         ('codestream', 'exclusive'),
         ('mlcomment', 'exclusive'),
         ('binaryblob', 'exclusive'),
+        ('numpylist', 'exclusive'),
         ('ignorerestofline', 'exclusive'),
         )
 
@@ -517,6 +606,23 @@ class FoamFileParser(PlyParser):
         print_("Error binaryblob",t.lexer.lexdata[t.lexer.lexpos])
         t.lexer.skip(1)
 
+    t_numpylist_ignore = ''
+
+    def t_numpylist_chunk(self,t):
+        r'[\s\S]'
+        # the list was already read when the prelist was found
+        t.value = t.lexer.numpy_value
+        t.lexer.lineno += t.lexer.lexdata.count('\n',t.lexpos,t.lexer.numpy_end)
+        t.lexer.lexpos = t.lexer.numpy_end
+        t.lexer.numpy_value = None
+        t.type = "NUMPYLIST"
+        t.lexer.begin('INITIAL')
+        return t
+
+    def t_numpylist_error(self,t):
+        print_("Error numpylist",t.lexer.lexdata[t.lexer.lexpos])
+        t.lexer.skip(1)
+
     def t_codestream_end(self,t):
         r"\#\}"
         t.value = t.lexer.lexdata[t.lexer.code_start:t.lexer.lexpos-2]
@@ -892,6 +998,10 @@ class FoamFileParser(PlyParser):
         '''binaryblob : BINARYBLOB'''
         p[0] = BinaryBlob(p[1])
 
+    def p_numpylist(self,p):
+        '''numpylist : NUMPYLIST'''
+        p[0] = NumpyList(p[1])
+
     def p_prelist_seen(self,p):
         '''prelist_seen : '''
         if self.binaryMode:
@@ -899,11 +1009,23 @@ class FoamFileParser(PlyParser):
                 p.lexer.binary_start = p.lexer.lexpos
                 p.lexer.binary_listlen = p[-1]
                 self.inBinary=True
+        elif self.listLengthNumpy!=None and \
+             int(p[-1])>=self.listLengthNumpy and \
+             p.lexer.lexdata[p.lexer.lexpos-1]=='(':
+            result=readNumpyList(p.lexer.lexdata,p.lexer.lexpos,int(p[-1]))
+            if result is not None:
+                p.lexer.begin('numpylist')
+                p.lexer.numpy_value,p.lexer.numpy_end=result
+            elif self.listLengthUnparsed!=None:
+                self.startUnparsed(p)
         elif self.listLengthUnparsed!=None:
-            if int(p[-1])>=self.listLengthUnparsed:
-                p.lexer.begin('unparsed')
-                p.lexer.level=0
-                p.lexer.code_start = p.lexer.lexpos
+            self.startUnparsed(p)
+
+    def startUnparsed(self,p):
+        if int(p[-1])>=self.listLengthUnparsed:
+            p.lexer.begin('unparsed')
+            p.lexer.level=0
+            p.lexer.code_start = p.lexer.lexpos
 
     def p_codestream(self,p):
         '''codestream : codeSeen CODESTART CODESTREAMCHUNK CODEEND '''
@@ -926,11 +1048,17 @@ class FoamFileParser(PlyParser):
         '''prelist : integer prelist_seen '(' itemlist ')'
                    | integer prelist_seen '(' binaryblob ')'
                    | integer prelist_seen '(' unparsed ')'
+                   | integer prelist_seen '(' numpylist ')'
                    | integer prelist_seen '{' item '}' '''
         if type(p[4])==Unparsed:
             p[0] = UnparsedList(int(p[1]),p[4].data)
+        elif type(p[4])==NumpyList:
+            p[0] = p[4]
         elif type(p[4])==BinaryBlob:
-            p[0] = BinaryList(int(p[1]),p[4].data)
+            p[0] = BinaryList(int(p[1]),
+                              p[4].data,
+                              arch=self.binaryArch,
+                              elementType=binaryElementType(self.headerClass))
         elif p[5]=='}':
             p[0]=[ p[4] ]*int(p[1])
         else:
@@ -1056,6 +1184,10 @@ class FoamFileParser(PlyParser):
                 self.binaryMode=False
             else:
                 raise FatalErrorPyFoamException("Don't know how to parse file format",p[0]["format"])
+        elif len(p)==4 and self.inHeader and p[1]=="arch":
+            self.binaryArch=str(p[2]).strip('"')
+        elif len(p)==4 and self.inHeader and p[1]=="class":
+            self.headerClass=str(p[2])
 
         if len(p)==4 and type(p[2])==list:
             # remove the prefix from long lists (if present)
@@ -1163,6 +1295,8 @@ class FoamFileParser(PlyParser):
                       | NONUNIFORM prelist
                       | NONUNIFORM NAME prelist'''
         if len(p)==4:
+            if type(p[3])==BinaryList and binaryElementType(p[2]):
+                p[3].elementType=binaryElementType(p[2])
             if isinstance(p[3],(NotAPrelist,)):
                 p[0] = Field(p[3].b,name=p[2])
             else:
@@ -1336,11 +1470,42 @@ class ParsedBoundaryDict(ParsedParameterFile):
         return string
 
 class ParsedFileHeader(ParsedParameterFile):
-    """Only parse the header of a file"""
+    """Only parse the header of a file. Only the beginning of the file
+    is read"""
 
     def __init__(self,name):
         ParsedParameterFile.__init__(self,name,backup=False,noBody=True)
 
+    def __readHeader(self):
+        """Read lines until the FoamFile-dictionary is closed"""
+        txt=""
+        while True:
+            l=self.fh.readline()
+            if PY3 and self.zipped:
+                l=str(l,self.encoding if self.encoding else "utf-8")
+            if len(l)==0:
+                break
+            txt+=l
+            start=txt.find("FoamFile")
+            if start>=0 and txt.find("}",start)>=0:
+                break
+        return txt
+
+    def readFile(self):
+        """Read the file up to the end of the header"""
+        self.openFile()
+        try:
+            txt=self.__readHeader()
+        except UnicodeDecodeError:
+            if self.encoding=="latin-1" or not self.name:
+                raise
+            self.closeFile()
+            self.encoding="latin-1"
+            self.openFile()
+            txt=self.__readHeader()
+        self.content=self.parse(txt)
+        self.closeFile()
+
     def __getitem__(self,name):
         return self.header[name]
 
@@ -1,12 +1,92 @@
 #  ICE Revision: $Id:$
-"""Working with a directory of samples"""
+"""Working with a directory of samples
 
+Sample files are parsed only once. The parsed columns are kept in a
+cache that is shared by all the objects in a process"""
+
+import os
+import threading
 from os import path,listdir
+from collections import OrderedDict
 from PyFoam.Error import error
 import math
 import re
 
 from PyFoam.Basics.SpreadsheetData import SpreadsheetData
+from PyFoam.RunDictionary.DirectoryIndex import listing
+
+# maximum number of values (summed over all files) that are kept in
+# the cache of parsed sample files
+maxCachedValues=10000000
+
+class SampleFileData(object):
+    """All the columns of a sample file"""
+
+    def __init__(self,fName):
+        """:param fName: name of the file"""
+        import numpy
+
+        with open(fName) as f:
+            lines=[l for l in f.read().splitlines()
+                   if l.strip()!="" and l.lstrip()[0]!='#']
+        lengths=[len(l.split()) for l in lines]
+
+        #: items in the first line
+        self.firstLine=lines[0].split() if len(lines)>0 else None
+        #: the different numbers of items in the lines
+        self.lengths=set(lengths)
+        # columns that are not in every line are not used
+        width=min(self.lengths) if len(lines)>0 else 0
+        try:
+            if len(self.lengths)>1:
+                values=numpy.array([l.split()[:width] for l in lines],dtype=float)
+            else:
+                values=numpy.fromstring(" ".join(lines),sep=" ")
+            #: 2D-array with the columns that are in all lines
+            self.columns=values.reshape(len(lines),width)
+        except ValueError:
+            error("File",fName,"has data that are not numbers")
+
+_samples=OrderedDict()
+_samplesLock=threading.Lock()
+_samplesSize=[0]
+
+def sampleFileData(fName):
+    """Get the parsed data of a sample file. The file is only parsed if
+    it changed since the last time
+    :param fName: name of the file
+    :return: a SampleFileData-object"""
+    fName=path.abspath(fName)
+    st=os.stat(fName)
+    signature=(st.st_ino,st.st_size,getattr(st,"st_mtime_ns",st.st_mtime))
+    with _samplesLock:
+        old=_samples.get(fName,None)
+        if old is not None and old[0]==signature:
+            _samples.pop(fName)
+            _samples[fName]=old
+            return old[1]
+    data=SampleFileData(fName)
+    with _samplesLock:
+        old=_samples.pop(fName,None)
+        if old is not None:
+            _samplesSize[0]-=old[1].columns.size
+        _samples[fName]=(signature,data)
+        _samplesSize[0]+=data.columns.size
+        while _samplesSize[0]>maxCachedValues and len(_samples)>1:
+            _samplesSize[0]-=_samples.popitem(last=False)[1][1].columns.size
+    return data
+
+def invalidate(fName=None):
+    """Forget the parsed data of a sample file
+    :param fName: the file. If unset the data of all files is removed"""
+    with _samplesLock:
+        if fName is None:
+            _samples.clear()
+            _samplesSize[0]=0
+        else:
+            old=_samples.pop(path.abspath(fName),None)
+            if old is not None:
+                _samplesSize[0]-=old[1].columns.size
 
 class SampleDirectory(object):
     """A directory of sampled times"""
@@ -44,6 +124,9 @@ class SampleDirectory(object):
         self.prefixes=prefixes
         self.postfixes=postfixes
 
+        # SampleTime-objects and the listings of their directories
+        self.__sampleTimes={}
+
         for d in listdir(self.dir):
             if path.isdir(path.join(self.dir,d)):
                 try:
@@ -59,27 +142,27 @@ class SampleDirectory(object):
 
     def __iter__(self):
         for t in self.times:
-            yield SampleTime(self.dir,
-                             t,
-                             prefixes=self.prefixes,
-                             postfixes=self.postfixes,
-                             valueNames=self.__defaultNames,
-                             namesFromFirstLine=self.__namesFromFirstLine,
-                             linePattern=self.__linePattern,
-                             needsExtension=self.__needsExtension)
+            yield self[t]
 
     def __getitem__(self,time):
-        if time in self:
-            return SampleTime(self.dir,
-                              time,
-                              prefixes=self.prefixes,
-                              postfixes=self.postfixes,
-                              valueNames=self.__defaultNames,
-                              namesFromFirstLine=self.__namesFromFirstLine,
-                              linePattern=self.__linePattern,
-                              needsExtension=self.__needsExtension)
-        else:
+        """The SampleTime-object for a time. The object is reused as long
+        as the directory of the time is not changed"""
+        if time not in self:
             raise KeyError(time)
+        current=listing(path.join(self.dir,time))
+        old=self.__sampleTimes.get(time,None)
+        if old is not None and old[0] is current:
+            return old[1]
+        st=SampleTime(self.dir,
+                      time,
+                      prefixes=self.prefixes,
+                      postfixes=self.postfixes,
+                      valueNames=self.__defaultNames,
+                      namesFromFirstLine=self.__namesFromFirstLine,
+                      linePattern=self.__linePattern,
+                      needsExtension=self.__needsExtension)
+        self.__sampleTimes[time]=(current,st)
+        return st
 
     def __contains__(self,time):
         return time in self.times
@@ -138,10 +221,14 @@ class SampleDirectory(object):
         sets=[]
 
         for t in time:
+            try:
+                st=self[t]
+            except KeyError:
+                continue
             for l in line:
                 for v in value:
                     try:
-                        d=self[t][(l,v)]
+                        d=st[(l,v)]
                         if d==None:
                             continue
                         d.note=note
@@ -184,6 +271,14 @@ class SampleTime(object):
         self.__linePattern=linePattern
         self.__namesFromFirstLine=namesFromFirstLine
 
+        if linePattern:
+            self.__lineExpr=re.compile(linePattern)
+
+        # the file for a line and a value
+        self.files={}
+        # the values in a file
+        self.__fileValues={}
+
         for f in listdir(self.dir):
             if f[0]=='.' or f[-1]=='~' or (f.find(".")<0 and needsExtension):
                 continue
@@ -191,23 +286,23 @@ class SampleTime(object):
             if nm==None:
                 continue
             vals=self.extractValues(f)
+            self.__fileValues[f]=vals
             if nm not in self.lines:
                 self.lines.append(nm)
             for v in vals:
                 if v not in self.values:
                     self.values.append(v)
+                if (nm,v) not in self.files:
+                    self.files[(nm,v)]=f
 
         self.lines.sort()
         self.values.sort()
 
-        self.cache={}
-
     def extractLine(self,fName):
         """Extract the name of the line from a filename"""
         if self.__linePattern:
-            expr=re.compile(self.__linePattern)
             try:
-                return expr.match(fName).groups(1)[0]
+                return self.__lineExpr.match(fName).groups(1)[0]
             except AttributeError:
                 return None
         else:
@@ -216,6 +311,9 @@ class SampleTime(object):
     def extractValues(self,fName):
         """Extracts the names of the contained Values from a filename"""
 
+        if fName in self.__fileValues:
+            return self.__fileValues[fName]
+
         if self.__defaultValueNames:
             self.__valueNames=self.__defaultValueNames[:]
             return self.__valueNames
@@ -250,66 +348,50 @@ class SampleTime(object):
         return self.__valueNames
 
     def __getitem__(self,key):
-        """Get the data for a value on a specific line
+        """Get the data for a value on a specific line. The parsed file
+        comes from the cache of sample files (which notices if the file
+        was rewritten)
         :param key: A tuple with the line-name and the value-name
         :returns: A SampleData-object"""
 
-        if key in self.cache:
-            return self.cache[key]
-
         line,val=key
         if line not in self.lines or val not in self.values:
             raise KeyError(key)
 
-        fName=None
-
-        for f in listdir(self.dir):
-            if line==self.extractLine(f) and val in self.extractValues(f):
-                fName=f
-                break
+        fName=self.files.get(key,None)
 
         if fName==None:
             error("Can't find a file for the line",line,"and the value",val,"in the directory",self.dir)
 
-        first=True
-        coord=[]
-        data=[]
-        index=None
-
-        for l in open(path.join(self.dir,fName)).readlines():
-            if l.strip()[0]=='#':
-                continue
+        sample=sampleFileData(path.join(self.dir,fName))
+        if sample.firstLine is None:
+            return None
 
-            tmp=l.split()
-            if self.__defaultValueNames:
-                if len(tmp)!=len(self.__defaultValueNames)+1:
-                    error("Number of items in line",l,
+        if self.__defaultValueNames:
+            for n in sample.lengths:
+                if n!=len(self.__defaultValueNames)+1:
+                    error("Number of items in a line of",fName,
                           "is not consistent with predefined name",
                           self.__defaultValueNames)
-            if first:
-                first=False
-                vector,index=self.determineIndex(fName,val,tmp)
 
-            coord.append(float(tmp[0]))
-            try:
-                if vector:
-                    data.append(tuple(map(float,tmp[index:index+3])))
-                else:
-                    data.append(float(tmp[index]))
-            except IndexError:
-                raise KeyError(key)
-
-        if index!=None:
-            self.cache[key]=SampleData(fName=path.join(self.dir,fName),
-                                       name=val,
-                                       line=self.extractLine(fName),
-                                       index=index,
-                                       coord=coord,
-                                       data=data)
-
-            return self.cache[key]
+        vector,index=self.determineIndex(fName,val,sample.firstLine)
+        columns=sample.columns
+        if index+(3 if vector else 1)>columns.shape[1]:
+            # some lines are too short
+            raise KeyError(key)
+
+        coord=columns[:,0].tolist()
+        if vector:
+            data=[tuple(v) for v in columns[:,index:index+3].tolist()]
         else:
-            return None
+            data=columns[:,index].tolist()
+
+        return SampleData(fName=path.join(self.dir,fName),
+                          name=val,
+                          line=self.extractLine(fName),
+                          index=index,
+                          coord=coord,
+                          data=data)
 
     def determineIndex(self,fName,vName,data):
         """Determines the index of the data from the filename and a dataset
@@ -7,18 +7,18 @@ from PyFoam.Error import warning,error
 from PyFoam import configuration as conf
 
 from PyFoam.RunDictionary.TimeDirectory import TimeDirectory
+from PyFoam.RunDictionary.DirectoryIndex import listing,invalidate,closestTime
 from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile,WriteParameterFile
 
 from PyFoam.Basics.DataStructures import DictProxy
 
 from PyFoam.ThirdParty.six import print_
 
-from os import listdir,path,mkdir,stat,environ
+from os import listdir,path,mkdir,environ
 from platform import uname
 from time import asctime
-from stat import ST_CTIME
 import tarfile,fnmatch,glob
-import re,os
+import os
 
 try:
     from os import getlogin
@@ -65,7 +65,7 @@ class SolutionDirectory(Utilities):
         self.parallel=parallel
         self.tolerant=tolerant
 
-        self.lastReread=0
+        self.timesListing=None
         self.reread()
 
         self.dirPrefix=''
@@ -111,21 +111,26 @@ class SolutionDirectory(Utilities):
         self.addPostprocDir(".")
         self.addPostprocDir("postProcessing",fail=False)
 
+    def __meshRegions(self):
+        """Directories in constant that have a polyMesh-directory"""
+        constant=listing(self.constantDir())
+        if constant is None:
+            error(self.constantDir(),"does not exist")
+        regions=[]
+        for f in constant.directories():
+            sub=listing(path.join(self.constantDir(),f))
+            if sub is not None and sub.isDir("polyMesh"):
+                regions.append(f)
+        return regions
+
     def regions(self):
         """Detect sub-region cases by looking through constant and finding
         directories with polyMesh-directories"""
-        regions=[]
-        for f in listdir(self.constantDir()):
-            fName=path.join(self.constantDir(),f)
-            if path.isdir(fName):
-                pF=path.join(fName,"polyMesh")
-                if path.exists(pF) and path.isdir(pF):
-                    if self.region is None:
-                        regions.append(f)
-                    else:
-                        # sub-regions. Do they even exist?
-                        regions.append(path.join(self.region,f))
-        return regions
+        if self.region is None:
+            return self.__meshRegions()
+        else:
+            # sub-regions. Do they even exist?
+            return [path.join(self.region,f) for f in self.__meshRegions()]
 
     def setToParallel(self):
         """Use the parallel times instead of the serial.
@@ -219,24 +224,7 @@ class SolutionDirectory(Utilities):
         Otherwise an exact match will be searched"""
         self.reread()
 
-        time=float(item)
-        result=None
-
-        if minTime:
-            result=0
-            for i in range(1,len(self.times)):
-                if abs(float(self.times[result])-time)>abs(float(self.times[i])-time):
-                    result=i
-        else:
-            for i in range(len(self.times)):
-                t=self.times[i]
-                if abs(float(t)-time)<1e-6:
-                    if result==None:
-                        result=i
-                    elif abs(float(t)-time)<abs(float(self.times[result])-time):
-                        result=i
-
-        return result
+        return closestTime(self.timeValues,float(item),minTime=minTime)
 
     def fullPath(self,time):
         if self.dirPrefix:
@@ -531,77 +519,57 @@ class SolutionDirectory(Utilities):
 
     def getParallelTimes(self):
         """Get a list of the times in the processor0-directory"""
-        result=[]
-
-        proc0=path.join(self.name,"processor0")
-        if path.exists(proc0):
-            for f in listdir(proc0):
-                try:
-                    val=float(f)
-                    result.append(f)
-                except ValueError:
-                    pass
-        result.sort(key=float)
-        return result
+        proc0=listing(path.join(self.name,"processor0"))
+        if proc0 is None:
+            return []
+        return list(proc0.times())
 
     def reread(self,force=False):
-        """Rescan the directory for the time directories"""
+        """Rescan the directory for the time directories. The listings of
+        the directories are shared with other objects and only redone if
+        the directories changed (see DirectoryIndex)
+        :param force: scan the directories even if they seem unchanged"""
 
         if force:
-            del self.procDirs
+            invalidate(self.name)
 
-        if not force and stat(self.name)[ST_CTIME]<=self.lastReread:
-            return
-
-        self.times=[]
-        self.first=None
-        self.firstParallel=None
-        self.last=None
-        procDirs = self.processorDirs()
-        self.procNr=len(procDirs)
+        caseListing=listing(self.name)
+        if caseListing is None:
+            error(self.name,"does not exist")
+        procDirs=caseListing.processorDirs()
 
+        timesListing=caseListing
         if procDirs and self.parallel:
-            timesDir = path.join(self.name, procDirs[0])
-        else:
-            timesDir = self.name
+            if force:
+                invalidate(path.join(self.name,procDirs[0]))
+            timesListing=listing(path.join(self.name,procDirs[0])) or caseListing
 
-        for f in listdir(timesDir):
-            try:
-                val=float(f)
-                self.times.append(f)
-            except ValueError:
-                pass
+        self.procDirs=procDirs
+        self.procNr=len(procDirs)
 
-        self.lastReread=stat(self.name)[ST_CTIME]
+        if timesListing is self.timesListing:
+            return
+        self.timesListing=timesListing
+
+        self.times=list(timesListing.times())
+        self.timeValues=timesListing.timeValues()
+        self.first=None
+        self.last=None
+        self.firstParallel=None
 
-        self.times.sort(key=float)
         if self.times:
             self.first = self.times[0]
             self.last = self.times[-1]
 
-        if self.parallel and len(procDirs)>0:
-            parTimes=[]
-            for f in listdir(path.join(self.name, procDirs[0])):
-                try:
-                    val=float(f)
-                    parTimes.append(f)
-                except ValueError:
-                    pass
-            if len(parTimes)>0:
-                self.firstParallel=min(parTimes)
+        if self.parallel and len(procDirs)>0 and timesListing is not caseListing:
+            self.firstParallel=self.first
 
     def processorDirs(self):
         """List with the processor directories"""
-        try:
-            return self.procDirs
-        except:
-            pass
-        self.procDirs=[]
-        for f in listdir(self.name):
-            if re.compile("processor[0-9]+").match(f):
-                self.procDirs.append(f)
-        self.procDirs.sort(key=lambda x:int(x[len("processor"):]))
-        return self.procDirs
+        caseListing=listing(self.name)
+        if caseListing is None:
+            return []
+        return caseListing.processorDirs()
 
     def nrProcs(self):
         """The number of directories with processor-data"""
@@ -693,6 +661,11 @@ class SolutionDirectory(Utilities):
             if keepInterval<=0:
                 error("The keeping interval",keepInterval,"is smaller that 0")
 
+        # the times as they were before anything was removed. Indices of
+        # the times that are closest to the times that should be kept
+        timeValues=self.timeValues
+        keepIndices=set(closestTime(timeValues,float(k),True) for k in keepTimes)
+
         if not keepRegular:
             for f in self.times:
                 keep=False
@@ -700,9 +673,8 @@ class SolutionDirectory(Utilities):
                     thisIndex=int((float(f)+1e-10)/keepInterval)
                     if thisIndex!=lastKeptIndex:
                         keep=True
-                for k in keepTimes:
-                    if self.timeIndex(float(f),True)==self.timeIndex(k,True):
-                        keep=True
+                if keepIndices and closestTime(timeValues,float(f),True) in keepIndices:
+                    keep=True
                 if float(f)>time and not (keepLast and f==last) and not keep:
                     #                   print "Removing",path.join(self.name,f)
                     if path.exists(path.join(self.name,f)):
@@ -722,36 +694,32 @@ class SolutionDirectory(Utilities):
         if self.nrProcs() and not keepParallel and not self.firstParallel is None:
             lastKeptIndex=int(-1e5)
             time=max(time,float(self.firstParallel))
-            for f in listdir(self.name):
-                if re.compile("processor[0-9]+").match(f):
-                    if removeProcs:
-                        if verbose:
-                            print_("Clearing",path.join(self.name,f))
-                        if not dryRun:
-                            self.rmtree(path.join(self.name,f))
-                    else:
-                        pDir=path.join(self.name,f)
-                        for t in listdir(pDir):
-                            try:
-                                keep=False
-                                val=float(t)
-                                if keepInterval!=None:
-                                    thisIndex=int((float(t)+1e-10)/keepInterval)
-                                    if thisIndex!=lastKeptIndex:
-                                        keep=True
-                                for k in keepTimes:
-                                    if self.timeIndex(val,True)==self.timeIndex(k,True):
-                                        keep=True
-                                if val>time and not (keepLast and t==last) and not keep:
-                                    if path.exists(path.join(pDir,t)):
-                                        if verbose:
-                                            print_("Clearing",path.join(pDir,t))
-                                        if not dryRun:
-                                            self.rmtree(path.join(pDir,t))
-                                elif keepInterval!=None:
-                                    lastKeptIndex=int((float(t)+1e-10)/keepInterval)
-                            except ValueError:
-                                pass
+            for f in self.processorDirs():
+                if removeProcs:
+                    if verbose:
+                        print_("Clearing",path.join(self.name,f))
+                    if not dryRun:
+                        self.rmtree(path.join(self.name,f))
+                else:
+                    pDir=path.join(self.name,f)
+                    pListing=listing(pDir)
+                    if pListing is None:
+                        continue
+                    for t,val in zip(pListing.times(),pListing.timeValues()):
+                        keep=False
+                        if keepInterval!=None:
+                            thisIndex=int((val+1e-10)/keepInterval)
+                            if thisIndex!=lastKeptIndex:
+                                keep=True
+                        if keepIndices and closestTime(timeValues,val,True) in keepIndices:
+                            keep=True
+                        if val>time and not (keepLast and t==last) and not keep:
+                            if verbose:
+                                print_("Clearing",path.join(pDir,t))
+                            if not dryRun:
+                                self.rmtree(path.join(pDir,t))
+                        elif keepInterval!=None:
+                            lastKeptIndex=int((val+1e-10)/keepInterval)
 
         if functionObjectData:
             cd=ParsedParameterFile(self.controlDict(),doMacroExpansion=True)
@@ -979,11 +947,7 @@ class SolutionDirectory(Utilities):
         """Gets a list of all the available mesh regions by checking all
         directories in constant and using all those that have a polyMesh-subdirectory
         :param defaultRegion: should the default region also be added (as None)"""
-        lst=[]
-        for d in self.listDirectory(self.constantDir()):
-            if path.isdir(path.join(self.constantDir(),d)):
-                if path.exists(self.polyMeshDir(region=d)):
-                    lst.append(d)
+        lst=[d for d in self.__meshRegions() if d in self.listDirectory(self.constantDir())]
 
         if defaultRegion:
             if path.exists(self.polyMeshDir()):
@@ -1119,25 +1083,18 @@ class SolutionDirectory(Utilities):
         self.__postprocInfo={}
 
     def __classifyDirectory(self,dPath):
-        cnt=0
-        minimum="1e40"
-        for d in listdir(dPath):
-            full=path.join(dPath,d)
-            if not path.isdir(full):
-                continue
-            try:
-                if float(d)<float(minimum):
-                    minimum=d
-                cnt+=1
-            except ValueError:
-                continue
-        if cnt<=0:
+        dListing=listing(dPath)
+        if dListing is None:
             return None
-        first=path.join(dPath,minimum)
+        times=dListing.timeDirectories()
+        if len(times)<=0:
+            return None
+        first=path.join(dPath,times[0])
+        firstListing=listing(first)
         hypothesis=None
-        for f in listdir(first):
+        for f in sorted(firstListing.entries):
             ff=path.join(first,f)
-            if not path.isfile(ff):
+            if firstListing.isDir(f) or not path.isfile(ff):
                 continue
             try:
                 float(f)
@@ -1161,14 +1118,15 @@ class SolutionDirectory(Utilities):
                 hypothesis=newHypothesis
             elif hypothesis!=newHypothesis and newHypothesis:
                 error("Can not decide between",hypothesis,
-                "and",newHypothesis,"for",full)
+                "and",newHypothesis,"for",ff)
         return hypothesis
 
     def __scanForPostproc(self,dirName):
-        for d in listdir(path.join(self.name,dirName)):
+        dListing=listing(path.join(self.name,dirName))
+        if dListing is None:
+            return
+        for d in dListing.directories():
             full=path.join(self.name,dirName,d)
-            if not path.isdir(full):
-                continue
             try:
                 # we don't want time directories
                 float(d)
@@ -1218,12 +1176,18 @@ class SolutionDirectory(Utilities):
 
     @property
     def pickledPlots(self):
-        """Get the pickled plot files. Newest first"""
+        """Get the pickled plot files. Newest first. For runs that are not
+        finished the timelineStore-file (if it is newer than the
+        pickledPlots)"""
         dirAndTime=[]
         for g in glob.glob(path.join(self.name,"*.analyzed")):
-            pName=path.join(g,"pickledPlots")
-            if path.exists(pName):
-                dirAndTime.append((path.getmtime(pName),pName))
+            found=[]
+            for f in ["pickledPlots","timelineStore"]:
+                pName=path.join(g,f)
+                if path.exists(pName):
+                    found.append((path.getmtime(pName),pName))
+            if len(found)>0:
+                dirAndTime.append(max(found,key=lambda x:x[0]))
         dirAndTime.sort(key=lambda x:x[0],reverse=True)
         return [s[len(self.name)+1:] for t,s in dirAndTime]
 
@@ -1,12 +1,17 @@
 #  ICE Revision: $Id:$
 """Working with a directory of timelines
 
-Currently not optimal as it reads the files more often than necessary"""
+The data in the files is parsed only once and kept in a cache that is
+shared by all the objects in a process. If a file grows (because the
+simulation is still running) only the new lines are read"""
 
+import os
+import threading
+import warnings
 from os import path,listdir
+from collections import OrderedDict
 
 from PyFoam.Error import error,warning
-import math
 
 try:
     from sys.float_info import max as float_maximum
@@ -16,10 +21,238 @@ except ImportError:
 
 from PyFoam.Basics.SpreadsheetData import SpreadsheetData
 
-from PyFoam.ThirdParty.six import PY3
+# number of files for which the parsed data is kept
+maxCachedFiles=100
 
-if PY3:
-    from functools import reduce
+# number of bytes at the end of the read data that are compared to find
+# out whether a file that got longer was rewritten
+tailLength=256
+
+def _safeFloat(v):
+    try:
+        return float(v)
+    except ValueError:
+        try:
+            return v.decode("utf-8","replace")
+        except AttributeError:
+            return v
+
+def _tokensPerLine(text):
+    """Number of whitespace-separated tokens in every line of a text
+    that ends with a newline"""
+    import numpy
+    raw=numpy.frombuffer(text,dtype=numpy.uint8)
+    space=(raw==32)|(raw==9)|(raw==10)|(raw==13)|(raw==11)|(raw==12)
+    starts=~space
+    starts[1:]&=space[:-1]
+    tokens=numpy.nonzero(starts)[0]
+    lineEnds=numpy.nonzero(raw==10)[0]
+    return numpy.diff(numpy.concatenate(([0],numpy.searchsorted(tokens,lineEnds))))
+
+def _parseRegular(text):
+    """Parse a text in which every line has the same number of numbers
+    :return: 2D-array with the values. None if the text is not
+    regular"""
+    import numpy
+    counts=_tokensPerLine(text)
+    counts=counts[counts>0]
+    if len(counts)==0:
+        return numpy.zeros((0,1))
+    nrCols=counts[0]
+    if (counts!=nrCols).any():
+        return None
+    try:
+        with warnings.catch_warnings():
+            # older numpy versions only warn about unparsable data
+            warnings.simplefilter("error",DeprecationWarning)
+            values=numpy.fromstring(text,sep=" ")
+    except (ValueError,DeprecationWarning):
+        return None
+    if len(values)!=nrCols*len(counts):
+        return None
+    return values.reshape(len(counts),nrCols)
+
+def _parseLines(text):
+    """Parse the text line by line. Lines do not need to have the same
+    length and values that are not numbers are kept as strings
+    :return: list with the times and list with the lists of values"""
+    times=[]
+    rows=[]
+    for l in text.split(b"\n"):
+        v=l.split()
+        if len(v)==0 or v[0][:1]==b"#":
+            continue
+        try:
+            t=float(v[0])
+        except ValueError:
+            continue
+        times.append(t)
+        rows.append([_safeFloat(x) for x in v[1:]])
+    return times,rows
+
+class TimelineData(object):
+    """The data of a timeline-file. As long as every line has the same
+    number of numbers the data is kept in a 2D-array. Otherwise (lines
+    that were cut short or values that are strings) a list with the
+    values for every line is used"""
+
+    def __init__(self,name):
+        """:param name: the full path of the file"""
+        self.name=name
+        self.lock=threading.Lock()
+        self.__reset()
+
+    def __reset(self):
+        self.signature=None
+        self.ino=None
+        self.offset=0
+        self.tail=b""
+        self.__times=[]
+        self.__values=[]
+        self.rows=None
+        self.sorted=True
+
+    def update(self):
+        """Read the lines that were added since the last call. If the
+        file was rewritten it is read completely. Lines that do not end
+        with a newline are being written and are not used yet"""
+        with self.lock:
+            st=os.stat(self.name)
+            signature=(st.st_ino,st.st_size,getattr(st,"st_mtime_ns",st.st_mtime))
+            if signature==self.signature:
+                return
+            with open(self.name,"rb") as f:
+                rewritten=st.st_ino!=self.ino or \
+                           st.st_size<self.offset or \
+                           (self.signature is not None and st.st_size==self.signature[1])
+                if not rewritten and len(self.tail)>0:
+                    f.seek(self.offset-len(self.tail))
+                    rewritten=f.read(len(self.tail))!=self.tail
+                if rewritten:
+                    self.__reset()
+                f.seek(self.offset)
+                chunk=f.read()
+            self.signature=signature
+            self.ino=st.st_ino
+            end=chunk.rfind(b"\n")+1
+            if end>0:
+                self.__add(chunk[:end])
+                self.offset+=end
+                self.tail=chunk[max(0,end-tailLength):end]
+
+    def __add(self,text):
+        import numpy
+        if text.find(b"#")>=0:
+            text=b"\n".join(l for l in text.split(b"\n")
+                            if l.lstrip()[:1]!=b"#")+b"\n"
+        text=text.replace(b"(",b" ").replace(b")",b" ")
+
+        values=None
+        if self.rows is None:
+            values=_parseRegular(text)
+            if values is not None and len(values)>0 and len(self.__values)>0 and \
+               values.shape[1]!=self.__values[0].shape[1]:
+                values=None
+        if values is not None:
+            if len(values)==0:
+                return
+            times=values[:,0]
+            self.__values.append(values[:,1:])
+        else:
+            if self.rows is None:
+                self.rows=self.values().tolist()
+                self.__values=[]
+            times,rows=_parseLines(text)
+            if len(times)==0:
+                return
+            times=numpy.asarray(times,dtype=float)
+            self.rows+=rows
+
+        old=self.times()
+        self.sorted=self.sorted and \
+                     (len(old)==0 or times[0]>=old[-1]) and \
+                     bool((times[1:]>=times[:-1]).all())
+        self.__times.append(times)
+
+    def times(self):
+        """Array with the times"""
+        import numpy
+        if len(self.__times)!=1:
+            self.__times=[numpy.concatenate(self.__times) if self.__times else numpy.zeros(0)]
+        return self.__times[0]
+
+    def values(self):
+        """2D-array with the values without the time (one row per
+        time). None if the lines are not regular"""
+        import numpy
+        if self.rows is not None:
+            return None
+        if len(self.__values)==0:
+            return numpy.zeros((0,0))
+        elif len(self.__values)>1:
+            self.__values=[numpy.concatenate(self.__values)]
+        return self.__values[0]
+
+    def row(self,i):
+        """List with the values of a line"""
+        if self.rows is not None:
+            return self.rows[i]
+        else:
+            return self.values()[i].tolist()
+
+    def __len__(self):
+        return len(self.times())
+
+    def nearest(self,times):
+        """Indices of the lines with the times that are nearest to the
+        specified times. If two lines are equally near the first one is
+        used
+        :param times: list with the times
+        :return: array with the indices"""
+        import numpy
+        t=self.times()
+        q=numpy.asarray(times,dtype=float)
+        if self.sorted:
+            i=numpy.searchsorted(t,q,"left")
+            lo=numpy.clip(i-1,0,len(t)-1)
+            hi=numpy.clip(i,0,len(t)-1)
+            result=numpy.where(numpy.abs(q-t[lo])<=numpy.abs(t[hi]-q),lo,hi)
+            # the first of equal times
+            return numpy.searchsorted(t,t[result],"left")
+        else:
+            return numpy.array([numpy.argmin(numpy.abs(t-v)) for v in q],dtype=int)
+
+_timelines=OrderedDict()
+_timelinesLock=threading.Lock()
+
+def timelineData(fName):
+    """Get the data of a timeline-file. The file is only read if it
+    changed since the last time
+    :param fName: name of the file
+    :return: a TimelineData-object"""
+    fName=path.abspath(fName)
+    with _timelinesLock:
+        data=_timelines.pop(fName,None)
+        if data is None:
+            data=TimelineData(fName)
+        _timelines[fName]=data
+        while len(_timelines)>maxCachedFiles:
+            _timelines.popitem(last=False)
+    try:
+        data.update()
+    except (OSError,IOError):
+        invalidate(fName)
+        raise
+    return data
+
+def invalidate(fName=None):
+    """Forget the data of a file
+    :param fName: the file. If unset the data of all files is removed"""
+    with _timelinesLock:
+        if fName is None:
+            _timelines.clear()
+        else:
+            _timelines.pop(path.abspath(fName),None)
 
 class TimelineDirectory(object):
     """A directory of sampled times"""
@@ -293,83 +526,71 @@ class TimelineValue(object):
 
     def timeRange(self):
         """Range of times"""
-        lines=open(self.file).readlines()
-        for l in lines:
-            v=l.split()
-            if v[0][0]!='#':
-                minRange=float(v[0])
-                break
-        lines.reverse()
-        for l in lines:
-            v=l.split()
-            if len(v)>=len(self.positions)+1:
-                maxRange=float(v[0])
-                break
-
-        return minRange,maxRange
+        data=timelineData(self.file)
+        if len(data)==0:
+            error("No data in",self.file)
+        times=data.times()
+        if data.rows is None:
+            return times[0],times[-1]
+        for i in range(len(data.rows)-1,-1,-1):
+            if len(data.rows[i])>=len(self.positions):
+                return times[0],times[i]
+        error("No complete line in",self.file)
 
     def getData(self,times,vectorMode=None):
         """Get the data values that are nearest to the actual times"""
+        import numpy
+
         if self.isVector and vectorMode==None:
             vectorMode="mag"
 
-        dist=len(times)*[1e80]
-        data=len(times)*[len(self.positions)*[1e80]]
+        data=timelineData(self.file)
+        if len(data)==0:
+            return [[] for t in times]
+        indices=data.nearest(times)
 
-        lines=open(self.file).readlines()
+        if self.isVector:
+            if vectorMode in ["x","y","z"]:
+                comps=[["x","y","z"].index(vectorMode)]
+            elif vectorMode=="mag":
+                comps=[0,1,2]
+            else:
+                error("Unknown vector mode",vectorMode)
+            columns=[[3*p+c for p in self.positionIndex] for c in comps]
+            if data.rows is None:
+                values=data.values()[indices]
+            else:
+                values=numpy.array([[float(v) for v in data.rows[i]] for i in indices])
+            if vectorMode=="mag":
+                x,y,z=[values[:,c] for c in columns]
+                return numpy.sqrt(x*x+y*y+z*z).tolist()
+            else:
+                return values[:,columns[0]].tolist()
 
-        for l in lines:
-            v=l.split()
-            if v[0][0]!='#':
-                try:
-                    time=float(v[0])
-                    vals=[x.replace('(','').replace(')','') for x in v[1:]]
-                    for i,t in enumerate(times):
-                        if abs(t-time)<dist[i]:
-                            dist[i]=abs(t-time)
-                            data[i]=vals
-                except ValueError:
-                    pass
         result=[]
-        for d in data:
+        for i in indices:
             tmp=[]
-            if self.isVector:
-                for p in range(len(self.positions)):
-                    if vectorMode=="x":
-                        tmp.append(float(d[p]))
-                    elif vectorMode=="y":
-                        tmp.append(float(d[p+1]))
-                    elif vectorMode=="z":
-                        tmp.append(float(d[p+2]))
-                    elif vectorMode=="mag":
-                        tmp.append(math.sqrt(reduce(lambda a,b:a+b,[float(v)**2 for v in d[p:p+3]],0)))
-                    else:
-                        error("Unknown vector mode",vectorMode)
-            else:
-                for v in d:
-                    try:
-                        if abs(float(v))<1e40:
-                            tmp.append(float(v))
-                    except ValueError:
+            for v in data.row(i):
+                try:
+                    if abs(v)<1e40:
                         tmp.append(v)
+                except TypeError:
+                    tmp.append(v)
             result.append(tmp)
 
         return result
 
     def __call__(self,addTitle=True):
         """Return the data as a SpreadsheetData-object"""
+        import numpy
+
+        data=timelineData(self.file)
+        times=data.times()
+        if data.rows is None:
+            values=numpy.column_stack((times,data.values()))
+        else:
+            values=[[t]+r for t,r in zip(times.tolist(),data.rows)]
 
-        def safeFloat(v):
-            try:
-                return float(v)
-            except ValueError:
-                return v
-        lines=open(self.file).readlines()
-        data=[]
-        for l in lines:
-            v=l.split()
-            if v[0][0]!='#':
-                data.append([safeFloat(x.replace('(','').replace(')','')) for x in v])
         names=["time"]
         if self.isVector:
             for p in self.positions:
@@ -377,7 +598,7 @@ class TimelineValue(object):
         else:
             names+=self.positions
 
-        return SpreadsheetData(data=data,
+        return SpreadsheetData(data=values,
                                names=names,
                                title="%s_t=%s" % (self.val,self.time) if addTitle else None)
 
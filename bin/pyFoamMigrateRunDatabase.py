@@ -0,0 +1,5 @@
+#! /usr/bin/env python
+
+from PyFoam.Applications.MigrateRunDatabase import MigrateRunDatabase
+
+MigrateRunDatabase()
@@ -0,0 +1,121 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for the information that pyFoamCaseReport.py
+# collects from the processor directories of a decomposed case (sizes
+# and the faces of the patches). Once the way it was done before (the
+# boundary-file parsed for every patch and the faces and points files
+# read) and once with processorInformation. The second argument is the
+# number of processes for the pool
+
+import os
+import re
+import sys
+import time
+import shutil
+import tempfile
+from os import path
+from multiprocessing import Pool
+
+from PyFoam.Applications.CaseReport import processorInformation
+from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedBoundaryDict,ParsedFileHeader
+from PyFoam.RunDictionary.ListFile import ListFile
+from PyFoam.ThirdParty.six import print_
+
+nrProcs=64
+jobs=2
+nrPatches=10
+nrFaces=50000
+if len(sys.argv)>1:
+    nrProcs=int(sys.argv[1])
+if len(sys.argv)>2:
+    jobs=int(sys.argv[2])
+
+header="""FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       %s;
+    note        "%s";
+    object      %s;
+}
+"""
+
+tmpDir=tempfile.mkdtemp()
+os.makedirs(path.join(tmpDir,"system"))
+os.makedirs(path.join(tmpDir,"constant","polyMesh"))
+with open(path.join(tmpDir,"system","controlDict"),"w") as f:
+    f.write(header % ("dictionary","","controlDict"))
+for p in range(nrProcs):
+    pm=path.join(tmpDir,"processor%d" % p,"constant","polyMesh")
+    os.makedirs(pm)
+    note="nPoints:%d  nCells:%d  nFaces:%d  nInternalFaces:%d" % (nrFaces,nrFaces//3,nrFaces,nrFaces//2)
+    with open(path.join(pm,"owner"),"w") as f:
+        f.write(header % ("labelList",note,"owner"))
+        f.write("%d\n(\n%s)\n" % (nrFaces,"".join("%d\n" % (i//3) for i in range(nrFaces))))
+    with open(path.join(pm,"faces"),"w") as f:
+        f.write(header % ("faceList","","faces"))
+        f.write("%d\n(\n%s)\n" % (nrFaces,"4(0 1 2 3)\n"*nrFaces))
+    with open(path.join(pm,"points"),"w") as f:
+        f.write(header % ("vectorField","","points"))
+        f.write("%d\n(\n%s)\n" % (nrFaces,"(0 0 0)\n"*nrFaces))
+    patches=["wall%d" % i for i in range(nrPatches)]
+    patches+=["procBoundary%dto%d" % (p,q) for q in (p-1,p+1) if q>=0 and q<nrProcs]
+    with open(path.join(pm,"boundary"),"w") as f:
+        f.write(header % ("polyBoundaryMesh","","boundary"))
+        f.write("%d\n(\n" % len(patches))
+        for i,n in enumerate(patches):
+            f.write("%s\n{\n    type patch;\n    nFaces %d;\n    startFace %d;\n}\n" % (n,i+1,nrFaces//2+i))
+        f.write(")\n")
+
+def oldWay():
+    sol=SolutionDirectory(tmpDir,archive=None,paraviewLink=False)
+    result=[]
+    for p in sol.processorDirs():
+        pm=sol.polyMeshDir(processor=p)
+        owner=ParsedFileHeader(path.join(pm,"owner"))
+        result.append({"points":ListFile(pm,"points").getSize(),
+                       "faces":ListFile(pm,"faces").getSize(),
+                       "cells":int(re.search("nCells: *([0-9]+)",owner["note"]).group(1)),
+                       "patches":{}})
+    for i in range(nrPatches):
+        b="wall%d" % i
+        for p,r in zip(sol.processorDirs(),result):
+            r["patches"][b]=ParsedBoundaryDict(sol.boundaryDict(processor=p))[b]["nFaces"]
+    return result
+
+def tasks():
+    sol=SolutionDirectory(tmpDir,archive=None,paraviewLink=False)
+    return [(tmpDir,None,p,None,True,True,True) for p in sol.processorDirs()]
+
+try:
+    start=time.time()
+    old=oldWay()
+    oldTime=time.time()-start
+
+    start=time.time()
+    serial=[processorInformation(t) for t in tasks()]
+    serialTime=time.time()-start
+
+    start=time.time()
+    pool=Pool(jobs)
+    parallel=pool.map(processorInformation,tasks())
+    pool.close()
+    pool.join()
+    parallelTime=time.time()-start
+finally:
+    shutil.rmtree(tmpDir)
+
+for o,s,p in zip(old,serial,parallel):
+    assert s==p
+    for k in ["points","faces","cells"]:
+        assert o[k]==s[k]
+    for b,n in o["patches"].items():
+        assert s["patches"][b]==n
+
+print_("Collected the data of %d processors with %d patches" % (nrProcs,nrPatches))
+print_("Parsed for every patch   : %8.3f s" % oldTime)
+print_("Parsed once per processor: %8.3f s" % serialTime)
+print_("Pool with %2d processes   : %8.3f s" % (jobs,parallelTime))
+print_("Speedup (serial)         : %8.1f" % (oldTime/serialTime))
+print_("Speedup (pool)           : %8.1f" % (oldTime/parallelTime))
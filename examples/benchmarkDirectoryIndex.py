@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for the cached directory listings of SolutionDirectory:
+# builds a case with many time- and processor-directories and queries it
+# repeatedly the way utilities do (last time, time lookups, number of
+# processors) with and without reusing the listings
+
+import sys
+import time
+import shutil
+import tempfile
+from os import path,mkdir,makedirs
+
+from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
+from PyFoam.RunDictionary import DirectoryIndex
+from PyFoam.ThirdParty.six import print_
+
+nrTimes=10000
+nrProcs=512
+nrQueries=200
+if len(sys.argv)>1:
+    nrTimes=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrProcs=int(sys.argv[2])
+
+tmpDir=tempfile.mkdtemp()
+case=path.join(tmpDir,"case")
+for d in ["constant/polyMesh","system"]:
+    makedirs(path.join(case,d))
+open(path.join(case,"system","controlDict"),"w").close()
+times=["%g" % (i*1e-3) for i in range(nrTimes)]
+for t in times:
+    mkdir(path.join(case,t))
+for p in range(nrProcs):
+    mkdir(path.join(case,"processor%d" % p))
+
+def query(cached):
+    DirectoryIndex.invalidate()
+    # don't distrust the listings of the just created directories
+    DirectoryIndex.racyInterval=-1
+    start=time.time()
+    sol=SolutionDirectory(case,archive=None,paraviewLink=False)
+    for i in range(nrQueries):
+        if not cached:
+            DirectoryIndex.invalidate()
+        sol.getLast()
+        sol.timeName(times[(i*37)%nrTimes])
+        sol.nrProcs()
+    return time.time()-start
+
+try:
+    uncached=query(False)
+    cached=query(True)
+finally:
+    shutil.rmtree(tmpDir)
+
+print_("%d queries on a case with %d times and %d processor directories" % (nrQueries,nrTimes,nrProcs))
+print_("Rescanning every time : %8.3f s" % uncached)
+print_("Cached listings       : %8.3f s" % cached)
+print_("Speedup               : %8.1f" % (uncached/cached))
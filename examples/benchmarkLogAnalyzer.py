@@ -0,0 +1,99 @@
+#! /usr/bin/env python
+
+# Benchmark for the prefiltering of lines in the log analyzers: replays a
+# solver log through a StandardLogAnalyzer (with a number of additional
+# custom regular expressions) with and without the LineDispatcher
+#
+# Usage: benchmarkLogAnalyzer.py [<logfile> [<nr of custom expressions>]]
+#
+# If no logfile is specified (or it is an empty string) a log in the
+# style of pimpleFoam is generated
+
+import sys
+import time
+import random
+import tempfile
+import os
+
+from PyFoam.LogAnalysis.StandardLogAnalyzer import StandardLogAnalyzer
+from PyFoam.LogAnalysis.RegExpLineAnalyzer import RegExpLineAnalyzer
+from PyFoam.ThirdParty.six import print_
+
+def writePimpleLog(fName,nrSteps=2000):
+    """Write a log file that looks like the output of pimpleFoam"""
+    rnd=random.Random(42)
+    def r():
+        return "%g" % rnd.uniform(1e-6,1)
+    with open(fName,"w") as f:
+        f.write("Create mesh for time = 0\n\n")
+        f.write("PIMPLE: Operating solver in PISO mode\n\n")
+        f.write("Starting time loop\n\n")
+        for i in range(1,nrSteps+1):
+            f.write("Courant Number mean: %s max: %s\n" % (r(),r()))
+            f.write("deltaT = 0.0001\n")
+            f.write("Time = %g\n\n" % (i*1e-4))
+            for corr in range(1,3):
+                f.write("PIMPLE: iteration %d\n" % corr)
+                for u in ["Ux","Uy","Uz"]:
+                    f.write("smoothSolver:  Solving for %s, Initial residual = %s, Final residual = %s, No Iterations %d\n" % (u,r(),r(),rnd.randint(1,5)))
+                for p in range(2):
+                    f.write("GAMG:  Solving for p, Initial residual = %s, Final residual = %s, No Iterations %d\n" % (r(),r(),rnd.randint(5,30)))
+                    f.write("time step continuity errors : sum local = %s, global = %s, cumulative = %s\n" % (r(),r(),r()))
+            for v in ["k","epsilon"]:
+                f.write("smoothSolver:  Solving for %s, Initial residual = %s, Final residual = %s, No Iterations %d\n" % (v,r(),r(),rnd.randint(1,5)))
+            f.write("bounding epsilon, min: -%s max: %s average: %s\n" % (r(),r(),r()))
+            f.write("ExecutionTime = %g s  ClockTime = %d s\n\n" % (i*0.17,i//5))
+        f.write("End\n\n")
+
+customExpressions=[
+    "Courant Number mean: (%f%) max: (%f%)",
+    "bounding epsilon, min: (%f%) max: (%f%) average: (%f%)",
+    "PIMPLE: iteration ([0-9]+)",
+    "Interface Courant Number mean: (%f%) max: (%f%)",
+    "Phase-1 volume fraction = (%f%)  Min\(alpha1\) = (%f%)  Max\(alpha1\) = (%f%)",
+    "Mean temperature = (%f%)",
+    "fieldMinMax min\((.+)\) = (%f%)",
+    "Pressure drop = (%f%)",
+]
+
+if len(sys.argv)>1 and sys.argv[1]!="":
+    logFile=sys.argv[1]
+    tmpFile=None
+else:
+    tmpFile=tempfile.mktemp(suffix=".log")
+    writePimpleLog(tmpFile)
+    logFile=tmpFile
+
+nrCustom=24
+if len(sys.argv)>2:
+    nrCustom=int(sys.argv[2])
+
+def analyze(prefilter):
+    analyzer=StandardLogAnalyzer(doTimelines=True,doFiles=False)
+    analyzer.prefilterLines=prefilter
+    for i in range(nrCustom):
+        exp=customExpressions[i % len(customExpressions)]
+        analyzer.addAnalyzer("Custom%02d_custom%d" % (i,i),
+                             RegExpLineAnalyzer("custom%d" % i,
+                                                exp,
+                                                doTimelines=True,
+                                                doFiles=False))
+    start=time.time()
+    with open(logFile) as fh:
+        analyzer.analyze(fh)
+    return time.time()-start,analyzer.collectData()
+
+try:
+    with open(logFile) as fh:
+        nrLines=sum(1 for l in fh)
+    plain,plainData=analyze(False)
+    filtered,filteredData=analyze(True)
+finally:
+    if tmpFile:
+        os.remove(tmpFile)
+
+print_("Analyzed %d lines with %d custom expressions" % (nrLines,nrCustom))
+print_("All analyzers      : %8.3f s (%8.0f lines/s)" % (plain,nrLines/plain))
+print_("Prefiltered lines  : %8.3f s (%8.0f lines/s)" % (filtered,nrLines/filtered))
+print_("Speedup            : %8.1f" % (plain/filtered))
+print_("Same results       : %s" % (plainData==filteredData))
@@ -0,0 +1,72 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for the caching of the lexer and parser tables: reads a
+# large number of small dictionaries with and without reusing the tables
+# that were built for the first file
+
+import sys
+import time
+import shutil
+import tempfile
+from os import path
+
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
+from PyFoam.Basics.PlyParser import clearParserCache
+from PyFoam.ThirdParty.six import print_
+
+nrFiles=10000
+if len(sys.argv)>1:
+    nrFiles=int(sys.argv[1])
+
+template="""FoamFile
+{
+    version 2.0;
+    format ascii;
+    class volScalarField;
+    object p%d;
+}
+
+dimensions [0 2 -2 0 0 0 0];
+
+internalField uniform %d;
+
+boundaryField
+{
+    inlet
+    {
+        type zeroGradient;
+    }
+    outlet
+    {
+        type fixedValue;
+        value uniform 0;
+    }
+}
+"""
+
+tmpDir=tempfile.mkdtemp()
+names=[]
+for i in range(nrFiles):
+    names.append(path.join(tmpDir,"p%d" % i))
+    with open(names[-1],"w") as f:
+        f.write(template % (i,i))
+
+def readAll(rebuild):
+    clearParserCache()
+    start=time.time()
+    for n in names:
+        if rebuild:
+            clearParserCache()
+        ParsedParameterFile(n)
+    return time.time()-start
+
+try:
+    uncached=readAll(True)
+    cached=readAll(False)
+finally:
+    shutil.rmtree(tmpDir)
+
+print_("Read %d files" % nrFiles)
+print_("Rebuilding parser : %8.3f s" % uncached)
+print_("Cached parser     : %8.3f s" % cached)
+print_("Speedup           : %8.1f" % (uncached/cached))
@@ -0,0 +1,67 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for the decimation of plotted timelines: a timeline
+# with many points is replotted repeatedly while new points are added
+# (the way a plot of a running simulation is updated). The plot formats
+# every point that it gets as text (like the data that is sent to
+# gnuplot). Once with all the points and once with the decimated data
+
+import sys
+import time
+import math
+
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection
+from PyFoam.Basics.GeneralPlotTimelines import GeneralPlotTimelines
+from PyFoam.ThirdParty.six import print_
+
+nrPoints=200000
+nrLines=5
+nrUpdates=50
+if len(sys.argv)>1:
+    nrPoints=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrLines=int(sys.argv[2])
+
+class TextPlot(GeneralPlotTimelines):
+    def __init__(self,timelines,maxPoints):
+        GeneralPlotTimelines.__init__(self,timelines,None)
+        self.maxPoints=maxPoints
+        self.sent=0
+
+    def preparePlot(self):
+        pass
+
+    def buildData(self,times,name,title,lastValid):
+        txt="".join("%g %g\n" % p for p in zip(times,self.getValues(name)))
+        self.sent+=len(txt)
+
+    def doReplot(self):
+        pass
+
+def fill(start,end):
+    for i in range(start,end):
+        data.setTime(float(i))
+        for l in range(nrLines):
+            data.setValue("line%d" % l,math.sin(i*1e-3*(l+1))+1e-3*(i%7))
+
+data=TimeLineCollection()
+fill(0,nrPoints)
+step=max(1,nrPoints//(10*nrUpdates))
+
+def replotAll(maxPoints):
+    plot=TextPlot(data,maxPoints)
+    start=time.time()
+    written=len(data.getTimes())
+    for u in range(nrUpdates):
+        fill(written,written+step)
+        written+=step
+        plot.redo()
+    return time.time()-start,plot.sent
+
+full,fullSent=replotAll(0)
+decimated,decimatedSent=replotAll(4000)
+
+print_("Replotted %d lines with %d points %d times" % (nrLines,nrPoints,nrUpdates))
+print_("All points         : %8.3f s (%d bytes)" % (full,fullSent))
+print_("Decimated          : %8.3f s (%d bytes)" % (decimated,decimatedSent))
+print_("Speedup            : %8.1f" % (full/decimated))
@@ -0,0 +1,50 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for the database with the run data: adds runs with
+# a number of custom values (different values for different runs, the
+# way it happens with many function objects) to a database with the
+# wide and with the long layout and dumps them to a CSV-file
+
+import sys
+import time
+import shutil
+import tempfile
+from os import path
+
+from PyFoam.Basics.RunDatabase import RunDatabase
+from PyFoam.ThirdParty.six import print_
+
+nrRuns=1000
+nrValues=200
+if len(sys.argv)>1:
+    nrRuns=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrValues=int(sys.argv[2])
+
+def runData(i):
+    return {"name":"run%d" % i,
+            "nrSteps":i,
+            "analyzed":dict(("value%d" % ((i+j)%(3*nrValues)),i*j*0.5)
+                            for j in range(nrValues))}
+
+tmpDir=tempfile.mkdtemp()
+
+def fillAndDump(layout):
+    db=RunDatabase(path.join(tmpDir,layout+".db"),create=True,layout=layout)
+    start=time.time()
+    for i in range(nrRuns):
+        db.add(runData(i),commit=False)
+    db.commit()
+    added=time.time()
+    db.dumpToCSV(path.join(tmpDir,layout+".csv"),pandasFormat=False)
+    return added-start,time.time()-added
+
+try:
+    wideAdd,wideDump=fillAndDump("wide")
+    longAdd,longDump=fillAndDump("long")
+finally:
+    shutil.rmtree(tmpDir)
+
+print_("%d runs with %d of %d values" % (nrRuns,nrValues,3*nrValues))
+print_("Wide layout: add %8.3f s  dump %8.3f s" % (wideAdd,wideDump))
+print_("Long layout: add %8.3f s  dump %8.3f s" % (longAdd,longDump))
@@ -0,0 +1,80 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for reading STL-files and getting the bounding boxes
+# of the solids. Once the way it was done before (lines read into a
+# list and the vertices converted one by one) and once with STLFile
+# (ASCII and binary)
+
+import sys
+import time
+import random
+import shutil
+import tempfile
+from os import path
+
+from PyFoam.Basics.STLFile import STLFile
+from PyFoam.ThirdParty.six import print_
+
+nrSolids=4
+nrFacets=100000
+if len(sys.argv)>1:
+    nrFacets=int(sys.argv[1])
+
+tmpDir=tempfile.mkdtemp()
+asciiName=path.join(tmpDir,"test.stl")
+binaryName=path.join(tmpDir,"binary.stl")
+
+with open(asciiName,"w") as f:
+    for s in range(nrSolids):
+        f.write("solid patch%d\n" % s)
+        for i in range(nrFacets):
+            v=[random.uniform(-1,1) for j in range(12)]
+            f.write("  facet normal %e %e %e\n    outer loop\n" % tuple(v[:3]))
+            for j in range(3):
+                f.write("      vertex %e %e %e\n" % tuple(v[3+3*j:6+3*j]))
+            f.write("    endloop\n  endfacet\n")
+        f.write("endsolid patch%d\n" % s)
+
+def oldWay():
+    lines=[l.strip() for l in open(asciiName).readlines()]
+    result=[]
+    for l in lines:
+        if l.find("solid")==0:
+            info={"name":l.split()[1],"facets":0,"min":[1e100]*3,"max":[-1e100]*3}
+        elif l.find("endsolid")==0:
+            result.append(info)
+        elif l.find("vertex")==0:
+            info["min"]=[min(m) for m in zip(info["min"],[float(v) for v in l.split()[1:4]])]
+            info["max"]=[max(m) for m in zip(info["max"],[float(v) for v in l.split()[1:4]])]
+        elif l.find("endfacet")==0:
+            info["facets"]+=1
+    return result
+
+try:
+    start=time.time()
+    old=oldWay()
+    oldTime=time.time()-start
+
+    start=time.time()
+    new=STLFile(asciiName).patchInfo()
+    asciiTime=time.time()-start
+
+    STLFile(asciiName).writeTo(binaryName,binary=True)
+
+    start=time.time()
+    binary=STLFile(binaryName).patchInfo()
+    binaryTime=time.time()-start
+finally:
+    shutil.rmtree(tmpDir)
+
+for o,n in zip(old,new):
+    assert o["name"]==n["name"] and o["facets"]==n["facets"]
+    assert o["min"]==n["min"] and o["max"]==n["max"]
+assert binary[0]["facets"]==nrSolids*nrFacets
+
+print_("Read %d solids with %d facets each" % (nrSolids,nrFacets))
+print_("Line by line     : %8.3f s" % oldTime)
+print_("numpy (ASCII)    : %8.3f s" % asciiTime)
+print_("numpy (binary)   : %8.3f s" % binaryTime)
+print_("Speedup (ASCII)  : %8.1f" % (oldTime/asciiTime))
+print_("Speedup (binary) : %8.1f" % (oldTime/binaryTime))
@@ -0,0 +1,62 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for reading sample directories: the data of all the
+# lines is requested line by line for all times (the way
+# pyFoamSamplePlot.py does it). Once with the parsed files thrown away
+# before every request and once with the cached data
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from os import path,mkdir
+
+from PyFoam.RunDictionary.SampleDirectory import SampleDirectory,invalidate
+from PyFoam.ThirdParty.six import print_
+
+nrTimes=50
+nrLines=50
+nrPoints=100
+if len(sys.argv)>1:
+    nrTimes=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrLines=int(sys.argv[2])
+
+tmpDir=tempfile.mkdtemp()
+mkdir(path.join(tmpDir,"samples"))
+for t in range(nrTimes):
+    tDir=path.join(tmpDir,"samples",str(t))
+    mkdir(tDir)
+    for l in range(nrLines):
+        with open(path.join(tDir,"line%d_p_k_epsilon_T.xy" % l),"w") as f:
+            for i in range(nrPoints):
+                f.write("%g %g %g %g %g\n" % (i*0.1,t,l,i,t*l))
+        with open(path.join(tDir,"line%d_U.xy" % l),"w") as f:
+            for i in range(nrPoints):
+                f.write("%g %g %g %g\n" % (i*0.1,t,l,i))
+    # listings of directories that were just modified are not trusted
+    os.utime(tDir,(time.time()-60,time.time()-60))
+
+def readAll(cached):
+    invalidate()
+    start=time.time()
+    samples=SampleDirectory(tmpDir)
+    nrSets=0
+    for l in samples.lines():
+        if not cached:
+            invalidate()
+            samples=SampleDirectory(tmpDir)
+        nrSets+=len(samples.getData(line=[l]))
+    return time.time()-start,nrSets
+
+try:
+    uncached,nrSets=readAll(False)
+    cached,nrSets=readAll(True)
+finally:
+    shutil.rmtree(tmpDir)
+
+print_("Read %d sets from %d times with %d lines" % (nrSets,nrTimes,nrLines))
+print_("Parsing every time : %8.3f s" % uncached)
+print_("Cached data        : %8.3f s" % cached)
+print_("Speedup            : %8.1f" % (uncached/cached))
@@ -0,0 +1,44 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for the vectorized resampling of SpreadsheetData:
+# resamples one probe series at the times of another and compares them.
+# The point-by-point evaluation (the way resample used to work) is done
+# for comparison
+
+import sys
+import time
+
+import numpy
+
+from PyFoam.Basics.SpreadsheetData import SpreadsheetData
+from PyFoam.ThirdParty.six import print_
+
+nrRows=200000
+if len(sys.argv)>1:
+    nrRows=int(sys.argv[1])
+
+t1=numpy.linspace(0,10,nrRows)
+t2=numpy.sort(numpy.random.uniform(-0.5,10.5,nrRows))
+sp1=SpreadsheetData(data=numpy.array([t1,numpy.sin(t1)]).T,names=["t","p"])
+sp2=SpreadsheetData(data=numpy.array([t2,numpy.sin(t2)+1e-3*t2]).T,names=["t","p"])
+
+start=time.time()
+old=[sp2(t,"p",invalidExtend=True) for t in sp1.data["t"]]
+pointwise=time.time()-start
+
+start=time.time()
+new=sp1.resample(sp2,"p",invalidExtend=True)
+vectorized=time.time()-start
+
+if old!=new:
+    print_("Results differ")
+
+start=time.time()
+result=sp1.compare(sp2,"p",common=True)
+compared=time.time()-start
+
+print_("Resampling %d rows" % nrRows)
+print_("Point by point : %8.3f s" % pointwise)
+print_("Vectorized     : %8.3f s" % vectorized)
+print_("Speedup        : %8.1f" % (pointwise/vectorized))
+print_("Complete compare with %d rows: %.3f s (maximum difference %g)" % (nrRows,compared,result["max"]))
@@ -0,0 +1,92 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for the cache of compiled templates: prepares a number
+# of variants of a case with a set of templates (the way
+# pyFoamPrepareCase.py does it) with and without reusing the compiled
+# templates
+
+import sys
+import time
+import shutil
+import tempfile
+from os import path
+
+from PyFoam.Basics.TemplateFile import TemplateFile,clearTemplateCache
+from PyFoam.ThirdParty.six import print_
+
+nrVariants=500
+nrTemplates=40
+if len(sys.argv)>1:
+    nrVariants=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrTemplates=int(sys.argv[2])
+
+template="""FoamFile
+{
+    version 2.0;
+    format ascii;
+    class volScalarField;
+    object f%(nr)d;
+}
+$$ inletValue = velocity*%(nr)d
+$$ outletValue = 0.5*inletValue if pressureOutlet else 0
+
+dimensions [0 1 -1 0 0 0 0];
+
+internalField uniform |-inletValue-|;
+
+boundaryField
+{
+<!--(for i in range(nrPatches))-->
+    patch|-i-|
+    {
+  <!--(if i==0)-->
+        type fixedValue;
+        value uniform |-inletValue-|;
+  <!--(elif i==nrPatches-1 and pressureOutlet)-->
+        type fixedValue;
+        value uniform |-outletValue-|;
+  <!--(else)-->
+        type zeroGradient;
+  <!--(end)-->
+    }
+<!--(end)-->
+    walls
+    {
+        type |-wallType-|;
+        value uniform |-round(velocity*sqrt(%(nr)d),4)-|;
+    }
+}
+"""
+
+tmpDir=tempfile.mkdtemp()
+names=[]
+for i in range(nrTemplates):
+    names.append(path.join(tmpDir,"f%d.template" % i))
+    with open(names[-1],"w") as f:
+        f.write(template % {"nr":i})
+
+def prepareAll(cached):
+    clearTemplateCache()
+    start=time.time()
+    for v in range(nrVariants):
+        values={"velocity":1+0.01*v,
+                "pressureOutlet":v%2==0,
+                "nrPatches":2+v%5,
+                "wallType":"noSlip"}
+        for n in names:
+            if not cached:
+                clearTemplateCache()
+            TemplateFile(name=n,expressionDelimiter="|-").writeToFile(n[:-len(".template")],values)
+    return time.time()-start
+
+try:
+    uncached=prepareAll(False)
+    cached=prepareAll(True)
+finally:
+    shutil.rmtree(tmpDir)
+
+print_("Prepared %d variants with %d templates" % (nrVariants,nrTemplates))
+print_("Compiling every time : %8.3f s" % uncached)
+print_("Cached templates     : %8.3f s" % cached)
+print_("Speedup              : %8.1f" % (uncached/cached))
@@ -0,0 +1,66 @@
+#! /usr/bin/env python
+
+# Micro-benchmark for the loader of timeline-files: a probe-file of a
+# running simulation is queried repeatedly (the way a plotting utility
+# does it) while new lines are appended. Once the file is parsed every
+# time and once with the cached data that is only extended by the new
+# lines
+
+import sys
+import time
+import shutil
+import tempfile
+from os import path,mkdir
+
+from PyFoam.RunDictionary.TimelineDirectory import TimelineDirectory,invalidate
+from PyFoam.ThirdParty.six import print_
+
+nrLines=100000
+nrProbes=20
+nrUpdates=20
+if len(sys.argv)>1:
+    nrLines=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrProbes=int(sys.argv[2])
+
+tmpDir=tempfile.mkdtemp()
+mkdir(path.join(tmpDir,"probes"))
+mkdir(path.join(tmpDir,"probes","0"))
+fName=path.join(tmpDir,"probes","0","U")
+
+def lines(start,end):
+    return "".join("%g " % (i*1e-3)+
+                   " ".join("(%g %g %g)" % (i,p,-i) for p in range(nrProbes))+"\n"
+                   for i in range(start,end))
+
+with open(fName,"w") as f:
+    for c in "xyz":
+        f.write("# %s " % c+" ".join(str(p) for p in range(nrProbes))+"\n")
+    f.write("# Time\n")
+    f.write(lines(0,nrLines))
+
+def queryAll(cached):
+    invalidate()
+    start=time.time()
+    written=nrLines
+    for u in range(nrUpdates):
+        with open(fName,"a") as f:
+            f.write(lines(written,written+100))
+        written+=100
+        if not cached:
+            invalidate()
+        st=TimelineDirectory(tmpDir)["U"]
+        mi,ma=st.timeRange()
+        st.getData([mi+(ma-mi)*i/10. for i in range(11)],vectorMode="mag")
+    return time.time()-start
+
+try:
+    uncached=queryAll(False)
+    cached=queryAll(True)
+finally:
+    shutil.rmtree(tmpDir)
+
+print_("Queried %d lines with %d probes %d times" % (nrLines,nrProbes,nrUpdates))
+print_("Parsing every time : %8.3f s" % uncached)
+print_("Cached data        : %8.3f s" % cached)
+print_("Speedup            : %8.1f" % (uncached/cached))
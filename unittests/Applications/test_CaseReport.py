@@ -1,5 +1,63 @@
 import unittest
 
-from PyFoam.Applications.CaseReport import CaseReport
+from PyFoam.Applications.CaseReport import CaseReport,processorInformation
+from PyFoam.RunDictionary.MeshInformation import MeshInformation
+
+from os import path,makedirs
+from tempfile import mkdtemp
+from shutil import rmtree
 
 theSuite=unittest.TestSuite()
+
+header="""FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       %s;
+    note        "%s";
+    object      %s;
+}
+"""
+
+class ProcessorInformationTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        makedirs(path.join(self.theDir,"system"))
+        makedirs(path.join(self.theDir,"constant","polyMesh"))
+        with open(path.join(self.theDir,"system","controlDict"),"w") as f:
+            f.write(header % ("dictionary","","controlDict"))
+        for p in range(2):
+            pm=path.join(self.theDir,"processor%d" % p,"constant","polyMesh")
+            makedirs(pm)
+            with open(path.join(pm,"owner"),"w") as f:
+                f.write(header % ("labelList",
+                                  "nPoints:%d  nCells:%d  nFaces:%d  nInternalFaces:1" % (8+p,1+p,6+p),
+                                  "owner"))
+                f.write("%d\n(\n%s)\n" % (6+p,"0\n"*(6+p)))
+            with open(path.join(pm,"boundary"),"w") as f:
+                f.write(header % ("polyBoundaryMesh","","boundary"))
+                f.write("2\n(\nwalls\n{\n type wall;\n nFaces %d;\n startFace 1;\n}\n" % (4+p))
+                f.write("procBoundary%dto%d\n{\n type processor;\n nFaces 1;\n startFace %d;\n}\n)\n" % (p,1-p,5+p))
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def testSizesFromOwnerHeader(self):
+        mesh=MeshInformation(self.theDir,processor="processor1")
+        self.assertEqual(mesh.nrOfPoints(),9)
+        self.assertEqual(mesh.nrOfFaces(),7)
+        self.assertEqual(mesh.nrOfCells(),2)
+
+    def testProcessorInformation(self):
+        info=processorInformation((self.theDir,None,"processor0",None,True,True,True))
+        self.assertEqual(info["points"],8)
+        self.assertEqual(info["faces"],6)
+        self.assertEqual(info["cells"],1)
+        self.assertEqual(info["patches"],{"walls":4,"procBoundary0to1":1})
+        info=processorInformation((self.theDir,None,"processor1",None,True,False,True))
+        self.assert_("points" not in info)
+        self.assertEqual(info["patches"]["walls"],5)
+
+theSuite.addTest(unittest.makeSuite(ProcessorInformationTest,"test"))
+
+# Should work with Python3 and Python2
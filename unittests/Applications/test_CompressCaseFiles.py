@@ -1,5 +1,61 @@
 import unittest
 
-from PyFoam.Applications.CompressCaseFiles import CompressCaseFiles
+from PyFoam.Applications.CompressCaseFiles import CompressCaseFiles,compressionTask
+
+from os import path
+from tempfile import mkdtemp
+from shutil import rmtree
+import gzip
 
 theSuite=unittest.TestSuite()
+
+class CompressionTaskTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        self.fName=path.join(self.theDir,"U")
+        self.data="".join("(%d %d 0)\n" % (i,i*i) for i in range(20000)).encode()
+        open(self.fName,"wb").write(self.data)
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def testCompressDecompress(self):
+        (problem,oldSize,newSize),=compressionTask(("compress",[self.fName],6))
+        self.assertEqual(problem,None)
+        self.assertEqual(oldSize,len(self.data))
+        self.assert_(not path.exists(self.fName))
+        self.assertEqual(path.getsize(self.fName+".gz"),newSize)
+        self.assertEqual(gzip.open(self.fName+".gz").read(),self.data)
+        (problem,oldSize,newSize),=compressionTask(("decompress",[self.fName+".gz"],6))
+        self.assertEqual(problem,None)
+        self.assertEqual(open(self.fName,"rb").read(),self.data)
+        self.assert_(not path.exists(self.fName+".gz"))
+
+    def testMembersAreOneFile(self):
+        half=len(self.data)//2
+        parts=[path.join(self.theDir,"p0"),path.join(self.theDir,"p1")]
+        for offset,length,p in zip([0,half],[half,len(self.data)-half],parts):
+            (problem,oldSize,newSize),=compressionTask(("member",[(self.fName,offset,length,p)],6))
+            self.assertEqual(problem,None)
+        with open(self.fName+".gz","wb") as f:
+            for p in parts:
+                f.write(open(p,"rb").read())
+        self.assertEqual(gzip.open(self.fName+".gz").read(),self.data)
+
+    def testEstimate(self):
+        (problem,oldSize,newSize),=compressionTask(("estimate",[self.fName],6))
+        self.assertEqual(problem,None)
+        self.assert_(path.exists(self.fName))
+        compressionTask(("compress",[self.fName],6))
+        # only the file name in the header is missing
+        self.assertAlmostEqual(newSize,path.getsize(self.fName+".gz"),delta=10)
+        (problem,oldSize,newSize),=compressionTask(("estimateDecompress",[self.fName+".gz"],6))
+        self.assertEqual(newSize,len(self.data))
+
+    def testProblemsAreReported(self):
+        (problem,oldSize,newSize),=compressionTask(("compress",[self.fName+"nix"],6))
+        self.assert_(problem is not None)
+
+theSuite.addTest(unittest.makeSuite(CompressionTaskTest,"test"))
+
+# Should work with Python3 and Python2
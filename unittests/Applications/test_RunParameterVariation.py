@@ -2,4 +2,62 @@ import unittest
 
 from PyFoam.Applications.RunParameterVariation import RunParameterVariation
 
+from optparse import Values
+import time
+
 theSuite=unittest.TestSuite()
+
+class PackedVariations(RunParameterVariation):
+    """Only the scheduling of the variations. Instead of running a
+    solver the variation waits and reports the time it was running"""
+    def __init__(self,jobs):
+        self.opts=Values({"jobs":jobs,
+                          "procnr":None,
+                          "autosenseParallel":True})
+        self.stored=[]
+
+    def printPhase(self,*args):
+        pass
+
+    def warning(self,*args):
+        pass
+
+    def runVariation(self,i,usedVals,origCase,workCase,storeData):
+        start=time.time()
+        time.sleep(usedVals["delay"])
+        if usedVals.get("fail",False):
+            raise ValueError("Failing variation")
+        storeData(i,{"start":start,"end":time.time()})
+
+    def run(self,variations):
+        self.runVariationsParallel(range(len(variations)),variations,{},None,
+                                   lambda i,data:self.stored.append((i,data)))
+
+class RunParameterVariationParallelTest(unittest.TestCase):
+    def testVariationProcessors(self):
+        app=PackedVariations(2)
+        self.assertEqual(app.variationProcessors({}),1)
+        self.assertEqual(app.variationProcessors({"numberOfProcessors":4}),4)
+        app.opts.procnr=3
+        self.assertEqual(app.variationProcessors({"numberOfProcessors":4}),3)
+
+    def testResultsInOrder(self):
+        app=PackedVariations(3)
+        app.run([{"delay":1.5},{"delay":0.1},{"delay":0.5}])
+        self.assertEqual([i for i,d in app.stored],[0,1,2])
+
+    def testMoreProcessorsThanJobs(self):
+        app=PackedVariations(2)
+        app.run([{"delay":0.1},{"delay":0.1,"numberOfProcessors":4},{"delay":0.1}])
+        self.assertEqual([i for i,d in app.stored],[0,1,2])
+        big=app.stored[1][1]
+        for i,d in [app.stored[0],app.stored[2]]:
+            self.assert_(d["end"]<=big["start"] or d["start"]>=big["end"])
+
+    def testFailedVariation(self):
+        app=PackedVariations(2)
+        self.assertRaises(Exception,
+                          app.run,[{"delay":0.1,"fail":True},{"delay":0.1}])
+        self.assertEqual([i for i,d in app.stored],[1])
+
+theSuite.addTest(unittest.makeSuite(RunParameterVariationParallelTest,"test"))
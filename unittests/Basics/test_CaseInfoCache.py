@@ -0,0 +1,55 @@
+import unittest
+
+from PyFoam.Basics import CaseInfoCache as cic
+from PyFoam.Basics.CaseInfoCache import CaseInfoCache,fileSignature
+from PyFoam.Basics.Utilities import diskUsage
+
+from os import path,makedirs
+from tempfile import mkdtemp
+from shutil import rmtree
+
+theSuite=unittest.TestSuite()
+
+class CaseInfoCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        self.case=path.join(self.theDir,"case")
+        for d in ["0","1/uniform","system"]:
+            makedirs(path.join(self.case,d))
+        for f,size in [("0/U",100),("1/U",2000),("1/uniform/time",30),("system/controlDict",7)]:
+            open(path.join(self.case,f),"w").write("x"*size)
+        self.cache=CaseInfoCache(path.join(self.theDir,"cache.sqlite"))
+
+    def tearDown(self):
+        cic.settledTime=60.
+        self.cache.close()
+        rmtree(self.theDir)
+
+    def testCaseData(self):
+        cd=path.join(self.case,"system","controlDict")
+        sig=fileSignature([self.case,cd])
+        self.assertEqual(self.cache.get(self.case,sig),None)
+        self.cache.put(self.case,sig,{"last":"1","nrSteps":2})
+        self.assertEqual(self.cache.get(self.case,sig),{"last":"1","nrSteps":2})
+        open(cd,"a").write("more")
+        self.assertNotEqual(fileSignature([self.case,cd]),sig)
+        self.assertEqual(self.cache.get(self.case,fileSignature([self.case,cd])),None)
+        self.cache.clear()
+        self.assertEqual(self.cache.get(self.case,sig),None)
+
+    def testDiskUsage(self):
+        self.assertEqual(self.cache.diskUsage(self.case),diskUsage(self.case))
+
+    def testDiskUsageIncremental(self):
+        cic.settledTime=-1e10
+        size=self.cache.diskUsage(self.case)
+        # rewritten in place. Not noticed
+        open(path.join(self.case,"1","U"),"w").write("x"*10)
+        self.assertEqual(self.cache.diskUsage(self.case),size)
+        # new file changes the directory
+        open(path.join(self.case,"1","p"),"w").write("x"*10)
+        self.assertEqual(self.cache.diskUsage(self.case),diskUsage(self.case))
+
+theSuite.addTest(unittest.makeSuite(CaseInfoCacheTest,"test"))
+
+# Should work with Python3 and Python2
@@ -7,6 +7,7 @@ from PyFoam.Basics.FoamFileGenerator import (Vector,Dimension,Field,
                                              DictRedirection,
                                              Unparsed,
                                              SymmTensor,Codestream,BoolProxy)
+from PyFoam.Basics.DataStructures import BinaryList,binaryElementType
 
 from PyFoam.ThirdParty.six import iteritems
 
@@ -365,3 +366,45 @@ class UnparsedTest(unittest.TestCase):
         self.assertEqual(data["cell"][1],34)
 
 theSuite.addTest(unittest.makeSuite(UnparsedTest,"test"))
+
+class BinaryListTest(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        self.np=np
+
+    def makeList(self,values,arch=None,elementType=None):
+        data=values.tobytes().decode("latin-1")
+        return BinaryList(len(values),data,arch=arch,elementType=elementType)
+
+    def testElementType(self):
+        self.assertEqual(binaryElementType("List<vector>"),"vector")
+        self.assertEqual(binaryElementType("volSymmTensorField"),"symmTensor")
+        self.assertEqual(binaryElementType("labelList"),"label")
+        self.assertEqual(binaryElementType("faceCompactList"),None)
+
+    def testDecodeVector(self):
+        vals=self.np.arange(12,dtype="<f8").reshape((4,3))
+        b=self.makeList(vals,arch="LSB;label=32;scalar=64",elementType="vector")
+        self.assertEqual(b.toNumpy().shape,(4,3))
+        self.assertTrue(self.np.array_equal(b.toNumpy(),vals))
+
+    def testGuessType(self):
+        b=self.makeList(self.np.arange(5,dtype="<i4"))
+        self.assertEqual(b.toNumpy().dtype.kind,"i")
+        b=self.makeList(self.np.arange(6,dtype="<f8").reshape((2,3)))
+        self.assertEqual(b.toNumpy().shape,(2,3))
+
+    def testArch(self):
+        vals=self.np.arange(5,dtype=">f4")
+        b=self.makeList(vals,arch="MSB;label=64;scalar=32",elementType="scalar")
+        self.assertTrue(self.np.array_equal(b.toNumpy(),vals))
+
+    def testEncode(self):
+        b=self.makeList(self.np.zeros((2,3)),elementType="vector")
+        vals=self.np.arange(9).reshape((3,3))
+        b.fromNumpy(vals)
+        self.assertEqual(len(b),3)
+        self.assertEqual(b.toNumpy().dtype,self.np.dtype("<f8"))
+        self.assertTrue(self.np.array_equal(b.toNumpy(),vals))
+
+theSuite.addTest(unittest.makeSuite(BinaryListTest,"test"))
@@ -1,7 +1,7 @@
 import unittest
 
 from PyFoam.Basics.FoamFileGenerator import FoamFileGenerator,makeString,FoamFileGeneratorError
-from PyFoam.Basics.DataStructures import DictProxy,TupleProxy,Unparsed,UnparsedList,BoolProxy
+from PyFoam.Basics.DataStructures import DictProxy,TupleProxy,Unparsed,UnparsedList,BoolProxy,NumpyList,Field
 from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile,FoamStringParser
 
 from PyFoam.FoamInformation import oldTutorialStructure,foamTutorials,foamVersionNumber,foamFork
@@ -230,6 +230,27 @@ class FoamFileGeneratorUnparsedList(unittest.TestCase):
 
 theSuite.addTest(unittest.makeSuite(FoamFileGeneratorUnparsedList,"test"))
 
+class FoamFileGeneratorNumpyList(unittest.TestCase):
+    def testScalarList(self):
+        import numpy as np
+        g=FoamFileGenerator(NumpyList(np.array([1.5,2.,3.])))
+        self.assertEqual(str(g),"3\n(\n  1.5\n  2\n  3\n)\n")
+    def testFullPrecision(self):
+        import numpy as np
+        values=np.array([0.1,1/3.,-2e-300,1e300])
+        g=FoamFileGenerator(NumpyList(values))
+        self.assertEqual([float(v) for v in str(g).split()[2:-1]],list(values))
+    def testVectorList(self):
+        import numpy as np
+        g=FoamFileGenerator(NumpyList(np.array([[1,2,3],[4,5,6]])))
+        self.assertEqual(str(g),"2\n(\n  (1 2 3)\n  (4 5 6)\n)\n")
+    def testNumpyListDict(self):
+        import numpy as np
+        g=FoamFileGenerator({"a":Field(NumpyList(np.array([1,2])),name="List<label>")})
+        self.assertEqual(str(g),"a nonuniform List<label> 2\n(\n  1\n  2\n)\n;\n")
+
+theSuite.addTest(unittest.makeSuite(FoamFileGeneratorNumpyList,"test"))
+
 class FoamFileGeneratorRoundtrip(unittest.TestCase):
     def setUp(self):
         self.theFile=mktemp()
@@ -1,5 +1,74 @@
 import unittest
 
-from PyFoam.Basics.GeneralPlotTimelines import GeneralPlotTimelines
+from PyFoam.Basics.GeneralPlotTimelines import GeneralPlotTimelines,TimelineDecimator
+
+import numpy as np
 
 theSuite=unittest.TestSuite()
+
+class TimelineDecimatorTest(unittest.TestCase):
+    def setUp(self):
+        rnd=np.random.RandomState(42)
+        self.times=np.arange(100000,dtype=float)
+        self.values=np.cumsum(rnd.normal(size=len(self.times)))
+
+    def testSmallUnchanged(self):
+        dec=TimelineDecimator(1000)
+        t,v=dec(self.times[:500],self.values[:500])
+        self.assertEqual(len(t),500)
+        self.assert_((v==self.values[:500]).all())
+
+    def testBounded(self):
+        dec=TimelineDecimator(1000)
+        t,v=dec(self.times,self.values)
+        self.assert_(len(t)<=1000+3)
+        self.assert_(len(t)>250)
+        self.assert_((np.diff(t)>0).all())
+        self.assertEqual(t[0],self.times[0])
+        self.assertEqual(t[-1],self.times[-1])
+        self.assertEqual(v[-1],self.values[-1])
+
+    def testKeepsExtrema(self):
+        dec=TimelineDecimator(1000)
+        self.values[12345]=1e10
+        self.values[54321]=-1e10
+        t,v=dec(self.times,self.values)
+        self.assertEqual(v.max(),1e10)
+        self.assertEqual(v.min(),-1e10)
+        self.assertEqual(list(t[v==1e10]),[12345.])
+        self.assertEqual(list(t[v==-1e10]),[54321.])
+
+    def testIncrementalEqualsFresh(self):
+        dec=TimelineDecimator(1000)
+        n=1
+        step=1
+        while n<len(self.times):
+            t,v=dec(self.times[:n],self.values[:n],splits=0)
+            n+=step
+            step=step*3//2+1
+        t,v=dec(self.times,self.values,splits=0)
+        tf,vf=TimelineDecimator(1000)(self.times,self.values)
+        self.assert_((t==tf).all())
+        self.assert_((v==vf).all())
+
+    def testLastValueChanges(self):
+        dec=TimelineDecimator(1000)
+        dec(self.times,self.values,splits=0)
+        self.values[-1]=1e10
+        t,v=dec(self.times,self.values,splits=0)
+        self.assertEqual(v[-1],1e10)
+
+    def testResetOnSplit(self):
+        dec=TimelineDecimator(1000)
+        dec(self.times,self.values,splits=0)
+        self.values[:50000]=0
+        t,v=dec(self.times,self.values,splits=0)
+        self.assert_(v.min()<0)
+        t,v=dec(self.times,self.values,splits=1)
+        self.assertEqual(len(t[(t<50000) & (v!=0)]),0)
+        t,v=dec(self.times[:2000],self.values[:2000],splits=1)
+        self.assertEqual(t[-1],1999.)
+
+theSuite.addTest(unittest.makeSuite(TimelineDecimatorTest,"test"))
+
+# Should work with Python3 and Python2
@@ -1,5 +1,63 @@
 import unittest
+import os
+from threading import Timer
+from io import BytesIO,StringIO
 
 from PyFoam.Basics.LineReader import LineReader
 
 theSuite=unittest.TestSuite()
+
+text="  Time = 1\nfirst line  \n\n  second line\nno newline at the end"
+
+class LineReaderTest(unittest.TestCase):
+    def readAll(self,reader,fh,size):
+        result=[]
+        lines=reader.readLines(fh,size)
+        while len(lines)>0:
+            result+=lines
+            lines=reader.readLines(fh,size)
+        return result
+
+    def testReadLinesSameAsRead(self):
+        single=LineReader(stripAllSpaces=False)
+        fh=StringIO(text)
+        expected=[]
+        while single.read(fh):
+            expected.append(single.line)
+        for size in [1,3,7,1000]:
+            self.assertEqual(self.readAll(LineReader(stripAllSpaces=False),
+                                          BytesIO(text.encode()),size),
+                             expected)
+        self.assertEqual(self.readAll(LineReader(),StringIO(text),5),
+                         [l.strip() for l in expected])
+
+    def testReadLinesFromPipe(self):
+        r,w=os.pipe()
+        os.write(w,b"a\nb\nc")
+        reader=LineReader()
+        fh=os.fdopen(r,"rb",0)
+        self.assertEqual(reader.readLines(fh),["a","b"])
+        self.assertEqual(reader.line,"b")
+        os.write(w,b"d\ne\n")
+        os.close(w)
+        self.assertEqual(reader.readLines(fh),["cd","e"])
+        self.assertEqual(reader.readLines(fh),[])
+        fh.close()
+
+    def testIdleBeforeWaiting(self):
+        r,w=os.pipe()
+        os.write(w,b"a\nb")
+        reader=LineReader()
+        fh=os.fdopen(r,"rb",0)
+        called=[]
+        self.assertEqual(reader.readLines(fh,idle=lambda:called.append(1)),["a"])
+        self.assertEqual(called,[])
+        writer=Timer(0.2,os.write,args=[w,b"c\n"])
+        writer.start()
+        self.assertEqual(reader.readLines(fh,idle=lambda:called.append(1)),["bc"])
+        self.assertEqual(called,[1])
+        writer.join()
+        os.close(w)
+        fh.close()
+
+theSuite.addTest(unittest.makeSuite(LineReaderTest,"test"))
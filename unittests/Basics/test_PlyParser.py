@@ -3,3 +3,26 @@ import unittest
 from PyFoam.Basics.PlyParser import PlyParser
 
 theSuite=unittest.TestSuite()
+
+from PyFoam.RunDictionary.ParsedParameterFile import FoamStringParser
+
+class PlyParserCacheTest(unittest.TestCase):
+    def testTablesAreShared(self):
+        p1=FoamStringParser("a 1;")
+        p2=FoamStringParser("b 2;")
+        self.assertTrue(p1.parser.action is p2.parser.action)
+        self.assertFalse(p1.parser is p2.parser)
+        self.assertFalse(p1.lexer is p2.lexer)
+
+    def testInstancesAreIndependent(self):
+        p1=FoamStringParser("a 1;")
+        p2=FoamStringParser("b (1 2 3);",noVectorOrTensor=True)
+        self.assertEqual(p1.getData()["a"],1)
+        self.assertEqual(p2.getData()["b"],[1,2,3])
+        self.assertEqual(p1.parse("c 3;")[1]["c"],3)
+
+    def testErrorDoesNotBreakCache(self):
+        self.assertRaises(Exception,lambda:FoamStringParser("a (1 2"))
+        self.assertEqual(FoamStringParser("a 1;")["a"],1)
+
+theSuite.addTest(unittest.makeSuite(PlyParserCacheTest,"test"))
@@ -1,7 +1,92 @@
 import unittest
 
+import re
 import sys
 if sys.version_info[0]>2 or sys.version_info[1]>5:
     from PyFoam.Basics.RunDatabase import RunDatabase
 
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
 theSuite=unittest.TestSuite()
+
+def runData(i):
+    data={"name":"run%d" % i,
+          "nrSteps":i,
+          "analyzed":{"Linear":{"Ux":{"final":0.5*i,"iterations":i}},
+                      "custom%d" % (i%3):{"val":i*0.25}}}
+    if i%2:
+        data["extra"]={"sQuare[1]":"x(y)","number":"3.5"}
+    return data
+
+def dump(db,fName,**kwargs):
+    db.dumpToCSV(fName,pandasFormat=False,**kwargs)
+    # insertion times differ
+    return re.sub("[0-9-]+ [0-9:.]+,","",open(fName).read())
+
+class RunDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def fill(self,layout,nr=7):
+        db=RunDatabase(path.join(self.theDir,layout+".db"),create=True,layout=layout)
+        for i in range(nr):
+            db.add(runData(i),commit=False)
+        db.commit()
+        return db
+
+    def testLayouts(self):
+        wide=self.fill("wide")
+        long=self.fill("long")
+        self.assertEqual(wide.layout,"wide")
+        self.assertEqual(long.layout,"long")
+        self.assertEqual(RunDatabase(path.join(self.theDir,"long.db")).layout,"long")
+        csv=path.join(self.theDir,"dump.csv")
+        wideDump=dump(wide,csv)
+        self.assertEqual(len(wideDump.splitlines()),8)
+        self.assert_(wideDump.startswith("runInfo//insertionTime,runInfo//name,"))
+        self.assertEqual(wideDump,dump(long,csv))
+        for kwargs in [{"selection":["Linear"]},
+                       {"disableRunData":["name"]},
+                       {"disableRunData":["steps"],"selection":["custom"]}]:
+            self.assertEqual(dump(wide,csv,**kwargs),dump(long,csv,**kwargs))
+
+    def testIterRuns(self):
+        long=self.fill("long",nr=3)
+        runs=list(long.iterRuns())
+        self.assertEqual([r[0] for r in runs],[1,2,3])
+        self.assertEqual(runs[1][1]["extraData"],{"sQuare[1]":"x(y)","number":"3.5"})
+        self.assertEqual(runs[2][1]["analyzedData"]["Linear//Ux//iterations"],2.)
+        self.assert_("extraData" not in runs[2][1])
+
+    def testMigrate(self):
+        wide=self.fill("wide")
+        csv=path.join(self.theDir,"dump.csv")
+        wide.dumpToCSV(csv,pandasFormat=False)
+        original=open(csv).read()
+        long=wide.copyTo(path.join(self.theDir,"migrated.db"))
+        self.assertEqual(long.layout,"long")
+        long.dumpToCSV(csv,pandasFormat=False)
+        self.assertEqual(open(csv).read(),original)
+        back=long.copyTo(path.join(self.theDir,"back.db"),layout="wide")
+        back.dumpToCSV(csv,pandasFormat=False)
+        self.assertEqual(open(csv).read(),original)
+        back.add(runData(10))
+        self.assertEqual(list(back.iterRuns())[-1][0],8)
+
+    def testManyValues(self):
+        # more values than SQLite allows columns in a table
+        long=self.fill("long",nr=0)
+        for i in range(3):
+            long.add({"analyzed":dict(("v%d" % j,i+j) for j in range(2500))},
+                     commit=False)
+        long.commit()
+        data=long.dumpToCSV(None,pandasFormat=False)
+        self.assertEqual(len(data),2501)
+        self.assertEqual(list(data["analyzed//v2499"]),[2499.,2500.,2501.])
+
+theSuite.addTest(unittest.makeSuite(RunDatabaseTest,"test"))
@@ -1,5 +1,134 @@
 import unittest
 
 from PyFoam.Basics.STLFile import STLFile
+from PyFoam.Error import FatalErrorPyFoamException
+
+from os import path
+from tempfile import mkdtemp
+from shutil import rmtree
+
+import numpy as np
 
 theSuite=unittest.TestSuite()
+
+def facetText(normal,vertices):
+    txt="  facet normal %g %g %g\n    outer loop\n" % tuple(normal)
+    for v in vertices:
+        txt+="      vertex %g %g %g\n" % tuple(v)
+    return txt+"    endloop\n  endfacet\n"
+
+class STLFileTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        self.fName=path.join(self.theDir,"box.stl")
+        with open(self.fName,"w") as f:
+            f.write("solid inlet\n")
+            f.write(facetText((1,0,0),((0,0,0),(0,1,0),(0,0,1))))
+            f.write("endsolid inlet\n")
+            f.write("solid wall\n")
+            for i in range(3):
+                f.write(facetText((0,0,1),((i,0,0),(i,2,0),(i,0,-1.5e-3))))
+            f.write("endsolid wall\n")
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def testPatchInfo(self):
+        stl=STLFile(self.fName)
+        self.assert_(not stl.isBinary())
+        info=stl.patchInfo()
+        self.assertEqual([p["name"] for p in info],["inlet","wall"])
+        self.assertEqual([p["facets"] for p in info],[1,3])
+        self.assertEqual((info[0]["start"],info[0]["end"]),(1,9))
+        self.assertEqual((info[1]["start"],info[1]["end"]),(10,32))
+        self.assertEqual(info[1]["min"],[0,0,-1.5e-3])
+        self.assertEqual(info[1]["max"],[2,2,0])
+        wall=stl.solids()[1]
+        self.assertEqual(wall.vertices.shape,(3,3,3))
+        self.assertEqual(list(wall.vertices[2,1]),[2,2,0])
+
+    def testSmallBlocks(self):
+        import PyFoam.Basics.STLFile as mod
+        old=mod.blockSize
+        mod.blockSize=20
+        try:
+            stl=STLFile(self.fName)
+        finally:
+            mod.blockSize=old
+        self.assertEqual(stl.patchInfo(),STLFile(self.fName).patchInfo())
+
+    def testWriteASCII(self):
+        stl=STLFile(self.fName)
+        stl.writeTo(path.join(self.theDir,"copy.stl"))
+        copy=STLFile(path.join(self.theDir,"copy.stl"))
+        self.assertEqual(copy.patchInfo(),stl.patchInfo())
+        for a,b in zip(stl.solids(),copy.solids()):
+            self.assert_(np.array_equal(a.vertices,b.vertices))
+            self.assert_(np.array_equal(a.normals,b.normals))
+
+    def testWriteKeepsPrecision(self):
+        fName=path.join(self.theDir,"precise.stl")
+        with open(fName,"w") as f:
+            f.write("solid precise\n")
+            f.write("facet normal 0 0 1\nouter loop\n")
+            for v in ((0.12345678901234567,1/3.,0),(1.2345678901234567e-30,1,0),(2,0,1e30)):
+                f.write("vertex %r %r %r\n" % v)
+            f.write("endloop\nendfacet\n")
+            f.write("endsolid precise\n")
+        stl=STLFile(fName)
+        stl.writeTo(path.join(self.theDir,"copy.stl"))
+        copy=STLFile(path.join(self.theDir,"copy.stl"))
+        self.assert_(np.array_equal(copy.solids()[0].vertices,stl.solids()[0].vertices))
+        # single precision from binary files is written with fewer digits
+        stl.writeTo(path.join(self.theDir,"binary.stl"),binary=True)
+        binary=STLFile(path.join(self.theDir,"binary.stl"))
+        lines=list(binary)
+        self.assertEqual(lines[3],"vertex 0.123456791 0.333333343 0")
+        binary.writeTo(path.join(self.theDir,"copy.stl"))
+        copy=STLFile(path.join(self.theDir,"copy.stl"))
+        self.assert_(np.array_equal(copy.solids()[0].vertices.astype(np.float32),
+                                    binary.solids()[0].vertices))
+
+    def testWriteBinary(self):
+        stl=STLFile(self.fName)
+        stl.writeTo(path.join(self.theDir,"binary.stl"),binary=True)
+        self.assertEqual(path.getsize(path.join(self.theDir,"binary.stl")),84+4*50)
+        binary=STLFile(path.join(self.theDir,"binary.stl"))
+        self.assert_(binary.isBinary())
+        self.assertEqual(len(binary.solids()),1)
+        self.assertEqual(binary.patchInfo()[0]["facets"],4)
+        self.assert_(np.allclose(binary.solids()[0].vertices[1:],stl.solids()[1].vertices))
+        with open(path.join(self.theDir,"binary.stl"),"rb") as f:
+            self.assertEqual(STLFile(f).patchInfo()[0]["facets"],4)
+
+    def testEraseMerge(self):
+        stl=STLFile(self.fName)
+        stl.mergePatches(["inlet","wall"],"all")
+        self.assertEqual([(p["name"],p["facets"]) for p in stl.patchInfo()],[("all",4)])
+        stl=STLFile(self.fName)
+        stl.erasePatches(["inlet"])
+        self.assertEqual([p["name"] for p in stl.patchInfo()],["wall"])
+        self.assertEqual((stl.patchInfo()[0]["start"],stl.patchInfo()[0]["end"]),(1,23))
+
+    def testJoin(self):
+        result=STLFile()
+        result+=STLFile(self.fName)
+        self.assertEqual([p["name"] for p in result.patchInfo()],["box:inlet","box:wall"])
+        lines=list(result)
+        self.assertEqual(lines[0],"solid box:inlet")
+        self.assertEqual(lines[-1],"endsolid box:wall")
+        self.assertEqual(len(lines),32)
+
+    def testErrors(self):
+        txt=open(self.fName).read()
+        for broken in [txt.replace("vertex","vortex",1),
+                       txt.replace("endsolid wall","endsolid inlet"),
+                       txt.replace("endsolid wall\n",""),
+                       "facets\n"+txt]:
+            with open(self.fName,"w") as f:
+                f.write(broken)
+            self.assertRaises(FatalErrorPyFoamException,STLFile,self.fName)
+
+theSuite.addTest(unittest.makeSuite(STLFileTest,"test"))
+
+# Should work with Python3 and Python2
@@ -143,6 +143,21 @@ class SpreadsheetInterpolationTest(unittest.TestCase):
         self.assertAlmostEqual(data["val"],26.1)
         self.assertEqual(data["descr"],b('val_5'))
 
+    def testSpreadsheetDataEvaluateSameAsCall(self):
+        sp=SpreadsheetData(data=data3a,names=names3a)
+        times=[-1,0,0.3,1,2.5,2.7,5,8.9,9,10]
+        for ext in [False,True]:
+            for noInt in [False,True]:
+                vals=sp(numpy.array(times),"val",invalidExtend=ext,noInterpolation=noInt)
+                descr=sp.evaluate(times,"descr",invalidExtend=ext,noInterpolation=noInt)
+                for i,t in enumerate(times):
+                    v=sp(t,"val",invalidExtend=ext,noInterpolation=noInt)
+                    if numpy.isnan(v):
+                        self.assert_(numpy.isnan(vals[i]))
+                    else:
+                        self.assertEqual(vals[i],v)
+                    self.assertEqual(descr[i],sp(t,"descr",invalidExtend=ext,noInterpolation=noInt))
+
 theSuite.addTest(unittest.makeSuite(SpreadsheetInterpolationTest,"test"))
 
 names4 = ['t','val']
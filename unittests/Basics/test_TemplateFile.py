@@ -1,13 +1,17 @@
 import unittest
 
 from PyFoam.Basics.TemplateFile import TemplateFile,TemplateFileOldFormat,PyratempPreprocessor
+from PyFoam.Basics.TemplateFile import clearTemplateCache,getCompiledTemplate
+from PyFoam import configuration as config
 from PyFoam.Error import FatalErrorPyFoamException
 
-from tempfile import mktemp
+from tempfile import mktemp,mkdtemp
+from shutil import rmtree
 
 from PyFoam.ThirdParty.six import PY3
 
 import sys
+import os
 
 theSuite=unittest.TestSuite()
 
@@ -109,6 +113,49 @@ class TemplateFileTest(unittest.TestCase):
         self.assertEqual(t.getString({}),"\nTRUE\nFALSE\n2 3\n* 32\n")
 theSuite.addTest(unittest.makeSuite(TemplateFileTest,"test"))
 
+class TemplateCacheTest(unittest.TestCase):
+    def setUp(self):
+        clearTemplateCache()
+
+    def tearDown(self):
+        config().set("Template","persistentCache","False")
+        config().set("Template","persistentCacheDirectory","")
+        clearTemplateCache()
+        if hasattr(self,"cacheDir"):
+            rmtree(self.cacheDir,ignore_errors=True)
+
+    def testSameTemplateParsedOnce(self):
+        t1=TemplateFile(content=templateMacro,expressionDelimiter="$")
+        t2=TemplateFile(content=templateMacro,expressionDelimiter="$")
+        self.assert_(t1.compiled is t2.compiled)
+        self.assert_(t1.ptemplate.parsetree is t2.ptemplate.parsetree)
+        self.assertEqual(t2.getString({"vals":[2,3]}),"2 \t = 4\n3 \t = 9\n")
+        self.assertEqual(t1.getString({"vals":[4]}),"4 \t = 16\n")
+        self.assertEqual(t2.getString({"vals":[5]}),"5 \t = 25\n")
+        self.assert_(len(t1.compiled.compileCache)>0)
+
+    def testOptionsAreDistinguished(self):
+        t1=TemplateFile(content=template1,expressionDelimiter="$")
+        t2=TemplateFile(content=template1,expressionDelimiter="|")
+        self.assert_(t1.compiled is not t2.compiled)
+        self.assertEqual(t1.getString({"x":-1}),"This should be 1")
+        self.assertEqual(t2.getString({"x":-1}),"This should be $x+y$")
+
+    def testPersistentCache(self):
+        self.cacheDir=mkdtemp()
+        config().set("Template","persistentCache","True")
+        config().set("Template","persistentCacheDirectory",self.cacheDir)
+        t1=TemplateFile(content=templateFor,expressionDelimiter="$")
+        clearTemplateCache()
+        self.assert_(getCompiledTemplate(t1.cacheKey) is not None)
+        t2=TemplateFile(content=templateFor,expressionDelimiter="$")
+        self.assertEqual(t2.getString({"x":2}),t1.getString({"x":2}))
+        self.assertEqual(os.listdir(self.cacheDir),[t1.cacheKey])
+        clearTemplateCache(persistent=True)
+        self.assertEqual(getCompiledTemplate(t1.cacheKey),None)
+
+theSuite.addTest(unittest.makeSuite(TemplateCacheTest,"test"))
+
 class TemplateFileAllowExecutionTest(unittest.TestCase):
     def testAssignmentNotWorkingInPython3(self):
         t=TemplateFile(content=templateVariablesIn3,
@@ -1,5 +1,92 @@
 import unittest
 
-from PyFoam.Basics.TimeLineCollection import TimeLineCollection
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLineColumn,TimeLinesRegistry
 
 theSuite=unittest.TestSuite()
+
+class TimeLineColumnTest(unittest.TestCase):
+    def testAppend(self):
+        col=TimeLineColumn()
+        self.assertEqual(len(col),0)
+        for i in range(100):
+            col.append(i)
+        self.assertEqual(len(col),100)
+        self.assertEqual(col[-1],99)
+        self.assertEqual(col.last(),99)
+        self.assertEqual(list(col[95:]),[95,96,97,98,99])
+        self.assertEqual(col,list(range(100)))
+        self.assertRaises(IndexError,lambda:col[100])
+
+    def testViewsStayValid(self):
+        col=TimeLineColumn([1,2,3])
+        view=col.view()
+        for i in range(1000):
+            col.append(i)
+        col.setLast(-1)
+        self.assertEqual(list(view),[1,2,3])
+        self.assertEqual(len(col),1003)
+        self.assertEqual(col.tolist()[-1],-1)
+
+class TimeLineCollectionTest(unittest.TestCase):
+    def fill(self,lines):
+        for t in range(1,6):
+            lines.setTime(t)
+            lines.setValue("a",t)
+            lines.setValue("a",2*t)
+            if t>2:
+                lines.setValue("b",10*t)
+
+    def testStoreValues(self):
+        lines=TimeLineCollection(registry=TimeLinesRegistry())
+        self.fill(lines)
+        self.assertEqual(lines.getTimes(),[1,2,3,4,5])
+        self.assertEqual(lines.getValues("a"),[1,2,3,4,5])
+        self.assertEqual(lines.getValues("b"),[0,0,30,40,50])
+        self.assertEqual(lines.getLatestData(),{"a":5,"b":50})
+
+    def testAccumulation(self):
+        lines=TimeLineCollection(accumulation="sum",registry=TimeLinesRegistry())
+        self.fill(lines)
+        self.assertEqual(lines.getValues("a"),[3,6,9,12,15])
+        lines.setAccumulator("a","last")
+        lines.setTime(6)
+        lines.setValue("a",1)
+        lines.setValue("a",7)
+        self.assertEqual(lines.getValues("a")[-1],7)
+
+    def testSnapshot(self):
+        lines=TimeLineCollection(registry=TimeLinesRegistry())
+        self.fill(lines)
+        times,values=lines.snapshot()
+        lines.setTime(6)
+        lines.setValue("a",6)
+        self.assertEqual(list(times),[1,2,3,4,5])
+        self.assertEqual(list(values["b"]),[0,0,30,40,50])
+        self.assertEqual(len(lines.getTimes()),6)
+
+    def testSplit(self):
+        lines=TimeLineCollection(splitThres=10,registry=TimeLinesRegistry())
+        for t in range(1,11):
+            lines.setTime(t)
+            lines.setValue("a",t)
+        self.assertEqual(lines.getTimes(),[1,3,5,7,9])
+        # the last value was set after the splitting
+        self.assertEqual(lines.getValues("a"),[1.5,3.5,5.5,7.5,10])
+
+    def testTransfer(self):
+        registry=TimeLinesRegistry()
+        lines=TimeLineCollection(registry=registry)
+        self.fill(lines)
+        data=registry.prepareForTransfer()[str(lines.lineNr)]
+        self.assertEqual(type(data["times"]),list)
+        self.assertEqual(data["times"],[1,2,3,4,5])
+        self.assertEqual(data["values"]["b"],[0,0,30,40,50])
+        other=TimeLineCollection(preloadData=data,registry=TimeLinesRegistry())
+        self.assertEqual(other.getTimes(),lines.getTimes())
+        self.assertEqual(other.getValues("a"),lines.getValues("a"))
+        data=other.getData()
+        self.assertEqual(sorted(data.names()),["a","b","time"])
+        self.assertEqual(data.size(),5)
+
+theSuite.addTest(unittest.makeSuite(TimeLineColumnTest,"test"))
+theSuite.addTest(unittest.makeSuite(TimeLineCollectionTest,"test"))
@@ -0,0 +1,100 @@
+import unittest
+import tempfile
+import shutil
+from os import path
+
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry,mergeTransfer
+from PyFoam.Basics.TimeLineStore import TimeLineStoreWriter,readPlotData,convertToPickle,isTimeLineStore
+
+theSuite=unittest.TestSuite()
+
+class DummyPlots(object):
+    def __init__(self):
+        self.info={}
+
+    def prepareForTransfer(self):
+        return dict(self.info)
+
+def fillLines(lines,times):
+    for t in times:
+        lines.setTime(t)
+        lines.setValue("a",t*2)
+        if t>20:
+            lines.setValue("late",-t)
+
+class TimeLineStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=tempfile.mkdtemp()
+        self.fName=path.join(self.theDir,"timelineStore")
+
+    def tearDown(self):
+        shutil.rmtree(self.theDir)
+
+    def testIncrementalTransfer(self):
+        registry=TimeLinesRegistry()
+        lines=TimeLineCollection(registry=registry)
+        lines.setSplitting(splitThres=64)
+        lineInfo={}
+        cursor=None
+        for i in range(20):
+            fillLines(lines,range(i*10+1,i*10+11))
+            lines.setValue("a",-1)
+            increment,cursor=registry.prepareIncrementalTransfer(cursor)
+            mergeTransfer(lineInfo,increment)
+            self.assertEqual(lineInfo,registry.prepareForTransfer())
+        self.assert_(lines.splits>0)
+
+    def testOnlyChangesAreWritten(self):
+        registry=TimeLinesRegistry()
+        lines=TimeLineCollection(registry=registry)
+        fillLines(lines,range(1,101))
+        increment,cursor=registry.prepareIncrementalTransfer()
+        self.assertEqual(len(increment[str(lines.lineNr)]["times"]),100)
+        fillLines(lines,range(101,104))
+        increment,cursor=registry.prepareIncrementalTransfer(cursor)
+        inc=increment[str(lines.lineNr)]
+        self.assertEqual(inc["start"],99)
+        self.assertEqual(inc["times"],[100,101,102,103])
+
+    def testWriteAndRead(self):
+        registry=TimeLinesRegistry()
+        lines=TimeLineCollection(registry=registry)
+        lines.setSplitting(splitThres=64,advancedSplit=True)
+        plots=DummyPlots()
+        writer=TimeLineStoreWriter(self.fName)
+        self.assert_(isTimeLineStore(self.fName))
+        for i in range(30):
+            plots.info["1"]={"nr":1,"spec":{},"id":"test%d" % (i//10),"data":lines.lineNr}
+            fillLines(lines,range(i*10+1,i*10+11))
+            writer.update(registry,plots)
+            lineInfo,plotInfo=readPlotData(self.fName)
+            self.assertEqual(lineInfo,registry.prepareForTransfer())
+            self.assertEqual(plotInfo,plots.prepareForTransfer())
+
+        # incomplete last record
+        with open(self.fName,"rb") as fh:
+            data=fh.read()
+        with open(self.fName,"wb") as fh:
+            fh.write(data[:-7])
+        lineInfo,plotInfo=readPlotData(self.fName)
+        self.assertEqual(plotInfo,plots.prepareForTransfer())
+
+    def testConvert(self):
+        registry=TimeLinesRegistry()
+        lines=TimeLineCollection(registry=registry)
+        fillLines(lines,range(1,50))
+        plots=DummyPlots()
+        writer=TimeLineStoreWriter(self.fName)
+        writer.update(registry,plots)
+        pickleName=path.join(self.theDir,"pickledPlots")
+        convertToPickle(self.fName,pickleName)
+        self.assert_(not isTimeLineStore(pickleName))
+        self.assertEqual(readPlotData(pickleName),readPlotData(self.fName))
+
+        preloaded=TimeLinesRegistry()
+        for nr,line in readPlotData(pickleName)[0].items():
+            TimeLineCollection(preloadData=line,registry=preloaded)
+        self.assertEqual(preloaded.get(lines.lineNr).getValues("late"),
+                         lines.getValues("late"))
+
+theSuite.addTest(unittest.makeSuite(TimeLineStoreTest,"test"))
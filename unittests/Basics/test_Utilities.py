@@ -1,5 +1,18 @@
 import unittest
 
-from PyFoam.Basics.Utilities import Utilities
+from PyFoam.Basics.Utilities import Utilities,processFiles
+
+from os import path
 
 theSuite=unittest.TestSuite()
+
+class ProcessFilesTest(unittest.TestCase):
+    def testSerial(self):
+        self.assertEqual(processFiles(path.basename,["a/b","c/d"]),["b","d"])
+
+    def testParallelKeepsOrder(self):
+        names=["dir/f%d" % i for i in range(10)]
+        self.assertEqual(processFiles(path.basename,names,jobs=3),
+                         ["f%d" % i for i in range(10)])
+
+theSuite.addTest(unittest.makeSuite(ProcessFilesTest,"test"))
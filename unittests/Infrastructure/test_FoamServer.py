@@ -1,5 +1,24 @@
 import unittest
 
-from PyFoam.Infrastructure.FoamServer import FoamServer
+from PyFoam.Infrastructure.FoamServer import FoamServer,serverPortRange,nextServerPort
 
 theSuite=unittest.TestSuite()
+
+class ServerPortTest(unittest.TestCase):
+    def testNextPortInRange(self):
+        for useSSL in [False,True]:
+            start,nr=serverPortRange(useSSL)
+            self.assertEqual(nextServerPort(start,useSSL),start+1)
+            self.assertEqual(nextServerPort(start+nr-1,useSSL),start)
+
+    def testAllPortsTried(self):
+        start,nr=serverPortRange(False)
+        port=start+nr//2
+        tried=set()
+        for i in range(nr):
+            tried.add(port)
+            port=nextServerPort(port,False)
+        self.assertEqual(tried,set(range(start,start+nr)))
+        self.assertEqual(port,start+nr//2)
+
+theSuite.addTest(unittest.makeSuite(ServerPortTest,"test"))
@@ -1,5 +1,79 @@
 import unittest
+import threading
+import socket
+import sys
+
+from PyFoam.ThirdParty.six import PY3
+if PY3:
+    from xmlrpc.server import SimpleXMLRPCServer
+else:
+    from SimpleXMLRPCServer import SimpleXMLRPCServer
 
 from PyFoam.Infrastructure import NetworkHelpers
+from PyFoam.Infrastructure.NetworkHelpers import threadPool,subnetHosts,scanFoamServers,checkFoamServers,hostNames
 
 theSuite=unittest.TestSuite()
+
+class StandIn(object):
+    def isFoamServer(self):
+        return True
+
+class NetworkHelpersTest(unittest.TestCase):
+    def setUp(self):
+        self.servers=[]
+
+    def tearDown(self):
+        for s in self.servers:
+            s.shutdown()
+            s.server_close()
+
+    def serve(self,instance):
+        server=SimpleXMLRPCServer(("127.0.0.1",0),logRequests=False)
+        if instance is not None:
+            server.register_instance(instance)
+        t=threading.Thread(target=server.serve_forever)
+        t.daemon=True
+        t.start()
+        self.servers.append(server)
+        return server.server_address[1]
+
+    def testThreadPool(self):
+        self.assertEqual(threadPool(lambda x:x*x,range(100),jobs=7),
+                         [x*x for x in range(100)])
+        self.assertEqual(threadPool(lambda x:x,[],jobs=7),[])
+
+    def testThreadPoolException(self):
+        done=[]
+        def func(x):
+            if x in [13,42]:
+                raise ValueError(x)
+            done.append(x)
+            return x
+        try:
+            threadPool(func,range(100),jobs=3)
+            self.fail("No exception raised")
+        except ValueError:
+            e=sys.exc_info()[1]
+            self.assertEqual(e.args,(13,))
+        self.assertEqual(sorted(done),[x for x in range(100) if x not in [13,42]])
+
+    def testSubnetHosts(self):
+        self.assertEqual(len(subnetHosts("192.168.1.0/30")),4)
+        self.assertEqual(subnetHosts("10.0.0.1"),["10.0.0.1"])
+
+    def testHostNames(self):
+        self.assert_("127.0.0.1" in hostNames(["127.0.0.1"]))
+
+    def testScanLoopback(self):
+        foam=[self.serve(StandIn()) for i in range(3)]
+        other=self.serve(None)
+        ports=foam+[other]
+        start=min(ports)
+        length=max(ports)-start+1
+        found=scanFoamServers(["127.0.0.1"],start,length,timeout=2,jobs=50)
+        self.assertEqual(found["127.0.0.1"],sorted(foam))
+        self.assertEqual(checkFoamServers("127.0.0.1",other),[])
+        self.assertEqual(checkFoamServers("127.0.0.1",foam[0]),[foam[0]])
+        self.assertEqual(socket.getdefaulttimeout(),None)
+
+theSuite.addTest(unittest.makeSuite(NetworkHelpersTest,"test"))
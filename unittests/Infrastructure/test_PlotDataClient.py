@@ -0,0 +1,62 @@
+import unittest
+
+from PyFoam.ThirdParty.six import PY3
+if PY3:
+    from xmlrpc.client import dumps,loads,Fault
+else:
+    from xmlrpclib import dumps,loads,Fault
+
+from PyFoam.Infrastructure.PlotDataClient import PlotDataClient
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+
+theSuite=unittest.TestSuite()
+
+def marshal(data):
+    """Send the data through XMLRPC"""
+    return loads(dumps((data,),allow_none=False))[0][0]
+
+class DummyServer(object):
+    def __init__(self,registry,incremental=True):
+        self.registry=registry
+        self.incremental=incremental
+        self.transfered=0
+
+    def getPlotDataSince(self,cursor):
+        if not self.incremental:
+            raise Fault(1,"method getPlotDataSince is not supported")
+        data,cursor=self.registry.prepareIncrementalTransfer(marshal(cursor))
+        for d in data.values():
+            self.transfered+=len(d["times"])
+        return marshal({"data":data,"cursor":cursor})
+
+    def getPlotData(self):
+        data=self.registry.prepareForTransfer()
+        for d in data.values():
+            self.transfered+=len(d["times"])
+        return marshal(data)
+
+class PlotDataClientTest(unittest.TestCase):
+    def fill(self,lines,times):
+        for t in times:
+            lines.setTime(t)
+            lines.setValue("a",t)
+            lines.setValue("b",-t)
+
+    def follow(self,incremental):
+        registry=TimeLinesRegistry()
+        lines=TimeLineCollection(registry=registry)
+        lines.setSplitting(splitThres=128)
+        server=DummyServer(registry,incremental=incremental)
+        client=PlotDataClient(server)
+        for i in range(30):
+            self.fill(lines,range(i*10+1,i*10+11))
+            self.assertEqual(client.update(),registry.prepareForTransfer())
+        return server.transfered
+
+    def testIncremental(self):
+        self.assert_(self.follow(True)<self.follow(False)/2)
+
+    def testOldServer(self):
+        self.follow(False)
+
+theSuite.addTest(unittest.makeSuite(PlotDataClientTest,"test"))
@@ -0,0 +1,174 @@
+import unittest
+import tempfile
+import shutil
+import gzip
+from os import path
+from io import BytesIO
+
+from PyFoam.LogAnalysis.ChunkedLogAnalysis import timeStepChunks,decodeLines,analyzeChunked,canAnalyzeChunked
+from PyFoam.LogAnalysis.BoundingLogAnalyzer import BoundingLogAnalyzer
+from PyFoam.LogAnalysis.RegExpLineAnalyzer import RegExpLineAnalyzer
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry,startJournal,stopJournal,replayJournal
+
+theSuite=unittest.TestSuite()
+
+header="""/*---------------------------------------------------------------------------*\\
+Exec   : pimpleFoam
+\\*---------------------------------------------------------------------------*/
+Create mesh for time = 0
+
+Starting time loop
+
+"""
+
+def timeStep(i):
+    return """Courant Number mean: %g max: %g
+deltaT = 0.01
+Time = %g
+
+smoothSolver:  Solving for Ux, Initial residual = %g, Final residual = 2e-06, No Iterations %d
+GAMG:  Solving for p, Initial residual = %g, Final residual = 0.04, No Iterations %d
+GAMG:  Solving for p, Initial residual = %g, Final residual = 0.04, No Iterations %d
+time step continuity errors : sum local = 1.4e-07, global = -1.2e-19, cumulative = %g
+bounding epsilon, min: -%g max: 1 average: 0.5
+ExecutionTime = %g s  ClockTime = %d s
+
+""" % (0.1*i,0.5*i,0.01*i,1./i,i%5+1,0.5/i,i%13+3,0.1/i,i%7+2,1e-19*i,1e-3*i,0.17*i,i//3)
+
+log=header+"".join(timeStep(i) for i in range(1,201))+"End\n"
+
+def isTimeLine(raw):
+    return raw.strip().startswith(b"Time = ")
+
+class TimeStepChunksTest(unittest.TestCase):
+    def chunks(self,size):
+        return list(timeStepChunks(BytesIO(log.encode()),isTimeLine,size))
+
+    def testChunksCoverFile(self):
+        for size in [100,1000,len(log)*2]:
+            chunks=self.chunks(size)
+            self.assertEqual(chunks[0].decode(),log[:log.find("Time = ")])
+            self.assertEqual(chunks[0]+b"".join(c for w,c in chunks[1:]),
+                             log.encode())
+
+    def testChunksStartWithTimeStep(self):
+        chunks=self.chunks(1000)
+        self.assert_(len(chunks)>10)
+        for warmup,chunk in chunks[1:]:
+            self.assert_(isTimeLine(chunk[:chunk.find(b"\n")]))
+
+    def testWarmupIsPreviousTimeStep(self):
+        chunks=self.chunks(1000)
+        self.assertEqual(chunks[1][0],b"")
+        for i in range(2,len(chunks)):
+            warmup=chunks[i][0]
+            self.assert_(chunks[i-1][1].endswith(warmup))
+            self.assert_(isTimeLine(warmup[:warmup.find(b"\n")]))
+            self.assertEqual(len([l for l in warmup.split(b"\n") if isTimeLine(l)]),1)
+
+    def testNoTimeSteps(self):
+        chunks=list(timeStepChunks(BytesIO(header.encode()),isTimeLine,10))
+        self.assertEqual(chunks,[header.encode()])
+
+    def testDecodeLines(self):
+        self.assertEqual(decodeLines(b"  a \n b\r\n\nc\n"),["a","b","","c"])
+        self.assertEqual(decodeLines(b"  a \n b",stripAll=False),["  a"," b"])
+
+class JournalTest(unittest.TestCase):
+    def fill(self,lines,times):
+        for t in times:
+            lines.setTime(t)
+            lines.setAccumulator("b","sum")
+            lines.setValue("a",t*2)
+            lines.setValue("b",1)
+            lines.setValue("b",2)
+
+    def testReplay(self):
+        registry=TimeLinesRegistry()
+        orig=TimeLineCollection(registry=registry)
+        orig.setSplitting(splitThres=64,advancedSplit=True)
+        self.fill(orig,range(1,5))
+        startJournal()
+        self.fill(orig,range(5,300))
+        journal=stopJournal()
+        self.assertEqual(stopJournal(),None)
+
+        other=TimeLineCollection(registry=TimeLinesRegistry())
+        other.setSplitting(splitThres=64,advancedSplit=True)
+        self.fill(other,range(1,5))
+        otherRegistry=TimeLinesRegistry()
+        otherRegistry.add(other,orig.lineNr)
+        replayJournal(journal,otherRegistry)
+
+        self.assertEqual(orig.times,other.times)
+        self.assertEqual(orig.values,other.values)
+        self.assertEqual(other.getValues("b")[-1],3)
+
+class AnalyzeChunkedTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=tempfile.mkdtemp()
+        self.logFile=path.join(self.theDir,"pimpleFoam.logfile")
+        with open(self.logFile,"w") as f:
+            f.write(log)
+
+    def tearDown(self):
+        shutil.rmtree(self.theDir)
+
+    def analyzer(self):
+        analyzer=BoundingLogAnalyzer(doTimelines=True,doFiles=False)
+        analyzer.addAnalyzer("Custom01_courant",
+                             RegExpLineAnalyzer("courant",
+                                                "Courant Number mean: (%f%) max: (%f%)",
+                                                doTimelines=True,
+                                                doFiles=False,
+                                                accumulation="max"))
+        for nm in analyzer.listAnalyzers():
+            lines=getattr(analyzer.getAnalyzer(nm),"lines",None)
+            if lines:
+                lines.setSplitting(splitThres=64,advancedSplit=True)
+        return analyzer
+
+    def timelines(self,analyzer):
+        result={}
+        for nm in analyzer.listAnalyzers():
+            lines=getattr(analyzer.getAnalyzer(nm),"lines",None)
+            if lines:
+                result[nm]=(lines.times,lines.values)
+        return result
+
+    def serial(self):
+        analyzer=self.analyzer()
+        with open(self.logFile) as fh:
+            analyzer.analyze(fh)
+        return analyzer
+
+    def testSameTimelines(self):
+        serial=self.serial()
+        chunked=self.analyzer()
+        self.assert_(canAnalyzeChunked(chunked))
+        analyzeChunked(chunked,self.logFile,3,size=2000)
+        self.assertEqual(self.timelines(serial),self.timelines(chunked))
+        self.assertEqual(serial.getTime(),chunked.getTime())
+        self.assertEqual(serial.collectData(),chunked.collectData())
+
+    def testCompressed(self):
+        with open(self.logFile,"rb") as src:
+            with gzip.open(self.logFile+".gz","wb") as dst:
+                shutil.copyfileobj(src,dst)
+        chunked=self.analyzer()
+        analyzeChunked(chunked,self.logFile+".gz",2,size=5000)
+        self.assertEqual(self.timelines(self.serial()),self.timelines(chunked))
+
+    def testSingleProcess(self):
+        chunked=self.analyzer()
+        analyzeChunked(chunked,self.logFile,1,size=2000)
+        self.assertEqual(self.timelines(self.serial()),self.timelines(chunked))
+
+    def testFilesOnlySerial(self):
+        analyzer=BoundingLogAnalyzer(doTimelines=True,doFiles=True)
+        analyzer.setDirectory(self.theDir)
+        self.assert_(not canAnalyzeChunked(analyzer))
+
+theSuite.addTest(unittest.makeSuite(TimeStepChunksTest,"test"))
+theSuite.addTest(unittest.makeSuite(JournalTest,"test"))
+theSuite.addTest(unittest.makeSuite(AnalyzeChunkedTest,"test"))
@@ -0,0 +1,158 @@
+import unittest
+import re
+
+from PyFoam.LogAnalysis.LineDispatcher import LineDispatcher,requiredLiterals,combinable
+from PyFoam.LogAnalysis.StandardLogAnalyzer import StandardLogAnalyzer
+from PyFoam.LogAnalysis.RegExpLineAnalyzer import RegExpLineAnalyzer
+from PyFoam.LogAnalysis.LinearSolverLineAnalyzer import linearRegExp
+
+theSuite=unittest.TestSuite()
+
+log="""Create mesh for time = 0
+
+Time = 0.1
+
+Courant Number mean: 0.1 max: 0.5
+smoothSolver:  Solving for Ux, Initial residual = 1, Final residual = 2e-06, No Iterations 3
+GAMG:  Solving for p, Initial residual = 0.5, Final residual = 0.04, No Iterations 12
+time step continuity errors : sum local = 1.4e-07, global = -1.2e-19, cumulative = -1.2e-19
+Value of a is 1
+and of b 2
+ExecutionTime = 0.17 s  ClockTime = 0 s
+
+Time = 0.2
+
+Courant Number mean: 0.2 max: 0.7
+smoothSolver:  Solving for Ux, Initial residual = 0.5, Final residual = 1e-06, No Iterations 2
+GAMG:  Solving for p, Initial residual = 0.2, Final residual = 0.01, No Iterations 10
+time step continuity errors : sum local = 1e-07, global = -1e-19, cumulative = -2e-19
+Value of a is 3
+and of b 4
+ExecutionTime = 0.3 s  ClockTime = 1 s
+
+End
+"""
+
+class RequiredLiteralsTest(unittest.TestCase):
+    def testSimple(self):
+        self.assertEqual(requiredLiterals(re.compile("^deltaT = (.+)$")),["deltaT = "])
+
+    def testLongestLiteral(self):
+        self.assertEqual(requiredLiterals(re.compile(linearRegExp)),[", Initial residual = "])
+
+    def testBranch(self):
+        self.assertEqual(sorted(requiredLiterals(re.compile("^(Time =|Iteration:) (.+)$"))),
+                         ["Iteration:","Time ="])
+
+    def testNoLiteral(self):
+        self.assertEqual(requiredLiterals(re.compile("^(.+)([0-9]+)$")),None)
+        self.assertEqual(requiredLiterals(re.compile("a?b*")),None)
+        self.assertEqual(requiredLiterals(re.compile("Time",re.IGNORECASE)),None)
+
+    def testOptionalPartsIgnored(self):
+        self.assertEqual(requiredLiterals(re.compile("(Courant Number )?mean")),["mean"])
+
+    def testCombinable(self):
+        self.assertTrue(combinable(re.compile("^(.+) ([0-9]+)$")))
+        self.assertFalse(combinable(re.compile(r"(a)\1")))
+        self.assertFalse(combinable(re.compile("a",re.IGNORECASE)))
+
+class LineDispatcherTest(unittest.TestCase):
+    def analyze(self,prefilter):
+        analyzer=StandardLogAnalyzer(doTimelines=True,doFiles=False)
+        analyzer.prefilterLines=prefilter
+        analyzer.addAnalyzer("Custom01_courant",
+                             RegExpLineAnalyzer("courant",
+                                                "Courant Number mean: (%f%) max: (%f%)",
+                                                doTimelines=True,
+                                                doFiles=False))
+        analyzer.addAnalyzer("Custom02_noLiteral",
+                             RegExpLineAnalyzer("noLiteral",
+                                                "^\\w+\\W+(%f%)$",
+                                                doTimelines=True,
+                                                doFiles=False))
+        analyzer.addAnalyzer("Custom03_multiLine",
+                             RegExpLineAnalyzer("multiLine",
+                                                "^Value of a is (%f%)\\nand of b (%f%)$",
+                                                doTimelines=True,
+                                                doFiles=False))
+        for l in log.split("\n"):
+            analyzer.analyzeLine(l)
+        return analyzer
+
+    def testSameResults(self):
+        plain=self.analyze(False)
+        filtered=self.analyze(True)
+        self.assertEqual(plain.collectData(),filtered.collectData())
+        self.assertEqual(filtered.getTime(),"0.2")
+        data=filtered.collectData()
+        self.assertEqual(data["Custom"]["courant"]["value 1"],0.7)
+        self.assertEqual(data["Custom"]["multiLine"]["value 1"],4)
+        self.assertEqual(data["Custom"]["noLiteral"]["value 0"],0.2)
+
+    def testOnlyMatchingAnalyzersCalled(self):
+        calls=[]
+        class Counter(RegExpLineAnalyzer):
+            def doAnalysis(self,line):
+                calls.append(line)
+                RegExpLineAnalyzer.doAnalysis(self,line)
+            def lineFilters(self):
+                return [self.exp]
+        analyzer=StandardLogAnalyzer(doTimelines=True,doFiles=False)
+        analyzer.addAnalyzer("Custom01_exec",
+                             Counter("exec",
+                                     "^ExecutionTime = (%f%) s",
+                                     doTimelines=True,
+                                     doFiles=False))
+        for l in log.split("\n"):
+            analyzer.analyzeLine(l)
+        self.assertEqual(len(calls),2)
+
+    def testAnalyzersWithoutFiltersSeeAllLines(self):
+        calls=[]
+        class Counter(RegExpLineAnalyzer):
+            def doAnalysis(self,line):
+                calls.append(line)
+        analyzer=StandardLogAnalyzer(doTimelines=True,doFiles=False)
+        analyzer.addAnalyzer("Custom01_exec",
+                             Counter("exec",
+                                     "^ExecutionTime = (%f%) s",
+                                     doTimelines=True,
+                                     doFiles=False))
+        lines=log.split("\n")
+        for l in lines:
+            analyzer.analyzeLine(l)
+        self.assertEqual(len(calls),len(lines))
+
+class RecordingAnalyzer(object):
+    def __init__(self,name,filters,calls):
+        self.name=name
+        self.filters=filters
+        self.calls=calls
+
+    def lineFilters(self):
+        return self.filters
+
+    def doAnalysis(self,line):
+        self.calls.append((self.name,line))
+
+class LineDispatcherDirectTest(unittest.TestCase):
+    def testDispatch(self):
+        calls=[]
+        dispatcher=LineDispatcher([RecordingAnalyzer("all",None,calls),
+                                   RecordingAnalyzer("time",[re.compile("^Time = (.+)$")],calls),
+                                   RecordingAnalyzer("number",[re.compile("^(.+) ([0-9]+)$")],calls),
+                                   RecordingAnalyzer("courant",[re.compile("Courant Number")],calls)])
+        for l in ["Time = 1","Courant Number 3","nothing"]:
+            dispatcher.dispatch(l)
+        self.assertEqual(calls,[("all","Time = 1"),
+                                ("time","Time = 1"),
+                                ("number","Time = 1"),
+                                ("all","Courant Number 3"),
+                                ("number","Courant Number 3"),
+                                ("courant","Courant Number 3"),
+                                ("all","nothing")])
+
+theSuite.addTest(unittest.makeSuite(RequiredLiteralsTest,"test"))
+theSuite.addTest(unittest.makeSuite(LineDispatcherTest,"test"))
+theSuite.addTest(unittest.makeSuite(LineDispatcherDirectTest,"test"))
@@ -0,0 +1,191 @@
+import unittest
+
+from os import path,makedirs
+from tempfile import mkdtemp
+from shutil import rmtree
+import gzip
+
+from PyFoam.RunDictionary.BoundaryFieldRewriter import BoundaryFieldRewriter,processorFieldFiles
+from PyFoam.Basics.Utilities import processFiles
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
+
+theSuite=unittest.TestSuite()
+
+header=b"""FoamFile
+{
+    version     2.0;
+    format      %s;
+    arch        "LSB;label=32;scalar=64";
+    class       volScalarField;
+    object      p;
+}
+
+dimensions      [0 2 -2 0 0 0 0];
+
+"""
+
+boundary=b"""
+
+boundaryField
+{
+    walls
+    {
+        type            zeroGradient;
+        note            "a string with a brace }";
+    }
+    inlet
+    {
+        type            fixedValue;
+        value           nonuniform List<scalar> 2(%s);
+    }
+}
+
+// end of the file
+"""
+
+class BoundaryFieldRewriterTest(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        self.np=np
+        self.values=np.linspace(-1,1,20)
+        self.theDir=mkdtemp()
+
+        self.asciiFile=path.join(self.theDir,"pa")
+        with open(self.asciiFile,"wb") as f:
+            f.write(header % b"ascii")
+            f.write(b"internalField   nonuniform List<scalar> 20\n(\n")
+            for v in self.values:
+                f.write(("%r\n" % v.tolist()).encode())
+            f.write(b")\n;")
+            f.write(boundary % b"1 2")
+
+        # binary data with braces in the internal field and the patch
+        braces=np.frombuffer(b"}"*16,"<f8")
+        data=(header % b"binary")+b"internalField   nonuniform List<scalar> 22("
+        data+=np.concatenate((self.values,braces)).astype("<f8").tobytes()+b");"
+        data+=boundary % braces.tobytes()
+        self.binaryFile=path.join(self.theDir,"pb")
+        with open(self.binaryFile,"wb") as f:
+            f.write(data)
+        self.zippedFile=path.join(self.theDir,"pz")
+        with gzip.open(self.zippedFile+".gz","wb") as f:
+            f.write(data)
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def readRaw(self,name):
+        if path.exists(name):
+            with open(name,"rb") as f:
+                return f.read()
+        else:
+            with gzip.open(name+".gz","rb") as f:
+                return f.read()
+
+    def testRead(self):
+        for f in [self.asciiFile,self.binaryFile,self.zippedFile]:
+            test=BoundaryFieldRewriter(f)
+            self.assertEqual(list(test["boundaryField"].keys()),["walls","inlet"])
+            self.assertEqual(test["boundaryField"]["walls"]["type"],"zeroGradient")
+
+    def testRewrite(self):
+        for f in [self.asciiFile,self.binaryFile,self.zippedFile]:
+            old=self.readRaw(f)
+            test=BoundaryFieldRewriter(f)
+            test["boundaryField"]["walls"]["type"]="slip"
+            test["boundaryField"]["outlet"]={"type":"zeroGradient"}
+            test.writeFile()
+            new=self.readRaw(f)
+            self.assertEqual(new[:test.start],old[:test.start])
+            self.assertEqual(new[test.end:],b"\n\n// end of the file\n")
+            check=ParsedParameterFile(f)
+            self.assertEqual(check["boundaryField"]["walls"]["type"],"slip")
+            self.assertEqual(check["boundaryField"]["outlet"]["type"],"zeroGradient")
+
+    def testRewriteIsStable(self):
+        BoundaryFieldRewriter(self.binaryFile).writeFile()
+        first=self.readRaw(self.binaryFile)
+        BoundaryFieldRewriter(self.binaryFile).writeFile()
+        self.assertEqual(self.readRaw(self.binaryFile),first)
+
+    def testBackup(self):
+        old=self.readRaw(self.asciiFile)
+        test=BoundaryFieldRewriter(self.asciiFile,backup=True)
+        test["boundaryField"]["walls"]["type"]="slip"
+        test.writeFile()
+        self.assertNotEqual(self.readRaw(self.asciiFile),old)
+        test.restore()
+        self.assertEqual(self.readRaw(self.asciiFile),old)
+
+    def testInlineInternalField(self):
+        name=path.join(self.theDir,"U")
+        with open(name,"wb") as f:
+            f.write(header % b"ascii")
+            f.write(b"""internalField   nonuniform List<vector> 2((1 2 3) (4 5 6));
+
+boundaryField
+{
+    inlet
+    {
+        type            fixedValue;
+        value           nonuniform List<vector>
+2
+(
+(1 0 0)
+(2 0 0)
+)
+;
+    }
+}
+""")
+        test=BoundaryFieldRewriter(name)
+        self.assertEqual(test.parsed,None)
+        test["boundaryField"]["inlet"]["type"]="slip"
+        test.writeFile()
+        check=ParsedParameterFile(name)
+        self.assertEqual(check["boundaryField"]["inlet"]["type"],"slip")
+        self.assertEqual(len(check["internalField"].val),2)
+
+    def testFallbackToFullParse(self):
+        # boundaryField is not at the start of a line
+        name=path.join(self.theDir,"oneLine")
+        with open(name,"wb") as f:
+            f.write(header % b"ascii")
+            f.write(b"internalField uniform 0; ")
+            f.write((boundary % b"1 2").lstrip())
+        test=BoundaryFieldRewriter(name)
+        self.assertNotEqual(test.parsed,None)
+        test["boundaryField"]["walls"]["type"]="slip"
+        self.assertTrue(str(test).find("slip")>=0)
+        test.writeFile()
+        check=ParsedParameterFile(name)
+        self.assertEqual(check["boundaryField"]["walls"]["type"],"slip")
+        self.assertEqual(check["internalField"].val,0)
+
+class BoundaryFieldRewriterProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        for d in ["system","constant","0","processor0/0","processor1/0"]:
+            makedirs(path.join(self.theDir,d))
+        with open(path.join(self.theDir,"system","controlDict"),"w") as f:
+            f.write("endTime 1;\n")
+        for d in ["0","processor0/0","processor1/0"]:
+            with open(path.join(self.theDir,d,"p"),"wb") as f:
+                f.write(header % b"ascii")
+                f.write(b"internalField uniform 0;")
+                f.write(boundary % b"1 2")
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def testProcessorFiles(self):
+        names=processorFieldFiles(path.join(self.theDir,"0","p"))
+        self.assertEqual(len(names),2)
+        self.assertEqual(path.basename(path.dirname(path.dirname(names[1]))),"processor1")
+
+    def testProcessFiles(self):
+        names=[path.join(self.theDir,"0","p")]+processorFieldFiles(path.join(self.theDir,"0","p"))
+        self.assertEqual(processFiles(path.basename,names,jobs=2),["p","p","p"])
+
+theSuite.addTest(unittest.makeSuite(BoundaryFieldRewriterTest,"test"))
+theSuite.addTest(unittest.makeSuite(BoundaryFieldRewriterProcessorTest,"test"))
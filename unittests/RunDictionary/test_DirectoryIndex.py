@@ -0,0 +1,61 @@
+import unittest
+
+from PyFoam.RunDictionary import DirectoryIndex
+from PyFoam.RunDictionary.DirectoryIndex import listing,invalidate,closestTime
+
+from os import path,mkdir
+from tempfile import mkdtemp
+from shutil import rmtree
+
+theSuite=unittest.TestSuite()
+
+class DirectoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        for d in ["0","0.25","1e-2","processor10","processor2","constant"]:
+            mkdir(path.join(self.theDir,d))
+        open(path.join(self.theDir,"3"),"w").close()
+        open(path.join(self.theDir,"processor1"),"w").close()
+
+    def tearDown(self):
+        DirectoryIndex.racyInterval=2.
+        invalidate()
+        rmtree(self.theDir)
+
+    def testListing(self):
+        l=listing(self.theDir)
+        self.assertEqual(l.times(),["0","1e-2","0.25","3"])
+        self.assertEqual(l.timeValues(),[0,0.01,0.25,3])
+        self.assertEqual(l.timeDirectories(),["0","1e-2","0.25"])
+        self.assertEqual(l.processorDirs(),["processor2","processor10"])
+        self.assert_(l.isDir("constant"))
+        self.assert_(not l.isDir("3"))
+        self.assert_("3" in l)
+        self.assertEqual(listing(path.join(self.theDir,"nix")),None)
+
+    def testCaching(self):
+        DirectoryIndex.racyInterval=-1e10
+        l=listing(self.theDir)
+        self.assert_(listing(self.theDir) is l)
+        invalidate(self.theDir)
+        self.assert_(listing(self.theDir) is not l)
+
+    def testChangesAreSeen(self):
+        listing(self.theDir)
+        mkdir(path.join(self.theDir,"5"))
+        self.assertEqual(listing(self.theDir).times()[-1],"5")
+
+    def testClosestTime(self):
+        vals=[0,0.1,0.2,0.2,1]
+        self.assertEqual(closestTime(vals,0.2),2)
+        self.assertEqual(closestTime(vals,0.2+1e-8),2)
+        self.assertEqual(closestTime(vals,0.15),None)
+        self.assertEqual(closestTime(vals,0.16,minTime=True),2)
+        self.assertEqual(closestTime(vals,-3,minTime=True),0)
+        self.assertEqual(closestTime(vals,30,minTime=True),4)
+        self.assertEqual(closestTime([],1),None)
+        self.assertEqual(closestTime([],1,minTime=True),0)
+
+theSuite.addTest(unittest.makeSuite(DirectoryIndexTest,"test"))
+
+# Should work with Python3 and Python2
@@ -0,0 +1,174 @@
+import unittest
+
+from os import path
+from tempfile import mkdtemp
+from shutil import rmtree
+import gzip
+
+from PyFoam.RunDictionary import LazyFieldFile as lazyModule
+from PyFoam.RunDictionary.LazyFieldFile import LazyFieldFile,LazyField
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
+
+theSuite=unittest.TestSuite()
+
+header=b"""FoamFile
+{
+    version     2.0;
+    format      %s;
+    arch        "LSB;label=32;scalar=64";
+    class       volVectorField;
+    object      U;
+}
+
+dimensions      [0 1 -1 0 0 0 0];
+
+"""
+
+inlineField=b"""internalField   nonuniform List<vector> 2((1 2 3) (4 5 6));
+
+boundaryField
+{
+    inlet
+    {
+        type            fixedValue;
+        value           nonuniform List<vector>
+2
+(
+(1 0 0)
+(2 0 0)
+)
+;
+    }
+}
+"""
+
+boundary=b"""
+
+boundaryField
+{
+    walls
+    {
+        type            noSlip;
+    }
+    inlet
+    {
+        type            fixedValue;
+        value           uniform (1 0 0);
+    }
+}
+"""
+
+class LazyFieldFileTest(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        self.np=np
+        self.values=np.linspace(-1,1,30).reshape((10,3))
+        self.theDir=mkdtemp()
+
+        self.asciiFile=path.join(self.theDir,"Ua")
+        with open(self.asciiFile,"wb") as f:
+            f.write(header % b"ascii")
+            f.write(b"internalField   nonuniform List<vector> 10\n(\n")
+            for v in self.values:
+                f.write(("(%r %r %r)\n" % tuple(v.tolist())).encode())
+            f.write(b")\n;")
+            f.write(boundary)
+
+        data=(header % b"binary")+b"internalField   nonuniform List<vector> 10("
+        data+=self.values.astype("<f8").tobytes()+b");"+boundary
+        self.binaryFile=path.join(self.theDir,"Ub")
+        with open(self.binaryFile,"wb") as f:
+            f.write(data)
+        self.zippedFile=path.join(self.theDir,"Uz")
+        with gzip.open(self.zippedFile+".gz","wb") as f:
+            f.write(data)
+
+        self.uniformFile=path.join(self.theDir,"Uu")
+        with open(self.uniformFile,"wb") as f:
+            f.write(header % b"ascii")
+            f.write(b"internalField   uniform (0 0 0);")
+            f.write(boundary)
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def writeInline(self):
+        name=path.join(self.theDir,"Ui")
+        with open(name,"wb") as f:
+            f.write(header % b"ascii")
+            f.write(inlineField)
+        return name
+
+    def internalData(self,name):
+        with open(name,"rb") as f:
+            data=f.read()
+        start=data.find(b"List<vector> 10")+len(b"List<vector> 10")
+        return data[start:data.rfind(b")",0,data.find(b"boundaryField"))].lstrip()
+
+    def testLazyRead(self):
+        for f in [self.asciiFile,self.binaryFile,self.zippedFile]:
+            test=LazyFieldFile(f)
+            field=test["internalField"]
+            self.assertEqual(type(field),LazyField)
+            self.assertFalse(field.isLoaded())
+            self.assertEqual(len(field),10)
+            self.assertEqual(test["boundaryField"]["walls"]["type"],"noSlip")
+            self.assertTrue(self.np.array_equal(field.value(),self.values))
+            self.assertTrue(field.isLoaded())
+
+    def testUniformIsReadNormally(self):
+        test=LazyFieldFile(self.uniformFile)
+        self.assertTrue(test["internalField"].isUniform())
+        self.assertEqual(str(test["internalField"].value()),"(0 0 0)")
+
+    def testBoundaryOnlyKeepsData(self):
+        for f in [self.asciiFile,self.binaryFile]:
+            before=self.internalData(f)
+            test=LazyFieldFile(f)
+            test["boundaryField"]["walls"]["type"]="slip"
+            test.writeFile()
+            self.assertFalse(test["internalField"].isLoaded())
+            self.assertEqual(self.internalData(f),before)
+            check=ParsedParameterFile(f)
+            self.assertEqual(check["boundaryField"]["walls"]["type"],"slip")
+            # written file can be read lazily again
+            test=LazyFieldFile(f)
+            self.assertTrue(self.np.array_equal(test["internalField"].value(),self.values))
+
+    def testBoundaryOnlyZipped(self):
+        test=LazyFieldFile(self.zippedFile)
+        test["boundaryField"]["walls"]["type"]="slip"
+        test.writeFile()
+        check=LazyFieldFile(self.zippedFile)
+        self.assertEqual(check["boundaryField"]["walls"]["type"],"slip")
+        self.assertTrue(self.np.array_equal(check["internalField"].value(),self.values))
+
+    def testModifyValues(self):
+        for f in [self.asciiFile,self.binaryFile,self.zippedFile]:
+            test=LazyFieldFile(f)
+            test["internalField"][0]=[7,8,9]
+            test.writeFile()
+            check=LazyFieldFile(f)
+            self.assertTrue(self.np.array_equal(check["internalField"][0],[7,8,9]))
+            self.assertTrue(self.np.array_equal(check["internalField"][1:],self.values[1:]))
+
+    def testInlineList(self):
+        test=LazyFieldFile(self.writeInline())
+        self.assertTrue(self.np.array_equal(test["internalField"].value(),
+                                            [[1,2,3],[4,5,6]]))
+        self.assertEqual(len(test["boundaryField"]["inlet"]["value"].val),2)
+
+    def testParenthesisInSeveralBlocks(self):
+        from io import BytesIO
+        data=b"List<vector> 3((1 2 3)\n(4 5 6) (7 8 9)); value (1 0 0);"
+        oldSize=lazyModule.blockSize
+        for size in [1,2,3,7,1000]:
+            lazyModule.blockSize=size
+            try:
+                self.assertEqual(lazyModule.findClosingParenthesis(BytesIO(data),data.find(b"3(")+2),
+                                 data.find(b");"))
+                self.assertEqual(lazyModule.findClosingParenthesis(BytesIO(data[:30]),data.find(b"3(")+2),-1)
+            finally:
+                lazyModule.blockSize=oldSize
+
+theSuite.addTest(unittest.makeSuite(LazyFieldFileTest,"test"))
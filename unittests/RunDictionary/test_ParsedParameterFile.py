@@ -1,13 +1,14 @@
 import unittest
+import sys
 
 from PyFoam.FoamInformation import oldTutorialStructure,foamTutorials,foamVersionNumber,foamFork
 from os import path,remove
 from tempfile import mktemp,mkdtemp
 from shutil import copyfile,rmtree,copytree
 
-from PyFoam.RunDictionary.ParsedParameterFile import FoamStringParser,ParsedParameterFile,ParsedBoundaryDict,DictProxy,TupleProxy,PyFoamParserError,WriteParameterFile
+from PyFoam.RunDictionary.ParsedParameterFile import FoamStringParser,FoamFileParser,ParsedParameterFile,ParsedBoundaryDict,ParsedFileHeader,DictProxy,TupleProxy,PyFoamParserError,WriteParameterFile
 
-from PyFoam.Basics.FoamFileGenerator import Vector,Dimension,Field,Tensor,SymmTensor,Codestream
+from PyFoam.Basics.FoamFileGenerator import FoamFileGenerator,Vector,Dimension,Field,Tensor,SymmTensor,Codestream
 
 from PyFoam.FoamInformation import oldAppConvention as oldApp
 
@@ -443,6 +444,163 @@ nix "a=3+x;b=4;";
 
 theSuite.addTest(unittest.makeSuite(FoamStringParserTest,"test"))
 
+class FoamFileParserNumpyListTest(unittest.TestCase):
+    def parse(self,txt,threshold=2):
+        return FoamFileParser(txt,noHeader=True,listLengthNumpy=threshold)
+
+    def testScalarList(self):
+        p=self.parse('test nonuniform List<scalar> 4(1.5 2 3e2 -4);')
+        self.assertEqual(type(p["test"]),Field)
+        self.assertEqual(p["test"].value().data.shape,(4,))
+        self.assertEqual(p["test"][2],300.)
+        self.assertEqual(len(p["test"]),4)
+
+    def testLabelList(self):
+        p=self.parse('test 3(1 2 3);')
+        self.assertEqual(p["test"].data.dtype.kind,"i")
+        self.assertEqual(list(p["test"]),[1,2,3])
+
+    def testVectorList(self):
+        p=self.parse('test nonuniform List<vector> 2((1 2 3) (4 5 6));\nother 1;')
+        self.assertEqual(p["test"].value().data.shape,(2,3))
+        self.assertEqual(p["other"],1)
+
+    def testTensorLists(self):
+        p=self.parse('a 2((1 2 3 4 5 6) (1 2 3 4 5 6));\nb 2((1 2 3 4 5 6 7 8 9) (1 2 3 4 5 6 7 8 9));')
+        self.assertEqual(p["a"].data.shape,(2,6))
+        self.assertEqual(p["b"].data.shape,(2,9))
+
+    def testShortListsUnchanged(self):
+        p=self.parse('test 3(1 2 3);',threshold=4)
+        self.assertEqual(p["test"],[1,2,3])
+
+    def testFallbackToParser(self):
+        p=self.parse('a 2(b c);\nb 2((1 2) (3 4));\nc 2(1 x);')
+        self.assertEqual(p["a"],["b","c"])
+        self.assertEqual(p["b"],[[1,2],[3,4]])
+        self.assertEqual(p["c"],[1,"x"])
+
+    def testMixedTuplesUseParser(self):
+        p=self.parse('a 2((1 2) (3 4 5 6));\nb 2((1 2 3) (4 5 6 7 8 9));\nc 2((1 2 3 4) (5 6));')
+        self.assertEqual(p["a"],[[1,2],[3,4,5,6]])
+        self.assertEqual(type(p["b"]),list)
+        self.assertEqual(str(p["b"][0]),"(1 2 3)")
+        self.assertEqual(str(p["b"][1]),"(4 5 6 7 8 9)")
+        self.assertEqual(p["c"],[[1,2,3,4],[5,6]])
+
+    def testLineNumbersAfterList(self):
+        try:
+            self.parse('a 3(\n1\n2\n3\n);\nb ]')
+            self.fail("No exception")
+        except PyFoamParserError:
+            e=sys.exc_info()[1]
+            self.assertEqual(e.data.lineno,6)
+
+    def testRoundtrip(self):
+        p=self.parse('a nonuniform List<vector> 2((1 2 3.5) (4 5 6));\nb 3(1 2 3);')
+        p2=self.parse(str(FoamFileGenerator(p.getData())))
+        self.assertEqual(p["a"],p2["a"])
+        self.assertEqual(p["b"],p2["b"])
+
+theSuite.addTest(unittest.makeSuite(FoamFileParserNumpyListTest,"test"))
+
+class ParsedParameterFileBinaryTest(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        self.np=np
+        self.values=np.linspace(-1,1,30).reshape((10,3))
+        self.theDir=mkdtemp()
+        self.theFile=path.join(self.theDir,"U")
+        self.writeField(self.values)
+
+    def writeField(self,values):
+        with open(self.theFile,"wb") as f:
+            f.write(b"""FoamFile
+{
+    version     2.0;
+    format      binary;
+    arch        "LSB;label=32;scalar=64";
+    class       volVectorField;
+    object      U;
+}
+
+dimensions      [0 1 -1 0 0 0 0];
+
+internalField   nonuniform List<vector> %d(""" % len(values))
+            f.write(values.astype("<f8").tobytes())
+            f.write(b""");
+
+boundaryField
+{
+    walls
+    {
+        type            noSlip;
+    }
+}
+""")
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def testReadBinary(self):
+        test=ParsedParameterFile(self.theFile)
+        field=test["internalField"].value()
+        self.assertEqual(field.elementType,"vector")
+        self.assertTrue(self.np.array_equal(field.toNumpy(),self.values))
+        self.assertEqual(test["boundaryField"]["walls"]["type"],"noSlip")
+
+    def testWriteBinary(self):
+        test=ParsedParameterFile(self.theFile)
+        test["internalField"].value().fromNumpy(2*self.values)
+        test.writeFile()
+        test2=ParsedParameterFile(self.theFile)
+        self.assertTrue(self.np.array_equal(test2["internalField"].value().toNumpy(),
+                                            2*self.values))
+
+    def testCarriageReturnInData(self):
+        # bytes that are valid UTF-8 and contain \r and \r\n
+        bits=self.np.array([13,0x0a0d,0x0d0d0a,1,13*256,0x0d,0x0a0d0a0d,2,3],dtype="<i8")
+        self.writeField(bits.view("<f8").reshape((3,3)))
+        test=ParsedParameterFile(self.theFile)
+        field=test["internalField"].value().toNumpy()
+        self.assertTrue(self.np.array_equal(field.ravel().view("<i8"),bits))
+        test.writeFile()
+        test2=ParsedParameterFile(self.theFile)
+        field=test2["internalField"].value().toNumpy()
+        self.assertTrue(self.np.array_equal(field.ravel().view("<i8"),bits))
+
+theSuite.addTest(unittest.makeSuite(ParsedParameterFileBinaryTest,"test"))
+
+class ParsedFileHeaderTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        self.theFile=path.join(self.theDir,"owner")
+        with open(self.theFile,"wb") as f:
+            f.write(b"""FoamFile
+{
+    version     2.0;
+    format      binary;
+    class       labelList;
+    note        "nPoints:10 nCells:3 nFaces:12 nInternalFaces:2";
+    object      owner;
+}
+
+12(""")
+            # neither valid UTF-8 nor something the parser understands
+            f.write(b"\xff\xfe{{{"*1000)
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def testOnlyHeaderRead(self):
+        header=ParsedFileHeader(self.theFile)
+        self.assertEqual(header["class"],"labelList")
+        self.assertEqual(header["object"],"owner")
+        self.assert_("note" in header)
+        self.assert_("nCells:3" in header["note"])
+
+theSuite.addTest(unittest.makeSuite(ParsedFileHeaderTest,"test"))
+
 class ParsedParameterDictionaryMacroExpansion(unittest.TestCase):
     def testSimpleSubst(self):
         p1=FoamStringParser("""
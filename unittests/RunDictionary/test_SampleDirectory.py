@@ -1,6 +1,8 @@
 import unittest
+import os
 
-from PyFoam.RunDictionary.SampleDirectory import SampleDirectory
+from PyFoam.RunDictionary.SampleDirectory import SampleDirectory,sampleFileData,invalidate
+from PyFoam.RunDictionary import DirectoryIndex
 
 from os import path,mkdir
 from shutil import rmtree
@@ -177,3 +179,68 @@ class SampleDataTestPrefix(unittest.TestCase):
         p2=st[("line2","pre_p")]
 
 theSuite.addTest(unittest.makeSuite(SampleTimeTest,"test"))
+
+class SampleCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=createDirectory()
+        invalidate()
+
+    def tearDown(self):
+        DirectoryIndex.racyInterval=2.
+        DirectoryIndex.invalidate()
+        invalidate()
+        destroyDirectory(self.theDir)
+
+    def testFileParsedOnce(self):
+        fName=path.join(self.theDir,"samples","0","line1_p_p2_p3.xy")
+        data=sampleFileData(fName)
+        self.assertEqual(data.columns.shape,(3,4))
+        self.assert_(sampleFileData(fName) is data)
+        sd=SampleDirectory(self.theDir)
+        self.assertEqual(sd["0"][("line1","p3")].data,[0.,1.,1.])
+        self.assertEqual(sd["0"][("line1","p2")].data,[0.,0.,1.])
+        self.assert_(sampleFileData(fName) is data)
+        open(fName,"w").write("0 1 2 3\n")
+        self.assert_(sampleFileData(fName) is not data)
+        self.assertEqual(sampleFileData(fName).columns.shape,(1,4))
+
+    def testFilesIndexed(self):
+        sd=SampleDirectory(self.theDir)
+        st=sd["0"]
+        self.assertEqual(st.files[("line1","p2")],"line1_p_p2_p3.xy")
+        self.assertEqual(st.files[("line2","U2")],"line2_U_U2.xy")
+        self.assertEqual(len(st.files),10)
+
+    def testSampleTimeReused(self):
+        DirectoryIndex.racyInterval=-1e10
+        sd=SampleDirectory(self.theDir)
+        st=sd["0"]
+        self.assert_(sd["0"] is st)
+        open(path.join(self.theDir,"samples","0","line3_T.xy"),"w").write("0 1\n1 2\n")
+        DirectoryIndex.invalidate()
+        self.assert_(sd["0"] is not st)
+        self.assertEqual(sd["0"][("line3","T")].data,[1.,2.])
+
+    def testFileRewrittenInPlace(self):
+        DirectoryIndex.racyInterval=-1e10
+        fName=path.join(self.theDir,"samples","0","line1_p_p2_p3.xy")
+        sd=SampleDirectory(self.theDir)
+        st=sd["0"]
+        self.assertEqual(sd.getData(line=["line1"],value=["p"],time=["0"])[0].data,[0.,0.,1.])
+        st0=os.stat(path.dirname(fName))
+        with open(fName,"w") as f:
+            f.write("0 7 0 0\n1 8 0 0\n")
+        # the directory is not changed by rewriting a file
+        os.utime(path.dirname(fName),ns=(st0.st_atime_ns,st0.st_mtime_ns))
+        os.utime(fName,(st0.st_atime+10,st0.st_mtime+10))
+        self.assert_(sd["0"] is st)
+        self.assertEqual(sd.getData(line=["line1"],value=["p"],time=["0"])[0].data,[7.,8.])
+
+    def testNotesNotShared(self):
+        sd=SampleDirectory(self.theDir)
+        d1=sd.getData(line=["line1"],value=["p"],note="first")[0]
+        d2=sd.getData(line=["line1"],value=["p"],note="second")[0]
+        self.assertEqual(d1.note,"first")
+        self.assertEqual(d2.note,"second")
+
+theSuite.addTest(unittest.makeSuite(SampleCacheTest,"test"))
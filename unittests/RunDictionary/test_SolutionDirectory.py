@@ -1,9 +1,11 @@
 import unittest
+import sys
 
 from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
 from PyFoam.RunDictionary.TimeDirectory import TimeDirectory
+from PyFoam.Error import FatalErrorPyFoamException
 
-from os import path,environ,system
+from os import path,environ,system,mkdir,makedirs,listdir,utime
 from tempfile import mkdtemp
 from shutil import rmtree,copytree
 
@@ -51,4 +53,106 @@ class SolutionDirectoryTest(unittest.TestCase):
 
 theSuite.addTest(unittest.makeSuite(SolutionDirectoryTest,"test"))
 
+def makeSyntheticCase(dName,times,nrProcs=0,procTimes=None):
+    """A case with empty time-directories and processor-directories"""
+    for d in ["constant/polyMesh","system"]:
+        makedirs(path.join(dName,d))
+    open(path.join(dName,"system","controlDict"),"w").close()
+    for t in times:
+        mkdir(path.join(dName,t))
+    for p in range(nrProcs):
+        pDir=path.join(dName,"processor%d" % p)
+        mkdir(pDir)
+        for t in (procTimes if procTimes is not None else times):
+            mkdir(path.join(pDir,t))
+
+class SolutionDirectoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        self.theFile=path.join(self.theDir,"synthetic")
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def testTimesSortedNumerically(self):
+        makeSyntheticCase(self.theFile,["0","0.5","10","2","1e-3"])
+        test=SolutionDirectory(self.theFile)
+        self.assertEqual(test.getTimes(),["0","1e-3","0.5","2","10"])
+        self.assertEqual(test.getFirst(),"0")
+        self.assertEqual(test.getLast(),"10")
+        self.assertEqual(test.timeIndex(2.),3)
+        self.assertEqual(test.timeIndex(2.1),None)
+        self.assertEqual(test.timeIndex(2.1,minTime=True),3)
+        self.assertEqual(test.timeIndex(100,minTime=True),4)
+
+    def testNewTimesAreSeen(self):
+        makeSyntheticCase(self.theFile,["0","1"])
+        test=SolutionDirectory(self.theFile)
+        self.assertEqual(len(test),2)
+        mkdir(path.join(self.theFile,"2"))
+        self.assertEqual(test.getLast(),"2")
+        rmtree(path.join(self.theFile,"1"))
+        self.assertEqual(test.getTimes(),["0","2"])
+
+    def testProcessorDirectories(self):
+        makeSyntheticCase(self.theFile,["0"],nrProcs=12,procTimes=["0","3","20"])
+        test=SolutionDirectory(self.theFile)
+        self.assertEqual(test.nrProcs(),12)
+        self.assertEqual(test.processorDirs(),["processor%d" % i for i in range(12)])
+        self.assertEqual(test.getParallelTimes(),["0","3","20"])
+        par=SolutionDirectory(self.theFile,parallel=True)
+        self.assertEqual(par.getTimes(),["0","3","20"])
+        self.assertEqual(par.firstParallel,"0")
+
+    def testClearResultsParallel(self):
+        makeSyntheticCase(self.theFile,["0","1","2"],nrProcs=3,procTimes=["0","1","2","3"])
+        test=SolutionDirectory(self.theFile,parallel=True)
+        test.clearResults(keepTimes=[1])
+        self.assertEqual(test.getTimes(),["0","1"])
+        self.assertEqual(SolutionDirectory(self.theFile).getTimes(),["0","1"])
+        for p in test.processorDirs():
+            self.assertEqual(sorted(listdir(path.join(self.theFile,p))),["0","1"])
+
+    def testRegions(self):
+        makeSyntheticCase(self.theFile,["0"])
+        makedirs(path.join(self.theFile,"constant","solid","polyMesh"))
+        makedirs(path.join(self.theFile,"constant","noMesh"))
+        test=SolutionDirectory(self.theFile)
+        self.assertEqual(test.getRegions(),["solid"])
+        self.assertEqual(test.regions(),["solid"])
+
+    def testPostprocessing(self):
+        makeSyntheticCase(self.theFile,["0"])
+        for d,files in [("probes",["p"]),
+                        ("sets",["line_p.xy"]),
+                        ("mixed",["line_p.xy","plane_p.vtk"])]:
+            makedirs(path.join(self.theFile,"postProcessing",d,"0"))
+            for n in files:
+                open(path.join(self.theFile,"postProcessing",d,"0",n),"w").close()
+        test=SolutionDirectory(self.theFile)
+        try:
+            test.timelines
+            self.fail("No exception")
+        except FatalErrorPyFoamException:
+            e=sys.exc_info()[1]
+            self.assert_(str(e).find("plane_p.vtk")>=0)
+        rmtree(path.join(self.theFile,"postProcessing","mixed"))
+        test=SolutionDirectory(self.theFile)
+        self.assertEqual(test.timelines,[path.join("postProcessing","probes")])
+        self.assertEqual(test.samples,[path.join("postProcessing","sets")])
+
+    def testPickledPlotsNewestFile(self):
+        makeSyntheticCase(self.theFile,["0"])
+        analyzed=path.join(self.theFile,"PyFoamRunner.test.analyzed")
+        mkdir(analyzed)
+        for n,t in [("pickledPlots",1000),("timelineStore",2000)]:
+            open(path.join(analyzed,n),"w").close()
+            utime(path.join(analyzed,n),(t,t))
+        test=SolutionDirectory(self.theFile)
+        self.assertEqual(test.pickledPlots,[path.join("PyFoamRunner.test.analyzed","timelineStore")])
+        utime(path.join(analyzed,"pickledPlots"),(3000,3000))
+        self.assertEqual(test.pickledPlots,[path.join("PyFoamRunner.test.analyzed","pickledPlots")])
+
+theSuite.addTest(unittest.makeSuite(SolutionDirectoryIndexTest,"test"))
+
 # Should work with Python3 and Python2
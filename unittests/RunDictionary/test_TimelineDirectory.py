@@ -1,6 +1,6 @@
 import unittest
 
-from PyFoam.RunDictionary.TimelineDirectory import TimelineDirectory
+from PyFoam.RunDictionary.TimelineDirectory import TimelineDirectory,timelineData,invalidate
 from PyFoam.Basics.SpreadsheetData import SpreadsheetData
 
 from PyFoam.ThirdParty.six import b
@@ -202,3 +202,69 @@ class TimelineValueTest(unittest.TestCase):
         self.assertEqual(spread.data.dtype[1].kind,"S")
 
 theSuite.addTest(unittest.makeSuite(TimelineValueTest,"test"))
+
+class TimelineDataTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=createDirectory()
+        self.fName=path.join(self.theDir,"probes","0","p")
+        invalidate()
+
+    def tearDown(self):
+        invalidate()
+        destroyDirectory(self.theDir)
+
+    def testDataIsCached(self):
+        data=timelineData(self.fName)
+        self.assertEqual(list(data.times()),[0,1,3])
+        self.assertEqual(data.values().shape,(3,4))
+        self.assert_(data.rows is None)
+        self.assert_(timelineData(self.fName) is data)
+        self.assertEqual(list(data.nearest([-1,0.5,1.9,2,2.1,7])),[0,0,1,1,2,2])
+
+    def testIncrementalRead(self):
+        sd=TimelineDirectory(self.theDir)
+        self.assertEqual(sd["p"].timeRange(),(0,3))
+        offset=timelineData(self.fName).offset
+        with open(self.fName,"a") as f:
+            f.write("4 2 2 2 2\n5 3 3")
+        self.assertEqual(sd["p"].timeRange(),(0,4))
+        self.assert_(timelineData(self.fName).offset>offset)
+        with open(self.fName,"a") as f:
+            f.write(" 3 3\n")
+        self.assertEqual(sd["p"].timeRange(),(0,5))
+        self.assertEqual(sd["p"].getData([4.6]),[[3.,3.,3.,3.]])
+        self.assertEqual(sd["p"]().size(),5)
+
+    def testRewrittenFile(self):
+        sd=TimelineDirectory(self.theDir)
+        self.assertEqual(sd["p"].timeRange(),(0,3))
+        with open(self.fName,"w") as f:
+            f.write("# x 0 1 2 3\n# y 0 0 0 1\n# z 1 1 1 1\n# Time\n")
+            f.write("10 0 0 0 1\n11 0 0 1 1\n12 1 1 1 1\n13 1 1 1 1\n")
+        self.assertEqual(sd["p"].timeRange(),(10,13))
+
+    def testIrregularLinesAppended(self):
+        sd=TimelineDirectory(self.theDir)
+        sd["p"].getData([0])
+        with open(self.fName,"a") as f:
+            f.write("4 2 2\n")
+        self.assertEqual(sd["p"].getData([0,4]),[[0.,0.,0.,1.],[2.,2.]])
+        self.assertEqual(sd["p"].timeRange(),(0,3))
+
+    def testVectorComponents(self):
+        sd=TimelineDirectory(self.theDir)
+        st=sd["U"]
+        self.assert_(st.isVector)
+        self.assertEqual(st.getData([1],vectorMode="x"),[[0.,0.,0.,0.]])
+        self.assertEqual(st.getData([1],vectorMode="y"),[[0.,1.,0.,0.]])
+        self.assertEqual(st.getData([1,3],vectorMode="z"),[[1.,0.,1.,0.],[1.,1.,1.,0.]])
+        self.assertEqual(st.getData([3]),[[1.,1.,1.,0.]])
+
+    def testUnsortedTimes(self):
+        with open(self.fName,"a") as f:
+            f.write("2 5 5 5 5\n")
+        data=timelineData(self.fName)
+        self.assert_(not data.sorted)
+        self.assertEqual(list(data.nearest([1.9,2.5,3])),[3,2,2])
+
+theSuite.addTest(unittest.makeSuite(TimelineDataTest,"test"))